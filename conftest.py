@@ -2,26 +2,81 @@ import os
 import platform
 import pytest
 from pathlib import Path
+from typing import Optional
 
-from utils.helper.KubenetesHellper import KubernetesHelper
+from utils.helper.LatencyHistogram import latency_registry
+from utils.helper.MetadataCache import metadata_cache
+from utils.helper.WorkerHelper import WorkerHelper
+from utils.logger import log
 
-kubernetes_helper = KubernetesHelper(default_namespace=f"{os.environ['KUBERNETES_NAMESPACE']}")
+
+@pytest.fixture(scope="session")
+def kubernetes_helper():
+    """
+    Kubernetes 客户端，第一次被测试使用时才导入 kubernetes 并创建
+    纯 HTTP 测试不会触发 kubeconfig 加载；未设置 KUBERNETES_NAMESPACE 时依赖它的测试被跳过
+    """
+    namespace = os.getenv("KUBERNETES_NAMESPACE")
+    if not namespace:
+        pytest.skip("未设置 KUBERNETES_NAMESPACE，跳过依赖 Kubernetes 的测试")
+
+    from utils.helper.KubenetesHellper import KubernetesHelper
+    return KubernetesHelper(default_namespace=namespace)
+
+
+def _allure_results_dir(config) -> Optional[Path]:
+    """--alluredir 指定的 Allure 结果目录，未启用 Allure 时返回 None"""
+    report_dir = getattr(config.option, "allure_report_dir", None)
+    return Path(report_dir) if report_dir else None
+
+
+def pytest_configure(config):
+    """主进程生成本次运行的 ID，xdist 工作进程启动时通过环境变量继承"""
+    WorkerHelper.run_id()
+    config.addinivalue_line("markers", "xdist_group(name): 同组测试在同一个 xdist 工作进程中顺序执行")
+    config.addinivalue_line("markers", "throughput: 对 CPU 时间敏感的吞吐量测试，设置 BENCHMARK_THROUGHPUT=1 后运行")
+    # 共享模块级状态的测试 (如基准测试汇总) 通过 xdist_group 固定到同一个工作进程，
+    # loadgroup 对未分组的测试与 load 的分发方式相同
+    if getattr(config.option, "dist", "no") == "load":
+        config.option.dist = "loadgroup"
+    # 工作进程按自己的命令行参数解析 dist，由主进程告知是否需要给测试 ID 加上分组后缀
+    if getattr(config, "workerinput", {}).get("loadgroup"):
+        config.option.loadgroup = True
+
+
+def pytest_collection_modifyitems(config, items):
+    """吞吐量测试在共享 CI 机器或 -n 并行运行时结果不稳定，默认跳过"""
+    if os.getenv("BENCHMARK_THROUGHPUT") == "1":
+        return
+    skip = pytest.mark.skip(reason="设置 BENCHMARK_THROUGHPUT=1 后运行吞吐量测试")
+    for item in items:
+        if item.get_closest_marker("throughput"):
+            item.add_marker(skip)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """xdist 主进程启动工作进程前调用"""
+    node.workerinput["loadgroup"] = node.config.getvalue("dist") == "loadgroup"
 
 
 @pytest.hookimpl(tryfirst=True)
 def pytest_sessionstart(session):
-    """在所有测试开始前执行"""
+    """在所有测试开始前执行，会话级产物只由主进程生成"""
+    results_dir = _allure_results_dir(session.config)
+    if results_dir is None or not WorkerHelper.is_controller(session.config):
+        return
+
     env_vars = {
         "Python.Version": platform.python_version(),
         "OS": platform.platform(),
         "Pytest.Version": pytest.__version__,
         "CI": os.getenv("CI", "false"),
-        "Workers": os.getenv("PYTEST_XDIST_WORKER_COUNT", "1")
+        "Workers": str(getattr(session.config.option, "numprocesses", None) or 1)
     }
 
     # 确保目录存在
-    results_dir = Path("allure-results")
-    results_dir.mkdir(exist_ok=True)
+    results_dir.mkdir(parents=True, exist_ok=True)
 
     # 写入环境文件（使用绝对路径）
     env_file = results_dir / "environment.properties"
@@ -32,3 +87,48 @@ def pytest_sessionstart(session):
     print(f"✅ 环境文件已生成: {env_file.absolute()}")
 
 
+def pytest_sessionfinish(session, exitstatus):
+    """在所有测试结束后执行"""
+    # 高吞吐日志模式下汇总被采样丢弃的日志
+    log.report_suppressed()
+
+    # 延迟汇总只在启用 Allure 时随结果一起发布
+    results_dir = _allure_results_dir(session.config)
+    latency_prefix = f"latency-{WorkerHelper.run_id()}"
+    if not WorkerHelper.is_controller(session.config):
+        # 工作进程只保存自己的数据，由主进程在所有工作进程结束后合并
+        if results_dir is not None:
+            latency_registry.save(results_dir / f"{latency_prefix}-{WorkerHelper.worker_id()}.json")
+        session.config.workeroutput["metadata_cache"] = metadata_cache.stats()
+        log.complete()
+        return
+
+    if results_dir is not None:
+        # 完整汇总保存为 latency-summary.json，各接口的总耗时追加到 environment.properties 显示在报告首页
+        latency_registry.merge_files(results_dir.glob(f"{latency_prefix}-*.json"), remove=True)
+        summary_file = latency_registry.write_summary(results_dir)
+        if summary_file:
+            with (results_dir / "environment.properties").open("a", encoding="utf-8") as f:
+                for k, v in latency_registry.environment_properties().items():
+                    f.write(f"{k}={v}\n")
+            print(f"✅ 延迟汇总已生成: {summary_file.absolute()}")
+
+    # 合并各工作进程的日志
+    for merged_log in WorkerHelper.merge_worker_logs(log._logs_dir):
+        print(f"✅ 工作进程日志已合并: {merged_log.absolute()}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """xdist 工作进程结束时合并它的元数据缓存统计"""
+    stats = getattr(node, "workeroutput", {}).get("metadata_cache")
+    if stats:
+        metadata_cache.merge_stats(stats)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """在会话汇总中显示元数据缓存的命中情况"""
+    summary = metadata_cache.summary()
+    if summary:
+        terminalreporter.write_sep("-", "CnosDB metadata cache")
+        terminalreporter.write_line(summary)
@@ -0,0 +1,148 @@
+"""
+CnosDB 写入与查询基准测试
+
+默认在本地替身服务上运行，用于验证基准测试工具本身；设置 BENCHMARK_BASE_URL 后对真实集群测量。
+结果保存到 BENCHMARK_RESULTS_DIR，并与 BENCHMARK_BASELINE 比较，
+退化超过 BENCHMARK_REGRESSION_THRESHOLD 时测试失败，详见 BenchmarkHelper。
+
+环境变量:
+    BENCHMARK_BASE_URL: CnosDB 地址，例如 http://127.0.0.1:8902
+    BENCHMARK_USERNAME / BENCHMARK_PASSWORD: 认证信息，默认 root / 空
+    BENCHMARK_POINTS: 每组写入的数据点数，默认 20000
+    BENCHMARK_SERIES: 写入数据的序列数，默认 100
+    BENCHMARK_OUT_OF_ORDER: 写入数据中乱序点的比例，默认 0
+    BENCHMARK_QUERY_ITERATIONS: 每条查询的执行次数，默认 50
+"""
+import os
+
+import allure
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.helper.BenchmarkHelper import BenchmarkHelper, BenchmarkReport
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.WorkerHelper import WorkerHelper
+from utils.helper.WorkloadGenerator import WorkloadGenerator
+from utils.logger import log
+
+# 汇总测试依赖同模块其他测试的结果，xdist 下固定在同一个工作进程
+pytestmark = pytest.mark.xdist_group("cnosdb_benchmark")
+
+DB_NAME = WorkerHelper.db_name("benchmark")
+POINTS = int(os.getenv("BENCHMARK_POINTS", "20000"))
+SERIES = int(os.getenv("BENCHMARK_SERIES", "100"))
+OUT_OF_ORDER = float(os.getenv("BENCHMARK_OUT_OF_ORDER", "0"))
+QUERY_ITERATIONS = int(os.getenv("BENCHMARK_QUERY_ITERATIONS", "50"))
+USERNAME = os.getenv("BENCHMARK_USERNAME", "root")
+PASSWORD = os.getenv("BENCHMARK_PASSWORD", "")
+
+BATCH_SIZES = [1000, 5000, 10000]
+PRECISIONS = ["ns", "ms"]
+QUERIES = {
+    "select_limit": "SELECT * FROM air ORDER BY time DESC LIMIT 100",
+    "count": "SELECT count(*) FROM air",
+    "group_by_station": "SELECT station, avg(temperature), max(pressure) FROM air GROUP BY station",
+    "time_bucket": "SELECT date_bin(INTERVAL '1 minute', time) AS minute, avg(temperature) "
+                   "FROM air GROUP BY minute ORDER BY minute",
+}
+
+
+def _workload(precision: str) -> WorkloadGenerator:
+    """写入基准使用的确定性负载，相同参数在不同版本间生成完全相同的数据"""
+    return WorkloadGenerator("iot", series=SERIES, points_per_series=-(-POINTS // SERIES), interval="1s",
+                             out_of_order=OUT_OF_ORDER, precision=precision)
+
+
+def _generate_air(points: int, seed: int = 0) -> pd.DataFrame:
+    """生成 air 表的测试数据: 100 个站点，每秒一个点"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=points, freq="s"),
+        "station": np.char.add("station_", (np.arange(points) % 100).astype(str)),
+        "temperature": rng.normal(20, 5, points).round(2),
+        "pressure": rng.normal(1000, 10, points).round(2),
+        "visibility": rng.integers(0, 100, points),
+    })
+
+
+@pytest.fixture(scope="module")
+def target(request):
+    """返回 (base_url, 是否为替身服务)"""
+    base_url = os.getenv("BENCHMARK_BASE_URL")
+    if base_url:
+        return base_url, False
+    stub = request.getfixturevalue("cnosdb_stub")
+    stub.tables["air"] = _generate_air(1000)
+    return stub.base_url, True
+
+
+@pytest.fixture(scope="module")
+def database(target):
+    base_url, _ = target
+    CnosDBHelper._make_request(base_url, "/api/v1/sql?db=", f"DROP DATABASE IF EXISTS {DB_NAME}",
+                               USERNAME, PASSWORD, expected_status=None)
+    CnosDBHelper._make_request(base_url, "/api/v1/sql?db=", f"CREATE DATABASE {DB_NAME}", USERNAME, PASSWORD)
+    return DB_NAME
+
+
+@pytest.fixture(scope="module")
+def report(target):
+    _, is_stub = target
+    return BenchmarkReport("cnosdb", metadata={"target": "stub" if is_stub else target[0], "points": POINTS,
+                                               "workload": _workload("ns").describe()})
+
+
+@allure.story("CnosDB Write Benchmark")
+@pytest.mark.parametrize("precision", PRECISIONS)
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+def test_write_throughput(target, database, report, batch_size, precision):
+    base_url, _ = target
+    workload = _workload(precision)
+    blocks = list(workload.iter_chunks(batch_size))
+
+    result = BenchmarkHelper.measure_write(
+        base_url, database, blocks, USERNAME, PASSWORD, precision=precision, batch_lines=batch_size
+    )
+    log.info(f"写入基准 batch={batch_size} precision={precision}: {result}")
+
+    prefix = f"write.{precision}.batch_{batch_size}"
+    report.add(f"{prefix}.points_per_sec", round(result["points_per_sec"], 1), "points/s")
+    report.add(f"{prefix}.mb_per_sec", round(result["mb_per_sec"], 3), "MB/s")
+    report.add(f"{prefix}.batch_p99", round(result["batch_latency"]["p99"], 6), "s", higher_is_better=False)
+
+    assert result["points"] == workload.total_points
+    assert result["batches"] == len(blocks)
+
+
+@allure.story("CnosDB Query Benchmark")
+@pytest.mark.parametrize("query_name", list(QUERIES))
+def test_query_latency(target, database, report, query_name):
+    base_url, _ = target
+    result = BenchmarkHelper.measure_query(
+        base_url, database, QUERIES[query_name], USERNAME, PASSWORD, iterations=QUERY_ITERATIONS
+    )
+    log.info(f"查询基准 {query_name}: {result}")
+
+    for percentile in BenchmarkHelper.PERCENTILES:
+        report.add(f"query.{query_name}.p{percentile}", round(result[f"p{percentile}"], 6), "s",
+                   higher_is_better=False)
+
+    assert result["iterations"] == QUERY_ITERATIONS
+    assert result["p50"] <= result["p95"] <= result["p99"] <= result["max"]
+
+
+@allure.story("CnosDB Benchmark Baseline")
+def test_compare_with_baseline(report):
+    """
+    汇总本模块的结果并与基线比较，需要在同模块其他基准测试之后运行
+    单独运行 (其他基准测试未执行) 或没有基线时明确跳过，后者仍会保存本次结果
+    """
+    if not report.metrics:
+        pytest.skip("本模块的基准测试未在当前进程中执行，没有可汇总的结果")
+    has_baseline = BenchmarkReport.load_baseline(os.getenv("BENCHMARK_BASELINE")) is not None
+
+    regressions = BenchmarkHelper.finish(report)
+    if not has_baseline:
+        pytest.skip("未设置 BENCHMARK_BASELINE 或基线文件不存在，结果已保存，跳过基线比较")
+    assert not regressions, f"性能退化超过阈值: {[r['metric'] for r in regressions]}"
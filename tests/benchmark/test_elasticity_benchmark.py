@@ -0,0 +1,49 @@
+"""
+弹性基准测试：在持续的写入和查询负载下扩缩 CnosDB 的 StatefulSet/Deployment，测量 Pod 全部 Ready 的时间、
+新节点开始承接写入的时间、扩缩容期间的吞吐下降与恢复时间，以及每一步之后 vnode 数据在各节点上的分布。
+结果保存到 BENCHMARK_RESULTS_DIR，并与 BENCHMARK_BASELINE 比较，详见 BenchmarkHelper。
+
+需要 Kubernetes 集群 (KUBERNETES_NAMESPACE)，会修改工作负载的副本数，结束时恢复。
+
+环境变量:
+    ELASTICITY_WORKLOAD: 扩缩的工作负载名称，默认 cnosdb-query-tskv
+    ELASTICITY_KIND: statefulset 或 deployment，默认 statefulset
+    ELASTICITY_STEPS: 依次扩缩到的副本数，逗号分隔，默认先加一个副本再恢复
+    ELASTICITY_BASE_URL: 负载使用的 CnosDB 地址，默认工作负载序号最小的 Pod
+    ELASTICITY_SETTLE: 每一步之后的观察时间(秒)，默认 30
+"""
+import os
+
+import allure
+
+from utils.helper.BenchmarkHelper import BenchmarkHelper
+from utils.helper.ElasticityBenchmark import ElasticityBenchmark
+from utils.helper.WorkerHelper import WorkerHelper
+
+WORKLOAD = os.getenv("ELASTICITY_WORKLOAD", "cnosdb-query-tskv")
+KIND = os.getenv("ELASTICITY_KIND", "statefulset")
+STEPS = [int(step) for step in os.getenv("ELASTICITY_STEPS", "").split(",") if step.strip()] or None
+BASE_URL = os.getenv("ELASTICITY_BASE_URL")
+SETTLE = float(os.getenv("ELASTICITY_SETTLE", "30"))
+
+
+@allure.story("Elasticity Benchmark")
+def test_elasticity(kubernetes_helper):
+    base_url = BASE_URL
+    if not base_url:
+        workload = kubernetes_helper.get_workload(KIND, WORKLOAD)
+        assert workload is not None, f"{KIND} {WORKLOAD} 不存在"
+        pods = sorted(kubernetes_helper.list_pods(label_selector=workload["selector"]),
+                      key=lambda pod: kubernetes_helper.pod_sort_key(pod["name"]))
+        assert pods, f"{KIND} {WORKLOAD} 没有 Pod"
+        # 缩容从序号最大的 Pod 开始，负载发往序号最小的 Pod
+        base_url = f"http://{pods[0]['ip']}:8902"
+
+    bench = ElasticityBenchmark(kubernetes_helper, WORKLOAD, base_url, kind=KIND, steps=STEPS,
+                                db_name=WorkerHelper.db_name("elasticity"), settle=SETTLE)
+    report = bench.run()
+
+    results = bench.results()
+    assert results["error"].isna().all(), f"扩缩容失败: {results['error'].dropna().tolist()}"
+    regressions = BenchmarkHelper.finish(report)
+    assert not regressions, f"性能退化超过阈值: {[r['metric'] for r in regressions]}"
@@ -0,0 +1,68 @@
+"""
+Line Protocol 编码与合成负载生成的吞吐量测试
+
+结果受 CPU 时间影响，在 -n 并行或共享 CI 机器上不稳定，默认跳过；设置 BENCHMARK_THROUGHPUT=1 后运行，
+阈值按单核放宽到典型值的三分之一左右
+"""
+import time
+
+import allure
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.helper.LineProtocolEncoder import LineProtocolEncoder
+from utils.helper.WorkloadGenerator import WorkloadGenerator
+from utils.logger import log
+
+pytestmark = pytest.mark.throughput
+
+ROWS = 200_000
+
+
+@allure.story("Line Protocol Encoder Throughput")
+@pytest.mark.parametrize("decimals, float_format, minimum", [
+    # 两位小数的传感器读数按列向量化格式化，约 100 万行/秒
+    (2, "%r", 300_000),
+    # 全精度随机数逐值格式化，%r 约 30-60 万行/秒，%.6g 约快一倍
+    (None, "%r", 100_000),
+    (None, "%.6g", 200_000),
+])
+def test_line_protocol_encoder_throughput(decimals, float_format, minimum):
+    rng = np.random.default_rng(0)
+    temperature = rng.normal(20, 5, ROWS)
+    pressure = rng.random(ROWS)
+    if decimals is not None:
+        temperature, pressure = np.round(temperature, decimals), np.round(pressure, decimals)
+    df = pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=ROWS, freq="s"),
+        "station": rng.choice([f"station_{i}" for i in range(100)], ROWS),
+        "temperature": temperature,
+        "pressure": pressure,
+        "visibility": rng.integers(0, 100, ROWS),
+    })
+
+    start = time.perf_counter()
+    data = LineProtocolEncoder.encode_dataframe(df, "air", ["station"], time_column="time", float_format=float_format)
+    elapsed = time.perf_counter() - start
+    log.info(f"LineProtocolEncoder ({float_format}, decimals={decimals}): {ROWS / elapsed:.0f} 行/秒")
+
+    assert data.count(b"\n") == ROWS
+    assert ROWS / elapsed > minimum, f"{ROWS / elapsed:.0f} lines/s"
+
+
+@allure.story("Workload Generator Throughput")
+@pytest.mark.parametrize("profile", ["iot", "devops"])
+def test_workload_generator_throughput(profile):
+    workload = WorkloadGenerator(profile, series=100000, points_per_series=10)
+
+    # 单核环境实测 iot 约 1.5M、devops (10 个字段) 约 1.2M points/s，取三次中最快的一次，下限留出余量
+    best = 0.0
+    for _ in range(3):
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in workload.iter_chunks(100000))
+        best = max(best, workload.total_points / (time.perf_counter() - start))
+    log.info(f"WorkloadGenerator ({profile}): {best:.0f} points/s")
+
+    assert size > 100 * workload.total_points
+    assert best > 750000, f"{best:.0f} points/s"
@@ -0,0 +1,63 @@
+"""
+连接池基准测试：对比复用长连接与每次新建连接时的请求吞吐量 (requests/s)
+"""
+import json
+import time
+
+import allure
+import pytest
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.HttpSessionPool import session_pool
+from utils.logger import log
+
+REQUEST_COUNT = 300
+
+
+@pytest.fixture(scope="module", autouse=True)
+def bench_database(cnosdb_stub):
+    CnosDBHelper.create_database("bench", ip=cnosdb_stub.host, port=cnosdb_stub.port)
+
+
+def _run_writes(base_url: str, use_session_pool: bool) -> float:
+    """顺序写入 REQUEST_COUNT 次，返回 requests/s"""
+    start = time.perf_counter()
+    for i in range(REQUEST_COUNT):
+        CnosDBHelper._make_request(
+            base_url=base_url,
+            endpoint="/api/v1/write?db=bench&precision=ns",
+            data=f"ma,ta=a fa={i}",
+            use_session_pool=use_session_pool
+        )
+    return REQUEST_COUNT / (time.perf_counter() - start)
+
+
+@allure.story("HTTP Session Pool Benchmark")
+def test_session_pool_throughput(cnosdb_stub):
+    session_pool.close_all()
+
+    cnosdb_stub.client_ports.clear()
+    pooled_rps = _run_writes(cnosdb_stub.base_url, use_session_pool=True)
+    pooled_connections = len(cnosdb_stub.client_ports)
+
+    cnosdb_stub.client_ports.clear()
+    unpooled_rps = _run_writes(cnosdb_stub.base_url, use_session_pool=False)
+    unpooled_connections = len(cnosdb_stub.client_ports)
+
+    result = {
+        "requests": REQUEST_COUNT,
+        "pooled_rps": round(pooled_rps, 1),
+        "unpooled_rps": round(unpooled_rps, 1),
+        "pooled_connections": pooled_connections,
+        "unpooled_connections": unpooled_connections,
+    }
+    allure.attach(
+        json.dumps(result, indent=2),
+        name="Session Pool Benchmark",
+        attachment_type=allure.attachment_type.JSON
+    )
+    log.info(f"连接池基准结果: {result}")
+
+    assert pooled_connections == 1, f"连接池未复用连接: {pooled_connections} 个连接"
+    assert unpooled_connections == REQUEST_COUNT
+    assert len(cnosdb_stub.databases["bench"]) == 2 * REQUEST_COUNT
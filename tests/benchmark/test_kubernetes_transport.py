@@ -0,0 +1,105 @@
+"""
+Kubernetes API 传输基准测试：在本地 API Server 替身上比较库默认连接池与调大后的连接池，
+1 到 64 个并发调用方的吞吐量 (requests/s)、延迟和新建连接数
+
+环境变量:
+    K8S_BENCHMARK_REQUESTS: 每个并发级别的总请求数，默认 320
+    K8S_BENCHMARK_DELAY: 替身服务每个请求的处理时间(秒)，默认 0.01
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+import pandas as pd
+import pytest
+from kubernetes import client
+
+from tests.stub.kubernetes_api_server import KubernetesApiStubServer
+from utils.helper.KubenetesHellper import KubernetesHelper
+from utils.helper.LatencyHistogram import LatencyHistogram
+from utils.logger import log
+
+REQUESTS = int(os.getenv("K8S_BENCHMARK_REQUESTS", "320"))
+DELAY = float(os.getenv("K8S_BENCHMARK_DELAY", "0.01"))
+CONCURRENCY = [1, 2, 4, 8, 16, 32, 64]
+TUNED_POOL_SIZE = 64
+
+
+@pytest.fixture(scope="module")
+def api_stub():
+    with KubernetesApiStubServer(pods=2, delay=DELAY) as server:
+        yield server
+
+
+@pytest.fixture
+def k8s(api_stub, tmp_path):
+    helper = object.__new__(KubernetesHelper)
+    helper._default_namespace = api_stub.namespace
+    helper._config_file = str(api_stub.write_kubeconfig(tmp_path / "kubeconfig"))
+    yield helper
+    client.Configuration.set_default(None)
+
+
+def _run(k8s: KubernetesHelper, api_stub: KubernetesApiStubServer, callers: int) -> dict:
+    """callers 个线程共同完成 REQUESTS 次 list_pods"""
+    api_stub.reset_counters()
+    histogram = LatencyHistogram()
+    lock = threading.Lock()
+    barrier = threading.Barrier(callers)
+
+    def caller(count: int):
+        barrier.wait()
+        for _ in range(count):
+            start = time.perf_counter()
+            k8s.list_pods()
+            elapsed = time.perf_counter() - start
+            with lock:
+                histogram.record(elapsed)
+
+    counts = [REQUESTS // callers + (index < REQUESTS % callers) for index in range(callers)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        list(executor.map(caller, counts))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "callers": callers,
+        "rps": round(REQUESTS / elapsed, 1),
+        "p50_ms": round(histogram.percentile(50) * 1000, 2),
+        "p99_ms": round(histogram.percentile(99) * 1000, 2),
+        "connections": len(api_stub.client_ports),
+        "server_concurrency": api_stub.max_active,
+    }
+
+
+@allure.story("Kubernetes Transport Benchmark")
+def test_transport_throughput(k8s, api_stub):
+    default_pool_size = client.Configuration().connection_pool_maxsize
+    rows = []
+    for label, pool_size in [("default", default_pool_size), ("tuned", TUNED_POOL_SIZE)]:
+        k8s.configure_transport(pool_size=pool_size)
+        k8s.list_pods()
+        for callers in CONCURRENCY:
+            rows.append({"transport": label, "pool_size": pool_size, **_run(k8s, api_stub, callers)})
+
+    table = pd.DataFrame(rows)
+    allure.attach(
+        json.dumps({"requests": REQUESTS, "server_delay": DELAY, "results": rows}, indent=2),
+        name="Kubernetes Transport Benchmark",
+        attachment_type=allure.attachment_type.JSON
+    )
+    log.info(f"Kubernetes API 传输基准结果:\n{table.to_string(index=False)}")
+
+    tuned = table[table["transport"] == "tuned"].set_index("callers")
+    default = table[table["transport"] == "default"].set_index("callers")
+    # 连接池足够大时所有连接都被复用，调用方越多吞吐越高
+    assert (tuned["connections"] <= tuned.index.to_series().clip(upper=TUNED_POOL_SIZE)).all()
+    assert tuned.loc[16, "rps"] > 3 * tuned.loc[1, "rps"]
+    assert tuned.loc[64, "server_concurrency"] > default_pool_size
+    # 调用方多于库默认连接池时，多出的连接用完即关闭，需要不断新建
+    if default_pool_size < 64:
+        assert default.loc[64, "connections"] > default_pool_size
+        assert tuned.loc[64, "connections"] < default.loc[64, "connections"]
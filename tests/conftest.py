@@ -0,0 +1,31 @@
+from typing import Dict, List, Optional
+
+import pytest
+
+from tests.stub.cnosdb_server import CnosDBStubServer
+from utils.helper.WorkerHelper import WorkerHelper
+
+
+@pytest.fixture(scope="module")
+def cnosdb_stub():
+    """本地 CnosDB 替身服务"""
+    with CnosDBStubServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def worker_db_name():
+    """按 xdist 工作进程区分的数据库名: worker_db_name("db4") 在 gw1 上为 db4_gw1"""
+    return WorkerHelper.db_name
+
+
+@pytest.fixture(scope="session")
+def worker_pods(kubernetes_helper):
+    """
+    按 xdist 工作进程划分 Pod: worker_pods("cnosdb.com/role=query_tskv") 返回当前工作进程负责的子集，
+    各工作进程得到的子集互不相交，要修改或注入故障的 Pod 从中选择；每次调用重新列出 Pod
+    """
+    def shard(label_selector: Optional[str] = None) -> List[Dict]:
+        return WorkerHelper.shard(kubernetes_helper.list_pods(label_selector=label_selector))
+
+    return shard
@@ -1,5 +0,0 @@
-from utils.helper.KubenetesHellper import KubernetesHelper
-
-kube_client = KubernetesHelper()
-
-
@@ -3,23 +3,33 @@
 1. 创建3+3集群（k8s部署）
 2. 创建replica为1的数据库：CREATE DATABASE db4 WITH replica 1;
 3. 找出有更大存储空间的节点
-4. 向tskv-0节点写入line protocol数据
-5. 验证数据是否写入到存储空间更大的节点
+4. 通过集群客户端写入line protocol数据 (请求在各 query_tskv 节点之间分发)
+5. 验证数据是否写入到存储空间更大的节点 (通过 StorageProbe 采集各节点的 df/du)
 """
-from time import sleep
-from typing import Tuple
+from typing import Dict, List, Optional
+
 import allure
-from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.CnosDBClusterClient import CnosDBClusterClient
 from utils.helper.KubenetesHellper import KubernetesHelper
+from utils.helper.ScenarioRunner import ScenarioRunner
+from utils.helper.StorageProbe import StorageProbe
+from utils.helper.WaitHelper import WaitHelper
 from utils.logger import log
 
 class VNodeAllocationTester:
-    def __init__(self):
-        self.k8s = KubernetesHelper()
-        self.db_helper = CnosDBHelper()
+    def __init__(self, k8s: KubernetesHelper, db_name: str = "db4", own_pods: Optional[List[Dict]] = None):
+        """
+        :param own_pods: 当前工作进程负责的 query_tskv Pod，不创建大文件的节点从中选择，默认为全部
+        """
+        self.db_name = db_name
+        self.k8s = k8s
+        self.own_pods = own_pods
+        self.client = None
         self.query_tskv_pods = []
         self.excluded_pod = None
         self.pods_to_write = []
+        self.probe = StorageProbe(k8s)
+        self.storage_before = None
 
     def setup(self):
         """初始化并分组Pod"""
@@ -27,87 +37,99 @@ class VNodeAllocationTester:
         if not self.query_tskv_pods:
             raise ValueError("No query_tskv pods found")
 
-        self.pods_to_write = self.query_tskv_pods[:-1]
-        self.excluded_pod = self.query_tskv_pods[-1]
+        candidates = self.own_pods or self.query_tskv_pods
+        self.excluded_pod = candidates[-1]
+        self.pods_to_write = [pod for pod in self.query_tskv_pods if pod["name"] != self.excluded_pod["name"]]
+        self.client = CnosDBClusterClient.from_pods(self.query_tskv_pods)
         log.info(f"Current namespace: {self.k8s.default_namespace}")
 
     def manage_database(self, action: str):
         """管理数据库创建/删除"""
         sql = {
-            'create': 'CREATE DATABASE IF NOT EXISTS db4 WITH REPLICA 1',
-            'drop': 'DROP DATABASE IF EXISTS db4'
+            'create': f'CREATE DATABASE IF NOT EXISTS {self.db_name} WITH REPLICA 1',
+            'drop': f'DROP DATABASE IF EXISTS {self.db_name}'
         }[action]
 
-        resp = self.db_helper.query_from_cnosdb(
-            f"http://{self.pods_to_write[0]['ip']}:8902",
-            "",
-            sql
-        )
+        resp = self.client.query("", sql)
         assert resp.status_code == 200, f"{action.capitalize()} database failed: {resp.text}"
 
-    def prepare_storage_conditions(self):
-        """准备存储条件：在部分节点上创建大文件"""
-        for pod in self.pods_to_write:
-            success, message = self._write_large_file(pod['name'])
-            assert success, f"Failed to prepare storage on {pod['name']}: {message}"
+    def create_database(self):
+        """创建数据库并等待创建完成"""
+        self.manage_database('create')
+        self.wait_database_ready()
+
+    def prepare_storage_conditions(self, size_mb: int = 1024):
+        """准备存储条件：在部分节点上并发创建大文件"""
+        cmd = f"dd if=/dev/zero of=/var/lib/cnosdb/1G bs=1M count={size_mb}"
+        results = self.k8s.exec_many(self.pods_to_write, cmd.split())
+        for pod_name, result in results.items():
+            if result['success']:
+                log.info(f"Created {size_mb}MB file in {pod_name} ({result['duration']:.1f}s)")
+        failed = {name: result['error'] or result['stderr'] for name, result in results.items()
+                  if not result['success']}
+        assert not failed, f"Failed to prepare storage: {failed}"
+
+    def collect_storage_baseline(self):
+        """写入前采集各节点的存储用量，作为分配校验的基准"""
+        self.storage_before = self.probe.collect(self.query_tskv_pods)
+        self.storage_before.attach("Storage Before Write")
+        assert not self.storage_before.errors, f"Storage probe failed: {self.storage_before.errors}"
 
     def write_test_data(self):
         """写入测试数据"""
-        resp = self.db_helper.write_to_cnosdb(
-            f"http://{self.pods_to_write[0]['ip']}:8902",
-            db_name="db4",
-            data="ma,ta=a fa=1",
-        )
+        resp = self.client.write(self.db_name, "ma,ta=a fa=1")
         assert resp.status_code == 200, f"Data write failed: {resp.text}"
 
-    def verify_allocation(self):
-        """验证数据分配结果"""
-        sleep(10)  # 等待数据同步
-        success, message = self._check_directory_exists(
-            self.excluded_pod['name'],
-            "/var/lib/cnosdb/data/data/cnosdb.db4/"
+    def wait_database_ready(self, timeout: float = 30):
+        """等待数据库创建完成，元数据在集群内同步，从任一节点查询即可"""
+        WaitHelper.wait_until(
+            WaitHelper.database_exists(self.client.endpoints[0].base_url, self.db_name,
+                                       username=self.client.username, password=self.client.password),
+            description=f"数据库 {self.db_name} 创建完成",
+            timeout=timeout
         )
-        assert success, f"Allocation verification failed: {message}"
-
-    def _write_large_file(self, pod_name: str, size_mb: int = 1024) -> Tuple[bool, str]:
-        """在Pod上创建大文件"""
-        try:
-            cmd = f"dd if=/dev/zero of=/var/lib/cnosdb/1G bs=1M count={size_mb}"
-            result = self.k8s.exec_command(pod_name=pod_name, command=cmd.split())
-            return ("records in" in result and "records out" in result,
-                    f"Created {size_mb}MB file in {pod_name}")
-        except Exception as e:
-            return (False, f"Command failed on {pod_name}: {str(e)}")
-
-    def _check_directory_exists(self, pod_name: str, dir_path: str) -> Tuple[bool, str]:
-        """检查Pod中目录是否存在"""
-        try:
-            cmd = f"test -d {dir_path} && echo exists || echo missing"
-            result = self.k8s.exec_command(pod_name=pod_name, command=["/bin/bash", "-c", cmd])
-            exists = "exists" in result
-            return (exists, f"Directory {'exists' if exists else 'does not exist'}")
-        except Exception as e:
-            return (False, f"Check failed on {pod_name}: {str(e)}")
-
-@allure.story("VNode Allocation Test")
-def test_vnode_allocation_to_node_with_large_free_storage():
-    tester = VNodeAllocationTester()
-
-    with allure.step("Initialize test environment"):
-        tester.setup()
 
-    with allure.step("Clean up existing database"):
-        tester.manage_database('drop')
+    def verify_allocation(self, timeout: float = 60):
+        """验证数据分配结果：数据库的 vnode 全部位于可用空间最大的节点"""
+        def probe_vnodes():
+            snapshot = self.probe.collect(self.query_tskv_pods)
+            return snapshot if snapshot.vnode_pods(self.db_name) else None
 
-    with allure.step("Create test database"):
-        tester.manage_database('create')
-        sleep(3)  # Wait for DB initialization
-
-    with allure.step("Prepare storage conditions"):
-        tester.prepare_storage_conditions()
-
-    with allure.step("Write test data"):
-        tester.write_test_data()
+        snapshot = WaitHelper.wait_until(
+            probe_vnodes,
+            description=f"{self.db_name} 的 vnode 目录出现",
+            timeout=timeout
+        )
+        snapshot.attach("Storage After Write")
+        log.info(f"Storage growth:\n{snapshot.growth(self.storage_before).to_string(index=False)}")
+
+        available = self.storage_before.disks.set_index("pod")["available_bytes"]
+        largest = available.idxmax()
+        hosting = snapshot.vnode_pods(self.db_name)
+        assert hosting == {largest}, (
+            f"Allocation verification failed: vnodes of {self.db_name} on {sorted(hosting)}, "
+            f"expected {largest} (available bytes: {available.to_dict()})"
+        )
 
-    with allure.step("Verify data allocation"):
-        tester.verify_allocation()
\ No newline at end of file
+@allure.story("VNode Allocation Test")
+def test_vnode_allocation_to_node_with_large_free_storage(kubernetes_helper, worker_db_name, worker_pods):
+    tester = VNodeAllocationTester(kubernetes_helper, db_name=worker_db_name("db4"),
+                                   own_pods=worker_pods("cnosdb.com/role=query_tskv"))
+
+    # 删除/创建数据库与在节点上创建大文件互不依赖，可以同时进行；
+    # 存储基准需要在两者都完成后采集，保证写入前的状态稳定
+    runner = ScenarioRunner("VNode Allocation")
+    runner.add("Initialize test environment", tester.setup)
+    runner.add("Clean up existing database", lambda: tester.manage_database('drop'),
+               depends=["Initialize test environment"])
+    runner.add("Create test database", tester.create_database, depends=["Clean up existing database"])
+    runner.add("Prepare storage conditions", tester.prepare_storage_conditions,
+               depends=["Initialize test environment"])
+    runner.add("Collect storage baseline", tester.collect_storage_baseline,
+               depends=["Create test database", "Prepare storage conditions"])
+    runner.add("Write test data", tester.write_test_data, depends=["Collect storage baseline"])
+    runner.add("Verify data allocation", tester.verify_allocation, depends=["Write test data"])
+    runner.run()
+
+    log.info(tester.client.summary())
+    tester.client.attach()
@@ -0,0 +1,48 @@
+"""
+故障注入下的写入/查询性能：在持续负载下依次删除一个 query_tskv Pod、写满它的数据盘 (以及可选的扩缩容)，
+统计每个故障造成的吞吐下降、恢复时间和失败请求数
+1. 故障注入到当前工作进程负责的最后一个 query_tskv 节点，负载发往另一个节点
+2. 设置 FAULT_SCALE_DEPLOYMENT 时额外把该 Deployment 缩到 1 个副本，20 秒后恢复
+3. 每个故障都应在下一个故障注入前恢复
+"""
+import os
+
+import allure
+import pytest
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.FaultInjectionRunner import Fault, FaultInjectionRunner
+from utils.logger import log
+
+SCALE_DEPLOYMENT = os.getenv("FAULT_SCALE_DEPLOYMENT")
+
+
+@allure.story("Fault Injection Under Load")
+def test_throughput_recovers_after_faults(kubernetes_helper, worker_db_name, worker_pods):
+    db_name = worker_db_name("fault_injection")
+    pods = kubernetes_helper.list_pods(label_selector="cnosdb.com/role=query_tskv")
+    assert len(pods) >= 2, "需要至少 2 个 query_tskv 节点"
+    # 故障只注入当前工作进程负责的 Pod，并行运行时不会破坏其他工作进程的测试
+    own_pods = worker_pods("cnosdb.com/role=query_tskv")
+    if not own_pods:
+        pytest.skip("当前工作进程没有分到 query_tskv 节点")
+    target = own_pods[-1]
+    entry = next(pod for pod in pods if pod["name"] != target["name"])
+    CnosDBHelper.create_database(db_name, ip=entry["ip"])
+
+    runner = FaultInjectionRunner(f"http://{entry['ip']}:8902", db_name, writers=4, readers=2)
+    runner.add_fault(Fault.delete_pod(kubernetes_helper, target, at=10))
+    runner.add_fault(Fault.fill_disk(kubernetes_helper, target["name"], at=70, duration=20))
+    if SCALE_DEPLOYMENT:
+        runner.add_fault(Fault.scale(kubernetes_helper, SCALE_DEPLOYMENT, 1, at=130, restore_replicas=3,
+                                     duration=20))
+    try:
+        report = runner.run(duration=190 if SCALE_DEPLOYMENT else 130)
+    finally:
+        runner.attach()
+        CnosDBHelper.query_from_cnosdb(f"http://{entry['ip']}:8902", "", f"DROP DATABASE IF EXISTS {db_name}")
+
+    log.info(f"故障报告:\n{report.to_string(index=False)}")
+    assert report["error"].isna().all(), f"故障注入失败: {report['error'].dropna().tolist()}"
+    unrecovered = report.loc[report["recovery_time"].isna(), "fault"].tolist()
+    assert not unrecovered, f"吞吐未恢复: {unrecovered}"
@@ -0,0 +1,202 @@
+"""
+本地 CnosDB HTTP 替身服务
+
+基于 Flask 实现 /api/v1/write 与 /api/v1/sql 两个接口，用于在没有真实集群时
+验证客户端逻辑与基准测试工具本身。
+
+    with CnosDBStubServer() as server:
+        CnosDBHelper.write_to_cnosdb(server.base_url, "db", "ma,ta=a fa=1")
+"""
+import gzip
+import io
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import pandas as pd
+from flask import Flask, Response, request
+
+
+class _KeepAliveWSGIHandler(BaseHTTPRequestHandler):
+    """支持 HTTP/1.1 keep-alive 的最小 WSGI 处理器
+
+    werkzeug 开发服务器对每个响应都发送 Connection: close，无法体现连接复用的效果，
+    这里用标准库 http.server 承载 Flask 应用。
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = urlsplit(self.path)
+
+        environ = {
+            "REQUEST_METHOD": self.command,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+            "SERVER_NAME": self.server.server_address[0],
+            "SERVER_PORT": str(self.server.server_address[1]),
+            "SERVER_PROTOCOL": self.request_version,
+            "REMOTE_ADDR": self.client_address[0],
+            "REMOTE_PORT": self.client_address[1],
+            "CONTENT_LENGTH": str(length),
+            "CONTENT_TYPE": self.headers.get("Content-Type", ""),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for key, value in self.headers.items():
+            name = key.upper().replace("-", "_")
+            if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                environ[f"HTTP_{name}"] = value
+
+        response_status = []
+
+        def start_response(status, headers, exc_info=None):
+            response_status[:] = [status, headers]
+
+        chunks = self.server.app(environ, start_response)
+        try:
+            payload = b"".join(chunks)
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+        status, headers = response_status
+        code, _, reason = status.partition(" ")
+        self.send_response(int(code), reason)
+        for key, value in headers:
+            if key.lower() != "content-length":
+                self.send_header(key, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def handle(self):
+        # 客户端关闭连接池时会重置空闲的长连接，不属于错误
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class CnosDBStubServer:
+    """在后台线程中运行的 CnosDB 替身服务"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.databases: Dict[str, List[bytes]] = {}
+        # SELECT ... FROM <表名> 返回的结果集
+        self.tables: Dict[str, pd.DataFrame] = {}
+        self.request_count = 0
+        self.client_ports = set()
+        # 不为 None 时所有请求都返回该状态码，用于模拟节点故障
+        self.fail_status = None
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _KeepAliveWSGIHandler)
+        self._server.daemon_threads = True
+        self._server.app = self._create_app()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "CnosDBStubServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> "CnosDBStubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _create_app(self) -> Flask:
+        app = Flask("cnosdb-stub")
+
+        @app.before_request
+        def record_connection():
+            with self._lock:
+                self.client_ports.add(request.environ.get("REMOTE_PORT"))
+                if self.fail_status is not None:
+                    self.request_count += 1
+                    return Response(status=self.fail_status)
+
+        @app.post("/api/v1/write")
+        def write():
+            db_name = request.args.get("db", "")
+            body = request.get_data()
+            if request.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            with self._lock:
+                self.request_count += 1
+                if db_name not in self.databases:
+                    return Response(f'{{"error_code":"010001","error_message":"database {db_name} not found"}}',
+                                    status=422, mimetype="application/json")
+                self.databases[db_name].extend(line for line in body.split(b"\n") if line)
+            return Response(status=200)
+
+        @app.post("/api/v1/sql")
+        def sql():
+            statement = request.get_data(as_text=True).strip().rstrip(";")
+            words = statement.upper().split()
+            with self._lock:
+                self.request_count += 1
+                if words[:2] == ["CREATE", "DATABASE"]:
+                    self.databases.setdefault(self._database_name(statement), [])
+                    return Response("[]", mimetype="application/json")
+                if words[:2] == ["DROP", "DATABASE"]:
+                    self.databases.pop(self._database_name(statement), None)
+                    return Response("[]", mimetype="application/json")
+                if words[:2] == ["SHOW", "DATABASES"]:
+                    rows = ",".join(f'{{"database_name":"{name}"}}' for name in sorted(self.databases))
+                    return Response(f"[{rows}]", mimetype="application/json")
+                if words[:1] == ["SELECT"] and "FROM" in words:
+                    table = self.tables.get(statement.split()[words.index("FROM") + 1])
+                    if table is not None:
+                        return self._table_response(table, request.headers.get("Accept", ""))
+            return Response('[{"result":1}]', mimetype="application/json")
+
+        return app
+
+    @staticmethod
+    def _table_response(table: pd.DataFrame, accept: str) -> Response:
+        """按 Accept 请求头格式化结果集"""
+        if accept == "application/csv":
+            return Response(table.to_csv(index=False), mimetype="application/csv")
+        if accept == "application/nd-json":
+            return Response(table.to_json(orient="records", lines=True), mimetype="application/nd-json")
+        return Response(table.to_json(orient="records"), mimetype="application/json")
+
+    @staticmethod
+    def _database_name(statement: str) -> str:
+        """从 CREATE/DROP DATABASE 语句中取出库名"""
+        words = statement.split()
+        names = [w for w in words[2:] if w.upper() not in ("IF", "NOT", "EXISTS")]
+        return names[0] if names else ""
@@ -0,0 +1,151 @@
+"""
+本地 Kubernetes API Server 替身
+
+只实现 Pod 的 LIST 与 GET 两个接口，用于验证 KubernetesHelper 的传输层 (连接池、超时、限流) 和基准测试。
+每个请求按 delay 秒模拟服务端处理时间，并记录建立的连接数和同时处理的最大请求数。
+
+    with KubernetesApiStubServer(pods=10) as server:
+        server.write_kubeconfig(tmp_path / "kubeconfig")
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Set, Union
+from urllib.parse import urlsplit
+
+import yaml
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体分两次发送，不关闭 Nagle 时会被客户端的延迟 ACK 卡住约 40ms
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.stub.connection_opened(self.client_address[1])
+
+    def do_GET(self):
+        stub: "KubernetesApiStubServer" = self.server.stub
+        stub.request_started()
+        try:
+            if stub.delay:
+                time.sleep(stub.delay)
+            status, body = stub.handle(urlsplit(self.path).path)
+        finally:
+            stub.request_finished()
+        data = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端读取超时后已断开
+            self.close_connection = True
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # 默认 backlog 只有 5，大量并发建连时会丢 SYN 并等待 1s 后重传
+    request_queue_size = 256
+
+
+class KubernetesApiStubServer:
+    def __init__(self, pods: int = 3, namespace: str = "test", delay: float = 0.0, host: str = "127.0.0.1",
+                 port: int = 0):
+        self.namespace = namespace
+        self.delay = delay
+        self.pods: Dict[str, Dict] = {f"pod-{i}": self._pod(f"pod-{i}", i) for i in range(pods)}
+        self.request_count = 0
+        self.active = 0
+        self.max_active = 0
+        self.client_ports: Set[int] = set()
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.stub = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "KubernetesApiStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self):
+        with self._lock:
+            self.request_count = 0
+            self.max_active = 0
+            self.client_ports.clear()
+
+    def write_kubeconfig(self, path: Union[str, Path]) -> Path:
+        """生成指向替身服务的 kubeconfig"""
+        kubeconfig = {
+            "apiVersion": "v1",
+            "kind": "Config",
+            "clusters": [{"name": "stub", "cluster": {"server": self.base_url}}],
+            "users": [{"name": "stub", "user": {"token": "stub-token"}}],
+            "contexts": [{"name": "stub", "context": {"cluster": "stub", "user": "stub",
+                                                      "namespace": self.namespace}}],
+            "current-context": "stub",
+        }
+        path = Path(path)
+        path.write_text(yaml.safe_dump(kubeconfig), encoding="utf-8")
+        return path
+
+    # ------------------------- 请求处理 -------------------------
+    def connection_opened(self, port: int):
+        with self._lock:
+            self.client_ports.add(port)
+
+    def request_started(self):
+        with self._lock:
+            self.request_count += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def request_finished(self):
+        with self._lock:
+            self.active -= 1
+
+    def handle(self, path: str):
+        prefix = f"/api/v1/namespaces/{self.namespace}/pods"
+        if path == prefix:
+            return 200, {"kind": "PodList", "apiVersion": "v1", "metadata": {"resourceVersion": "1"},
+                         "items": list(self.pods.values())}
+        name = path[len(prefix) + 1:] if path.startswith(prefix + "/") else None
+        if name in self.pods:
+            return 200, self.pods[name]
+        return 404, {"kind": "Status", "apiVersion": "v1", "status": "Failure", "reason": "NotFound",
+                     "code": 404, "message": f"{path} not found"}
+
+    def _pod(self, name: str, index: int) -> Dict:
+        return {
+            "kind": "Pod",
+            "apiVersion": "v1",
+            "metadata": {"name": name, "namespace": self.namespace, "labels": {"app": "cnosdb"},
+                         "creationTimestamp": "2024-01-01T00:00:00Z", "resourceVersion": "1"},
+            "spec": {"nodeName": f"node-{index % 3}", "containers": [{"name": "cnosdb", "image": "cnosdb"}]},
+            "status": {"phase": "Running", "podIP": f"10.0.0.{index + 1}",
+                       "conditions": [{"type": "Ready", "status": "True"}]},
+        }
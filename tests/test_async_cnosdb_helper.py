@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from utils.helper.AsyncCnosDBHelper import AsyncCnosDBHelper
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def async_helper():
+    helper = AsyncCnosDBHelper(pool_size=64)
+    yield helper
+    helper.run(helper.close())
+
+
+def test_create_write_query(cnosdb_stub, async_helper):
+    async_helper.run(async_helper.create_database("async_db", ip=cnosdb_stub.host, port=cnosdb_stub.port))
+    async_helper.run(async_helper.write(cnosdb_stub.base_url, "async_db", "ma,ta=a fa=1"))
+    response = async_helper.run(async_helper.query(cnosdb_stub.base_url, "", "SHOW DATABASES"))
+
+    assert {"database_name": "async_db"} in response.json()
+    assert cnosdb_stub.databases["async_db"] == [b"ma,ta=a fa=1"]
+
+
+def test_concurrent_fan_out_shares_connection_pool(cnosdb_stub, async_helper):
+    async_helper.run(async_helper.create_database("fan_out", ip=cnosdb_stub.host, port=cnosdb_stub.port))
+    cnosdb_stub.client_ports.clear()
+
+    responses = async_helper.run(async_helper.gather(
+        (async_helper.write(cnosdb_stub.base_url, "fan_out", f"ma,ta=a fa={i}") for i in range(500)),
+        max_concurrency=32
+    ))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert len(cnosdb_stub.databases["fan_out"]) == 500
+    assert len(cnosdb_stub.client_ports) <= 32
+
+
+def test_unexpected_status_raises(cnosdb_stub, async_helper):
+    with pytest.raises(AssertionError):
+        async_helper.run(async_helper.write(cnosdb_stub.base_url, "missing_db", "ma,ta=a fa=1"))
+
+
+def test_allure_steps_stay_with_the_calling_test(tmp_path):
+    """共享事件循环线程上的请求步骤要记录到各自调用 run() 的测试下"""
+    (tmp_path / "test_two.py").write_text(textwrap.dedent("""
+        import pytest
+        from tests.stub.cnosdb_server import CnosDBStubServer
+        from utils.helper.AsyncCnosDBHelper import AsyncCnosDBHelper
+
+        helper = AsyncCnosDBHelper()
+
+        @pytest.fixture(scope="module")
+        def stub():
+            with CnosDBStubServer() as server:
+                yield server
+
+        @pytest.mark.parametrize("name", ["first", "second"])
+        def test_query(stub, name):
+            helper.run(helper.gather(helper.query(stub.base_url, "", f"SELECT '{name}'") for _ in range(3)))
+            with pytest.raises(AssertionError):
+                helper.run(helper.write(stub.base_url, "missing", "ma fa=1"))
+    """), encoding="utf-8")
+    env = {k: v for k, v in os.environ.items() if k != "PYTEST_ADDOPTS"}
+    env["PYTHONPATH"] = str(ROOT)
+    subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "test_two.py",
+                    f"--alluredir={tmp_path / 'results'}"], cwd=tmp_path, env=env, check=True,
+                   capture_output=True)
+
+    results = [json.loads(path.read_text(encoding="utf-8")) for path in (tmp_path / "results").glob("*-result.json")]
+    steps = {result["parameters"][0]["value"]: [step["status"] for step in result.get("steps", [])]
+             for result in results}
+    assert steps == {"'first'": ["passed"] * 3 + ["failed"], "'second'": ["passed"] * 3 + ["failed"]}
@@ -0,0 +1,106 @@
+import os
+
+import allure
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from utils.helper.AttachmentPolicy import AttachmentPolicy
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.HttpRequestHelper import HttpRequestHelper
+
+
+@pytest.fixture
+def attachments(monkeypatch):
+    """记录 allure.attach / allure.attach.file 的附件名"""
+    names = []
+    monkeypatch.setattr(allure, "attach", lambda body, name=None, **kw: names.append(name))
+    monkeypatch.setattr(allure.attach, "file", lambda path, name=None, **kw: names.append(name), raising=False)
+    return names
+
+
+def test_sample_mode_attaches_one_in_n():
+    policy = AttachmentPolicy(AttachmentPolicy.SAMPLE, sample_every=10)
+    assert sum(policy.should_attach() for _ in range(100)) == 10
+
+
+def test_preview_truncates_to_max_bytes():
+    policy = AttachmentPolicy(AttachmentPolicy.TRUNCATE, max_bytes=4)
+    assert policy.preview(b"abcd") == "abcd"
+    assert policy.preview(b"abcdefgh").startswith("abcd\n... (已截断 4 字节")
+
+
+def test_is_json_uses_content_type():
+    assert AttachmentPolicy.is_json({"Content-Type": "application/json; charset=utf-8"})
+    assert not AttachmentPolicy.is_json({"content-type": "text/plain"})
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        AttachmentPolicy("everything")
+
+
+def test_on_failure_mode_skips_successful_requests(cnosdb_stub, attachments):
+    policy = AttachmentPolicy(AttachmentPolicy.ON_FAILURE)
+    CnosDBHelper.query_from_cnosdb(cnosdb_stub.base_url, "", "SHOW DATABASES")
+    attachments.clear()
+
+    CnosDBHelper._make_request(cnosdb_stub.base_url, "/api/v1/sql?db=", "SHOW DATABASES",
+                               attachment_policy=policy)
+    assert attachments == []
+
+    with pytest.raises(AssertionError):
+        CnosDBHelper._make_request(cnosdb_stub.base_url, "/api/v1/write?db=missing", "ma fa=1",
+                                   attachment_policy=policy)
+    assert "Request Details" in attachments
+    assert "Assertion Failure" in attachments
+    assert not any(name.startswith("Response") for name in attachments)
+
+
+@pytest.mark.parametrize("mode", [AttachmentPolicy.TRUNCATE, AttachmentPolicy.FILE])
+def test_unparsed_modes_attach_response(cnosdb_stub, attachments, mode):
+    CnosDBHelper._make_request(cnosdb_stub.base_url, "/api/v1/sql?db=", "SHOW DATABASES",
+                               attachment_policy=AttachmentPolicy(mode))
+    assert attachments[0] == "Request Details"
+    assert attachments[1].startswith("Response 200")
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_file_mode_spools_streamed_response(cnosdb_stub, monkeypatch, fmt):
+    table = pd.DataFrame({"time": np.arange(20000), "value": np.arange(20000) / 2})
+    monkeypatch.setitem(cnosdb_stub.tables, "spool", table)
+    monkeypatch.setattr(HttpRequestHelper, "attachment_policy", AttachmentPolicy(AttachmentPolicy.FILE))
+    # 流式响应体不能整体读入内存
+    monkeypatch.setattr(requests.Response, "content", property(lambda self: pytest.fail("response.content read")))
+
+    files = {}
+
+    def attach_file(path, name=None, **kw):
+        with open(path, "rb") as f:
+            files[name] = f.read()
+
+    monkeypatch.setattr(allure, "attach", lambda body, name=None, **kw: None)
+    monkeypatch.setattr(allure.attach, "file", attach_file, raising=False)
+    chunks = []
+    paths = []
+    write_chunks = AttachmentPolicy.write_chunks
+
+    def spool(body, suffix):
+        path, size = write_chunks((chunks.append(len(chunk)) or chunk for chunk in body), suffix)
+        paths.append(path)
+        return path, size
+
+    monkeypatch.setattr(AttachmentPolicy, "write_chunks", staticmethod(spool))
+
+    with CnosDBHelper.query_stream(cnosdb_stub.base_url, "db", "SELECT * FROM spool", fmt=fmt) as result:
+        frame = result.to_dataframe()
+        # 读取期间文件保持打开，关闭响应后才删除
+        assert os.path.exists(paths[0])
+    assert not os.path.exists(paths[0])
+
+    (name, body), = files.items()
+    assert name.startswith(f"Response 200 ({len(body)} bytes")
+    assert len(chunks) > 1 and max(chunks) <= AttachmentPolicy.CHUNK_SIZE and sum(chunks) == len(body)
+    # 附加之后调用方仍能从头读取完整的响应体
+    pd.testing.assert_frame_equal(frame, table, check_dtype=False)
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from utils.helper.BenchmarkHelper import BenchmarkHelper, BenchmarkReport
+
+
+def test_percentiles():
+    result = BenchmarkHelper.percentiles(list(range(1, 101)))
+    assert result["p50"] == pytest.approx(50.5)
+    assert result["p99"] == pytest.approx(99.01)
+    with pytest.raises(ValueError):
+        BenchmarkHelper.percentiles([])
+
+
+def test_compare_respects_direction_and_threshold():
+    baseline = BenchmarkReport("cnosdb")
+    baseline.add("write.points_per_sec", 1000, "points/s")
+    baseline.add("query.p99", 0.010, "s", higher_is_better=False)
+    baseline.add("query.p50", 0.005, "s", higher_is_better=False)
+
+    current = BenchmarkReport("cnosdb")
+    current.add("write.points_per_sec", 700, "points/s")
+    current.add("query.p99", 0.011, "s", higher_is_better=False)
+    current.add("query.p50", 0.004, "s", higher_is_better=False)
+    current.add("query.new_metric", 1, "s", higher_is_better=False)
+
+    regressions = current.compare(baseline.to_dict(), threshold=0.2)
+    assert [r["metric"] for r in regressions] == ["write.points_per_sec"]
+    assert regressions[0]["change"] == pytest.approx(0.3)
+    assert current.compare(None) == []
+
+
+def test_finish_saves_results_and_updates_baseline(tmp_path, monkeypatch):
+    baseline_path = tmp_path / "baseline.json"
+    report = BenchmarkReport("cnosdb")
+    report.add("query.p99", 0.02, "s", higher_is_better=False)
+
+    monkeypatch.setenv("BENCHMARK_UPDATE_BASELINE", "1")
+    assert BenchmarkHelper.finish(report, results_dir=str(tmp_path / "out"), baseline_path=str(baseline_path)) == []
+    assert json.loads((tmp_path / "out" / "cnosdb.json").read_text())["metrics"]["query.p99"]["value"] == 0.02
+    assert baseline_path.is_file()
+
+    monkeypatch.delenv("BENCHMARK_UPDATE_BASELINE")
+    report.add("query.p99", 0.05, "s", higher_is_better=False)
+    regressions = BenchmarkHelper.finish(report, results_dir=str(tmp_path / "out"),
+                                         baseline_path=str(baseline_path), threshold=0.5)
+    assert [r["metric"] for r in regressions] == ["query.p99"]
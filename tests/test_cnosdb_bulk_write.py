@@ -0,0 +1,101 @@
+import gzip
+import socket
+import threading
+import time
+
+import pytest
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.HttpRequestHelper import HttpRequestHelper
+from utils.helper.HttpSessionPool import _TimedHTTPConnection
+
+
+@pytest.fixture(autouse=True)
+def bulk_database(cnosdb_stub):
+    CnosDBHelper.create_database("bulk", ip=cnosdb_stub.host, port=cnosdb_stub.port)
+    yield
+    CnosDBHelper.query_from_cnosdb(cnosdb_stub.base_url, "", "DROP DATABASE IF EXISTS bulk")
+
+
+def _lines(count: int):
+    for i in range(count):
+        yield f"air,station=XiaoMaiDao visibility={i}i {1642176000000000000 + i}"
+
+
+def test_bulk_write_splits_batches_by_line_count(cnosdb_stub):
+    stats = CnosDBHelper.bulk_write(cnosdb_stub.base_url, "bulk", _lines(2500), batch_lines=1000)
+
+    assert [s["points"] for s in stats] == [1000, 1000, 500]
+    assert [s["batch"] for s in stats] == [0, 1, 2]
+    assert all(s["retries"] == 0 for s in stats)
+    assert len(cnosdb_stub.databases["bulk"]) == 2500
+
+
+def test_bulk_write_splits_batches_by_byte_size(cnosdb_stub):
+    stats = CnosDBHelper.bulk_write(cnosdb_stub.base_url, "bulk", _lines(100), batch_bytes=1024)
+
+    assert all(s["bytes"] <= 1024 for s in stats)
+    assert sum(s["points"] for s in stats) == 100
+
+
+def test_bulk_write_gzip_and_points(cnosdb_stub):
+    points = [
+        {"measurement": "air", "tags": {"station": "Xiao Mai,Dao"}, "fields": {"visibility": 50, "note": 'a "b"'},
+         "time": 1642176000000000000},
+        b"air,station=LianYunGang visibility=51i 1642176000000000001",
+    ]
+    stats = CnosDBHelper.bulk_write(cnosdb_stub.base_url, "bulk", iter(points), compress=True)
+
+    assert stats[0]["wire_bytes"] == len(gzip.compress(b"\n".join(
+        [CnosDBHelper._format_point(points[0]).encode(), points[1]]), compresslevel=1))
+    assert cnosdb_stub.databases["bulk"] == [
+        b'air,station=Xiao\\ Mai\\,Dao visibility=50i,note="a \\"b\\"" 1642176000000000000',
+        b"air,station=LianYunGang visibility=51i 1642176000000000001",
+    ]
+
+
+def test_bulk_write_raises_on_rejected_batch(cnosdb_stub):
+    with pytest.raises(AssertionError):
+        CnosDBHelper.bulk_write(cnosdb_stub.base_url, "missing_db", _lines(10))
+
+
+def test_bulk_write_limits_batches_in_flight(cnosdb_stub, monkeypatch):
+    consumed = [0]
+    completed = [0]
+    outstanding = []
+    lock = threading.Lock()
+
+    def lines():
+        for line in _lines(200):
+            consumed[0] += 1
+            yield line
+
+    def send(**kwargs):
+        # 已从输入读出但尚未完成的批次数
+        with lock:
+            outstanding.append(consumed[0] // 10 - completed[0])
+        time.sleep(0.01)
+        with lock:
+            completed[0] += 1
+        return type("Response", (), {"status_code": 200, "text": ""})()
+
+    monkeypatch.setattr(HttpRequestHelper, "send_http_request", send)
+    stats = CnosDBHelper.bulk_write(cnosdb_stub.base_url, "bulk", lines(), batch_lines=10, max_in_flight=2)
+
+    assert len(stats) == 20
+    # 在途批次已满时暂停读取输入，最多再读出正在切分的一批
+    assert max(outstanding) <= 2 + 1
+
+
+def test_bulk_write_is_the_only_retry_layer(monkeypatch):
+    connects = []
+    connect = _TimedHTTPConnection.connect
+    monkeypatch.setattr(_TimedHTTPConnection, "connect", lambda self: connects.append(1) or connect(self))
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    with pytest.raises(RuntimeError, match="重试 2 次"):
+        CnosDBHelper.bulk_write(f"http://127.0.0.1:{port}", "bulk", _lines(10), max_retries=2, retry_backoff=0)
+    # 每次尝试只建立一次连接，连接池不再叠加自己的重试
+    assert len(connects) == 3
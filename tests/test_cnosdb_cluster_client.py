@@ -0,0 +1,147 @@
+import socket
+
+import pytest
+import requests
+
+from tests.stub.cnosdb_server import CnosDBStubServer
+from utils.helper.CnosDBClusterClient import CnosDBClusterClient
+from utils.helper.HttpSessionPool import _TimedHTTPConnection, session_pool
+
+
+@pytest.fixture(scope="module")
+def stubs():
+    servers = [CnosDBStubServer().start() for _ in range(3)]
+    yield servers
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture(autouse=True)
+def reset_fail_status(stubs):
+    for server in stubs:
+        server.fail_status = None
+
+
+@pytest.fixture
+def dead_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def test_round_robin_spreads_requests(stubs):
+    client = CnosDBClusterClient([server.base_url for server in stubs])
+    before = [server.request_count for server in stubs]
+
+    for _ in range(30):
+        client.query("", "SELECT 1")
+
+    assert [server.request_count - count for server, count in zip(stubs, before)] == [10, 10, 10]
+    stats = client.stats()
+    assert stats["requests"].tolist() == [10, 10, 10]
+    assert stats["share"].sum() == pytest.approx(1)
+    assert "共 30 次" in client.summary()
+
+
+def test_least_outstanding_prefers_idle_endpoint():
+    client = CnosDBClusterClient(["http://a:8902", "http://b:8902", "http://c:8902"],
+                                 strategy=CnosDBClusterClient.LEAST_OUTSTANDING)
+
+    busy = [client._acquire(set()) for _ in range(3)]
+    assert {endpoint.name for endpoint in busy} == {"http://a:8902", "http://b:8902", "http://c:8902"}
+
+    client._release(busy[1], 0, success=True)
+    assert client._acquire(set()) is busy[1]
+    assert client._acquire(set()).outstanding == 2
+
+
+def test_failover_ejects_dead_endpoint(stubs, dead_url):
+    client = CnosDBClusterClient([dead_url, stubs[0].base_url, stubs[1].base_url], max_failures=1,
+                                 ejection_time=60)
+
+    # 写入不是幂等请求，不换节点重试
+    with pytest.raises(requests.ConnectionError):
+        client.write("db", "ma,ta=a fa=1")
+
+    for _ in range(10):
+        assert client.query("", "SHOW DATABASES", use_cache=False).status_code == 200
+
+    stats = client.stats().set_index("base_url")
+    assert stats.loc[dead_url, ["requests", "failures", "ejections"]].tolist() == [1, 1, 1]
+    assert stats.loc[dead_url, "ejected"]
+    assert stats["requests"].sum() == 11
+    assert client.retries == 0
+
+
+def test_failover_does_not_stack_pool_retries(stubs, dead_url, monkeypatch):
+    connects = []
+    connect = _TimedHTTPConnection.connect
+    monkeypatch.setattr(_TimedHTTPConnection, "connect", lambda self: connects.append(self.port) or connect(self))
+    session_pool.close_all()
+    client = CnosDBClusterClient([dead_url, stubs[0].base_url], max_failures=1, ejection_time=60)
+
+    assert client.query("", "SHOW DATABASES", use_cache=False).status_code == 200
+
+    # 连接池默认会重试建立连接，集群客户端的请求只连接一次，失败的节点立即被摘除
+    dead_port = int(dead_url.rsplit(":", 1)[1])
+    assert connects.count(dead_port) == 1
+    assert client.stats().set_index("base_url").loc[dead_url, "ejected"]
+    assert client.retries == 1
+
+
+def test_idempotent_query_retries_on_unavailable_status(stubs):
+    stubs[0].fail_status = 503
+    client = CnosDBClusterClient([server.base_url for server in stubs], max_failures=2, ejection_time=60)
+
+    for _ in range(6):
+        assert client.query("", "SELECT 1").status_code == 200
+
+    stats = client.stats().set_index("base_url")
+    assert stats.loc[stubs[0].base_url, "failures"] == 2
+    assert stats.loc[stubs[0].base_url, "ejected"]
+    assert client.retries == 2
+
+    single = CnosDBClusterClient([stubs[0].base_url])
+    with pytest.raises(AssertionError, match="503"):
+        single.query("", "CREATE DATABASE IF NOT EXISTS x")
+    assert single.stats()["requests"].tolist() == [1]
+
+
+def test_all_endpoints_ejected_still_routes(dead_url):
+    client = CnosDBClusterClient([dead_url], max_failures=1, max_retries=1)
+
+    with pytest.raises(requests.ConnectionError):
+        client.query("", "SELECT 1")
+    with pytest.raises(requests.ConnectionError):
+        client.query("", "SELECT 1")
+
+    assert client.stats()["requests"].tolist() == [4]
+
+
+class FakeK8s:
+    def __init__(self, pods):
+        self.pods = pods
+
+    def list_pods(self, label_selector=None):
+        assert label_selector == "cnosdb.com/role=query_tskv"
+        return self.pods
+
+
+def test_from_kubernetes_and_refresh():
+    k8s = FakeK8s([{"name": "tskv-0", "ip": "10.0.0.1"}, {"name": "tskv-1", "ip": None},
+                   {"name": "tskv-2", "ip": "10.0.0.3"}])
+    client = CnosDBClusterClient.from_kubernetes(k8s)
+    assert [(e.name, e.base_url) for e in client.endpoints] == [
+        ("tskv-0", "http://10.0.0.1:8902"), ("tskv-2", "http://10.0.0.3:8902")
+    ]
+
+    kept = client.endpoints[0]
+    kept.requests = 5
+    k8s.pods = [{"name": "tskv-0", "ip": "10.0.0.1"}, {"name": "tskv-1", "ip": "10.0.0.2"}]
+    client.refresh()
+    assert [e.name for e in client.endpoints] == ["tskv-0", "tskv-1"]
+    assert client.endpoints[0] is kept and kept.requests == 5
+
+    with pytest.raises(RuntimeError):
+        CnosDBClusterClient(["http://a:8902"]).refresh()
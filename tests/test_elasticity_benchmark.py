@@ -0,0 +1,123 @@
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from utils.helper.ElasticityBenchmark import ElasticityBenchmark
+from utils.helper.KubenetesHellper import KubernetesHelper
+from utils.helper.StorageProbe import StorageSnapshot
+
+
+def _pod(name, ready, resource_version="1"):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, resource_version=resource_version, deletion_timestamp=None),
+        status=SimpleNamespace(conditions=[SimpleNamespace(type="Ready", status="True" if ready else "False")]),
+    )
+
+
+class FakeCluster:
+    """StatefulSet 替身: scale_workload 生成之后由 FakeWatch 回放的 Pod 事件"""
+
+    def __init__(self, replicas):
+        self.pods = {f"tskv-{i}": _pod(f"tskv-{i}", True) for i in range(replicas)}
+        self.events = []
+        self.scale_calls = []
+        self.default_namespace = "test"
+        self.core_v1 = SimpleNamespace(list_namespaced_pod=self.list_namespaced_pod)
+
+    def get_workload(self, kind, name):
+        return {"name": name, "kind": kind, "replicas": len(self.pods), "ready_replicas": len(self.pods),
+                "selector": "app=tskv"}
+
+    def scale_workload(self, kind, name, replicas):
+        self.scale_calls.append(replicas)
+        for index in range(len(self.pods), replicas):
+            self.events.append({"type": "ADDED", "object": _pod(f"tskv-{index}", False)})
+            self.events.append({"type": "MODIFIED", "object": _pod(f"tskv-{index}", True)})
+        for index in range(replicas, len(self.pods)):
+            self.events.append({"type": "DELETED", "object": _pod(f"tskv-{index}", True)})
+        return True
+
+    def list_pods(self, label_selector=None):
+        assert label_selector == "app=tskv"
+        return [{"name": name} for name in self.pods]
+
+    def list_namespaced_pod(self, namespace, **kwargs):
+        return SimpleNamespace(items=list(self.pods.values()), metadata=SimpleNamespace(resource_version="1"))
+
+    @staticmethod
+    def is_pod_ready(pod):
+        return pod.status.conditions[0].status == "True"
+
+    pod_sort_key = staticmethod(KubernetesHelper.pod_sort_key)
+
+
+class FakeProbe:
+    """每个 Pod 上都有一个 vnode，新 Pod 的 vnode 比老 Pod 小"""
+
+    def __init__(self, cluster, db_name):
+        self.cluster = cluster
+        self.db_name = db_name
+
+    def collect(self, pods=None):
+        names = [pod["name"] if isinstance(pod, dict) else pod for pod in pods or self.cluster.pods]
+        vnodes = pd.DataFrame([[name, "node", "data", "cnosdb", self.db_name, index, 1000 if index < 2 else 100]
+                               for index, name in enumerate(sorted(names))], columns=StorageSnapshot.VNODE_COLUMNS)
+        disks = pd.DataFrame([[name, "node", 100, 10, 90] for name in sorted(names)],
+                             columns=StorageSnapshot.DISK_COLUMNS)
+        return StorageSnapshot(vnodes, disks, {}, time.time(), 0.0)
+
+
+def test_scale_out_and_back_under_load(cnosdb_stub, monkeypatch):
+    cluster = FakeCluster(replicas=2)
+
+    class FakeWatch:
+        def stream(self, func, *args, **kwargs):
+            while cluster.events:
+                event = cluster.events.pop(0)
+                if event["type"] == "DELETED":
+                    cluster.pods.pop(event["object"].metadata.name)
+                else:
+                    cluster.pods[event["object"].metadata.name] = event["object"]
+                time.sleep(0.1)
+                yield event
+
+        def stop(self):
+            pass
+
+    from kubernetes import watch
+    monkeypatch.setattr(watch, "Watch", FakeWatch)
+
+    bench = ElasticityBenchmark(cluster, "tskv", cnosdb_stub.base_url, steps=[3, 2], db_name="elastic",
+                                warmup=0.5, settle=0.5, writers=1, readers=1,
+                                probe=FakeProbe(cluster, "elastic"))
+    report = bench.run()
+
+    assert cluster.scale_calls == [3, 2]
+    scale_out, scale_in = bench.steps
+    assert scale_out.new_pods == ["tskv-2"] and scale_out.removed_pods == []
+    assert 0.2 <= scale_out.ready_time < 1
+    assert scale_out.pod_ready_times["tskv-2"] == pytest.approx(scale_out.ready_time, abs=0.05)
+    assert scale_out.traffic_time >= scale_out.ready_time
+    assert scale_in.removed_pods == ["tskv-2"] and scale_in.traffic_time is None
+
+    results = bench.results().set_index("step")
+    assert list(results.index) == ["2_to_3", "3_to_2"]
+    assert results.loc["2_to_3", "vnode_max_mean"] == pytest.approx(1000 / 700)
+    assert results.loc["3_to_2", "vnode_gini"] == 0
+    assert results["error"].isna().all()
+    # 每个阻塞的扩缩容步骤之后仍有 settle 秒的负载
+    assert bench.runner.duration >= 1.5 + scale_out.ready_time + scale_in.ready_time
+
+    assert report.name == "elasticity"
+    assert report.metrics["scale.0.2_to_3.ready_s"]["higher_is_better"] is False
+    assert "scale.0.2_to_3.traffic_s" in report.metrics
+    assert "scale.1.3_to_2.traffic_s" not in report.metrics
+    assert report.metadata["steps"] == [3, 2]
+    assert "elastic" not in cnosdb_stub.databases
+
+
+def test_pod_sort_key_orders_by_ordinal():
+    names = ["tskv-10", "tskv-2", "meta-0", "tskv-1", "tskv"]
+    assert sorted(names, key=KubernetesHelper.pod_sort_key) == ["meta-0", "tskv", "tskv-1", "tskv-2", "tskv-10"]
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.FaultInjectionRunner import Fault, FaultInjectionRunner
+from utils.helper.WorkloadGenerator import WorkloadGenerator
+
+
+def test_outage_dip_and_recovery(cnosdb_stub):
+    CnosDBHelper.create_database("fault", ip=cnosdb_stub.host, port=cnosdb_stub.port)
+    runner = FaultInjectionRunner(cnosdb_stub.base_url, "fault", writers=2, readers=1, batch_rows=200,
+                                  workload=WorkloadGenerator("iot", series=50, points_per_series=100000),
+                                  resolution=0.1)
+
+    def fail():
+        cnosdb_stub.fail_status = 503
+
+    def recover():
+        cnosdb_stub.fail_status = None
+
+    runner.add_fault(Fault("outage", at=1.0, inject=fail, restore=recover, duration=1.0))
+    try:
+        report = runner.run(duration=3.5)
+    finally:
+        recover()
+
+    # 替身服务和测试进程共用 CPU，吞吐波动可达 30%，放宽恢复阈值
+    row = runner.fault_report(recovery_ratio=0.5).iloc[0]
+    assert report.iloc[0]["dip"] == row["dip"]
+    assert row["injected_at"] == pytest.approx(1.0, abs=0.1)
+    assert row["restored_at"] == pytest.approx(2.0, abs=0.1)
+    assert row["baseline"] > 0
+    assert row["dip"] > 0.9
+    assert 0.9 <= row["recovery_time"] <= 1.5
+    assert row["write_errors"] > 0 and row["query_errors"] > 0
+
+    series = runner.timeseries()
+    assert len(series) == 35
+    assert series["time"].diff().dropna().round(6).eq(0.1).all()
+    during = series[(series["time"] >= 1.2) & (series["time"] < 1.8)]
+    assert (during["write_points"] == 0).all() and (during["write_errors"] > 0).all()
+    after = series[series["time"] >= 2.3]
+    assert (after["write_errors"] == 0).all() and (after["write_points"] > 0).all()
+
+    records = runner.records()
+    written = int(records.loc[records["error"].isna() & (records["kind"] == "write"), "points"].sum())
+    assert len(cnosdb_stub.databases.pop("fault")) == written
+    assert "恢复" in runner.summary()
+    assert runner._svg_chart(series, report).count("<polyline") == 2
+
+
+class FakeK8s:
+    def __init__(self, delete_ok=True, exec_results=None):
+        self.delete_ok = delete_ok
+        self.exec_results = exec_results or {}
+        self.calls = []
+
+    def delete_pod(self, name):
+        self.calls.append(("delete", name))
+        return self.delete_ok
+
+    def scale_deployment(self, name, replicas):
+        self.calls.append(("scale", name, replicas))
+        return True
+
+    def exec_many(self, pods, command):
+        self.calls.append(("exec", pods[0], " ".join(command)))
+        stderr = self.exec_results.get(command[0], "")
+        return {pods[0]: {"success": not stderr, "stderr": stderr, "error": None}}
+
+
+def test_fault_factories_and_final_restore():
+    k8s = FakeK8s(delete_ok=False, exec_results={"dd": "dd: error writing: No space left on device"})
+    runner = FaultInjectionRunner("http://127.0.0.1:1", "fault", writers=0, readers=0, resolution=0.1)
+    runner.add_fault(Fault.delete_pod(k8s, {"name": "tskv-0"}, at=0.05))
+    runner.add_fault(Fault.fill_disk(k8s, "tskv-1", at=0.1, duration=0.05))
+    runner.add_fault(Fault.scale(k8s, "query", 1, at=0.2, restore_replicas=3, duration=10))
+
+    report = runner.run(duration=0.4).set_index("fault")
+
+    assert k8s.calls == [
+        ("delete", "tskv-0"),
+        ("exec", "tskv-1", "dd if=/dev/zero of=/var/lib/cnosdb/fault-injection-fill bs=1M"),
+        ("exec", "tskv-1", "rm -f /var/lib/cnosdb/fault-injection-fill"),
+        ("scale", "query", 1),
+        # 负载结束时仍未恢复的故障在结束后恢复
+        ("scale", "query", 3),
+    ]
+    assert "删除 Pod tskv-0 失败" in report.loc["delete pod tskv-0", "error"]
+    assert report.loc["fill disk tskv-1 (full)", "error"] is None
+    assert report.loc["scale query to 1", "restored_at"] >= 0.4
+
+    limited = Fault.fill_disk(FakeK8s(exec_results={"dd": "No space left on device"}), "tskv-1", at=0, size_mb=64)
+    with pytest.raises(RuntimeError, match="No space left"):
+        limited.inject()
+
+
+def test_blocking_action_delays_schedule():
+    runner = FaultInjectionRunner("http://127.0.0.1:1", "fault", writers=0, readers=0, resolution=0.1)
+    first = runner.add_fault(Fault("slow", at=0.1, inject=lambda: time.sleep(0.3)))
+    second = runner.add_fault(Fault("fast", at=0.2, inject=lambda: None))
+
+    runner.run(duration=0.4)
+
+    # 阻塞的动作耗时不计入 duration，之后的事件和结束时间都顺延
+    assert first.injected_at == pytest.approx(0.1, abs=0.05)
+    assert second.injected_at == pytest.approx(0.5, abs=0.05)
+    assert runner.duration == pytest.approx(0.7, abs=0.05)
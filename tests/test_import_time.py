@@ -0,0 +1,66 @@
+"""
+启动耗时检查：纯 HTTP 测试的导入链不能引入 kubernetes，导入耗时不能超过预算
+预算通过 IMPORT_TIME_BUDGET (秒) 调整，默认 3 秒
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import allure
+
+ROOT = Path(__file__).resolve().parents[1]
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "3"))
+
+HTTP_ONLY_MODULES = [
+    "conftest",
+    "tests.conftest",
+    "utils.helper.CnosDBHelper",
+    "utils.helper.WaitHelper",
+]
+
+
+def _clean_env():
+    env = {k: v for k, v in os.environ.items() if k != "KUBERNETES_NAMESPACE"}
+    env["KUBECONFIG"] = str(ROOT / "does-not-exist")
+    return env
+
+
+def _measure_import() -> dict:
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"for name in {HTTP_ONLY_MODULES!r}:\n"
+        "    __import__(name)\n"
+        "print(json.dumps({'seconds': time.perf_counter() - start,\n"
+        "                  'kubernetes': any(m.split('.')[0] == 'kubernetes' for m in sys.modules)}))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=_clean_env(),
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+@allure.story("Import Time Budget")
+def test_http_only_import_chain_is_fast_and_skips_kubernetes():
+    # 取三次中最快的一次，减少 CI 机器抖动的影响
+    runs = [_measure_import() for _ in range(3)]
+    best = min(run["seconds"] for run in runs)
+    allure.attach(
+        json.dumps({"budget": IMPORT_TIME_BUDGET, "runs": runs}, indent=2),
+        name=f"Import Time ({best:.3f}s)",
+        attachment_type=allure.attachment_type.JSON
+    )
+
+    assert not any(run["kubernetes"] for run in runs), "纯 HTTP 测试的导入链引入了 kubernetes"
+    assert best <= IMPORT_TIME_BUDGET, f"导入耗时 {best:.3f}s 超过预算 {IMPORT_TIME_BUDGET}s"
+
+
+def test_collection_without_kubernetes_namespace():
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider",
+         "tests/test_attachment_policy.py", "tests/enterprise"],
+        cwd=ROOT, env=_clean_env(), capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "test_vnode_allocation_to_node_with_large_free_storage" in result.stdout
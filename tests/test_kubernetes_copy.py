@@ -0,0 +1,156 @@
+import hashlib
+import os
+import queue
+import subprocess
+import threading
+
+import pytest
+
+from utils.helper import KubenetesHellper
+from utils.helper.KubenetesHellper import KubernetesHelper
+
+
+class LocalExecClient:
+    """
+    模拟 kubernetes.stream.ws_client.WSClient，命令在本地子进程中执行
+    与真实 exec 一样不会关闭 stdin，tar 需要在读到归档结束标记后自行退出
+    """
+
+    def __init__(self, command, binary):
+        self.binary = binary
+        self.sent = []
+        self._all = None
+        self._channels = {}
+        # 有界队列模拟 websocket 的背压
+        self._events = queue.Queue(maxsize=16)
+        self._proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE)
+        self._pending = 2
+        self._open = True
+        for channel, pipe in ((1, self._proc.stdout), (2, self._proc.stderr)):
+            threading.Thread(target=self._pump, args=(channel, pipe), daemon=True).start()
+
+    def _pump(self, channel, pipe):
+        for chunk in iter(lambda: pipe.read1(64 * 1024), b""):
+            self._events.put((channel, chunk))
+        self._events.put((channel, None))
+
+    def update(self, timeout=0):
+        if not self._open:
+            return
+        try:
+            channel, chunk = self._events.get(timeout=timeout or 0.001)
+        except queue.Empty:
+            return
+        if chunk is None:
+            self._pending -= 1
+            if self._pending == 0:
+                self._proc.wait()
+                self._open = False
+            return
+        data = chunk if self.binary else chunk.decode()
+        self._channels[channel] = self._channels.get(channel, data[:0]) + data
+
+    def _read(self, channel, timeout=0):
+        if channel not in self._channels:
+            self.update(timeout)
+        return self._channels.pop(channel, "")
+
+    def read_stdout(self, timeout=0):
+        return self._read(1, timeout)
+
+    def read_stderr(self, timeout=0):
+        return self._read(2, timeout)
+
+    def write_stdin(self, data):
+        self.sent.append(len(data))
+        self._proc.stdin.write(data)
+        self._proc.stdin.flush()
+
+    def run_forever(self, timeout=None):
+        while self._open:
+            self.update(timeout=0.1)
+
+    def is_open(self):
+        return self._open
+
+    @property
+    def returncode(self):
+        return None if self._open else self._proc.returncode
+
+    def close(self):
+        self._proc.kill()
+        self._proc.wait()
+        self._open = False
+
+
+@pytest.fixture
+def k8s(monkeypatch):
+    clients = []
+
+    def fake_stream(func, pod_name, namespace, command, binary=False, **kwargs):
+        clients.append(LocalExecClient(command, binary))
+        return clients[-1]
+
+    monkeypatch.setattr(KubenetesHellper, "stream", fake_stream)
+    helper = object.__new__(KubernetesHelper)
+    helper._default_namespace = "test"
+    helper._config_loaded = True
+    helper.exec_clients = clients
+    return helper
+
+
+def _sha256(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_copy_file_round_trip_in_chunks(k8s, tmp_path):
+    source = tmp_path / "data.bin"
+    source.write_bytes(os.urandom(3 * 1024 * 1024 + 123))
+    pod_root = tmp_path / "pod"
+
+    upload = k8s.copy_to_pod("tskv-0", source, str(pod_root / "import" / "dataset.bin"), chunk_size=256 * 1024)
+
+    assert upload["success"], upload["error"]
+    assert upload["verified"] and upload["files"] == 1
+    assert upload["bytes"] == source.stat().st_size
+    assert upload["checksums"] == {"dataset.bin": _sha256(source)}
+    assert _sha256(pod_root / "import" / "dataset.bin") == _sha256(source)
+    # 每次只发送一个固定大小的块
+    assert max(k8s.exec_clients[0].sent) == 256 * 1024 and upload["chunks"] >= 12
+    assert upload["mb_per_sec"] > 0
+
+    download = k8s.copy_from_pod("tskv-0", str(pod_root / "import" / "dataset.bin"), tmp_path / "back.bin",
+                                 chunk_size=64 * 1024)
+
+    assert download["success"], download["error"]
+    assert download["verified"]
+    assert _sha256(tmp_path / "back.bin") == _sha256(source)
+
+
+def test_copy_directory_round_trip(k8s, tmp_path):
+    source = tmp_path / "vnode_3"
+    (source / "tsm").mkdir(parents=True)
+    (source / "wal").mkdir()
+    (source / "tsm" / "_000001.tsm").write_bytes(os.urandom(100_000))
+    (source / "wal" / "_000001.wal").write_bytes(b"")
+    (source / "summary").write_text("version=1\n")
+
+    upload = k8s.copy_to_pod("tskv-0", source, str(tmp_path / "pod" / "data" / "vnode_3"))
+    assert upload["success"], upload["error"]
+    assert sorted(upload["checksums"]) == ["vnode_3/summary", "vnode_3/tsm/_000001.tsm", "vnode_3/wal/_000001.wal"]
+
+    download = k8s.copy_from_pod("tskv-0", str(tmp_path / "pod" / "data" / "vnode_3"), tmp_path / "local" / "copy")
+    assert download["success"], download["error"]
+    assert download["files"] == 3 and download["bytes"] == 100_000 + len("version=1\n")
+    for name in ("tsm/_000001.tsm", "wal/_000001.wal", "summary"):
+        assert _sha256(tmp_path / "local" / "copy" / name) == _sha256(source / name)
+
+
+def test_copy_reports_remote_errors(k8s, tmp_path):
+    missing = k8s.copy_from_pod("tskv-0", str(tmp_path / "missing"), tmp_path / "out")
+    assert not missing["success"]
+    assert "tar 退出码" in missing["error"] and missing["stderr"]
+
+    local_missing = k8s.copy_to_pod("tskv-0", tmp_path / "nope", str(tmp_path / "pod" / "nope"))
+    assert not local_missing["success"] and "本地路径不存在" in local_missing["error"]
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from utils.helper import KubenetesHellper
+from utils.helper.KubenetesHellper import KubernetesHelper
+
+
+class FakeExecClient:
+    """模拟 kubernetes.stream.ws_client.WSClient"""
+
+    def __init__(self, pod_name):
+        self.pod_name = pod_name
+        self._open = True
+        self.closed = threading.Event()
+
+    def run_forever(self, timeout=None):
+        if self.pod_name == "hang":
+            time.sleep(timeout)
+            return
+        time.sleep(0.3)
+        self._open = False
+
+    def is_open(self):
+        return self._open
+
+    def _read(self, data, timeout):
+        # 与 WSClient 一样，连接未关闭时不带 timeout 的读取会一直等待新数据 (这里最多等 5 秒，避免测试卡住)
+        if self._open and timeout is None:
+            self.closed.wait(5)
+        return data
+
+    def read_stdout(self, timeout=None):
+        return self._read(f"out {self.pod_name}", timeout)
+
+    def read_stderr(self, timeout=None):
+        return self._read("" if self.pod_name != "bad" else "No space left on device", timeout)
+
+    @property
+    def returncode(self):
+        return 1 if self.pod_name == "bad" else 0
+
+    def close(self):
+        self._open = False
+        self.closed.set()
+
+
+@pytest.fixture
+def k8s(monkeypatch):
+    def fake_stream(func, pod_name, namespace, **kwargs):
+        if pod_name == "gone":
+            raise KubenetesHellper.client.ApiException(status=404, reason="Not Found")
+        exec_client = FakeExecClient(pod_name)
+        helper.exec_clients.append(exec_client)
+        return exec_client
+
+    monkeypatch.setattr(KubenetesHellper, "stream", fake_stream)
+    helper = object.__new__(KubernetesHelper)
+    helper._default_namespace = "test"
+    helper._config_loaded = True
+    helper.exec_clients = []
+    return helper
+
+
+def test_exec_many_runs_pods_concurrently(k8s):
+    pods = [{"name": f"tskv-{i}"} for i in range(6)]
+    start = time.perf_counter()
+    results = k8s.exec_many(pods, ["true"], max_workers=6)
+
+    assert time.perf_counter() - start < 1.2
+    assert set(results) == {f"tskv-{i}" for i in range(6)}
+    assert all(r["success"] and r["exit_code"] == 0 for r in results.values())
+    assert results["tskv-0"]["stdout"] == "out tskv-0"
+
+
+def test_exec_many_isolates_failures(k8s):
+    start = time.perf_counter()
+    results = k8s.exec_many(["ok", "bad", "gone", "hang"], ["true"], timeout=0.5)
+
+    # 超时的命令不会阻塞在读取输出上
+    assert time.perf_counter() - start < 2
+    assert all(exec_client.closed.is_set() for exec_client in k8s.exec_clients)
+
+    assert results["ok"]["success"]
+    assert results["bad"]["exit_code"] == 1 and results["bad"]["stderr"] == "No space left on device"
+    assert "Not Found" in results["gone"]["error"]
+    assert results["hang"]["exit_code"] is None and "超时" in results["hang"]["error"]
+    assert not any(results[name]["success"] for name in ("bad", "gone", "hang"))
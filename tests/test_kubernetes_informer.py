@@ -0,0 +1,169 @@
+import queue
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.helper.KubenetesHellper import KubernetesHelper
+from utils.helper.KubernetesInformer import ResourceInformer
+
+
+def _pod(name, resource_version, labels, node="node-a"):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, namespace="test", resource_version=resource_version,
+                                 labels=labels, creation_timestamp=None),
+        status=SimpleNamespace(phase="Running", pod_ip="10.0.0.1",
+                               conditions=[SimpleNamespace(type="Ready", status="True")]),
+        spec=SimpleNamespace(node_name=node, containers=[SimpleNamespace(name="cnosdb")]),
+    )
+
+
+class FakeWatch:
+    """从队列读取事件的 kubernetes.watch.Watch 替身，stop() 或超时后结束"""
+    events = queue.Queue()
+    calls = []
+
+    def __init__(self):
+        self._stopped = False
+
+    def stream(self, func, namespace, **kwargs):
+        FakeWatch.calls.append(kwargs)
+        while not self._stopped:
+            try:
+                event = FakeWatch.events.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            if event is None:
+                return
+            yield event
+
+    def stop(self):
+        self._stopped = True
+
+
+class FakeApi:
+    def __init__(self, items, resource_version="10"):
+        self.items = items
+        self.resource_version = resource_version
+        self.list_calls = 0
+        self.failures = 0
+
+    def list_namespaced_pod(self, namespace, **kwargs):
+        self.list_calls += 1
+        if self.failures:
+            self.failures -= 1
+            from kubernetes import client
+            raise client.ApiException(status=503, reason="Service Unavailable")
+        return SimpleNamespace(items=list(self.items), metadata=SimpleNamespace(resource_version=self.resource_version))
+
+
+@pytest.fixture
+def fake_watch():
+    FakeWatch.events = queue.Queue()
+    FakeWatch.calls = []
+    return FakeWatch
+
+
+@pytest.fixture
+def k8s():
+    helper = object.__new__(KubernetesHelper)
+    helper._default_namespace = "test"
+    helper._informers = {}
+    helper.core_v1 = FakeApi([
+        _pod("tskv-0", "5", {"cnosdb.com/role": "query_tskv"}, node="node-a"),
+        _pod("tskv-1", "6", {"cnosdb.com/role": "query_tskv"}, node="node-b"),
+        _pod("meta-0", "7", {"cnosdb.com/role": "meta"}, node="node-a"),
+    ])
+    yield helper
+    helper.disable_informers()
+
+
+def _wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_list_pods_served_from_cache(k8s, fake_watch):
+    k8s.enable_informers(["pods"], watch_factory=fake_watch)
+    assert k8s.core_v1.list_calls == 1
+
+    pods = k8s.list_pods(label_selector="cnosdb.com/role=query_tskv")
+    assert [p["name"] for p in pods] == ["tskv-0", "tskv-1"]
+    assert [p["name"] for p in k8s.list_pods(node="node-a")] == ["meta-0", "tskv-0"]
+    assert [p["name"] for p in k8s.list_pods(label_selector="cnosdb.com/role!=meta", node="node-a")] == ["tskv-0"]
+    assert k8s.core_v1.list_calls == 1
+    assert _wait_for(lambda: fake_watch.calls)
+    assert fake_watch.calls[0]["resource_version"] == "10"
+
+
+def test_watch_events_update_store_and_handlers(k8s, fake_watch):
+    k8s.enable_informers(["pods"], watch_factory=fake_watch)
+    events = []
+    k8s.add_informer_handler("pods", lambda event_type, obj, old: events.append((event_type, obj["name"])))
+
+    fake_watch.events.put({"type": "ADDED", "object": _pod("tskv-2", "11", {"cnosdb.com/role": "query_tskv"})})
+    fake_watch.events.put({"type": "MODIFIED", "object": _pod("meta-0", "12", {"cnosdb.com/role": "query_tskv"})})
+    fake_watch.events.put({"type": "DELETED", "object": _pod("tskv-0", "13", {"cnosdb.com/role": "query_tskv"})})
+    assert _wait_for(lambda: len(events) == 3)
+
+    informer = k8s._informers["pods"]
+    assert events == [("ADDED", "tskv-2"), ("MODIFIED", "meta-0"), ("DELETED", "tskv-0")]
+    assert [p["name"] for p in k8s.list_pods(label_selector="cnosdb.com/role=query_tskv")] == \
+        ["meta-0", "tskv-1", "tskv-2"]
+    assert k8s.list_pods(label_selector="cnosdb.com/role=meta") == []
+    assert informer.resource_version == "13"
+
+    # 服务端超时结束一次 WATCH 后从最新的 resourceVersion 续上
+    fake_watch.events.put(None)
+    assert _wait_for(lambda: len(fake_watch.calls) >= 2)
+    assert fake_watch.calls[1]["resource_version"] == "13"
+
+
+def test_expired_resource_version_triggers_relist(k8s, fake_watch):
+    k8s.enable_informers(["pods"], watch_factory=fake_watch)
+    k8s.core_v1.items = [_pod("tskv-9", "40", {"cnosdb.com/role": "query_tskv"})]
+    k8s.core_v1.resource_version = "41"
+
+    fake_watch.events.put({"type": "ERROR", "object": None, "raw_object": {"code": 410, "message": "Gone"}})
+    assert _wait_for(lambda: k8s.core_v1.list_calls == 2)
+    assert _wait_for(lambda: k8s._informers["pods"].resource_version == "41")
+    assert [p["name"] for p in k8s.list_pods()] == ["tskv-9"]
+
+
+def test_failed_relist_is_retried_with_backoff(k8s, fake_watch):
+    k8s.enable_informers(["pods"], watch_factory=fake_watch)
+    assert _wait_for(lambda: len(fake_watch.calls) == 1)
+    k8s.core_v1.items = [_pod("tskv-9", "40", {"cnosdb.com/role": "query_tskv"})]
+    k8s.core_v1.resource_version = "41"
+    k8s.core_v1.failures = 1
+
+    fake_watch.events.put({"type": "ERROR", "object": None, "raw_object": {"code": 410, "message": "Gone"}})
+    assert _wait_for(lambda: k8s.core_v1.list_calls == 2)
+    assert _wait_for(lambda: k8s.core_v1.list_calls == 3)
+    assert _wait_for(lambda: len(fake_watch.calls) == 2)
+
+    informer = k8s._informers["pods"]
+    # LIST 成功之后才重新 WATCH，且从新的 resourceVersion 开始
+    assert fake_watch.calls[1]["resource_version"] == "41"
+    assert informer.is_fresh(max_staleness=5)
+    assert [p["name"] for p in k8s.list_pods()] == ["tskv-9"]
+
+
+def test_stale_cache_falls_back_to_api(k8s, fake_watch):
+    k8s.enable_informers(["pods"], max_staleness=5, watch_factory=fake_watch)
+    k8s._informers["pods"].last_sync = time.monotonic() - 60
+
+    assert len(k8s.list_pods()) == 3
+    assert k8s.core_v1.list_calls == 2
+
+
+def test_parse_selector():
+    assert ResourceInformer.parse_selector("a=1, b==2,c!=3,d,!e") == [
+        ("a", "=", "1"), ("b", "=", "2"), ("c", "!=", "3"), ("d", "exists", None), ("e", "!exists", None)
+    ]
+    with pytest.raises(ValueError):
+        ResourceInformer.parse_selector("env in (prod, dev)")
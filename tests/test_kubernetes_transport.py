@@ -0,0 +1,156 @@
+import threading
+import time
+
+import pytest
+from kubernetes import client
+
+from tests.stub.kubernetes_api_server import KubernetesApiStubServer
+from utils.helper.KubenetesHellper import KubernetesHelper
+from utils.helper.KubernetesTransport import TokenBucket
+from utils.helper.LatencyHistogram import latency_registry
+
+
+@pytest.fixture(scope="module")
+def api_stub():
+    with KubernetesApiStubServer(pods=5) as server:
+        yield server
+
+
+@pytest.fixture
+def k8s(api_stub, tmp_path):
+    api_stub.delay = 0
+    api_stub.reset_counters()
+    helper = object.__new__(KubernetesHelper)
+    helper._default_namespace = api_stub.namespace
+    helper._config_file = str(api_stub.write_kubeconfig(tmp_path / "kubeconfig"))
+    yield helper
+    client.Configuration.set_default(None)
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(qps=50, burst=5)
+
+    start = time.perf_counter()
+    waits = [bucket.acquire() for _ in range(25)]
+    elapsed = time.perf_counter() - start
+
+    assert waits[:5] == [0.0] * 5
+    assert all(wait > 0 for wait in waits[5:])
+    assert 0.35 < elapsed < 0.6
+    with pytest.raises(ValueError):
+        TokenBucket(qps=0)
+
+
+def test_singleton_initializes_once_across_threads(monkeypatch):
+    monkeypatch.setattr(KubernetesHelper, "_instance", None)
+    barrier = threading.Barrier(16)
+    instances = []
+
+    def create(index):
+        barrier.wait()
+        instances.append(KubernetesHelper(default_namespace=f"ns-{index}"))
+
+    threads = [threading.Thread(target=create, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(instances) == 16
+    assert all(instance is instances[0] for instance in instances)
+    assert instances[0].default_namespace.startswith("ns-")
+
+
+def test_calls_share_client_and_record_latency(k8s, api_stub):
+    latency_registry.reset()
+
+    assert [pod["name"] for pod in k8s.list_pods()] == [f"pod-{i}" for i in range(5)]
+    assert k8s.get_pod("pod-3")["ip"] == "10.0.0.4"
+    assert k8s.get_pod("missing") is None
+
+    assert k8s.core_v1.api_client is k8s.api_client is k8s.apps_v1.api_client
+    assert k8s.api_client.configuration.connection_pool_maxsize == 32
+    stats = k8s.transport_stats().set_index("api")
+    assert stats.loc["GET /api/v1/namespaces/{namespace}/pods", "requests"] == 1
+    assert stats.loc["GET /api/v1/namespaces/{namespace}/pods/{name}", ["requests", "errors"]].tolist() == [2, 1]
+    histogram = latency_registry.histogram("k8s_api", "GET /api/v1/namespaces/{namespace}/pods/{name}", "total")
+    assert histogram.count == 2
+
+
+def test_default_timeout_and_reconfigure(k8s, api_stub):
+    k8s.configure_transport(read_timeout=0.1)
+    api_stub.delay = 0.3
+    with pytest.raises(Exception, match="Read timed out"):
+        k8s.list_pods()
+    # 调用时指定的超时优先
+    assert len(k8s.core_v1.list_namespaced_pod(api_stub.namespace, _request_timeout=2).items) == 5
+
+    api_stub.delay = 0
+    old_client = k8s.api_client
+    k8s.configure_transport(pool_size=8)
+    assert k8s.api_client is not old_client
+    assert k8s.core_v1.api_client is k8s.api_client
+    assert k8s.api_client.configuration.connection_pool_maxsize == 8
+
+
+def test_concurrent_callers_reuse_pool(k8s, api_stub):
+    api_stub.delay = 0.05
+    k8s.configure_transport(pool_size=16)
+    barrier = threading.Barrier(16)
+
+    def call():
+        barrier.wait()
+        for _ in range(3):
+            k8s.list_pods()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=call) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert api_stub.request_count == 48
+    assert time.perf_counter() - start < 48 * 0.05 / 4
+    assert api_stub.max_active > 4
+    assert len(api_stub.client_ports) <= 16
+
+
+def test_qps_limit(k8s, api_stub):
+    k8s.configure_transport(qps=20, burst=2)
+
+    start = time.perf_counter()
+    for _ in range(10):
+        k8s.list_pods()
+
+    assert time.perf_counter() - start >= 0.35
+    stats = k8s.transport_stats()
+    assert stats["throttled"].sum() == 8
+
+
+def test_exec_command_uses_dedicated_client(k8s, monkeypatch):
+    from kubernetes.stream import ws_client
+
+    timeouts = []
+
+    class FakeWSClient:
+        def __init__(self, configuration, url, headers, capture_all, binary=False):
+            pass
+
+        def run_forever(self, timeout=None):
+            timeouts.append(timeout)
+            # 与 WSClient 一样把 timeout 当作数字比较，收到元组会失败
+            assert timeout is None or timeout >= 0
+
+        def read_all(self):
+            return "hello"
+
+    monkeypatch.setattr(ws_client, "WSClient", FakeWSClient)
+    shared = k8s.api_client
+    shared_request = shared.request
+
+    assert k8s.exec_command("pod-0", ["echo", "hello"]) == "hello"
+    assert len(timeouts) == 1 and not isinstance(timeouts[0], tuple)
+    # 默认传输参数下共用的 ApiClient 不参与 exec，也不会被临时替换 request
+    assert shared.request == shared_request
+    assert "GET /api/v1/namespaces/{namespace}/pods/{name}/exec" not in set(k8s.transport_stats()["api"])
@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.HttpSessionPool import session_pool
+from utils.helper.LatencyHistogram import LatencyHistogram, LatencyRegistry, latency_registry
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_histogram_percentiles_within_relative_error():
+    rng = np.random.default_rng(1)
+    samples = rng.lognormal(mean=-5, sigma=1, size=20000)
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record(float(value))
+
+    for p in (50, 95, 99):
+        assert histogram.percentile(p) == pytest.approx(np.percentile(samples, p), rel=1 / 64 + 0.005)
+    assert histogram.count == len(samples)
+    assert histogram.max == pytest.approx(samples.max())
+
+
+def test_histogram_memory_is_fixed_and_merge():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    size = a.counts.nbytes
+    for _ in range(10000):
+        a.record(0.001)
+    b.record(10)
+    b.record(1e-9)
+    b.record(10000)
+    a.merge(b)
+
+    assert a.counts.nbytes == size
+    assert a.count == 10003
+    assert a.percentile(50) == pytest.approx(0.001, rel=1 / 64)
+    assert a.percentile(100) == 10000
+
+
+def test_registry_summary_file_and_environment(tmp_path):
+    registry = LatencyRegistry()
+    assert registry.write_summary(tmp_path) is None
+
+    registry.record({"endpoint": "/api/v1/write", "target": "10.0.0.1:8902"},
+                    {"ttfb": 0.01, "connect": None, "total": 0.02})
+    summary_path = registry.write_summary(tmp_path)
+
+    summary = json.loads(summary_path.read_text())
+    assert set(summary["endpoint"]["/api/v1/write"]) == {"ttfb", "total"}
+    assert summary["target"]["10.0.0.1:8902"]["total"]["count"] == 1
+    # 汇总不再以伪造的测试结果出现在报告中
+    assert [path.name for path in tmp_path.iterdir()] == ["latency-summary.json"]
+    assert registry.environment_properties() == {
+        "Latency./api/v1/write": "count=1 p50=20.0ms p99=20.0ms max=20.0ms"}
+    assert list(registry.environment_properties("target")) == ["Latency.10.0.0.1\\:8902"]
+
+
+@pytest.mark.parametrize("alluredir", [None, "reports"])
+def test_session_summary_follows_alluredir(tmp_path, alluredir):
+    (tmp_path / "test_latency.py").write_text(textwrap.dedent("""
+        from utils.helper.LatencyHistogram import latency_registry
+
+        def test_request():
+            latency_registry.record({"endpoint": "/api/v1/sql"}, {"total": 0.005})
+    """), encoding="utf-8")
+    env = {k: v for k, v in os.environ.items() if k not in ("PYTEST_ADDOPTS", "PYTEST_XDIST_WORKER")}
+    env["PYTHONPATH"] = str(ROOT)
+    args = [f"--alluredir={alluredir}"] if alluredir else []
+    result = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-p", "conftest",
+                             "test_latency.py"] + args, cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout
+
+    assert not (tmp_path / "allure-results").exists()
+    if alluredir is None:
+        return
+    results_dir = tmp_path / alluredir
+    assert json.loads((results_dir / "latency-summary.json").read_text())["endpoint"]["/api/v1/sql"]
+    assert "Latency./api/v1/sql=count=1 " in (results_dir / "environment.properties").read_text()
+    results = [json.loads(path.read_text()) for path in results_dir.glob("*-result.json")]
+    assert [r["name"] for r in results] == ["test_request"]
+
+
+def test_requests_record_phases(cnosdb_stub):
+    session_pool.close_all()
+    latency_registry.reset()
+    CnosDBHelper.create_database("latency", ip=cnosdb_stub.host, port=cnosdb_stub.port)
+    for i in range(5):
+        CnosDBHelper.write_to_cnosdb(cnosdb_stub.base_url, "latency", f"ma,ta=a fa={i}")
+
+    target = f"{cnosdb_stub.host}:{cnosdb_stub.port}"
+    write = latency_registry.summary()["endpoint"]["/api/v1/write"]
+    assert write["total"]["count"] == 5
+    assert write["acquire"]["count"] == 5
+    assert set(write) == {"acquire", "ttfb", "download", "client", "total"}
+    # 长连接只在第一个请求 (CREATE DATABASE) 时建立
+    assert latency_registry.histogram("target", target, "connect").count == 1
+    assert latency_registry.histogram("target", target, "total").count == 6
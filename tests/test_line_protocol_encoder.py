@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.LineProtocolEncoder import LineProtocolEncoder
+
+
+def test_encode_dataframe_matches_sample_data():
+    df = pd.DataFrame({
+        "time": pd.to_datetime([1642176000000000000, 1642176000000000001]),
+        "station": ["XiaoMaiDao", "XiaoMaiDao"],
+        "visibility": [50, 50],
+        "temperature": [63.0, 63.5],
+    })
+    data = LineProtocolEncoder.encode_dataframe(df, "air", tag_columns=["station"], time_column="time")
+    assert data == (
+        b"air,station=XiaoMaiDao visibility=50i,temperature=63.0 1642176000000000000\n"
+        b"air,station=XiaoMaiDao visibility=50i,temperature=63.5 1642176000000000001\n"
+    )
+
+
+@pytest.mark.parametrize("precision, expected", [("ns", b"1642176000000000000"), ("us", b"1642176000000000"),
+                                                 ("ms", b"1642176000000")])
+def test_precision(precision, expected):
+    data = LineProtocolEncoder.encode_columns(
+        "ma", fields={"fa": np.array([1.5])},
+        timestamps=np.array(["2022-01-14T16:00:00"], dtype="datetime64[ns]"), precision=precision
+    )
+    assert data == b"ma fa=1.5 " + expected + b"\n"
+
+
+def test_escaping_and_field_types():
+    data = LineProtocolEncoder.encode_columns(
+        "my table",
+        tags={"host name": np.array(["a,b=c", ""], dtype=object)},
+        fields={
+            "u": np.array([1, 2], dtype=np.uint32),
+            "ok": np.array([True, False]),
+            "msg": np.array(['say "hi"', "c:\\tmp"], dtype=object),
+        },
+    )
+    assert data.decode().splitlines() == [
+        'my\\ table,host\\ name=a\\,b\\=c u=1u,ok=true,msg="say \\"hi\\""',
+        'my\\ table u=2u,ok=false,msg="c:\\\\tmp"',
+    ]
+
+
+def test_missing_fields_are_omitted_and_order_kept():
+    data = LineProtocolEncoder.encode_columns(
+        "ma",
+        fields={"fa": np.array([1.0, np.nan, 3.0]), "fb": np.array(["x", "y", None], dtype=object)},
+        timestamps=np.array([1, 2, 3]),
+    )
+    assert data.decode().splitlines() == ['ma fa=1.0,fb="x" 1', 'ma fb="y" 2', "ma fa=3.0 3"]
+
+
+def test_agrees_with_point_formatter():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        "station": rng.choice(["XiaoMaiDao", "Lian Yun,Gang"], 200),
+        "region": rng.choice(["east", "north"], 200),
+        "pressure": rng.random(200),
+        "level": rng.integers(0, 10, 200),
+        "time": np.arange(200, dtype=np.int64),
+    })
+    encoded = LineProtocolEncoder.encode_dataframe(df, "air", ["station", "region"], time_column="time")
+    expected = [
+        CnosDBHelper._format_point({
+            "measurement": "air",
+            "tags": {"station": row.station, "region": row.region},
+            "fields": {"pressure": row.pressure, "level": int(row.level)},
+            "time": row.time,
+        })
+        for row in df.itertuples()
+    ]
+    assert encoded.decode().splitlines() == expected
+
+
+@pytest.mark.parametrize("column", [
+    np.round(np.random.default_rng(1).normal(20, 5, 500), 2),
+    np.random.default_rng(2).normal(0, 1, 500),
+    np.array([0.0, -0.0, 0.1 + 0.2, 1e-4, 123456789.125, 9999999999999998.0, 2.0 ** 53, 1e16, 5e-324]),
+    np.random.default_rng(3).integers(-2 ** 63, 2 ** 63 - 1, 500, dtype=np.int64),
+    np.random.default_rng(4).integers(0, 2 ** 64 - 1, 500, dtype=np.uint64),
+    np.array(["中文", "", 'say "hi"'] * 3, dtype=object),
+])
+def test_vectorised_encoding_matches_row_formatting(column, monkeypatch):
+    rows = len(column)
+    kwargs = dict(
+        measurement="air",
+        fields={"value": column, "ok": np.arange(rows) % 2 == 0},
+        tags={"station": np.array(["XiaoMaiDao", "Lian Yun,Gang"], dtype=object)[np.arange(rows) % 2]},
+        timestamps=np.arange(rows, dtype=np.int64) - rows // 2,
+    )
+    vectorised = LineProtocolEncoder.encode_columns(**kwargs)
+    monkeypatch.setattr(LineProtocolEncoder, "_encode_matrix", staticmethod(lambda *args: None))
+
+    assert vectorised == LineProtocolEncoder.encode_columns(**kwargs)
+
+
+def test_iter_encode_feeds_bulk_write_line_counts():
+    df = pd.DataFrame({"fa": np.arange(250, dtype=np.float64)})
+    blocks = list(LineProtocolEncoder.iter_encode(df, "ma", chunk_rows=100))
+    batches = list(CnosDBHelper._iter_batches(iter(blocks), batch_bytes=1 << 20, batch_lines=200))
+    assert [count for _, count in batches] == [200, 50]
+
+
+def test_rejects_nat_and_newlines():
+    with pytest.raises(ValueError, match="NaT at rows \\[1\\]"):
+        LineProtocolEncoder.encode_columns("ma", fields={"fa": np.array([1.0, 2.0])},
+                                           timestamps=np.array(["2022-01-14", "NaT"], dtype="datetime64[ns]"))
+    with pytest.raises(ValueError, match="newlines"):
+        LineProtocolEncoder.encode_columns("ma", fields={"fa": np.array([1.0])},
+                                           tags={"host": np.array(["a\nma fa=2"], dtype=object)})
+    with pytest.raises(ValueError, match="newlines"):
+        LineProtocolEncoder.encode_columns("ma", fields={"msg": np.array(["line 1\r\nline 2"], dtype=object)})
+
+
+def test_missing_fields_with_many_columns():
+    fields = {f"f{i}": np.arange(3, dtype=np.float64) for i in range(70)}
+    fields["f65"] = np.array([0.0, np.nan, 2.0])
+    lines = LineProtocolEncoder.encode_columns("ma", fields=fields).decode().splitlines()
+
+    assert [line.count("=") for line in lines] == [70, 69, 70]
+    assert "f65=" not in lines[1] and lines[2].endswith("f69=2.0")
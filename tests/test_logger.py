@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from loguru import logger
+
+from utils import logger as logger_module
+from utils.logger import log
+
+
+class CountingArg:
+    """记录被格式化次数的参数"""
+    calls = 0
+
+    def __format__(self, spec):
+        CountingArg.calls += 1
+        return "arg"
+
+
+@pytest.fixture
+def high_volume(tmp_path, monkeypatch):
+    monkeypatch.setattr(log, "_logs_dir", tmp_path)
+
+    def configure(**kwargs):
+        log.configure_high_volume(console_level="CRITICAL", **kwargs)
+
+    yield configure
+    monkeypatch.undo()
+    log.configure()
+
+
+def _records(tmp_path):
+    logger.complete()
+    lines = []
+    for path in tmp_path.rglob("*.jsonl"):
+        lines.extend(json.loads(line) for line in path.read_text(encoding="utf-8").splitlines())
+    return lines
+
+
+def test_sampling_is_per_call_site_and_lazy(high_volume, tmp_path):
+    high_volume(sample_every=100, rate_limit=0)
+    CountingArg.calls = 0
+    arg = CountingArg()
+    for _ in range(1000):
+        log.info("请求 {}", arg)
+    log.info("另一个调用点")
+
+    records = _records(tmp_path)
+    assert [r["msg"] for r in records].count("请求 arg") == 10
+    assert "另一个调用点" in [r["msg"] for r in records]
+    assert CountingArg.calls == 10
+    assert records[1]["suppressed"] == 99
+    assert records[0]["site"].startswith("test_logger:")
+    assert list(log.suppressed_summary().values()) == [990 - 99 * 9]
+
+
+def test_rate_limit(high_volume, tmp_path):
+    high_volume(sample_every=1, rate_limit=5)
+    for i in range(200):
+        log.debug("写入 {}", i)
+
+    emitted = [r for r in _records(tmp_path) if r["msg"].startswith("写入")]
+    assert 5 <= len(emitted) <= 6
+    assert sum(log.report_suppressed().values()) == 200 - len(emitted)
+    assert log.suppressed_summary() == {}
+
+
+def test_errors_are_not_sampled_and_reach_allure(high_volume, tmp_path, monkeypatch):
+    attached = []
+    monkeypatch.setattr(logger_module.allure, "attach", lambda body, **kwargs: attached.append(body))
+    high_volume(sample_every=1000, rate_limit=1)
+    for i in range(3):
+        log.error("请求失败: {}", i)
+
+    assert attached == ["请求失败: 0", "请求失败: 1", "请求失败: 2"]
+    assert [r["msg"] for r in _records(tmp_path) if r["level"] == "ERROR"] == attached
+
+
+def test_configure_restores_direct_logging(high_volume):
+    high_volume()
+    assert "info" in log.__dict__
+    log.configure()
+    assert "info" not in log.__dict__
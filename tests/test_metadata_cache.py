@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.MetadataCache import MetadataCache, metadata_cache
+
+
+@pytest.fixture
+def cache():
+    CnosDBHelper.enable_metadata_cache(ttl=30, maxsize=16)
+    yield metadata_cache
+    CnosDBHelper.disable_metadata_cache()
+
+
+def _delta(before, after):
+    return {name: after[name] - before[name] for name in ("hits", "misses", "invalidations")}
+
+
+def _databases(stub):
+    response = CnosDBHelper.query_from_cnosdb(stub.base_url, "", "SHOW DATABASES")
+    return [row["database_name"] for row in response.json()]
+
+
+def test_metadata_queries_are_cached_until_ddl(cnosdb_stub, cache):
+    before = cache.stats()
+    requests_before = cnosdb_stub.request_count
+
+    first = _databases(cnosdb_stub)
+    assert _databases(cnosdb_stub) == first
+    CnosDBHelper.query_from_cnosdb(cnosdb_stub.base_url, "", "SHOW   DATABASES;")
+    assert cnosdb_stub.request_count - requests_before == 1
+
+    CnosDBHelper.create_database("cache_db", ip=cnosdb_stub.host, port=cnosdb_stub.port)
+    assert "cache_db" in _databases(cnosdb_stub)
+
+    CnosDBHelper._make_request(cnosdb_stub.base_url, "/api/v1/sql?db=", "DROP DATABASE cache_db")
+    assert "cache_db" not in _databases(cnosdb_stub)
+
+    assert _delta(before, cache.stats()) == {"hits": 2, "misses": 3, "invalidations": 2}
+    assert cnosdb_stub.request_count - requests_before == 5
+
+
+def test_writes_invalidate_only_their_database(cnosdb_stub, cache):
+    CnosDBHelper.create_database("cache_w", ip=cnosdb_stub.host, port=cnosdb_stub.port)
+    CnosDBHelper.query_from_cnosdb(cnosdb_stub.base_url, "cache_w", "SHOW TABLES")
+    CnosDBHelper.query_from_cnosdb(cnosdb_stub.base_url, "", "SHOW DATABASES")
+    assert cache.stats()["size"] == 2
+
+    CnosDBHelper.write_to_cnosdb(cnosdb_stub.base_url, "cache_w", "air,station=a visibility=1 1")
+
+    assert [key[1] for key in cache._cache] == [""]
+
+
+def test_only_read_only_metadata_is_cached(cache):
+    assert cache.cacheable("SHOW TABLES")
+    assert cache.cacheable("describe database db4")
+    assert cache.cacheable("SELECT * FROM information_schema.tables")
+    assert not cache.cacheable("SELECT * FROM air")
+    assert not cache.cacheable("SHOW TABLES; DROP DATABASE db4")
+    assert not MetadataCache().cacheable("SHOW DATABASES")
+
+
+def test_ttl_and_use_cache(cnosdb_stub):
+    CnosDBHelper.enable_metadata_cache(ttl=0.1)
+    try:
+        requests_before = cnosdb_stub.request_count
+        _databases(cnosdb_stub)
+        CnosDBHelper.query_from_cnosdb(cnosdb_stub.base_url, "", "SHOW DATABASES", use_cache=False)
+        _databases(cnosdb_stub)
+        time.sleep(0.15)
+        _databases(cnosdb_stub)
+        assert cnosdb_stub.request_count - requests_before == 3
+    finally:
+        CnosDBHelper.disable_metadata_cache()
+
+
+def test_merge_stats_and_summary():
+    cache = MetadataCache(enabled=True)
+    assert cache.summary() is None
+    cache.merge_stats({"hits": 3, "misses": 1, "invalidations": 2, "size": 5})
+    assert cache.stats() == {"hits": 3, "misses": 1, "invalidations": 2, "size": 0}
+    assert cache.summary() == "CnosDB 元数据缓存: 命中 3, 未命中 1, 命中率 75.0%, 失效 2 次"
@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+from utils.helper import PodLogTailer as tailer_module
+from utils.helper.PodLogTailer import PodLogTailer
+
+
+def ts(second: float) -> str:
+    return f"2025-01-01T00:00:{second:09.6f}123Z"
+
+
+class FakeLogResponse:
+    """模拟 read_namespaced_pod_log(_preload_content=False) 返回的 urllib3 响应"""
+
+    def __init__(self, lines, hold=False, error=None, delay=0.0):
+        self.lines = lines
+        self.hold = hold
+        self.error = error
+        self.delay = delay
+        self.closed = threading.Event()
+
+    def stream(self, amt, decode_content=True):
+        time.sleep(self.delay)
+        data = "".join(f"{line}\n" for line in self.lines).encode()
+        # 故意在行中间切分，验证跨块拼接
+        for i in range(0, len(data), 7):
+            yield data[i:i + 7]
+        if self.error:
+            raise self.error
+        if self.hold:
+            self.closed.wait(10)
+
+    def close(self):
+        self.closed.set()
+
+    def release_conn(self):
+        pass
+
+
+class FakeCoreV1:
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def read_namespaced_pod_log(self, pod, namespace, **kwargs):
+        self.calls.append((pod, kwargs))
+        return self.responses[pod].pop(0)
+
+
+class FakeK8s:
+    default_namespace = "test"
+
+    def __init__(self, responses):
+        self.core_v1 = FakeCoreV1(responses)
+
+
+def test_follow_merges_pods_by_timestamp():
+    k8s = FakeK8s({
+        "tskv-0": [FakeLogResponse([f"{ts(1)} a1", f"{ts(3)} a3", f"{ts(5)} a5"])],
+        "tskv-1": [FakeLogResponse([f"{ts(2)} b2", f"{ts(4)} b4"], delay=0.05)],
+    })
+    with PodLogTailer(k8s, ["tskv-0", {"name": "tskv-1"}], reorder_window=0.2) as tailer:
+        lines = list(tailer.follow(timeout=5))
+
+    assert [line.text for line in lines] == ["a1", "b2", "a3", "b4", "a5"]
+    assert lines[0].pod == "tskv-0" and lines[1].pod == "tskv-1"
+    assert lines[1].timestamp - lines[0].timestamp == pytest.approx(1.0)
+    assert k8s.core_v1.calls[0][1]["follow"] and k8s.core_v1.calls[0][1]["timestamps"]
+
+
+def test_wait_for_returns_as_soon_as_line_appears():
+    k8s = FakeK8s({
+        "tskv-0": [FakeLogResponse([f"{ts(1)} start", f"{ts(2)} create vnode 12 on node 1001"],
+                                   hold=True, delay=0.1)],
+        "tskv-1": [FakeLogResponse([], hold=True)],
+    })
+    start = time.monotonic()
+    with PodLogTailer(k8s, ["tskv-0", "tskv-1"]) as tailer:
+        line = tailer.wait_for(r"create vnode (\d+)", timeout=5)
+        assert time.monotonic() - start < 2
+        assert line.pod == "tskv-0" and line.text.endswith("node 1001")
+
+        with pytest.raises(TimeoutError):
+            tailer.wait_for(lambda line: "vnode" in line.text, timeout=0.3, pods=["tskv-1"])
+
+
+def test_buffer_is_bounded_and_attached_on_timeout(monkeypatch):
+    attached = {}
+    monkeypatch.setattr(tailer_module.allure, "attach", lambda body, name, **kwargs: attached.update({name: body}))
+    k8s = FakeK8s({"tskv-0": [FakeLogResponse([f"{ts(i)} line {i}" for i in range(20)], hold=True)]})
+
+    with PodLogTailer(k8s, ["tskv-0"], buffer_lines=5) as tailer:
+        with pytest.raises(TimeoutError):
+            tailer.wait_for("flush completed", timeout=0.5)
+
+    body = attached["Pod Logs (Timeout) - tskv-0"]
+    assert [row.split(" ", 1)[1] for row in body.splitlines()] == [f"line {i}" for i in range(15, 20)]
+    assert len(tailer.buffers["tskv-0"]) == 5
+
+
+def test_reconnect_resumes_without_duplicates():
+    k8s = FakeK8s({"tskv-0": [
+        FakeLogResponse([f"{ts(1)} one", f"{ts(2)} two"], error=TimeoutError("read timed out")),
+        FakeLogResponse([f"{ts(2)} two", f"{ts(3)} three"]),
+    ]})
+    with PodLogTailer(k8s, ["tskv-0"]) as tailer:
+        texts = [line.text for line in tailer.follow(timeout=5)]
+
+    assert texts == ["one", "two", "three"]
+    assert k8s.core_v1.calls[0][1]["tail_lines"] == 0
+    assert k8s.core_v1.calls[1][1]["since_seconds"] >= 1
+
+
+def test_lines_with_same_timestamp_are_kept():
+    k8s = FakeK8s({"tskv-0": [FakeLogResponse([
+        f"{ts(1)} line-a", f"{ts(1)} line-b", f"{ts(1)} line-c", "2025-01-01T00:00:01Z line-d"
+    ])]})
+    with PodLogTailer(k8s, ["tskv-0"]) as tailer:
+        texts = [line.text for line in tailer.follow(timeout=5)]
+
+    # 精度较粗的时间戳排在前面，同一时间戳的行保持输出顺序
+    assert texts == ["line-d", "line-a", "line-b", "line-c"]
+
+
+def test_reconnect_dedupes_by_nanosecond_timestamp():
+    first, second = "2025-01-01T00:00:01.000000001Z", "2025-01-01T00:00:01.000000002Z"
+    k8s = FakeK8s({"tskv-0": [
+        FakeLogResponse([f"{first} one", f"{first} two"], error=TimeoutError("read timed out")),
+        # 重放的行中: 时间戳更早的和相同时间戳下已读取的行被跳过，float 秒无法区分的 1ns 之差不会误判
+        FakeLogResponse([f"{first} one", f"{first} two", f"{first} three", f"{second} four"]),
+    ]})
+    with PodLogTailer(k8s, ["tskv-0"]) as tailer:
+        lines = list(tailer.follow(timeout=5))
+
+    assert [line.text for line in lines] == ["one", "two", "three", "four"]
+    assert lines[3].timestamp_ns - lines[0].timestamp_ns == 1
+
+
+def test_exception_in_block_attaches_logs(monkeypatch):
+    attached = []
+    monkeypatch.setattr(tailer_module.allure, "attach", lambda body, name, **kwargs: attached.append(name))
+    k8s = FakeK8s({"tskv-0": [FakeLogResponse([f"{ts(1)} boom"], hold=True)]})
+
+    with pytest.raises(AssertionError):
+        with PodLogTailer(k8s, ["tskv-0"]):
+            assert False
+
+    assert attached == ["Pod Logs (AssertionError) - tskv-0"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+
+ROWS = 20000
+
+
+@pytest.fixture(scope="module", autouse=True)
+def air_table(cnosdb_stub):
+    cnosdb_stub.tables["air"] = pd.DataFrame({
+        "time": np.arange(ROWS, dtype=np.int64),
+        "station": np.where(np.arange(ROWS) % 2 == 0, "XiaoMaiDao", "LianYunGang"),
+        "visibility": np.arange(ROWS, dtype=np.float64) / 2,
+    })
+    yield
+    cnosdb_stub.tables.pop("air")
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_iter_dataframes_respects_memory_budget(cnosdb_stub, fmt):
+    with CnosDBHelper.query_stream(cnosdb_stub.base_url, "db", "SELECT * FROM air", fmt=fmt) as result:
+        chunks = list(result.iter_dataframes(memory_budget=64 * 1024, initial_rows=100))
+
+    assert len(chunks[0]) == 100
+    assert all(c.memory_usage(index=False, deep=True).sum() <= 64 * 1024 for c in chunks[1:])
+    assert sum(len(c) for c in chunks) == ROWS
+    assert result.rows == ROWS
+    assert 0 < result.time_to_first_row
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_iter_rows(cnosdb_stub, fmt):
+    with CnosDBHelper.query_stream(cnosdb_stub.base_url, "db", "SELECT * FROM air", fmt=fmt) as result:
+        rows = result.iter_rows()
+        assert next(rows) == {"time": 0, "station": "XiaoMaiDao", "visibility": 0.0}
+        assert sum(1 for _ in rows) == ROWS - 1
+
+
+def test_to_arrays_and_max_bytes(cnosdb_stub):
+    with CnosDBHelper.query_stream(cnosdb_stub.base_url, "db", "SELECT * FROM air") as result:
+        arrays = result.to_arrays(memory_budget=32 * 1024)
+    np.testing.assert_array_equal(arrays["time"], np.arange(ROWS))
+
+    with CnosDBHelper.query_stream(cnosdb_stub.base_url, "db", "SELECT * FROM air") as result:
+        with pytest.raises(MemoryError):
+            result.to_dataframe(memory_budget=32 * 1024, max_bytes=64 * 1024)
+
+
+def test_result_can_only_be_read_once(cnosdb_stub):
+    with CnosDBHelper.query_stream(cnosdb_stub.base_url, "db", "SELECT * FROM air") as result:
+        result.to_dataframe()
+        with pytest.raises(RuntimeError):
+            result.to_dataframe()
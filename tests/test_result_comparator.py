@@ -0,0 +1,133 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.helper import TestHelper as test_helper
+from utils.helper.ResultComparator import ResultComparator
+
+
+def _air(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=rows, freq="ms"),
+        "station": np.char.add("station_", (np.arange(rows) % 100).astype(str)),
+        "temperature": rng.normal(20, 5, rows),
+        "visibility": rng.integers(0, 100, rows),
+    })
+
+
+def _chunks(frame: pd.DataFrame, size: int):
+    for start in range(0, len(frame), size):
+        yield frame.iloc[start:start + size]
+
+
+def test_unordered_ignores_row_order_and_dtype():
+    expected = pd.DataFrame({"station": ["a", "b", "b", "c"], "value": [1, 2, 2, 3]})
+    actual = expected.iloc[[3, 1, 0, 2]].astype({"value": "float64"})
+
+    result = ResultComparator().compare(actual, expected)
+
+    assert result.equal, result.summary()
+    assert result.matched == 4
+
+
+def test_unordered_reports_missing_extra_and_tolerance():
+    expected = pd.DataFrame({"station": ["a", "b", "b", "c"], "value": [1.0, 2.0, 2.0, 3.0]})
+    actual = pd.DataFrame({"station": ["c", "b", "a", "d"], "value": [3.0000001, 2.5, 1.0, 4.0]})
+
+    result = ResultComparator(tolerances={"value": 1e-3}).compare(actual, expected)
+
+    assert not result
+    assert (result.missing, result.extra, result.value_mismatches, result.matched) == (1, 1, 1, 2)
+    assert result.column_mismatches == {"value": 1}
+    kinds = {m["type"]: m for m in result.mismatches}
+    assert kinds["missing"]["values"] == {"station": "b", "value": 2.0}
+    assert kinds["extra"]["values"] == {"station": "d", "value": 4.0}
+    assert kinds["value"] == {"type": "value", "column": "value", "expected": 2.0, "actual": 2.5,
+                              "expected_row": 1, "actual_row": 1}
+
+
+def test_unordered_tolerance_pairs_by_nearest_value():
+    expected = pd.DataFrame({"station": ["a"] * 4, "value": [1.0, 2.0, 3.0, 4.0]})
+    actual = pd.DataFrame({"station": ["a"] * 3, "value": [4.0, 2.0, 3.0000001]})
+
+    result = ResultComparator(float_tolerance=1e-6).compare(actual, expected)
+
+    # 缺少的一行不会让同组之后的行错位
+    assert (result.missing, result.extra, result.value_mismatches, result.matched) == (1, 0, 0, 3)
+    assert result.mismatches == [{"type": "missing", "row": 0, "values": {"station": "a", "value": 1.0}}]
+
+    # 同组中缺少一行、多出一行、一行超出容差
+    actual = pd.DataFrame({"station": ["a"] * 4, "value": [2.0, 3.5, 4.0, 9.0]})
+    result = ResultComparator(float_tolerance=1e-6).compare(actual, expected)
+    assert (result.missing, result.extra, result.value_mismatches, result.matched) == (0, 0, 2, 2)
+
+    actual = pd.DataFrame({"station": ["a"] * 5, "value": [0.5, 2.0, 3.0, 4.0, 5.0]})
+    result = ResultComparator(float_tolerance=1e-6).compare(actual, expected)
+    assert (result.missing, result.extra, result.value_mismatches, result.matched) == (0, 1, 1, 3)
+
+
+def test_ordered_with_misaligned_chunks():
+    expected = _air(1000)
+    actual = expected.copy()
+    actual.loc[10, "visibility"] += 1
+    actual.loc[20, "temperature"] += 1e-9
+    actual.loc[30, "temperature"] += 1
+    actual = pd.concat([actual, expected.iloc[:5]], ignore_index=True)
+
+    result = ResultComparator(ordered=True, float_tolerance=1e-6, max_mismatches=3).compare(
+        _chunks(actual, 128), _chunks(expected, 300)
+    )
+
+    assert result.rows_expected == 1000 and result.rows_actual == 1005
+    assert result.value_mismatches == 2 and result.extra == 5 and result.matched == 998
+    assert result.column_mismatches == {"temperature": 1, "visibility": 1}
+    assert [m.get("row") for m in result.mismatches] == [30, 10, 1000]
+    assert len(result.mismatches) == 3
+
+
+def test_time_bucket_alignment():
+    expected = pd.DataFrame({"time": ["2024-01-01T00:00:01Z", "2024-01-01T00:00:02Z"], "value": [1, 2]})
+    actual = pd.DataFrame({"time": pd.to_datetime(["2024-01-01 00:00:01.250", "2024-01-01 00:00:02.999"]),
+                           "value": [1, 2]})
+
+    assert not ResultComparator(time_column="time").compare(actual, expected)
+    assert ResultComparator(time_column="time", time_bucket="1s").compare(actual, expected)
+
+
+def test_missing_columns_and_ignore():
+    expected = pd.DataFrame({"a": [1], "b": [2]})
+    actual = pd.DataFrame({"a": [1], "c": [3]})
+
+    result = ResultComparator().compare(actual, expected)
+    assert result.missing_columns == ["b"] and result.extra_columns == ["c"] and not result
+    assert ResultComparator(ignore_columns=["b", "c"]).compare(actual, expected)
+
+
+def test_compare_results_and_nested_dicts():
+    frame = _air(100)
+    assert test_helper.TestHelper.compare_results(frame.sample(frac=1, random_state=1), frame)
+
+    expected = {"status": "ok", "vnode": {"id": 3, "node": {"id": 1001}}}
+    actual = {"status": "ok", "vnode": {"id": 3, "node": {"id": 1002}}}
+    assert test_helper.TestHelper.compare_dicts(expected, expected)
+    assert not test_helper.TestHelper.compare_dicts(actual, expected)
+    assert test_helper.TestHelper._dict_differences(actual, expected) == [
+        "值不匹配: vnode.node.id (期望: 1001, 实际: 1002)"
+    ]
+
+
+@pytest.mark.parametrize("ordered", [False, True])
+def test_large_result_sets(ordered):
+    expected = _air(500_000)
+    actual = expected.sample(frac=1, random_state=2) if not ordered else expected.copy()
+    actual["temperature"] += 1e-9
+
+    start = time.perf_counter()
+    result = ResultComparator(ordered=ordered, float_tolerance=1e-6).compare(_chunks(actual, 100_000), expected)
+
+    assert result.equal, result.summary()
+    assert result.matched == 500_000
+    assert time.perf_counter() - start < 10
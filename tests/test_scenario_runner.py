@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from utils.helper.ScenarioRunner import ScenarioRunner, ScenarioStep
+
+
+def _sleep(seconds: float, value=None):
+    def func():
+        time.sleep(seconds)
+        return value
+
+    return func
+
+
+def test_independent_steps_run_concurrently():
+    runner = ScenarioRunner("concurrent")
+    runner.add("setup", _sleep(0.01, "ready"))
+    runner.add("drop database", _sleep(0.2), depends=["setup"])
+    runner.add("fill disks", _sleep(0.3, 1024), depends=["setup"])
+    runner.add("write", _sleep(0.05), depends=["drop database", "fill disks"])
+
+    start = time.perf_counter()
+    results = runner.run()
+    elapsed = time.perf_counter() - start
+
+    assert results == {"setup": "ready", "drop database": None, "fill disks": 1024, "write": None}
+    assert elapsed < 0.5
+    timeline = runner.timeline().set_index("step")
+    assert timeline.loc["write", "start"] >= timeline.loc["fill disks", "start"] + 0.3
+    assert abs(timeline.loc["drop database", "start"] - timeline.loc["fill disks", "start"]) < 0.1
+    assert timeline["thread"].str.startswith("scenario").all()
+    assert [step.name for step in runner.critical_path()] == ["setup", "fill disks", "write"]
+    assert "关键路径: setup" in runner.summary()
+
+
+def test_failure_skips_remaining_steps_and_raises():
+    finished = threading.Event()
+    runner = ScenarioRunner("failure")
+
+    def broken():
+        raise RuntimeError("disk full")
+
+    @runner.step("slow")
+    def slow():
+        time.sleep(0.1)
+        finished.set()
+
+    runner.add("broken", broken)
+    runner.add("after broken", _sleep(0), depends=["broken"])
+    runner.add("after slow", _sleep(0), depends=["slow"])
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        runner.run()
+
+    # 失败时等待执行中的步骤结束，但不再启动新的步骤
+    assert finished.is_set()
+    status = {step.name: step.status for step in runner.steps}
+    assert status == {"slow": ScenarioStep.PASSED, "broken": ScenarioStep.FAILED,
+                      "after broken": ScenarioStep.SKIPPED, "after slow": ScenarioStep.SKIPPED}
+
+
+def test_failure_upstream_of_join(monkeypatch):
+    # 与 test_case4 相同的依赖形状: 汇合步骤的一个依赖被跳过，另一个已完成
+    def drop():
+        raise RuntimeError("drop failed")
+
+    runner = ScenarioRunner("join")
+    runner.add("setup", _sleep(0))
+    runner.add("drop database", drop, depends=["setup"])
+    runner.add("create database", _sleep(0), depends=["drop database"])
+    runner.add("prepare storage", _sleep(0.1), depends=["setup"])
+    runner.add("collect baseline", _sleep(0), depends=["create database", "prepare storage"])
+
+    with pytest.raises(RuntimeError, match="drop failed"):
+        runner.run()
+
+    timeline = runner.timeline().set_index("step")
+    assert timeline.loc["prepare storage", "status"] == ScenarioStep.PASSED
+    assert timeline.loc["collect baseline", "status"] == ScenarioStep.SKIPPED
+    assert pd.isna(timeline.loc["collect baseline", "waited"])
+
+    # 报告出错时仍然抛出步骤本身的异常
+    monkeypatch.setattr(runner, "summary", lambda: 1 / 0)
+    with pytest.raises(RuntimeError, match="drop failed"):
+        runner.run()
+
+
+def test_max_workers_limits_concurrency():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    runner = ScenarioRunner("limited", max_workers=2)
+    for index in range(6):
+        runner.add(f"step {index}", work)
+    runner.run()
+
+    assert peak[0] == 2
+    assert runner.timeline()["waited"].max() >= 0.05
+
+
+def test_invalid_dependencies():
+    runner = ScenarioRunner("invalid")
+    runner.add("a", _sleep(0), depends=["b"])
+    runner.add("b", _sleep(0), depends=["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        runner.run()
+
+    runner = ScenarioRunner("unknown")
+    runner.add("a", _sleep(0), depends=["missing"])
+    with pytest.raises(ValueError, match="unknown"):
+        runner.run()
+    with pytest.raises(ValueError, match="duplicate"):
+        runner.add("a", _sleep(0))
@@ -0,0 +1,87 @@
+import pytest
+
+from utils.helper.StorageProbe import StorageProbe, StorageSnapshot
+
+
+def _output(available_kb: int, du: str) -> str:
+    return (
+        "Filesystem     1024-blocks    Used Available Capacity Mounted on\n"
+        f"/dev/sdb1         10485760 1048576 {available_kb}      10% /var/lib/cnosdb\n"
+        "---\n" + du
+    )
+
+
+class FakeK8s:
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.calls = []
+
+    def list_pods(self, label_selector=None):
+        self.calls.append(("list_pods", label_selector))
+        return [{"name": name, "node": f"node-{name[-1]}"} for name in self.outputs]
+
+    def exec_many(self, pods, command, max_workers=8, timeout=None, container=None):
+        self.calls.append(("exec_many", command))
+        results = {}
+        for pod in pods:
+            output = self.outputs[pod["name"]]
+            failed = output is None
+            results[pod["name"]] = {"pod": pod["name"], "stdout": output or "", "stderr": "No such file",
+                                    "exit_code": 1 if failed else 0, "error": None, "success": not failed}
+        return results
+
+
+@pytest.fixture
+def k8s():
+    return FakeK8s({
+        "tskv-0": _output(9000000, "8\t./data/cnosdb.db4/3/tsm\n100\t./data/cnosdb.db4/3\n"
+                                   "20\t./wal/cnosdb.db4/3\n50\t./data/cnosdb.public/1\n"
+                                   "4\t./data/cnosdb.db4\n170\t.\n"),
+        "tskv-1": _output(8000000, "400\t./data/cnosdb.public/2\n400\t.\n"),
+        "tskv-2": _output(9437184, ""),
+        "tskv-3": None,
+    })
+
+
+def test_collect_builds_vnode_and_disk_frames(k8s):
+    snapshot = StorageProbe(k8s).collect()
+
+    assert k8s.calls[0] == ("list_pods", "cnosdb.com/role=query_tskv")
+    assert snapshot.errors == {"tskv-3": "No such file"}
+    assert list(snapshot.disks["pod"]) == ["tskv-0", "tskv-1", "tskv-2"]
+    assert snapshot.disks.set_index("pod").loc["tskv-2", "available_bytes"] == 9437184 * 1024
+
+    db4 = snapshot.vnodes[snapshot.vnodes["database"] == "db4"]
+    assert db4[["pod", "node", "kind", "tenant", "vnode", "bytes"]].values.tolist() == [
+        ["tskv-0", "node-0", "data", "cnosdb", 3, 100 * 1024],
+        ["tskv-0", "node-0", "wal", "cnosdb", 3, 20 * 1024],
+    ]
+    assert snapshot.vnode_pods("db4") == {"tskv-0"}
+    assert snapshot.by_node(kind="data").to_dict() == {"tskv-0": 150 * 1024, "tskv-1": 400 * 1024, "tskv-2": 0}
+    assert snapshot.by_database().loc["tskv-1", "public"] == 400 * 1024
+
+
+def test_skew_metrics(k8s):
+    snapshot = StorageProbe(k8s).collect()
+    skew = snapshot.skew(kind="data")
+
+    assert skew["pods"] == 3
+    assert skew["max_mean"] == pytest.approx(400 / (550 / 3))
+    assert skew["gini"] == pytest.approx(StorageSnapshot.gini([0, 150, 400]))
+    assert StorageSnapshot.gini([5, 5, 5]) == 0
+    assert StorageSnapshot.gini([0, 0, 0, 10]) == pytest.approx(0.75)
+
+
+def test_growth_between_snapshots(k8s):
+    before = StorageProbe(k8s).collect()
+    k8s.outputs["tskv-2"] = _output(9000000, "300\t./data/cnosdb.db4/7\n")
+    after = StorageProbe(k8s).collect()
+
+    growth = after.growth(before).set_index(["pod", "database"])
+    assert growth.loc[("tskv-2", "db4"), "growth"] == 300 * 1024
+    assert growth.loc[("tskv-0", "db4"), "growth"] == 0
+
+
+def test_parse_rejects_unexpected_output():
+    with pytest.raises(ValueError):
+        StorageProbe.parse("sh: cd: can't cd to /var/lib/cnosdb/data")
@@ -0,0 +1,78 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.WaitHelper import WaitHelper
+
+
+def _pod(name, resource_version, ready):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, resource_version=resource_version, deletion_timestamp=None),
+        status=SimpleNamespace(conditions=[SimpleNamespace(type="Ready", status="True" if ready else "False")]),
+    )
+
+
+class FakeWatch:
+    """按顺序回放事件的 kubernetes.watch.Watch 替身"""
+    events = []
+    calls = []
+
+    def stream(self, func, *args, **kwargs):
+        FakeWatch.calls.append(kwargs)
+        yield from FakeWatch.events
+
+    def stop(self):
+        pass
+
+
+def test_wait_until_backs_off_until_true():
+    calls = []
+
+    def predicate():
+        calls.append(time.monotonic())
+        return len(calls) >= 4 and "ready"
+
+    assert WaitHelper.wait_until(predicate, "ready", timeout=5, initial_interval=0.01) == "ready"
+    gaps = [b - a for a, b in zip(calls, calls[1:])]
+    assert gaps[2] > gaps[0]
+
+
+def test_wait_until_times_out_with_last_error():
+    def predicate():
+        raise ConnectionError("refused")
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError, match="refused"):
+        WaitHelper.wait_until(predicate, "never", timeout=0.3, initial_interval=0.05)
+    assert time.monotonic() - start < 1
+
+
+def test_database_exists(cnosdb_stub):
+    predicate = WaitHelper.database_exists(cnosdb_stub.base_url, "wait_db")
+    assert not predicate()
+    CnosDBHelper.create_database("wait_db", ip=cnosdb_stub.host, port=cnosdb_stub.port)
+    assert WaitHelper.wait_until(predicate, "wait_db", timeout=5)
+
+
+def test_wait_for_resources_uses_watch_from_list_resource_version(monkeypatch):
+    from kubernetes import watch
+    monkeypatch.setattr(watch, "Watch", FakeWatch)
+    FakeWatch.calls = []
+    FakeWatch.events = [
+        {"type": "MODIFIED", "object": _pod("tskv-0", "11", True)},
+        {"type": "ADDED", "object": _pod("tskv-1", "12", False)},
+        {"type": "MODIFIED", "object": _pod("tskv-1", "13", True)},
+    ]
+
+    def list_func(namespace, **kwargs):
+        return SimpleNamespace(items=[_pod("tskv-0", "9", False)], metadata=SimpleNamespace(resource_version="10"))
+
+    k8s = SimpleNamespace(core_v1=SimpleNamespace(list_namespaced_pod=list_func), default_namespace="test",
+                          is_pod_ready=lambda pod: pod.status.conditions[0].status == "True")
+    pods = WaitHelper.wait_for_pods_ready(k8s, "cnosdb.com/role=query_tskv", count=2, timeout=5)
+
+    assert set(pods) == {"tskv-0", "tskv-1"}
+    assert FakeWatch.calls[0]["resource_version"] == "10"
+    assert FakeWatch.calls[0]["label_selector"] == "cnosdb.com/role=query_tskv"
@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from utils.helper.LatencyHistogram import LatencyRegistry
+from utils.helper.WorkerHelper import WorkerHelper
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_shard_is_disjoint_and_complete():
+    pods = [{"name": f"tskv-{i}"} for i in range(7)]
+    shards = [WorkerHelper.shard(list(reversed(pods)), index=i, count=3) for i in range(3)]
+
+    names = [pod["name"] for shard in shards for pod in shard]
+    assert sorted(names) == sorted(pod["name"] for pod in pods)
+    assert len(names) == len(set(names))
+    assert [len(shard) for shard in shards] == [3, 2, 2]
+
+
+def test_worker_pods_fixture(tmp_path):
+    """worker_pods 是会话级 fixture，在独立进程中替换 kubernetes_helper，避免缓存的替身泄漏到其他测试"""
+    (tmp_path / "test_pods.py").write_text(textwrap.dedent("""
+        import pytest
+
+        class FakeK8s:
+            def list_pods(self, label_selector=None):
+                assert label_selector == "cnosdb.com/role=query_tskv"
+                return [{"name": f"tskv-{i}"} for i in (3, 0, 2, 1, 4)]
+
+        @pytest.fixture(scope="session")
+        def kubernetes_helper():
+            return FakeK8s()
+
+        def test_slice(worker_pods):
+            assert [p["name"] for p in worker_pods("cnosdb.com/role=query_tskv")] == ["tskv-1", "tskv-4"]
+    """), encoding="utf-8")
+    env = {k: v for k, v in os.environ.items() if k != "PYTEST_ADDOPTS"}
+    env.update(PYTHONPATH=str(ROOT), PYTEST_XDIST_WORKER="gw1", PYTEST_XDIST_WORKER_COUNT="3")
+    result = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-p", "tests.conftest",
+                             "test_pods.py"], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout
+
+
+def test_db_name_and_worker_info(monkeypatch):
+    monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
+    monkeypatch.delenv("PYTEST_XDIST_WORKER_COUNT", raising=False)
+    assert WorkerHelper.db_name("db4") == "db4"
+    assert WorkerHelper.worker_count() == 1
+    assert WorkerHelper.shard(["b", "a"]) == ["a", "b"]
+
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw2")
+    monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "4")
+    assert WorkerHelper.db_name("db4") == "db4_gw2"
+    assert WorkerHelper.worker_index() == 2
+    assert WorkerHelper.shard(list("abcdefgh")) == ["c", "g"]
+
+
+def test_merge_worker_logs_orders_records(tmp_path, monkeypatch):
+    monkeypatch.setenv(WorkerHelper.RUN_ID_ENV, "run1")
+    worker_dir = WorkerHelper.worker_log_dir(tmp_path)
+    worker_dir.mkdir(parents=True)
+    (worker_dir / "gw0.log").write_text(
+        "2025-01-01 00:00:00.100 | INFO     | a:1 - first\n"
+        "2025-01-01 00:00:00.300 | ERROR    | a:2 - boom\n"
+        "Traceback (most recent call last):\n"
+        "2025-01-01 00:00:00.500 | INFO     | a:3 - last\n",
+        encoding="utf-8"
+    )
+    (worker_dir / "gw1.log").write_text(
+        "2025-01-01 00:00:00.200 | INFO     | b:1 - second\n"
+        "2025-01-01 00:00:00.400 | INFO     | b:2 - fourth\n",
+        encoding="utf-8"
+    )
+    (worker_dir / "gw1.jsonl").write_text(json.dumps({"ts": 2.0, "msg": "x"}) + "\n", encoding="utf-8")
+    (worker_dir / "gw0.jsonl").write_text(json.dumps({"ts": 1.0, "msg": "y"}) + "\n", encoding="utf-8")
+
+    merged = WorkerHelper.merge_worker_logs(tmp_path)
+
+    assert [path.name for path in merged] == ["pytest_merged_run1.log", "pytest_merged_run1.jsonl"]
+    lines = merged[0].read_text(encoding="utf-8").splitlines()
+    assert [line.split(" - ")[-1] for line in lines if " - " in line] == ["first", "second", "boom", "fourth", "last"]
+    assert lines[2] == "[gw0] 2025-01-01 00:00:00.300 | ERROR    | a:2 - boom"
+    assert lines[3] == "Traceback (most recent call last):"
+    assert [json.loads(line)["msg"] for line in merged[1].read_text().splitlines()] == ["y", "x"]
+    assert not worker_dir.exists()
+
+
+def test_latency_registry_merge_files(tmp_path):
+    dims = {"endpoint": "/api/v1/write"}
+    for worker, values in (("gw0", [0.001, 0.002]), ("gw1", [0.003])):
+        registry = LatencyRegistry()
+        for value in values:
+            registry.record(dims, {"total": value})
+        registry.save(tmp_path / f"latency-{worker}.json")
+
+    merged = LatencyRegistry()
+    assert merged.merge_files(sorted(tmp_path.glob("latency-*.json")), remove=True) == 2
+    histogram = merged.histogram("endpoint", "/api/v1/write", "total")
+    assert histogram.count == 3
+    assert histogram.max == 0.003
+    assert not list(tmp_path.glob("latency-*.json"))
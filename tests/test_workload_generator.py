@@ -0,0 +1,96 @@
+import pandas as pd
+import pytest
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.LineProtocolEncoder import LineProtocolEncoder
+from utils.helper.WorkloadGenerator import WorkloadGenerator
+
+
+def _parse(data: bytes) -> pd.DataFrame:
+    """把生成的 Line Protocol 拆分为 series key、字段和时间戳"""
+    lines = [line.split(" ") for line in data.decode().splitlines()]
+    return pd.DataFrame({
+        "series": [parts[0] for parts in lines],
+        "fields": [parts[1] for parts in lines],
+        "time": [int(parts[2]) for parts in lines],
+    })
+
+
+@pytest.mark.parametrize("decimals", [2, 0])
+def test_output_matches_line_protocol_encoder(decimals):
+    workload = WorkloadGenerator("iot", series=30, points_per_series=7, seed=3, decimals=decimals)
+    frame = workload.to_dataframe()
+
+    expected = LineProtocolEncoder.encode_dataframe(
+        frame, workload.measurement, tag_columns=workload.tag_names, time_column="time",
+        float_format=f"%.{decimals}f"
+    )
+    assert b"".join(workload.iter_chunks(50)) == expected
+    # 每块一行时每个字段都按实际长度排列，包括比最大宽度短的负数
+    assert b"".join(workload.iter_chunks(1)) == expected
+    assert expected.startswith(b"air,region=region_00,station=station_00 visibility=")
+    assert frame["temperature"].between(-20, 40).all()
+
+
+def test_reproducible_and_independent_of_chunk_size():
+    def generate(chunk_rows, **kwargs):
+        workload = WorkloadGenerator("devops", series=200, points_per_series=30, out_of_order=0.1, **kwargs)
+        return b"".join(workload.iter_chunks(chunk_rows))
+
+    data = generate(1000, seed=7)
+    assert generate(333, seed=7) == data
+    assert generate(50000, seed=7) == data
+    assert generate(1000, seed=8) != data
+
+
+def test_series_and_tag_cardinality():
+    workload = WorkloadGenerator("devops", series=5000, fields=12, tag_cardinality={"region": 4, "zone": 2})
+    parsed = _parse(b"".join(workload.iter_chunks()))
+
+    assert len(parsed) == workload.total_points == 5000
+    assert parsed["series"].nunique() == 5000
+    tags = parsed["series"].str.split(",", expand=True).iloc[:, 1:]
+    cardinality = {column.iloc[0].split("=")[0]: column.nunique() for _, column in tags.items()}
+    assert cardinality == {"datacenter": 27, "hostname": 5000, "os": 3, "rack": 100, "region": 4,
+                           "service": 20, "team": 8, "zone": 2}
+    assert workload.field_names[-2:] == ["field_10", "field_11"]
+    assert parsed["fields"].str.count("=").eq(12).all()
+
+
+def test_out_of_order_points_arrive_after_next_point():
+    workload = WorkloadGenerator("iot", series=100, points_per_series=50, out_of_order=0.05, seed=1)
+    parsed = _parse(b"".join(workload.iter_chunks(777)))
+
+    assert len(parsed) == workload.total_points
+    assert not parsed.duplicated(["series", "time"]).any()
+    # lateness=1 时乱序点紧跟在同一序列的下一个点之后
+    diff = parsed.groupby("series")["time"].diff()
+    assert 0.03 < (diff < 0).mean() < 0.07
+    assert set(diff[diff < 0]) == {-workload.interval_ns}
+    assert _parse(b"".join(WorkloadGenerator("iot", series=100, points_per_series=50).iter_chunks()))[
+               "time"].is_monotonic_increasing
+
+
+def test_time_range_and_precision():
+    workload = WorkloadGenerator("iot", series=2, start="2024-01-01T08:00:00+08:00", end="2024-01-01T00:01:00Z",
+                                 interval="15s", precision="ms")
+    parsed = _parse(b"".join(workload.iter_chunks()))
+
+    assert workload.points_per_series == 4
+    assert parsed["time"].unique().tolist() == [1704067200000, 1704067215000, 1704067230000, 1704067245000]
+    assert workload.describe()["start"] == "2024-01-01T00:00:00+00:00"
+    with pytest.raises(ValueError):
+        WorkloadGenerator(interval="1500us", precision="ms")
+
+
+def test_write_to_stub(cnosdb_stub):
+    CnosDBHelper.create_database("workload", ip=cnosdb_stub.host, port=cnosdb_stub.port)
+    workload = WorkloadGenerator("iot", series=500, points_per_series=10, out_of_order=0.1)
+
+    stats = workload.write(cnosdb_stub.base_url, "workload", chunk_rows=1000)
+
+    assert sum(s["points"] for s in stats) == 5000
+    assert len(stats) >= 5
+    # 批次并发发送，只比较内容
+    expected = b"".join(workload.iter_chunks(1000)).splitlines()
+    assert sorted(cnosdb_stub.databases.pop("workload")) == sorted(expected)
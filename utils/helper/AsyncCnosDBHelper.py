@@ -0,0 +1,325 @@
+import asyncio
+import contextvars
+import json
+import threading
+import time
+from typing import Union, Dict, Any, Optional, Awaitable, Callable, Iterable, List, Tuple, TypeVar
+from urllib.parse import urljoin
+
+import aiohttp
+import allure
+
+from utils.helper.AttachmentPolicy import AttachmentPolicy
+from utils.helper.HttpRequestHelper import HttpRequestHelper
+from utils.logger import log
+
+T = TypeVar("T")
+
+# run() 执行期间待记录的 Allure 步骤，由 run() 在调用线程上记录
+_pending_steps: contextvars.ContextVar[Optional[List[Tuple[str, Callable[[], None]]]]] = \
+    contextvars.ContextVar("pending_allure_steps", default=None)
+
+
+class AsyncHttpResponse:
+    """异步请求的响应，属性与 requests.Response 常用字段保持一致"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes, elapsed: float):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.elapsed = elapsed
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class AsyncCnosDBHelper:
+    """
+    基于 asyncio 的 CnosDB 客户端
+    同一事件循环内的所有请求共享一个 aiohttp 连接池，可以在单个线程中并发数千个请求
+
+    在同步测试中使用共享的后台事件循环:
+        helper = AsyncCnosDBHelper()
+        responses = helper.run(helper.gather(
+            helper.query(f"http://{pod['ip']}:8902", "db4", "SELECT 1") for pod in pods
+        ))
+    """
+
+    _shared_loop: Optional[asyncio.AbstractEventLoop] = None
+    _shared_loop_lock = threading.Lock()
+
+    def __init__(
+            self,
+            pool_size: int = 256,
+            pool_size_per_host: int = 0,
+            keepalive_timeout: float = 30,
+            max_concurrency: int = 1000,
+            attachment_policy: Optional[AttachmentPolicy] = None
+    ):
+        """
+        :param pool_size: 连接池最大连接数，0 表示不限制
+        :param pool_size_per_host: 每个目标主机的最大连接数，0 表示不限制
+        :param keepalive_timeout: 空闲连接保持时间(秒)
+        :param max_concurrency: gather 默认的最大并发请求数
+        :param attachment_policy: Allure 附件策略，默认使用 HttpRequestHelper.attachment_policy
+        """
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.max_concurrency = max_concurrency
+        self.attachment_policy = attachment_policy
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    # ------------------------- 事件循环 -------------------------
+    @classmethod
+    def shared_loop(cls) -> asyncio.AbstractEventLoop:
+        """获取在后台线程中运行的共享事件循环"""
+        with cls._shared_loop_lock:
+            if cls._shared_loop is None or cls._shared_loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="cnosdb-async-loop", daemon=True).start()
+                cls._shared_loop = loop
+            return cls._shared_loop
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        在共享事件循环中执行协程并同步等待结果
+        Allure 按线程记录当前测试，事件循环线程长期存在，其中的步骤会归到它第一次使用时的测试下，
+        因此请求的 Allure 步骤先暂存，协程结束后在调用线程上按完成顺序记录
+        """
+        steps: List[Tuple[str, Callable[[], None]]] = []
+
+        async def collect() -> T:
+            _pending_steps.set(steps)
+            return await coro
+
+        try:
+            return asyncio.run_coroutine_threadsafe(collect(), self.shared_loop()).result(timeout)
+        finally:
+            # 超时时协程仍在运行，只记录已完成的请求
+            for title, body in list(steps):
+                self._attach_step(title, body)
+
+    async def gather(self, coros: Iterable[Awaitable[T]], max_concurrency: Optional[int] = None,
+                     return_exceptions: bool = False) -> List[T]:
+        """并发执行多个协程，同时运行的协程数不超过 max_concurrency，结果顺序与输入一致"""
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def limited(coro: Awaitable[T]) -> T:
+            async with semaphore:
+                return await coro
+
+        return await asyncio.gather(*(limited(c) for c in coros), return_exceptions=return_exceptions)
+
+    async def close(self):
+        """关闭当前事件循环上的连接池"""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取当前事件循环上的连接池，不存在时创建"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[loop] = session
+        return session
+
+    # ------------------------- 请求 -------------------------
+    async def _make_request(
+            self,
+            base_url: str,
+            endpoint: str,
+            data: Union[str, bytes],
+            username: str = "root",
+            password: str = "",
+            expected_status: Optional[int] = 200,
+            timeout: int = 10
+    ) -> AsyncHttpResponse:
+        """
+        内部通用请求方法，Allure 和日志记录与 HttpRequestHelper.send_http_request 一致
+        请求完成后才记录 Allure 步骤，并发协程的步骤不会互相嵌套
+        """
+        if not isinstance(data, (str, bytes)):
+            raise TypeError("data must be str or bytes")
+
+        url = urljoin(base_url, endpoint)
+        request_description = f"POST {url}"
+        headers = {
+            "Accept": "application/json",
+            "Content-Type": "text/plain"
+        }
+
+        log.info("发送请求: {}", request_description)
+        start = time.perf_counter()
+        try:
+            async with self._get_session().post(
+                    url,
+                    data=data if isinstance(data, bytes) else data.encode('utf-8'),
+                    headers=headers,
+                    auth=aiohttp.BasicAuth(username, password),
+                    timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as resp:
+                content = await resp.read()
+                response = AsyncHttpResponse(
+                    url, resp.status, dict(resp.headers), content, time.perf_counter() - start
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = str(e) or type(e).__name__
+
+            def report_error():
+                log.error(f"请求失败: {error}")
+                HttpRequestHelper.attach_request(url, "POST", headers, None, None, timeout)
+                allure.attach(error, name="Request Error", attachment_type=allure.attachment_type.TEXT)
+
+            self._report_step(f"HTTP请求: {request_description}", report_error)
+            raise
+
+        policy = self.attachment_policy or HttpRequestHelper.attachment_policy
+        attach = policy.should_attach()
+        log.info("收到响应: {} (耗时: {}s)", response.status_code, response.elapsed)
+
+        failure = None
+        if expected_status is not None and response.status_code != expected_status:
+            failure = AssertionError(
+                f"预期状态码 {expected_status}, 实际得到 {response.status_code}\n"
+                f"响应内容: {policy.preview(response.content)}"
+            )
+
+        def report_response():
+            if attach:
+                HttpRequestHelper.attach_request(url, "POST", headers, None, None, timeout)
+                HttpRequestHelper.attach_response(
+                    response.status_code, response.headers, response.content, response.elapsed, policy
+                )
+            if failure is not None:
+                log.error(f"断言失败: {str(failure)}")
+                if not attach:
+                    HttpRequestHelper.attach_request(url, "POST", headers, None, None, timeout)
+                allure.attach(
+                    policy.preview(response.content),
+                    name="Assertion Failure",
+                    attachment_type=allure.attachment_type.TEXT
+                )
+                # 在步骤内抛出，步骤标记为失败
+                raise failure
+
+        self._report_step(f"HTTP请求: {request_description}", report_response)
+        if failure is not None:
+            raise failure
+        if expected_status is not None:
+            log.success("状态码验证通过: {}", expected_status)
+        return response
+
+    def _report_step(self, title: str, body: Callable[[], None]):
+        """
+        记录一个 Allure 步骤，在 run() 中执行时暂存到 run() 结束后在调用线程上记录
+        ERROR 日志同样会生成 Allure 步骤，因此放在 body 中一起记录
+        """
+        steps = _pending_steps.get()
+        if steps is None:
+            self._attach_step(title, body)
+        else:
+            steps.append((title, body))
+
+    @staticmethod
+    def _attach_step(title: str, body: Callable[[], None]):
+        """执行 body 记录步骤内容，断言失败只标记步骤状态，由请求本身向调用方抛出"""
+        try:
+            with allure.step(title):
+                body()
+        except AssertionError:
+            pass
+
+    async def query(
+            self,
+            base_url: str,
+            db_name: str,
+            data: Union[str, bytes],
+            username: str = "root",
+            password: str = "",
+            timeout: int = 300,
+    ) -> AsyncHttpResponse:
+        """
+        从CnosDB查询数据
+        :param base_url: 基础URL
+        :param db_name: 数据库名称
+        :param data: 查询数据
+        :param username: 用户名
+        :param password: 密码
+        :param timeout: 超时时间
+        :return: 请求响应
+        """
+        return await self._make_request(
+            base_url=base_url,
+            endpoint=f"/api/v1/sql?db={db_name}",
+            data=data,
+            username=username,
+            password=password,
+            expected_status=200,
+            timeout=timeout
+        )
+
+    async def write(
+            self,
+            base_url: str,
+            db_name: str,
+            data: Union[str, bytes],
+            username: str = "root",
+            password: str = "",
+            precision: str = "ns"
+    ) -> AsyncHttpResponse:
+        """
+        写入数据到CnosDB
+        :param base_url: 基础URL
+        :param db_name: 数据库名称
+        :param data: 要写入的数据
+        :param username: 用户名
+        :param password: 密码
+        :param precision: 时间精度
+        :return: 请求响应
+        """
+        return await self._make_request(
+            base_url=base_url,
+            endpoint=f"/api/v1/write?db={db_name}&precision={precision}",
+            data=data,
+            username=username,
+            password=password,
+            expected_status=200
+        )
+
+    async def create_database(
+            self,
+            db_name: str,
+            ip: str = "127.0.0.1",
+            port: int = 8902,
+            username: str = "root",
+            password: str = "",
+            **options
+    ) -> AsyncHttpResponse:
+        """
+        创建CnosDB数据库，参数与 CnosDBHelper.create_database 一致
+        """
+        data = f"create database if not exists {db_name}"
+        if options:
+            options_str = " ".join(f"{k}={v}" for k, v in options.items())
+            data = f"{data} {options_str}"
+
+        return await self.query(
+            base_url=f"http://{ip}:{port}",
+            db_name="",
+            data=data,
+            username=username,
+            password=password,
+        )
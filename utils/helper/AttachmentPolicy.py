@@ -0,0 +1,105 @@
+import itertools
+import os
+import tempfile
+import threading
+from typing import Iterable, Mapping, Tuple
+
+
+class AttachmentPolicy:
+    """
+    HTTP 请求/响应附加到 Allure 的策略
+
+    模式:
+        full:       完整解析响应体并格式化后附加 (默认，与旧行为一致)
+        truncate:   不解析响应体，只附加前 max_bytes 字节
+        sample:     每 sample_every 个请求完整附加一次，其余只在失败时附加
+        on_failure: 只在请求失败或状态码断言失败时附加
+        file:       不解析响应体，原始字节分块写入文件后作为文件附件，流式请求边读取边写入，不在内存中保留响应体
+    """
+
+    FULL = "full"
+    TRUNCATE = "truncate"
+    SAMPLE = "sample"
+    ON_FAILURE = "on_failure"
+    FILE = "file"
+
+    MODES = (FULL, TRUNCATE, SAMPLE, ON_FAILURE, FILE)
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, mode: str = FULL, max_bytes: int = 64 * 1024, sample_every: int = 100):
+        """
+        :param mode: 附加模式，取值见 AttachmentPolicy.MODES
+        :param max_bytes: truncate 模式及失败信息中保留的最大字节数
+        :param sample_every: sample 模式的采样间隔
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}, got {mode!r}")
+        if sample_every < 1:
+            raise ValueError("sample_every must be >= 1")
+
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.sample_every = sample_every
+        self._counter = itertools.count()
+        self._counter_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AttachmentPolicy":
+        """从环境变量 HTTP_ATTACHMENT_MODE / HTTP_ATTACHMENT_MAX_BYTES / HTTP_ATTACHMENT_SAMPLE_EVERY 创建策略"""
+        return cls(
+            mode=os.getenv("HTTP_ATTACHMENT_MODE", cls.FULL),
+            max_bytes=int(os.getenv("HTTP_ATTACHMENT_MAX_BYTES", 64 * 1024)),
+            sample_every=int(os.getenv("HTTP_ATTACHMENT_SAMPLE_EVERY", 100))
+        )
+
+    def should_attach(self) -> bool:
+        """当前请求是否在正常路径上附加请求/响应详情"""
+        if self.mode == self.ON_FAILURE:
+            return False
+        if self.mode == self.SAMPLE:
+            with self._counter_lock:
+                return next(self._counter) % self.sample_every == 0
+        return True
+
+    def preview(self, content: bytes) -> str:
+        """截取前 max_bytes 字节用于附件或失败信息"""
+        if len(content) <= self.max_bytes:
+            return content.decode("utf-8", errors="replace")
+        return (
+            f"{content[:self.max_bytes].decode('utf-8', errors='replace')}"
+            f"\n... (已截断 {len(content) - self.max_bytes} 字节, 共 {len(content)} 字节)"
+        )
+
+    def write_file(self, content: bytes, suffix: str) -> str:
+        """把响应体分块写入临时文件，返回文件路径"""
+        view = memoryview(content)
+        path, _ = self.write_chunks((view[offset:offset + self.CHUNK_SIZE]
+                                     for offset in range(0, len(view), self.CHUNK_SIZE)), suffix)
+        return path
+
+    @staticmethod
+    def write_chunks(chunks: Iterable[bytes], suffix: str) -> Tuple[str, int]:
+        """把逐块产生的响应体依次写入临时文件，返回文件路径和总字节数"""
+        fd, path = tempfile.mkstemp(prefix="http-response-", suffix=suffix)
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, size
+
+    @staticmethod
+    def is_json(headers: Mapping[str, str]) -> bool:
+        """根据 Content-Type 判断响应体是否为 JSON"""
+        content_type = ""
+        for key, value in headers.items():
+            if key.lower() == "content-type":
+                content_type = value.lower()
+                break
+        media_type = content_type.split(";", 1)[0].strip()
+        return media_type == "application/json" or media_type.endswith("+json")
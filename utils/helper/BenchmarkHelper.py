@@ -0,0 +1,233 @@
+import json
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import allure
+import numpy as np
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.logger import log
+
+
+class BenchmarkReport:
+    """
+    基准测试结果集合
+    每个指标记录数值、单位和方向 (越大越好/越小越好)，可以保存为 JSON、附加到 Allure，
+    并与保存的基线比较
+
+    report = BenchmarkReport("cnosdb")
+    report.add("write.ns.batch_5000.points_per_sec", 120000, "points/s")
+    report.add("query.select_limit.p99", 0.012, "s", higher_is_better=False)
+    regressions = report.compare(BenchmarkReport.load_baseline("baseline.json"), threshold=0.2)
+    """
+
+    def __init__(self, name: str, metadata: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.metadata = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            **(metadata or {})
+        }
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, value: float, unit: str, higher_is_better: bool = True):
+        """记录一个指标，同名指标会被覆盖"""
+        self.metrics[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "metadata": self.metadata, "metrics": self.metrics}
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """把结果写入 JSON 文件，目录不存在时自动创建"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+        log.info(f"基准测试结果已保存: {path}")
+        return path
+
+    def attach(self):
+        """把结果附加到 Allure"""
+        allure.attach(
+            json.dumps(self.to_dict(), indent=2, ensure_ascii=False),
+            name=f"Benchmark: {self.name}",
+            attachment_type=allure.attachment_type.JSON
+        )
+
+    @staticmethod
+    def load_baseline(path: Optional[Union[str, Path]]) -> Optional[Dict[str, Any]]:
+        """读取基线文件，路径为空或文件不存在时返回 None"""
+        if not path or not Path(path).is_file():
+            return None
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+
+    def compare(self, baseline: Optional[Dict[str, Any]], threshold: float = 0.2) -> List[Dict[str, Any]]:
+        """
+        与基线比较，返回退化超过 threshold 的指标
+        :param baseline: load_baseline 的返回值或 to_dict 的结果
+        :param threshold: 允许的相对退化比例，0.2 表示吞吐量下降或延迟上升超过 20% 视为退化
+        :return: [{"metric", "baseline", "current", "change", "unit"}]，change 为相对变化，正数表示变差
+        """
+        if not baseline:
+            return []
+
+        regressions = []
+        comparison = []
+        for name, metric in self.metrics.items():
+            base = baseline.get("metrics", {}).get(name)
+            if base is None or not base["value"]:
+                continue
+            change = (metric["value"] - base["value"]) / base["value"]
+            if metric["higher_is_better"]:
+                change = -change
+            entry = {
+                "metric": name,
+                "baseline": base["value"],
+                "current": metric["value"],
+                "change": round(change, 4),
+                "unit": metric["unit"]
+            }
+            comparison.append(entry)
+            if change > threshold:
+                regressions.append(entry)
+
+        allure.attach(
+            json.dumps({"threshold": threshold, "comparison": comparison, "regressions": regressions},
+                       indent=2, ensure_ascii=False),
+            name=f"Baseline Comparison ({len(regressions)} regressions)",
+            attachment_type=allure.attachment_type.JSON
+        )
+        for entry in regressions:
+            log.warning(
+                f"性能退化: {entry['metric']} 基线 {entry['baseline']} {entry['unit']}, "
+                f"当前 {entry['current']} {entry['unit']} (变差 {entry['change']:.1%})"
+            )
+        return regressions
+
+
+class BenchmarkHelper:
+    """
+    基于 CnosDBHelper 的写入吞吐量和查询延迟测量工具
+
+    环境变量:
+        BENCHMARK_RESULTS_DIR: 结果 JSON 的输出目录，默认 benchmark-results
+        BENCHMARK_BASELINE: 基线 JSON 路径，未设置或文件不存在时跳过比较
+        BENCHMARK_REGRESSION_THRESHOLD: 允许的相对退化比例，默认 0.2
+        BENCHMARK_UPDATE_BASELINE: 为 1 时把本次结果写入 BENCHMARK_BASELINE
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    @staticmethod
+    def percentiles(samples: Sequence[float], percentiles: Iterable[int] = PERCENTILES) -> Dict[str, float]:
+        """计算样本的百分位数，返回 {"p50": ..., "p95": ..., "p99": ...}"""
+        if not len(samples):
+            raise ValueError("samples must not be empty")
+        values = np.percentile(np.asarray(samples, dtype=np.float64), list(percentiles))
+        return {f"p{p}": float(v) for p, v in zip(percentiles, values)}
+
+    @staticmethod
+    def measure_write(
+            base_url: str,
+            db_name: str,
+            blocks: Sequence[bytes],
+            username: str = "root",
+            password: str = "",
+            precision: str = "ns",
+            batch_lines: int = 10000,
+            max_in_flight: int = 1,
+            compress: bool = False
+    ) -> Dict[str, Any]:
+        """
+        测量写入吞吐量，数据应预先编码好，编码耗时不计入结果
+        :param blocks: Line Protocol 数据块，例如 LineProtocolEncoder.iter_encode 的输出
+        :param batch_lines: 单批次行数
+        :param max_in_flight: 最大在途批次数，1 表示顺序写入
+        :return: {"points", "bytes", "batches", "seconds", "points_per_sec", "mb_per_sec", "batch_latency"}
+        """
+        start = time.perf_counter()
+        stats = CnosDBHelper.bulk_write(
+            base_url=base_url,
+            db_name=db_name,
+            lines=blocks,
+            username=username,
+            password=password,
+            precision=precision,
+            batch_bytes=2 ** 62,
+            batch_lines=batch_lines,
+            compress=compress,
+            max_in_flight=max_in_flight
+        )
+        seconds = time.perf_counter() - start
+        points = sum(s["points"] for s in stats)
+        size = sum(s["bytes"] for s in stats)
+        return {
+            "points": points,
+            "bytes": size,
+            "batches": len(stats),
+            "seconds": seconds,
+            "points_per_sec": points / seconds,
+            "mb_per_sec": size / seconds / 1024 / 1024,
+            "batch_latency": BenchmarkHelper.percentiles([s["latency"] for s in stats])
+        }
+
+    @staticmethod
+    def measure_query(
+            base_url: str,
+            db_name: str,
+            sql: str,
+            username: str = "root",
+            password: str = "",
+            iterations: int = 50,
+            warmup: int = 5
+    ) -> Dict[str, Any]:
+        """
+        重复执行查询并统计延迟，预热请求不计入结果
+        :return: {"iterations", "mean", "min", "max", "p50", "p95", "p99"}，单位为秒
+        """
+        for _ in range(warmup):
+            CnosDBHelper.query_from_cnosdb(base_url, db_name, sql, username, password)
+
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = CnosDBHelper.query_from_cnosdb(base_url, db_name, sql, username, password)
+            _ = response.content
+            latencies.append(time.perf_counter() - start)
+
+        return {
+            "iterations": iterations,
+            "mean": float(np.mean(latencies)),
+            "min": float(np.min(latencies)),
+            "max": float(np.max(latencies)),
+            **BenchmarkHelper.percentiles(latencies)
+        }
+
+    @staticmethod
+    def finish(report: BenchmarkReport, results_dir: Optional[str] = None,
+               baseline_path: Optional[str] = None, threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        保存结果、附加到 Allure 并与基线比较，参数为 None 时从环境变量读取
+        :return: 退化的指标列表
+        """
+        results_dir = results_dir or os.getenv("BENCHMARK_RESULTS_DIR", "benchmark-results")
+        baseline_path = baseline_path or os.getenv("BENCHMARK_BASELINE")
+        if threshold is None:
+            threshold = float(os.getenv("BENCHMARK_REGRESSION_THRESHOLD", "0.2"))
+
+        report.save(Path(results_dir) / f"{report.name}.json")
+        report.attach()
+
+        baseline = BenchmarkReport.load_baseline(baseline_path)
+        if baseline is None:
+            log.info(f"未找到基线文件 ({baseline_path})，跳过基线比较")
+            regressions = []
+        else:
+            regressions = report.compare(baseline, threshold)
+
+        if baseline_path and os.getenv("BENCHMARK_UPDATE_BASELINE") == "1":
+            report.save(baseline_path)
+        return regressions
@@ -0,0 +1,348 @@
+import itertools
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import allure
+import pandas as pd
+import requests
+
+from utils.helper.CnosDBHelper import CnosDBHelper, Point
+from utils.helper.MetadataCache import metadata_cache
+from utils.logger import log
+
+
+class Endpoint:
+    """集群中一个 CnosDB 节点的路由状态和请求统计"""
+
+    def __init__(self, name: str, base_url: str):
+        self.name = name
+        self.base_url = base_url
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.latency = 0.0
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "endpoint": self.name,
+            "base_url": self.base_url,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            "ejected": not self.available(now),
+            "outstanding": self.outstanding,
+            "mean_latency": self.latency / self.requests if self.requests else 0.0,
+        }
+
+
+class CnosDBClusterClient:
+    """
+    面向多个 CnosDB 节点的客户端，在节点之间分发请求
+
+    client = CnosDBClusterClient.from_kubernetes(k8s)
+    client.query("db4", "SELECT count(*) FROM air")
+    client.write("db4", "air,station=XiaoMaiDao visibility=50 1642176000000000000")
+    log.info(client.summary())
+
+    路由策略:
+        round_robin: 轮询可用节点
+        least_outstanding: 选择在途请求最少的可用节点，数量相同时轮询
+    被动健康检查: 连接失败、超时或 502/503/504 计为一次失败，连续失败 max_failures 次的节点
+    摘除 ejection_time 秒，期间不参与路由；所有节点都被摘除时退回使用全部节点。
+    幂等请求 (SELECT/SHOW/DESCRIBE/EXPLAIN) 失败时换一个节点重试，最多 max_retries 次；
+    写入和 DDL 默认不重试，避免重复执行。
+    """
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_OUTSTANDING = "least_outstanding"
+    STRATEGIES = (ROUND_ROBIN, LEAST_OUTSTANDING)
+
+    LABEL_SELECTOR = "cnosdb.com/role=query_tskv"
+    PORT = 8902
+    IDEMPOTENT = re.compile(r"^\s*(SELECT|SHOW|DESCRIBE|DESC|EXPLAIN|WITH)\b", re.IGNORECASE)
+    RETRY_STATUS = (502, 503, 504)
+
+    def __init__(
+            self,
+            endpoints: Sequence[Union[str, Dict[str, str]]],
+            strategy: str = ROUND_ROBIN,
+            username: str = "root",
+            password: str = "",
+            max_failures: int = 3,
+            ejection_time: float = 30,
+            max_retries: int = 2
+    ):
+        """
+        :param endpoints: 节点地址列表，元素为 base_url 或 {"name": ..., "base_url": ...}
+        :param strategy: 路由策略 round_robin / least_outstanding
+        :param username: 用户名
+        :param password: 密码
+        :param max_failures: 连续失败多少次后摘除节点
+        :param ejection_time: 节点摘除时长(秒)
+        :param max_retries: 幂等请求换节点重试的最大次数
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"strategy must be one of {self.STRATEGIES}, got {strategy!r}")
+        self.strategy = strategy
+        self.username = username
+        self.password = password
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+        self.max_retries = max_retries
+        self.retries = 0
+
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._endpoints: List[Endpoint] = []
+        self._k8s = None
+        self._label_selector = None
+        self._port = self.PORT
+        self.set_endpoints(endpoints)
+
+    @classmethod
+    def from_pods(cls, pods: Iterable[Dict[str, Any]], port: int = PORT, **kwargs) -> "CnosDBClusterClient":
+        """由 KubernetesHelper.list_pods 返回的 Pod 信息创建，跳过还没有分配 IP 的 Pod"""
+        return cls(cls._pod_endpoints(pods, port), **kwargs)
+
+    @classmethod
+    def from_kubernetes(cls, k8s, label_selector: str = LABEL_SELECTOR, port: int = PORT,
+                        **kwargs) -> "CnosDBClusterClient":
+        """按 label_selector 查询 Pod 创建，之后可以调用 refresh 重新发现节点"""
+        client = cls.from_pods(k8s.list_pods(label_selector=label_selector), port=port, **kwargs)
+        client._k8s = k8s
+        client._label_selector = label_selector
+        client._port = port
+        return client
+
+    # ------------------------- 节点 -------------------------
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        with self._lock:
+            return list(self._endpoints)
+
+    def set_endpoints(self, endpoints: Sequence[Union[str, Dict[str, str]]]):
+        """替换节点列表，地址不变的节点保留其统计和摘除状态"""
+        normalized = []
+        for endpoint in endpoints:
+            if isinstance(endpoint, str):
+                endpoint = {"name": endpoint, "base_url": endpoint}
+            normalized.append((endpoint["name"], endpoint["base_url"].rstrip("/")))
+        if not normalized:
+            raise ValueError("at least one endpoint is required")
+
+        with self._lock:
+            existing = {endpoint.base_url: endpoint for endpoint in self._endpoints}
+            self._endpoints = []
+            for name, base_url in normalized:
+                endpoint = existing.get(base_url) or Endpoint(name, base_url)
+                endpoint.name = name
+                self._endpoints.append(endpoint)
+        log.info(f"CnosDB 集群节点: {[endpoint.name for endpoint in self._endpoints]}")
+
+    def refresh(self):
+        """重新查询 Pod，Pod 重建后 IP 变化时更新节点列表，只对 from_kubernetes 创建的客户端有效"""
+        if self._k8s is None:
+            raise RuntimeError("refresh requires a client created by from_kubernetes")
+        pods = self._k8s.list_pods(label_selector=self._label_selector)
+        self.set_endpoints(self._pod_endpoints(pods, self._port))
+
+    # ------------------------- 请求 -------------------------
+    def query(
+            self,
+            db_name: str,
+            data: Union[str, bytes],
+            timeout: int = 300,
+            expected_status: Optional[int] = 200,
+            idempotent: Optional[bool] = None,
+            use_cache: bool = True
+    ) -> requests.Response:
+        """
+        执行 SQL，参数与 CnosDBHelper.query_from_cnosdb 一致
+        :param idempotent: 是否允许换节点重试，None 表示按语句类型判断
+        :param use_cache: 是否允许使用元数据缓存，缓存按集群而不是单个节点区分
+        """
+        cache_key = None
+        if use_cache and metadata_cache.cacheable(data):
+            cache_key = metadata_cache.key(self._cache_url(), db_name, data, self.username)
+            cached = metadata_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if idempotent is None:
+            statement = data.decode("utf-8", errors="replace") if isinstance(data, bytes) else data
+            idempotent = self.IDEMPOTENT.match(statement) is not None
+        response = self._send(f"/api/v1/sql?db={db_name}", data, idempotent, expected_status, timeout)
+        if cache_key is not None and response.status_code == 200:
+            metadata_cache.put(cache_key, response)
+        return response
+
+    def write(
+            self,
+            db_name: str,
+            data: Union[str, bytes],
+            precision: str = "ns",
+            expected_status: Optional[int] = 200,
+            timeout: int = 60,
+            idempotent: bool = False
+    ) -> requests.Response:
+        """
+        写入 Line Protocol，参数与 CnosDBHelper.write_to_cnosdb 一致
+        :param idempotent: 数据都带时间戳时重复写入结果相同，可以设为 True 允许换节点重试
+        """
+        try:
+            return self._send(f"/api/v1/write?db={db_name}&precision={precision}", data, idempotent,
+                              expected_status, timeout)
+        finally:
+            # 写入可能自动创建表和字段
+            metadata_cache.invalidate(db_name)
+
+    def bulk_write(self, db_name: str, lines: Iterable[Union[str, bytes, Point]],
+                   **kwargs) -> List[Dict[str, Any]]:
+        """通过 CnosDBHelper.bulk_write 流式写入，整个批量写入发送到一个节点"""
+        endpoint = self._acquire(set())
+        start = time.perf_counter()
+        try:
+            stats = CnosDBHelper.bulk_write(endpoint.base_url, db_name, lines, username=self.username,
+                                            password=self.password, **kwargs)
+        except (requests.RequestException, RuntimeError):
+            # RuntimeError 表示批次重试次数用尽
+            self._release(endpoint, start, success=False)
+            raise
+        except BaseException:
+            self._release(endpoint, start, success=None)
+            raise
+        self._release(endpoint, start, success=True)
+        return stats
+
+    # ------------------------- 统计 -------------------------
+    def stats(self) -> pd.DataFrame:
+        """每个节点的请求数、失败数、摘除次数、在途请求数和平均延迟，share 为请求占比"""
+        now = time.monotonic()
+        with self._lock:
+            rows = [endpoint.to_dict(now) for endpoint in self._endpoints]
+        frame = pd.DataFrame(rows)
+        total = frame["requests"].sum()
+        frame["share"] = frame["requests"] / total if total else 0.0
+        return frame
+
+    def summary(self) -> str:
+        frame = self.stats()
+        lines = [f"CnosDB 集群请求分布 ({self.strategy}): 共 {frame['requests'].sum()} 次, "
+                 f"失败 {frame['failures'].sum()} 次, 重试 {self.retries} 次"]
+        for row in frame.itertuples():
+            lines.append(f"  {row.endpoint}: {row.requests} 次 ({row.share:.1%}), 失败 {row.failures}, "
+                         f"摘除 {row.ejections} 次{' (已摘除)' if row.ejected else ''}, "
+                         f"平均延迟 {row.mean_latency * 1000:.1f}ms")
+        return "\n".join(lines)
+
+    def attach(self, name: str = "CnosDB Cluster Requests"):
+        """把请求分布作为 Allure 附件保存"""
+        allure.attach(self.stats().to_csv(index=False), name=name, attachment_type=allure.attachment_type.CSV)
+
+    # ------------------------- 内部方法 -------------------------
+    def _send(self, endpoint_path: str, data: Union[str, bytes], idempotent: bool,
+              expected_status: Optional[int], timeout: int) -> requests.Response:
+        attempts = 1 + (self.max_retries if idempotent else 0)
+        tried = set()
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            endpoint = self._acquire(tried)
+            tried.add(endpoint.base_url)
+            start = time.perf_counter()
+            try:
+                response = CnosDBHelper._make_request(
+                    base_url=endpoint.base_url,
+                    endpoint=endpoint_path,
+                    data=data,
+                    username=self.username,
+                    password=self.password,
+                    expected_status=None,
+                    timeout=timeout,
+                    # 换节点重试由这里负责，连接池不再重试，第一次连接失败即计入故障
+                    pool_retries=False
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._release(endpoint, start, success=False)
+                if last_attempt:
+                    raise
+                log.warning(f"节点 {endpoint.name} 请求失败, 换节点重试: {e}")
+                self._count_retry()
+                continue
+            except requests.RequestException:
+                self._release(endpoint, start, success=False)
+                raise
+            except BaseException:
+                self._release(endpoint, start, success=None)
+                raise
+
+            failed = response.status_code in self.RETRY_STATUS
+            self._release(endpoint, start, success=not failed)
+            if failed and not last_attempt:
+                log.warning(f"节点 {endpoint.name} 返回 {response.status_code}, 换节点重试")
+                self._count_retry()
+                continue
+
+            if expected_status is not None:
+                assert response.status_code == expected_status, (
+                    f"预期状态码 {expected_status}, 实际得到 {response.status_code} (节点 {endpoint.name})\n"
+                    f"响应内容: {response.text[:1024]}"
+                )
+            return response
+
+    def _acquire(self, tried: set) -> Endpoint:
+        """选择一个节点并增加其在途请求数，优先选择没有尝试过的可用节点"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self._endpoints if e.available(now) and e.base_url not in tried]
+            if not candidates:
+                candidates = [e for e in self._endpoints if e.available(now)]
+            if not candidates:
+                # 全部节点被摘除时不拒绝请求，按摘除结束时间最早的顺序尝试
+                candidates = sorted(self._endpoints, key=lambda e: e.ejected_until)[:1]
+
+            offset = next(self._counter)
+            rotated = candidates[offset % len(candidates):] + candidates[:offset % len(candidates)]
+            if self.strategy == self.LEAST_OUTSTANDING:
+                endpoint = min(rotated, key=lambda e: e.outstanding)
+            else:
+                endpoint = rotated[0]
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _release(self, endpoint: Endpoint, start: float, success: Optional[bool]):
+        """请求结束，success 为 None 表示与节点健康无关的错误，不计入健康检查"""
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.latency += time.perf_counter() - start
+            if success is None:
+                return
+            if success:
+                endpoint.consecutive_failures = 0
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.max_failures and endpoint.available(time.monotonic()):
+                endpoint.ejected_until = time.monotonic() + self.ejection_time
+                endpoint.ejections += 1
+                endpoint.consecutive_failures = 0
+                log.warning(f"节点 {endpoint.name} 连续失败 {self.max_failures} 次, 摘除 {self.ejection_time}s")
+
+    def _count_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def _cache_url(self) -> str:
+        return "cluster:" + ",".join(sorted(endpoint.base_url for endpoint in self.endpoints))
+
+    @staticmethod
+    def _pod_endpoints(pods: Iterable[Dict[str, Any]], port: int) -> List[Dict[str, str]]:
+        return [{"name": pod["name"], "base_url": f"http://{pod['ip']}:{port}"} for pod in pods if pod.get("ip")]
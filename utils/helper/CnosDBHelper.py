@@ -1,7 +1,17 @@
-from typing import  Union
+import gzip
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, Iterable, Dict, Any, List, Iterator, Tuple
 import requests
 
 from utils.helper.HttpRequestHelper import HttpRequestHelper
+from utils.helper.LineProtocolEncoder import LineProtocolEncoder
+from utils.helper.MetadataCache import metadata_cache
+from utils.helper.QueryResultStream import QueryResultStream
+from utils.logger import log
+
+Point = Dict[str, Any]
 
 
 class CnosDBHelper:
@@ -13,6 +23,7 @@ class CnosDBHelper:
             username: str = "root",
             password: str = "",
             expected_status: int = 200,
+            accept: str = "application/json",
             **kwargs
     ) -> requests.Response:
         """
@@ -21,19 +32,38 @@ class CnosDBHelper:
         if not isinstance(data, (str, bytes)):
             raise TypeError("data must be str or bytes")
 
-        return HttpRequestHelper.send_http_request(
-            method="POST",
-            base_url=base_url,
-            endpoint=endpoint,
-            auth=(username, password),
-            headers={
-                "Accept": "application/json",
-                "Content-Type": "text/plain"
-            },
-            data=data if isinstance(data, bytes) else data.encode('utf-8'),
-            expected_status=expected_status,
-            **kwargs
-        )
+        try:
+            return HttpRequestHelper.send_http_request(
+                method="POST",
+                base_url=base_url,
+                endpoint=endpoint,
+                auth=(username, password),
+                headers={
+                    "Accept": accept,
+                    "Content-Type": "text/plain"
+                },
+                data=data if isinstance(data, bytes) else data.encode('utf-8'),
+                expected_status=expected_status,
+                **kwargs
+            )
+        finally:
+            # DDL 无论是否成功都可能改变元数据，清空元数据缓存
+            if endpoint.startswith("/api/v1/sql"):
+                metadata_cache.on_statement(data)
+
+    @staticmethod
+    def enable_metadata_cache(ttl: float = 30, maxsize: int = 256):
+        """
+        开启只读元数据查询 (SHOW / DESCRIBE / information_schema) 的结果缓存
+        :param ttl: 缓存有效期(秒)
+        :param maxsize: 最多缓存的查询数
+        """
+        metadata_cache.enable(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def disable_metadata_cache():
+        """关闭并清空元数据缓存"""
+        metadata_cache.disable()
 
     @staticmethod
     def query_from_cnosdb(
@@ -43,19 +73,30 @@ class CnosDBHelper:
             username: str = "root",
             password: str = "",
             timeout: int = 300,
+            use_cache: bool = True,
     ) -> requests.Response:
         """
         从CnosDB查询数据
+        元数据缓存开启时，只读元数据语句的结果从缓存返回，见 enable_metadata_cache
         :param base_url: 基础URL
         :param db_name: 数据库名称
         :param data: 查询数据
         :param username: 用户名
         :param password: 密码
         :param timeout: 超时时间
+        :param use_cache: 是否允许使用元数据缓存
         :return: 请求响应
         """
+        cache_key = None
+        if use_cache and metadata_cache.cacheable(data):
+            cache_key = metadata_cache.key(base_url, db_name, data, username)
+            cached = metadata_cache.get(cache_key)
+            if cached is not None:
+                log.debug("元数据缓存命中: {} {}", db_name, cache_key[-1])
+                return cached
+
         endpoint = f"/api/v1/sql?db={db_name}"
-        return CnosDBHelper._make_request(
+        response = CnosDBHelper._make_request(
             base_url=base_url,
             endpoint=endpoint,
             data=data,
@@ -64,6 +105,47 @@ class CnosDBHelper:
             expected_status=200,
             timeout=timeout
         )
+        if cache_key is not None and response.status_code == 200:
+            metadata_cache.put(cache_key, response)
+        return response
+
+    @staticmethod
+    def query_stream(
+            base_url: str,
+            db_name: str,
+            data: Union[str, bytes],
+            username: str = "root",
+            password: str = "",
+            timeout: int = 300,
+            fmt: str = "csv"
+    ) -> QueryResultStream:
+        """
+        从CnosDB流式查询数据，响应体不会一次性读入内存
+        :param base_url: 基础URL
+        :param db_name: 数据库名称
+        :param data: 查询数据
+        :param username: 用户名
+        :param password: 密码
+        :param timeout: 超时时间
+        :param fmt: 响应格式，csv (默认，列式解码最快) 或 ndjson
+        :return: 流式查询结果，使用完毕后需要 close 或在 with 语句中使用
+        """
+        if fmt not in QueryResultStream.FORMATS:
+            raise ValueError(f"fmt must be one of {tuple(QueryResultStream.FORMATS)}, got {fmt!r}")
+
+        started_at = time.perf_counter()
+        response = CnosDBHelper._make_request(
+            base_url=base_url,
+            endpoint=f"/api/v1/sql?db={db_name}",
+            data=data,
+            username=username,
+            password=password,
+            expected_status=200,
+            accept=QueryResultStream.FORMATS[fmt],
+            timeout=timeout,
+            stream=True
+        )
+        return QueryResultStream(response, fmt=fmt, started_at=started_at)
 
     @staticmethod
     def write_to_cnosdb(
@@ -85,14 +167,18 @@ class CnosDBHelper:
         :return: 请求响应
         """
         endpoint = f"/api/v1/write?db={db_name}&precision={precision}"
-        return CnosDBHelper._make_request(
-            base_url=base_url,
-            endpoint=endpoint,
-            data=data,
-            username=username,
-            password=password,
-            expected_status=200
-        )
+        try:
+            return CnosDBHelper._make_request(
+                base_url=base_url,
+                endpoint=endpoint,
+                data=data,
+                username=username,
+                password=password,
+                expected_status=200
+            )
+        finally:
+            # 写入可能自动创建表和字段
+            metadata_cache.invalidate(db_name)
 
     @staticmethod
     def create_database(
@@ -143,4 +229,185 @@ class CnosDBHelper:
             password=password,
         )
 
+    @staticmethod
+    def bulk_write(
+            base_url: str,
+            db_name: str,
+            lines: Iterable[Union[str, bytes, Point]],
+            username: str = "root",
+            password: str = "",
+            precision: str = "ns",
+            batch_bytes: int = 1024 * 1024,
+            batch_lines: int = 10000,
+            compress: bool = False,
+            max_in_flight: int = 4,
+            max_retries: int = 3,
+            retry_backoff: float = 0.5,
+            timeout: int = 60
+    ) -> List[Dict[str, Any]]:
+        """
+        流式批量写入数据到CnosDB
+        按字节数和行数切分批次，最多同时发送 max_in_flight 个批次，
+        在途批次已满时暂停读取输入，内存占用与数据总量无关
+        :param base_url: 基础URL
+        :param db_name: 数据库名称
+        :param lines: Line Protocol 行 (str/bytes) 或数据点字典的迭代器，例如:
+               {"measurement": "air", "tags": {"station": "XiaoMaiDao"},
+                "fields": {"visibility": 50}, "time": 1642176000000000000}
+        :param username: 用户名
+        :param password: 密码
+        :param precision: 时间精度
+        :param batch_bytes: 单批次最大字节数 (压缩前)
+        :param batch_lines: 单批次最大行数
+        :param compress: 是否使用 gzip 压缩请求体
+        :param max_in_flight: 最大在途批次数
+        :param max_retries: 单批次失败 (连接错误或 5xx) 后的最大重试次数，连接池不再额外重试
+        :param retry_backoff: 重试退避因子(秒)
+        :param timeout: 单批次请求超时时间
+        :return: 按批次顺序排列的统计信息列表，每项包含
+                 batch/points/bytes/wire_bytes/latency(含重试)/retries
+        """
+        endpoint = f"/api/v1/write?db={db_name}&precision={precision}"
+        headers = {
+            "Accept": "application/json",
+            "Content-Type": "text/plain"
+        }
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+
+        def send_batch(index: int, body: bytes, points: int) -> Dict[str, Any]:
+            payload = gzip.compress(body, compresslevel=1) if compress else body
+            retries = 0
+            start = time.perf_counter()
+            while True:
+                try:
+                    response = HttpRequestHelper.send_http_request(
+                        method="POST",
+                        base_url=base_url,
+                        endpoint=endpoint,
+                        auth=(username, password),
+                        headers=headers,
+                        data=payload,
+                        timeout=timeout,
+                        pool_retries=False
+                    )
+                    if response.status_code < 500:
+                        break
+                    error = f"HTTP {response.status_code}: {response.text}"
+                except requests.RequestException as e:
+                    error = str(e)
+                if retries >= max_retries:
+                    raise RuntimeError(f"批次 {index} 写入失败 (重试 {retries} 次): {error}")
+                retries += 1
+                time.sleep(retry_backoff * 2 ** (retries - 1))
+
+            assert response.status_code == 200, (
+                f"批次 {index} 预期状态码 200, 实际得到 {response.status_code}\n"
+                f"响应内容: {response.text}"
+            )
+            return {
+                "batch": index,
+                "points": points,
+                "bytes": len(body),
+                "wire_bytes": len(payload),
+                "latency": time.perf_counter() - start,
+                "retries": retries
+            }
+
+        stats: List[Dict[str, Any]] = []
+        in_flight = threading.BoundedSemaphore(max_in_flight)
+        futures = []
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            try:
+                for index, (body, points) in enumerate(
+                        CnosDBHelper._iter_batches(lines, batch_bytes, batch_lines)):
+                    # 在途批次已满时阻塞，形成背压
+                    in_flight.acquire()
+                    future = executor.submit(send_batch, index, body, points)
+                    future.add_done_callback(lambda _: in_flight.release())
+                    futures.append(future)
+
+                    # 及时回收已完成的批次，避免持有请求体
+                    while futures and futures[0].done():
+                        stats.append(futures.pop(0).result())
+                for future in futures:
+                    stats.append(future.result())
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                # 写入可能自动创建表和字段
+                metadata_cache.invalidate(db_name)
+
+        total_points = sum(s["points"] for s in stats)
+        total_seconds = sum(s["latency"] for s in stats)
+        log.info(
+            f"批量写入完成: {db_name} {len(stats)} 批次, {total_points} 点, "
+            f"{sum(s['bytes'] for s in stats)} 字节, 重试 {sum(s['retries'] for s in stats)} 次, "
+            f"累计耗时 {total_seconds:.3f}s"
+        )
+        return stats
+
+    @staticmethod
+    def _iter_batches(
+            lines: Iterable[Union[str, bytes, Point]],
+            batch_bytes: int,
+            batch_lines: int
+    ) -> Iterator[Tuple[bytes, int]]:
+        """把输入按字节数和行数切分为批次，产出 (请求体, 行数)
+        输入项可以是多行的数据块 (如 LineProtocolEncoder.iter_encode 的输出)，
+        超过 batch_bytes 的单个数据块独立成为一个批次"""
+        buffer: List[bytes] = []
+        size = 0
+        count = 0
+        for line in lines:
+            if isinstance(line, dict):
+                line = CnosDBHelper._format_point(line)
+            if isinstance(line, str):
+                line = line.encode("utf-8")
+            line = line.strip(b"\n")
+            if not line:
+                continue
+            line_count = line.count(b"\n") + 1
+
+            if buffer and (size + len(line) + 1 > batch_bytes or count + line_count > batch_lines):
+                yield b"\n".join(buffer), count
+                buffer = []
+                size = 0
+                count = 0
+            buffer.append(line)
+            size += len(line) + 1
+            count += line_count
+
+        if buffer:
+            yield b"\n".join(buffer), count
+
+    @staticmethod
+    def _format_point(point: Point) -> str:
+        """把数据点字典格式化为一行 Line Protocol"""
+
+        def format_field(value: Any) -> str:
+            if isinstance(value, bool):
+                return "true" if value else "false"
+            if isinstance(value, int):
+                return f"{value}i"
+            if isinstance(value, float):
+                return repr(value)
+            return LineProtocolEncoder.escape_string_field(value)
 
+        escape_key = LineProtocolEncoder.escape_key
+        measurement = LineProtocolEncoder.escape_measurement(point["measurement"])
+        tags = "".join(
+            f",{escape_key(k)}={escape_key(v)}"
+            for k, v in sorted((point.get("tags") or {}).items())
+            if v is not None and v != ""
+        )
+        fields = ",".join(
+            f"{escape_key(k)}={format_field(v)}"
+            for k, v in point["fields"].items()
+            if v is not None
+        )
+        timestamp = point.get("time")
+        line = f"{measurement}{tags} {fields}"
+        return line if timestamp is None else f"{line} {int(timestamp)}"
@@ -0,0 +1,237 @@
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import allure
+import numpy as np
+import pandas as pd
+
+from utils.helper.BenchmarkHelper import BenchmarkReport
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.FaultInjectionRunner import Fault, FaultInjectionRunner
+from utils.helper.StorageProbe import StorageProbe, StorageSnapshot
+from utils.helper.WaitHelper import WaitHelper
+from utils.logger import log
+
+
+class ScaleStep:
+    """
+    一次扩缩容及其测量结果，时间为从发出扩缩容请求开始的秒数
+
+    ready_time: 副本数达到目标且全部 Ready (缩容时多余的 Pod 已删除)
+    pod_ready_times: 新增 Pod 各自第一次 Ready 的时间
+    traffic_time: 新增 Pod 上出现该数据库的 vnode 数据，即开始承接写入；缩容或超时时为 None
+    """
+
+    def __init__(self, from_replicas: int, to_replicas: int):
+        self.from_replicas = from_replicas
+        self.to_replicas = to_replicas
+        self.ready_time: Optional[float] = None
+        self.pod_ready_times: Dict[str, float] = {}
+        self.traffic_time: Optional[float] = None
+        self.new_pods: List[str] = []
+        self.removed_pods: List[str] = []
+        self.snapshot: Optional[StorageSnapshot] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.from_replicas}_to_{self.to_replicas}"
+
+
+class ElasticityBenchmark:
+    """
+    在持续的写入和查询负载下依次把 Deployment 或 StatefulSet 扩缩到 steps 中的副本数，测量:
+    全部 Pod Ready 的时间 (watch 检测)、新节点开始承接写入的时间、扩缩容期间的吞吐下降与恢复，
+    以及每一步之后该数据库 vnode 数据在各节点上的分布
+
+    bench = ElasticityBenchmark(k8s, "cnosdb-query-tskv", base_url="http://cnosdb:8902", steps=[4, 3])
+    report = bench.run()
+    BenchmarkHelper.finish(report)
+
+    负载和每一步之后的间隔由 FaultInjectionRunner 执行，每个扩缩容步骤是其中一个阻塞的注入动作。
+    CnosDB 只在创建新的 vnode 时把数据放到新节点上，默认使用较短的 VNODE_DURATION，
+    负载写入的数据时间跨度推进很快，会持续创建新的 vnode。结束时副本数恢复为初始值。
+    """
+
+    def __init__(self, k8s, name: str, base_url: str, kind: str = "statefulset",
+                 steps: Optional[Sequence[int]] = None, db_name: str = "elasticity",
+                 database_options: str = "WITH SHARD 4 VNODE_DURATION '1h'", warmup: float = 10,
+                 settle: float = 30, ready_timeout: float = 600, traffic_timeout: float = 120,
+                 writers: int = 4, readers: int = 1, probe: Optional[StorageProbe] = None,
+                 username: str = "root", password: str = ""):
+        """
+        :param k8s: KubernetesHelper
+        :param name: Deployment 或 StatefulSet 名称
+        :param base_url: 负载使用的 CnosDB 地址，应指向不会被缩容的节点或 Service
+        :param kind: deployment 或 statefulset
+        :param steps: 依次扩缩到的副本数，默认先加一个副本再恢复
+        :param db_name: 负载写入的数据库，运行前创建、结束后删除
+        :param database_options: 创建数据库的 WITH 子句
+        :param warmup: 第一次扩缩容前的负载时间(秒)，作为吞吐基准
+        :param settle: 每一步完成后继续观察的时间(秒)
+        :param ready_timeout: 等待 Pod 全部 Ready 的超时时间(秒)
+        :param traffic_timeout: 等待新节点承接写入的超时时间(秒)，超时只记录，不视为失败
+        :param writers: 写入线程数
+        :param readers: 查询线程数
+        :param probe: 采集 vnode 分布的 StorageProbe，默认按工作负载的选择器创建
+        """
+        self.k8s = k8s
+        self.name = name
+        self.kind = kind
+        self.base_url = base_url
+        self.targets = list(steps) if steps is not None else None
+        self.db_name = db_name
+        self.database_options = database_options
+        self.warmup = warmup
+        self.settle = settle
+        self.ready_timeout = ready_timeout
+        self.traffic_timeout = traffic_timeout
+        self.username = username
+        self.password = password
+        self.probe = probe
+        self.runner = FaultInjectionRunner(base_url, db_name, writers=writers, readers=readers,
+                                           username=username, password=password)
+        self.steps: List[ScaleStep] = []
+        self.selector: Optional[str] = None
+        self.initial_replicas: Optional[int] = None
+
+    # ------------------------- 执行 -------------------------
+    def run(self) -> BenchmarkReport:
+        """执行全部扩缩容步骤并返回 BenchmarkReport，调用方用 BenchmarkHelper.finish 保存并与基线比较"""
+        workload = self.k8s.get_workload(self.kind, self.name)
+        if workload is None:
+            raise ValueError(f"{self.kind} {self.name} not found")
+        self.selector = workload["selector"]
+        self.initial_replicas = workload["replicas"]
+        self.probe = self.probe or StorageProbe(self.k8s, label_selector=self.selector)
+        targets = self.targets or [self.initial_replicas + 1, self.initial_replicas]
+
+        self.steps = []
+        self.runner.faults = []
+        current = self.initial_replicas
+        for index, target in enumerate(targets):
+            step = ScaleStep(current, target)
+            self.steps.append(step)
+            self.runner.add_fault(Fault(f"scale {self.name} {step.from_replicas} -> {step.to_replicas}",
+                                        at=self.warmup + index * self.settle,
+                                        inject=lambda step=step: self._scale(step)))
+            current = target
+
+        with allure.step(f"Elasticity: {self.kind} {self.name} {self.initial_replicas} -> "
+                         f"{' -> '.join(map(str, targets))}"):
+            self._query(f"DROP DATABASE IF EXISTS {self.db_name}")
+            self._query(f"CREATE DATABASE {self.db_name} {self.database_options}")
+            try:
+                self.runner.run(duration=self.warmup + len(targets) * self.settle)
+            finally:
+                if current != self.initial_replicas:
+                    log.info(f"恢复 {self.kind} {self.name} 副本数为 {self.initial_replicas}")
+                    self._scale(ScaleStep(current, self.initial_replicas))
+                self._query(f"DROP DATABASE IF EXISTS {self.db_name}")
+            self.attach()
+            log.info(f"弹性基准结果:\n{self.results().to_string(index=False)}")
+        return self.report()
+
+    def _scale(self, step: ScaleStep):
+        """发出扩缩容请求，通过 watch 等待副本全部 Ready，扩容时再等待新 Pod 承接写入"""
+        before = {pod["name"] for pod in self.k8s.list_pods(label_selector=self.selector)}
+        start = time.monotonic()
+        if not self.k8s.scale_workload(self.kind, self.name, step.to_replicas):
+            raise RuntimeError(f"扩缩 {self.kind} {self.name} 到 {step.to_replicas} 个副本失败")
+
+        def condition(pods: Dict[str, Any]) -> bool:
+            now = time.monotonic() - start
+            ready = {name for name, pod in pods.items()
+                     if pod.metadata.deletion_timestamp is None and self.k8s.is_pod_ready(pod)}
+            for name in ready - before:
+                step.pod_ready_times.setdefault(name, now)
+            return len(pods) == step.to_replicas and len(ready) == step.to_replicas
+
+        pods = WaitHelper.wait_for_resources(
+            self.k8s.core_v1.list_namespaced_pod,
+            self.k8s.default_namespace,
+            condition,
+            description=f"{self.kind} {self.name} 的 {step.to_replicas} 个副本 Ready",
+            timeout=self.ready_timeout,
+            label_selector=self.selector
+        )
+        step.ready_time = time.monotonic() - start
+        step.new_pods = sorted(set(pods) - before, key=self.k8s.pod_sort_key)
+        step.removed_pods = sorted(before - set(pods), key=self.k8s.pod_sort_key)
+
+        if step.new_pods:
+            def new_pods_have_data():
+                snapshot = self.probe.collect(step.new_pods)
+                return snapshot.vnode_pods(self.db_name) & set(step.new_pods)
+
+            try:
+                WaitHelper.wait_until(new_pods_have_data, f"新节点 {step.new_pods} 承接 {self.db_name} 的写入",
+                                      timeout=self.traffic_timeout, initial_interval=0.5, max_interval=2)
+                step.traffic_time = time.monotonic() - start
+            except TimeoutError:
+                log.warning(f"{self.traffic_timeout}s 内新节点 {step.new_pods} 上没有出现 {self.db_name} 的数据")
+
+        step.snapshot = self.probe.collect()
+        log.info(f"扩缩容 {step.name}: Ready {step.ready_time:.1f}s, "
+                 f"承接写入 {'-' if step.traffic_time is None else f'{step.traffic_time:.1f}s'}")
+
+    def _query(self, sql: str):
+        CnosDBHelper._make_request(self.base_url, "/api/v1/sql?db=", sql, self.username, self.password)
+
+    # ------------------------- 结果 -------------------------
+    def results(self) -> pd.DataFrame:
+        """每个步骤一行，合并 FaultInjectionRunner 的吞吐下降、恢复时间和错误数，以及 vnode 分布的倾斜程度"""
+        impact = self.runner.fault_report() if self.runner.duration is not None else None
+        rows = []
+        for index, step in enumerate(self.steps):
+            skew = step.snapshot.skew(self.db_name) if step.snapshot is not None else {}
+            row = {
+                "step": step.name,
+                "ready_s": step.ready_time,
+                "first_pod_ready_s": min(step.pod_ready_times.values(), default=None),
+                "traffic_s": step.traffic_time,
+                "new_pods": ", ".join(step.new_pods),
+                "removed_pods": ", ".join(step.removed_pods),
+                "vnode_gini": skew.get("gini"),
+                "vnode_max_mean": skew.get("max_mean"),
+            }
+            if impact is not None:
+                fault = impact.iloc[index]
+                row.update(dip=fault["dip"], recovery_s=fault["recovery_time"], write_errors=fault["write_errors"],
+                           query_errors=fault["query_errors"], error=fault["error"])
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def report(self) -> BenchmarkReport:
+        """
+        汇总为 BenchmarkReport，指标名为 scale.<序号>.<原副本数>_to_<目标副本数>.<指标>，
+        同样的 steps 在不同版本之间可以直接比较
+        """
+        report = BenchmarkReport("elasticity", metadata={
+            "kind": self.kind,
+            "workload": self.name,
+            "initial_replicas": self.initial_replicas,
+            "steps": [step.to_replicas for step in self.steps],
+            "database_options": self.database_options,
+            "load": self.runner.workload.describe(),
+        })
+        for index, row in self.results().iterrows():
+            prefix = f"scale.{index}.{row['step']}"
+            metrics = [("ready_s", "s", False), ("traffic_s", "s", False), ("recovery_s", "s", False),
+                       ("dip", "ratio", False), ("vnode_gini", "ratio", False)]
+            for column, unit, higher_is_better in metrics:
+                value = row.get(column)
+                if value is not None and not pd.isna(value):
+                    report.add(f"{prefix}.{column}", round(float(value), 3), unit, higher_is_better)
+        return report
+
+    def attach(self):
+        """把步骤结果、每一步之后的 vnode 分布和负载曲线附加到 Allure"""
+        allure.attach(self.results().to_csv(index=False), name="Elasticity Steps",
+                      attachment_type=allure.attachment_type.CSV)
+        spread = {step.name: step.snapshot.by_node(self.db_name) for step in self.steps if step.snapshot is not None}
+        if spread:
+            table = pd.DataFrame(spread).fillna(0).astype(np.int64)
+            allure.attach(table.to_csv(index_label="pod"), name="Elasticity VNode Spread (bytes)",
+                          attachment_type=allure.attachment_type.CSV)
+        if self.runner.duration is not None:
+            self.runner.attach("Elasticity Load")
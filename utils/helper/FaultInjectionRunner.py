@@ -0,0 +1,394 @@
+import math
+import posixpath
+import threading
+import time
+from html import escape
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import allure
+import numpy as np
+import pandas as pd
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.helper.WorkloadGenerator import WorkloadGenerator
+from utils.logger import log
+
+
+class Fault:
+    """
+    一次故障注入: 负载开始后 at 秒执行 inject，有 restore 时再过 duration 秒执行 restore
+    injected_at / restored_at 为实际执行时间 (相对负载开始的秒数)，inject 或 restore 抛出的异常记录在 error 中
+    """
+
+    def __init__(self, name: str, at: float, inject: Callable[[], Any],
+                 restore: Optional[Callable[[], Any]] = None, duration: float = 0.0):
+        self.name = name
+        self.at = at
+        self.inject = inject
+        self.restore = restore
+        self.duration = duration
+        self.injected_at: Optional[float] = None
+        self.restored_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @classmethod
+    def delete_pod(cls, k8s, pod: Union[str, Dict], at: float) -> "Fault":
+        """删除 Pod，由控制器重建"""
+        name = pod["name"] if isinstance(pod, dict) else pod
+
+        def inject():
+            if not k8s.delete_pod(name):
+                raise RuntimeError(f"删除 Pod {name} 失败")
+
+        return cls(f"delete pod {name}", at, inject)
+
+    @classmethod
+    def scale(cls, k8s, deployment: str, replicas: int, at: float, restore_replicas: Optional[int] = None,
+              duration: float = 0.0) -> "Fault":
+        """把 Deployment 扩缩到 replicas 个副本，restore_replicas 不为 None 时 duration 秒后恢复"""
+
+        def scale_to(count: int):
+            def action():
+                if not k8s.scale_deployment(deployment, count):
+                    raise RuntimeError(f"扩缩 {deployment} 到 {count} 个副本失败")
+
+            return action
+
+        restore = scale_to(restore_replicas) if restore_replicas is not None else None
+        return cls(f"scale {deployment} to {replicas}", at, scale_to(replicas), restore, duration)
+
+    @classmethod
+    def fill_disk(cls, k8s, pod: Union[str, Dict], at: float, path: str = "/var/lib/cnosdb",
+                  size_mb: Optional[int] = None, duration: float = 0.0) -> "Fault":
+        """
+        在 Pod 的 path 目录下用 dd 写入 size_mb MB 的文件，size_mb 为 None 时写满磁盘
+        duration 秒后删除该文件
+        """
+        name = pod["name"] if isinstance(pod, dict) else pod
+        file = posixpath.join(path, "fault-injection-fill")
+        command = ["dd", "if=/dev/zero", f"of={file}", "bs=1M"] + ([f"count={size_mb}"] if size_mb else [])
+
+        def run(args: List[str], allow_full: bool = False):
+            result = k8s.exec_many([name], args)[name]
+            disk_full = allow_full and "No space left" in result["stderr"]
+            if not result["success"] and not disk_full:
+                raise RuntimeError(f"{' '.join(args)} 在 {name} 中执行失败: {result['error'] or result['stderr']}")
+
+        label = f"{size_mb}MB" if size_mb else "full"
+        return cls(f"fill disk {name} ({label})", at, lambda: run(command, allow_full=size_mb is None),
+                   lambda: run(["rm", "-f", file]), duration)
+
+
+class FaultInjectionRunner:
+    """
+    在持续的写入和查询负载下按计划注入故障，记录亚秒级的吞吐量和延迟时间序列，
+    并计算每个故障造成的吞吐下降幅度、恢复时间和错误数
+
+    runner = FaultInjectionRunner(base_url, "fault_db", writers=4, readers=2)
+    runner.add_fault(Fault.delete_pod(k8s, "cnosdb-tskv-0", at=10))
+    runner.add_fault(Fault.scale(k8s, "cnosdb-query", 1, at=30, restore_replicas=3, duration=10))
+    runner.run(duration=60)
+    runner.attach()
+
+    写入和查询通过 CnosDBHelper 发送，每个请求都会生成 Allure 步骤，长时间运行时建议设置
+    HTTP_ATTACHMENT_MODE=on_failure。第一个故障之前应留出至少 baseline_window 秒的正常负载作为基准。
+    """
+
+    def __init__(self, base_url: str, db_name: str, writers: int = 2, readers: int = 1,
+                 workload: Optional[WorkloadGenerator] = None, batch_rows: int = 1000,
+                 query: Optional[str] = None, resolution: float = 0.25, think_time: float = 0.0,
+                 username: str = "root", password: str = ""):
+        """
+        :param base_url: CnosDB 地址，通常为集群的 Service
+        :param db_name: 写入和查询的数据库，需提前创建
+        :param writers: 写入线程数，每个线程循环写入 batch_rows 行
+        :param readers: 查询线程数
+        :param workload: 写入的数据，默认为从当前时间开始的 iot 负载
+        :param batch_rows: 每次写入的行数
+        :param query: 查询语句，默认统计写入表的行数
+        :param resolution: 时间序列的时间粒度(秒)
+        :param think_time: 每个线程两次请求之间的间隔(秒)
+        """
+        self.base_url = base_url
+        self.db_name = db_name
+        self.writers = writers
+        self.readers = readers
+        self.workload = workload or WorkloadGenerator(
+            "iot", series=100, points_per_series=10 ** 7, interval="1s",
+            start=pd.Timestamp.now(tz="UTC").floor("s")
+        )
+        self.batch_rows = batch_rows
+        self.query = query or f"SELECT count(*) FROM {self.workload.measurement}"
+        self.resolution = resolution
+        self.think_time = think_time
+        self.username = username
+        self.password = password
+        self.faults: List[Fault] = []
+        self.duration: Optional[float] = None
+        self._records: List[tuple] = []
+        self._chunks: Optional[Iterator[bytes]] = None
+        self._chunks_lock = threading.Lock()
+
+    def add_fault(self, fault: Fault) -> Fault:
+        self.faults.append(fault)
+        return fault
+
+    # ------------------------- 执行 -------------------------
+    def run(self, duration: float) -> pd.DataFrame:
+        """
+        运行 duration 秒负载并按计划注入故障，结束后执行尚未执行的恢复动作，返回 fault_report()
+        注入和恢复动作阻塞的时间不计入 duration
+        """
+        self._records = []
+        self._chunks = self.workload.iter_chunks(self.batch_rows)
+        for fault in self.faults:
+            fault.injected_at = fault.restored_at = fault.error = None
+
+        stop = threading.Event()
+        with allure.step(f"Fault injection: {len(self.faults)} 个故障, {duration}s 负载"):
+            origin = time.perf_counter()
+            threads = [threading.Thread(target=self._load, args=("write", origin, stop), name=f"fault-writer-{i}",
+                                        daemon=True) for i in range(self.writers)]
+            threads += [threading.Thread(target=self._load, args=("query", origin, stop), name=f"fault-reader-{i}",
+                                         daemon=True) for i in range(self.readers)]
+            for thread in threads:
+                thread.start()
+            try:
+                self._schedule(origin, duration, stop)
+            finally:
+                stop.set()
+                for thread in threads:
+                    thread.join()
+                self.duration = time.perf_counter() - origin
+                # 负载结束前没来得及恢复的故障也要恢复，保证集群回到初始状态
+                for fault in self.faults:
+                    if fault.injected_at is not None and fault.restore and fault.restored_at is None:
+                        self._apply(fault, "restore", origin)
+
+            report = self.fault_report()
+            log.info(self.summary())
+        return report
+
+    def _schedule(self, origin: float, duration: float, stop: threading.Event):
+        """
+        在主线程中按时间顺序执行注入和恢复动作
+        动作本身阻塞的时间 (例如等待扩容完成) 顺延之后的计划和负载结束时间，保证每个动作之后的间隔不被压缩
+        """
+        events = [(fault.at, 0, index, "inject") for index, fault in enumerate(self.faults)]
+        events += [(fault.at + fault.duration, 1, index, "restore")
+                   for index, fault in enumerate(self.faults) if fault.restore is not None]
+        delay = 0.0
+        for at, _, index, action in sorted(events):
+            if at >= duration:
+                break
+            if stop.wait(max(0.0, at + delay - (time.perf_counter() - origin))):
+                return
+            fault = self.faults[index]
+            if action == "restore" and fault.injected_at is None:
+                continue
+            start = time.perf_counter()
+            self._apply(fault, action, origin)
+            delay += time.perf_counter() - start
+        stop.wait(max(0.0, duration + delay - (time.perf_counter() - origin)))
+
+    def _apply(self, fault: Fault, action: str, origin: float):
+        with allure.step(f"{action}: {fault.name}"):
+            at = time.perf_counter() - origin
+            if action == "inject":
+                fault.injected_at = at
+            else:
+                fault.restored_at = at
+            try:
+                getattr(fault, action)()
+                log.info(f"故障 {fault.name} {action} 完成 (t={at:.2f}s, 耗时 {time.perf_counter() - origin - at:.2f}s)")
+            except Exception as e:
+                fault.error = f"{action}: {e}"
+                log.error(f"故障 {fault.name} {action} 失败: {e}")
+
+    def _load(self, kind: str, origin: float, stop: threading.Event):
+        """循环发送请求，每个请求记录 (结束时间, 类型, 点数, 耗时, 错误)"""
+        while not stop.is_set():
+            points = 0
+            start = time.perf_counter()
+            try:
+                if kind == "write":
+                    with self._chunks_lock:
+                        chunk = next(self._chunks, None)
+                    if chunk is None:
+                        return
+                    points = chunk.count(b"\n")
+                    start = time.perf_counter()
+                    CnosDBHelper.write_to_cnosdb(self.base_url, self.db_name, chunk, username=self.username,
+                                                 password=self.password, precision=self.workload.precision)
+                else:
+                    CnosDBHelper.query_from_cnosdb(self.base_url, self.db_name, self.query, username=self.username,
+                                                   password=self.password, timeout=30, use_cache=False)
+                error = None
+            except Exception as e:
+                points, error = 0, type(e).__name__
+            end = time.perf_counter()
+            self._records.append((end - origin, kind, points, end - start, error))
+            if self.think_time:
+                stop.wait(self.think_time)
+
+    # ------------------------- 结果 -------------------------
+    def records(self) -> pd.DataFrame:
+        """每个请求一行: time (结束时间)、kind (write/query)、points、latency、error"""
+        frame = pd.DataFrame(self._records, columns=["time", "kind", "points", "latency", "error"])
+        return frame.astype({"time": np.float64, "points": np.int64, "latency": np.float64})
+
+    def timeseries(self) -> pd.DataFrame:
+        """
+        按 resolution 分桶的时间序列，time 为桶的开始时间，结尾不足一个桶的请求不计入
+        write_points / writes / queries 为每秒速率，*_errors 为桶内失败次数，延迟单位为毫秒
+        """
+        records = self.records()
+        # 最后一个不完整的桶会被误判为吞吐下降，丢弃
+        bins = max(1, int((self.duration or 0.0) // self.resolution))
+        index = pd.RangeIndex(bins, name="bin")
+        records["bin"] = (records["time"] // self.resolution).astype(np.int64)
+        records = records[records["bin"] < bins]
+
+        frame = pd.DataFrame(index=index)
+        for kind, rate in (("write", "writes"), ("query", "queries")):
+            rows = records[records["kind"] == kind]
+            grouped = rows.groupby("bin")
+            ok = rows[rows["error"].isna()].groupby("bin")
+            frame[rate] = grouped.size().reindex(index, fill_value=0) / self.resolution
+            frame[f"{kind}_errors"] = rows["error"].notna().groupby(rows["bin"]).sum().reindex(
+                index, fill_value=0).astype(np.int64)
+            frame[f"{kind}_p50_ms"] = ok["latency"].quantile(0.5).reindex(index) * 1000
+            frame[f"{kind}_p99_ms"] = ok["latency"].quantile(0.99).reindex(index) * 1000
+            if kind == "write":
+                frame["write_points"] = grouped["points"].sum().reindex(index, fill_value=0) / self.resolution
+        frame.insert(0, "time", index * self.resolution)
+        columns = ["time", "write_points", "writes", "write_errors", "write_p50_ms", "write_p99_ms",
+                   "queries", "query_errors", "query_p50_ms", "query_p99_ms"]
+        return frame[columns].reset_index(drop=True)
+
+    def fault_report(self, baseline_window: float = 5.0, recovery_ratio: float = 0.9,
+                     stable_window: float = 1.0) -> pd.DataFrame:
+        """
+        每个故障的影响，以写入吞吐 (points/s) 衡量
+
+        baseline: 注入前 baseline_window 秒的平均吞吐
+        dip: 注入后到下一个故障注入前吞吐的最大降幅，0.6 表示最低时只有基准的 40%
+        recovery_time: 从注入到吞吐持续 stable_window 秒不低于 recovery_ratio * baseline 的时间，
+                       未恢复时为 NaN，一直没有下降时为 0
+        write_errors / query_errors: 注入到恢复 (未恢复时到窗口结束) 期间失败的请求数
+        """
+        series = self.timeseries()
+        records = self.records()
+        times = series["time"].to_numpy()
+        throughput = series["write_points"].to_numpy()
+        stable_bins = max(1, math.ceil(stable_window / self.resolution))
+        injected = sorted(fault.injected_at for fault in self.faults if fault.injected_at is not None)
+
+        rows = []
+        for fault in self.faults:
+            row = {"fault": fault.name, "injected_at": fault.injected_at, "restored_at": fault.restored_at,
+                   "baseline": np.nan, "min_throughput": np.nan, "dip": np.nan, "recovery_time": np.nan,
+                   "write_errors": 0, "query_errors": 0, "error": fault.error}
+            if fault.injected_at is None:
+                rows.append(row)
+                continue
+            at = fault.injected_at
+            window_end = min([t for t in injected if t > at] + [self.duration or at])
+            before = (times >= at - baseline_window) & (times + self.resolution <= at)
+            window = np.flatnonzero((times + self.resolution > at) & (times < window_end))
+            baseline = throughput[before].mean() if before.any() else np.nan
+            recovered_at = window_end
+            if len(window) and baseline > 0:
+                values = throughput[window]
+                low = np.flatnonzero(values < recovery_ratio * baseline)
+                row["min_throughput"] = values.min()
+                row["dip"] = max(0.0, 1 - values.min() / baseline)
+                if not len(low):
+                    row["recovery_time"] = 0.0
+                    recovered_at = at
+                elif len(values) - low[-1] - 1 >= stable_bins:
+                    recovered_at = times[window[low[-1]]] + self.resolution
+                    row["recovery_time"] = recovered_at - at
+            failed = records[(records["time"] >= at) & (records["time"] < max(recovered_at, at))
+                             & records["error"].notna()]
+            row.update(baseline=baseline, write_errors=int((failed["kind"] == "write").sum()),
+                       query_errors=int((failed["kind"] == "query").sum()))
+            rows.append(row)
+        return pd.DataFrame(rows, columns=["fault", "injected_at", "restored_at", "baseline", "min_throughput",
+                                           "dip", "recovery_time", "write_errors", "query_errors", "error"])
+
+    def summary(self) -> str:
+        records = self.records()
+        lines = [f"故障注入: 负载 {self.duration or 0.0:.1f}s, 写入 {int((records['kind'] == 'write').sum())} 次, "
+                 f"查询 {int((records['kind'] == 'query').sum())} 次, 失败 {int(records['error'].notna().sum())} 次"]
+        for row in self.fault_report().itertuples():
+            if row.injected_at is None or pd.isna(row.injected_at):
+                lines.append(f"  {row.fault}: 未注入")
+                continue
+            recovery = "未恢复" if pd.isna(row.recovery_time) else f"{row.recovery_time:.2f}s"
+            lines.append(f"  {row.fault} (t={row.injected_at:.2f}s): 吞吐下降 {row.dip:.0%}, 恢复 {recovery}, "
+                         f"写入失败 {row.write_errors}, 查询失败 {row.query_errors}"
+                         + (f", {row.error}" if row.error else ""))
+        return "\n".join(lines)
+
+    def attach(self, name: str = "Fault Injection"):
+        """把吞吐/延迟曲线 (SVG)、故障报告和时间序列附加到 Allure"""
+        series = self.timeseries()
+        report = self.fault_report()
+        allure.attach(self._svg_chart(series, report), name=f"{name} - Chart",
+                      attachment_type=allure.attachment_type.SVG)
+        allure.attach(report.to_csv(index=False), name=f"{name} - Faults", attachment_type=allure.attachment_type.CSV)
+        allure.attach(series.to_csv(index=False), name=f"{name} - Timeseries",
+                      attachment_type=allure.attachment_type.CSV)
+
+    @staticmethod
+    def _svg_chart(series: pd.DataFrame, report: pd.DataFrame, width: int = 960, height: int = 360) -> str:
+        """写入吞吐 (蓝，左轴) 与写入 p99 延迟 (橙，右轴) 曲线，红线为注入时间，阴影为恢复前的区间"""
+        left, right, top, bottom = 70, 70, 20, 40
+        plot_w, plot_h = width - left - right, height - top - bottom
+        step = float(series["time"].iloc[1]) if len(series) > 1 else 1.0
+        t_max = float(series["time"].iloc[-1]) + step if len(series) else 1.0
+        tp_max = max(float(series["write_points"].max()), 1.0) if len(series) else 1.0
+        latency = series["write_p99_ms"].max()
+        lat_max = 1.0 if pd.isna(latency) else max(float(latency), 1.0)
+
+        def x(t):
+            return left + plot_w * float(t) / t_max
+
+        def y(value, top_value):
+            return top + plot_h * (1 - float(value) / top_value)
+
+        def polyline(values, top_value, color):
+            points = " ".join(f"{x(t):.1f},{y(v, top_value):.1f}" for t, v in zip(series["time"], values)
+                              if not pd.isna(v))
+            return f'<polyline fill="none" stroke="{color}" stroke-width="1.5" points="{points}"/>'
+
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                 f'font-family="sans-serif" font-size="11">',
+                 f'<rect x="{left}" y="{top}" width="{plot_w}" height="{plot_h}" fill="white" stroke="#999"/>']
+        for row in report.itertuples():
+            if pd.isna(row.injected_at):
+                continue
+            end = row.injected_at + (t_max if pd.isna(row.recovery_time) else row.recovery_time)
+            parts.append(f'<rect x="{x(row.injected_at):.1f}" y="{top}" '
+                         f'width="{max(0.0, x(min(end, t_max)) - x(row.injected_at)):.1f}" height="{plot_h}" '
+                         f'fill="#f44" fill-opacity="0.12"/>')
+            parts.append(f'<line x1="{x(row.injected_at):.1f}" y1="{top}" x2="{x(row.injected_at):.1f}" '
+                         f'y2="{top + plot_h}" stroke="#d00" stroke-dasharray="4,3"/>')
+            parts.append(f'<text x="{x(row.injected_at) + 3:.1f}" y="{top + 12}" fill="#d00">'
+                         f'{escape(row.fault)}</text>')
+        for tick in range(5):
+            fraction = tick / 4
+            parts.append(f'<text x="{left - 6}" y="{y(tp_max * fraction, tp_max) + 4:.1f}" text-anchor="end" '
+                         f'fill="#1f77b4">{tp_max * fraction:,.0f}</text>')
+            parts.append(f'<text x="{width - right + 6}" y="{y(lat_max * fraction, lat_max) + 4:.1f}" '
+                         f'fill="#ff7f0e">{lat_max * fraction:.0f}</text>')
+            parts.append(f'<text x="{x(t_max * fraction):.1f}" y="{height - bottom + 16}" text-anchor="middle">'
+                         f'{t_max * fraction:.1f}s</text>')
+        parts.append(polyline(series["write_points"], tp_max, "#1f77b4"))
+        parts.append(polyline(series["write_p99_ms"], lat_max, "#ff7f0e"))
+        parts.append(f'<text x="{left}" y="{height - 6}" fill="#1f77b4">write points/s</text>')
+        parts.append(f'<text x="{width - right}" y="{height - 6}" text-anchor="end" fill="#ff7f0e">'
+                     f'write p99 ms</text>')
+        parts.append("</svg>")
+        return "\n".join(parts)
@@ -1,11 +1,52 @@
+import io
 import json
+import os
+import time
 from typing import  Union, Dict, Any, Optional, List, Mapping, ByteString
 import requests
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 from utils.logger import log
+from utils.helper.HttpSessionPool import session_pool
+from utils.helper.AttachmentPolicy import AttachmentPolicy
+from utils.helper.LatencyHistogram import latency_registry
 import allure
 
+
+class _SpooledBody(io.BufferedReader):
+    """从附件临时文件读取的响应体，关闭时删除文件 (Windows 不能删除仍打开的文件)"""
+
+    def __init__(self, path: str):
+        super().__init__(io.FileIO(path, "rb"))
+        self.path = path
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class _SpooledResponse(requests.Response):
+    """响应体已写入临时文件的响应，读完响应体后 close 仍会关闭并删除该文件"""
+
+    def close(self):
+        try:
+            self.raw.close()
+        finally:
+            super().close()
+
+
 class HttpRequestHelper:
+    # 全局默认的 Allure 附件策略，可通过环境变量或 configure_attachments 修改
+    attachment_policy = AttachmentPolicy.from_env()
+
+    @staticmethod
+    def configure_attachments(mode: str = AttachmentPolicy.FULL, max_bytes: int = 64 * 1024,
+                              sample_every: int = 100) -> AttachmentPolicy:
+        """设置全局默认的 Allure 附件策略，参数见 AttachmentPolicy"""
+        HttpRequestHelper.attachment_policy = AttachmentPolicy(mode, max_bytes, sample_every)
+        return HttpRequestHelper.attachment_policy
 
     @staticmethod
     def send_http_request(
@@ -21,7 +62,11 @@ class HttpRequestHelper:
             auth: Optional[tuple] = None,
             timeout: int = 10,
             expected_status: Optional[int] = None,
-            ssl_verify: bool = True
+            ssl_verify: bool = True,
+            use_session_pool: bool = True,
+            attachment_policy: Optional[AttachmentPolicy] = None,
+            stream: bool = False,
+            pool_retries: bool = True
     ) -> requests.Response:
         """
         发送HTTP请求的通用方法
@@ -40,6 +85,11 @@ class HttpRequestHelper:
             timeout: 请求超时时间(秒)
             expected_status: 预期的HTTP状态码
             ssl_verify: 是否验证SSL证书
+            use_session_pool: 是否复用连接池中的长连接，False 时每次请求新建连接
+            attachment_policy: 本次请求的 Allure 附件策略，默认使用 HttpRequestHelper.attachment_policy
+            stream: 是否流式读取响应体，为 True 时成功响应的响应体不会被读取和附加，由调用方消费；
+                file 附件模式下响应体先分块写入附件文件，调用方再从该文件读取
+            pool_retries: 连接池是否重试建立连接失败，调用方自行重试时设为 False
 
         Returns:
             requests.Response: 响应对象
@@ -58,7 +108,8 @@ class HttpRequestHelper:
             "headers": headers or {},
             "params": params,
             "timeout": timeout,
-            "verify": ssl_verify
+            "verify": ssl_verify,
+            "stream": stream
         }
 
         # 请求体处理优先级: data > json > form > files
@@ -73,62 +124,69 @@ class HttpRequestHelper:
         if auth:
             request_data["auth"] = auth
 
+        policy = attachment_policy or HttpRequestHelper.attachment_policy
+        attach = policy.should_attach()
+        request_body = json_data or form_data
+
         # 记录到Allure
         with allure.step(f"HTTP请求: {request_description}"):
             try:
                 # 记录请求详情
-                allure.attach(
-                    json.dumps({
-                        "url": url,
-                        "method": method,
-                        "headers": request_data["headers"],
-                        "params": params,
-                        "body": json_data or form_data,
-                        "timeout": timeout
-                    }, indent=2, ensure_ascii=False),
-                    name="Request Details",
-                    attachment_type=allure.attachment_type.JSON
-                )
+                if attach:
+                    HttpRequestHelper.attach_request(
+                        url, method, request_data["headers"], params, request_body, timeout
+                    )
 
-                log.info(f"发送请求: {request_description}")
-                response = requests.request(**request_data)
+                log.info("发送请求: {}", request_description)
+                start = time.perf_counter()
+                if use_session_pool:
+                    session_pool.start_timing()
+                    response = session_pool.request(base_url, retry=pool_retries, **request_data)
+                    timings = session_pool.collect_timing()
+                else:
+                    response = requests.request(**request_data)
+                    timings = {}
+                received = time.perf_counter()
 
-                # 记录响应详情
-                try:
-                    response_body = response.json()
-                    content_type = "JSON"
-                except ValueError:
-                    response_body = response.text
-                    content_type = "Text"
+                # 记录响应详情，流式响应只有失败时才读取响应体，file 模式下分块写入附件文件
+                if attach and stream and policy.mode == AttachmentPolicy.FILE:
+                    response = HttpRequestHelper.spool_response(response, policy)
+                elif attach:
+                    streamed = stream and expected_status in (None, response.status_code)
+                    HttpRequestHelper.attach_response(
+                        response.status_code,
+                        response.headers,
+                        None if streamed else response.content,
+                        response.elapsed.total_seconds(),
+                        policy
+                    )
 
-                allure.attach(
-                    json.dumps({
-                        "status_code": response.status_code,
-                        "headers": dict(response.headers),
-                        "body": response_body,
-                        "elapsed": f"{response.elapsed.total_seconds()}s"
-                    }, indent=2, ensure_ascii=False),
-                    name=f"Response ({content_type})",
-                    attachment_type=allure.attachment_type.JSON
+                phases = HttpRequestHelper._request_phases(
+                    timings, response.elapsed.total_seconds(), start, received, stream
                 )
-
+                latency_registry.record(HttpRequestHelper._latency_dimensions(url), phases)
                 log.info(
-                    f"收到响应: {response.status_code} "
-                    f"(耗时: {response.elapsed.total_seconds()}s)"
+                    "收到响应: {} (耗时: {}s, 首字节: {:.6f}s, 下载: {:.6f}s, 客户端: {:.6f}s)",
+                    response.status_code, response.elapsed.total_seconds(),
+                    phases["ttfb"], phases["download"] or 0.0, phases["client"]
                 )
 
                 # 状态码断言
                 if expected_status is not None:
                     assert response.status_code == expected_status, (
                         f"预期状态码 {expected_status}, 实际得到 {response.status_code}\n"
-                        f"响应内容: {response_body}"
+                        f"响应内容: {policy.preview(response.content)}"
                     )
-                    log.success(f"状态码验证通过: {expected_status}")
+                    log.success("状态码验证通过: {}", expected_status)
 
                 return response
 
             except requests.RequestException as e:
                 log.error(f"请求失败: {str(e)}")
+                if not attach:
+                    HttpRequestHelper.attach_request(
+                        url, method, request_data["headers"], params, request_body, timeout
+                    )
                 allure.attach(
                     str(e),
                     name="Request Error",
@@ -137,8 +195,12 @@ class HttpRequestHelper:
                 raise
             except AssertionError as e:
                 log.error(f"断言失败: {str(e)}")
+                if not attach:
+                    HttpRequestHelper.attach_request(
+                        url, method, request_data["headers"], params, request_body, timeout
+                    )
                 allure.attach(
-                    response.text if 'response' in locals() else "No response",
+                    policy.preview(response.content) if 'response' in locals() else "No response",
                     name="Assertion Failure",
                     attachment_type=allure.attachment_type.TEXT
                 )
@@ -150,4 +212,155 @@ class HttpRequestHelper:
                     name="Unexpected Error",
                     attachment_type=allure.attachment_type.TEXT
                 )
-                raise
\ No newline at end of file
+                raise
+
+    @staticmethod
+    def _request_phases(timings: Dict[str, float], elapsed: float, start: float, received: float,
+                        stream: bool) -> Dict[str, Optional[float]]:
+        """
+        拆分一次请求的耗时，单位为秒
+        acquire/connect: 从连接池获取连接 / 建立新连接，只有使用连接池时才有
+        ttfb: 发送请求到收到响应头，扣除连接耗时，近似服务端处理时间
+        download: 读取响应体，流式请求由调用方读取，不记录
+        client: 收到响应后的附件和日志等客户端开销
+        """
+        now = time.perf_counter()
+        acquire = timings.get("acquire")
+        connect = timings.get("connect")
+        return {
+            "acquire": acquire,
+            "connect": connect,
+            "ttfb": max(0.0, elapsed - (acquire or 0.0) - (connect or 0.0)),
+            "download": None if stream else max(0.0, received - start - elapsed),
+            "client": now - received,
+            "total": now - start,
+        }
+
+    @staticmethod
+    def _latency_dimensions(url: str) -> Dict[str, str]:
+        """延迟直方图的分组键: 接口路径和目标地址"""
+        parts = urlsplit(url)
+        return {"endpoint": parts.path, "target": parts.netloc}
+
+    @staticmethod
+    def attach_request(
+            url: str,
+            method: str,
+            headers: Dict[str, str],
+            params: Any,
+            body: Any,
+            timeout: Union[int, float]
+    ):
+        """把请求详情附加到Allure"""
+        allure.attach(
+            json.dumps({
+                "url": url,
+                "method": method,
+                "headers": headers,
+                "params": params,
+                "body": body,
+                "timeout": timeout
+            }, indent=2, ensure_ascii=False),
+            name="Request Details",
+            attachment_type=allure.attachment_type.JSON
+        )
+
+    @staticmethod
+    def spool_response(response: requests.Response, policy: AttachmentPolicy) -> requests.Response:
+        """
+        file 模式下把流式响应体用 iter_content 分块写入临时文件并作为附件，内存占用与响应体大小无关
+        返回从该文件读取响应体 (已解压) 的新响应，调用方仍可通过 raw / iter_content / iter_lines 流式消费，
+        关闭响应 (或 with 块结束) 时删除临时文件
+        """
+        is_json = AttachmentPolicy.is_json(response.headers)
+        path, size = policy.write_chunks(
+            response.iter_content(policy.CHUNK_SIZE), ".json" if is_json else ".txt"
+        )
+        try:
+            allure.attach.file(
+                path,
+                name=f"Response {response.status_code} ({size} bytes, {response.elapsed.total_seconds()}s)",
+                attachment_type=allure.attachment_type.JSON if is_json else allure.attachment_type.TEXT
+            )
+            spooled = _SpooledResponse()
+            for name in ("status_code", "headers", "url", "history", "encoding", "reason", "cookies", "elapsed",
+                         "request", "connection"):
+                setattr(spooled, name, getattr(response, name, None))
+            spooled.raw = _SpooledBody(path)
+        except BaseException:
+            os.remove(path)
+            raise
+        # 原响应体已读完，归还连接
+        response.close()
+        return spooled
+
+    @staticmethod
+    def attach_response(
+            status_code: int,
+            headers: Mapping[str, str],
+            content: Optional[bytes],
+            elapsed: float,
+            policy: Optional[AttachmentPolicy] = None
+    ):
+        """按附件策略把响应详情附加到Allure，只有 full 模式会解析 JSON 响应体
+        content 为 None 表示流式响应，只附加状态码和响应头"""
+        policy = policy or HttpRequestHelper.attachment_policy
+        if content is None:
+            allure.attach(
+                json.dumps({
+                    "status_code": status_code,
+                    "headers": dict(headers),
+                    "body": "<streamed>",
+                    "elapsed": f"{elapsed}s"
+                }, indent=2, ensure_ascii=False),
+                name="Response (Streamed)",
+                attachment_type=allure.attachment_type.JSON
+            )
+            return
+
+        is_json = AttachmentPolicy.is_json(headers)
+        summary = f"{status_code} ({len(content)} bytes, {elapsed}s)"
+
+        if policy.mode == AttachmentPolicy.FILE:
+            path = policy.write_file(content, ".json" if is_json else ".txt")
+            try:
+                allure.attach.file(
+                    path,
+                    name=f"Response {summary}",
+                    attachment_type=allure.attachment_type.JSON if is_json else allure.attachment_type.TEXT
+                )
+            finally:
+                os.remove(path)
+            return
+
+        if policy.mode == AttachmentPolicy.TRUNCATE:
+            allure.attach(
+                f"status_code: {status_code}\n"
+                f"headers: {json.dumps(dict(headers), ensure_ascii=False)}\n"
+                f"elapsed: {elapsed}s\n\n"
+                f"{policy.preview(content)}",
+                name=f"Response {summary}",
+                attachment_type=allure.attachment_type.TEXT
+            )
+            return
+
+        text = content.decode("utf-8", errors="replace")
+        response_body = text
+        content_type = "Text"
+        if is_json and content:
+            try:
+                response_body = json.loads(text)
+                content_type = "JSON"
+            except ValueError:
+                pass
+
+        allure.attach(
+            json.dumps({
+                "status_code": status_code,
+                "headers": dict(headers),
+                "body": response_body,
+                "elapsed": f"{elapsed}s"
+            }, indent=2, ensure_ascii=False),
+            name=f"Response ({content_type})",
+            attachment_type=allure.attachment_type.JSON
+        )
@@ -0,0 +1,193 @@
+import threading
+import time
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+# 当前线程中正在进行的请求的连接阶段耗时
+_phase_timings = threading.local()
+
+
+def _add_timing(phase: str, seconds: float):
+    timings = getattr(_phase_timings, "values", None)
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_timing("connect", time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_timing("connect", time.perf_counter() - start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        try:
+            return super()._get_conn(timeout)
+        finally:
+            _add_timing("acquire", time.perf_counter() - start)
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        try:
+            return super()._get_conn(timeout)
+        finally:
+            _add_timing("acquire", time.perf_counter() - start)
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """记录连接获取和建立耗时的 HTTPAdapter"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class HttpSessionPool:
+    """按 base_url 管理的 requests.Session 连接池
+
+    同一个 base_url (scheme://host:port) 的请求复用同一个 Session，
+    底层 urllib3 连接池保持 keep-alive，避免每次请求重新建立 TCP 连接。
+    自行重试的调用方 (例如 CnosDBHelper.bulk_write) 使用 retry=False 的 Session，避免两层重试叠加。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._sessions: Dict[Tuple[str, bool], requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+        self._initialized = True
+        self.configure()
+
+    def configure(
+            self,
+            pool_size: int = 32,
+            max_retries: int = 3,
+            backoff_factor: float = 0.2,
+            keep_alive: bool = True
+    ):
+        """配置连接池参数，已创建的 Session 会被关闭并按新参数重建
+
+        Args:
+            pool_size: 每个 base_url 的最大连接数
+            max_retries: 连接错误时的最大重试次数 (只重试建立连接失败，不重试已发出的请求)
+            backoff_factor: 重试退避因子，第 n 次重试前等待 backoff_factor * 2^(n-1) 秒
+            keep_alive: 是否保持长连接，False 时每个请求发送 Connection: close
+        """
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.keep_alive = keep_alive
+        self.close_all()
+
+    def get_session(self, base_url: str, retry: bool = True) -> requests.Session:
+        """获取 base_url 对应的 Session，不存在时创建；retry 为 False 时连接错误不重试，直接抛给调用方"""
+        key = (self._pool_key(base_url), retry)
+        session = self._sessions.get(key)
+        if session is not None:
+            return session
+
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._create_session(retry)
+                self._sessions[key] = session
+            return session
+
+    def request(self, base_url: str, retry: bool = True, **request_data) -> requests.Response:
+        """使用 base_url 对应的 Session 发送请求，retry 见 get_session，其余参数与 requests.request 一致"""
+        return self.get_session(base_url, retry).request(**request_data)
+
+    @staticmethod
+    def start_timing():
+        """开始记录当前线程下一次请求的连接阶段耗时"""
+        _phase_timings.values = {}
+
+    @staticmethod
+    def collect_timing() -> Dict[str, float]:
+        """取出当前线程记录的连接阶段耗时 {"acquire": 秒, "connect": 秒}，未建立新连接时没有 connect"""
+        timings = getattr(_phase_timings, "values", None) or {}
+        _phase_timings.values = None
+        return timings
+
+    def close_all(self):
+        """关闭所有 Session 并释放连接"""
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def _create_session(self, retry: bool = True) -> requests.Session:
+        """按当前配置创建 Session，retry 为 False 时不重试"""
+        max_retries = self.max_retries if retry else 0
+        adapter = _TimedHTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=Retry(
+                total=max_retries,
+                connect=max_retries,
+                read=0,
+                status=0,
+                other=0,
+                backoff_factor=self.backoff_factor,
+                raise_on_status=False
+            ),
+            pool_block=False
+        )
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    @staticmethod
+    def _pool_key(base_url: str) -> str:
+        """规范化 base_url，只保留 scheme://netloc 作为连接池的键"""
+        parts = urlsplit(base_url)
+        return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+# 全局单例实例
+session_pool = HttpSessionPool()
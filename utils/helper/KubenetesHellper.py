@@ -1,48 +1,158 @@
 from kubernetes import client, config
-from kubernetes.client import ApiClient
 from kubernetes.stream import stream
+import hashlib
+import os
+import posixpath
+import shlex
+import tarfile
+import threading
+import time
 import yaml
-from typing import Dict, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from utils.helper.KubernetesInformer import ResourceInformer
+from utils.helper.KubernetesTransport import KubernetesApiClient, Timeout, TokenBucket
+from utils.helper.PodLogTailer import PodLogTailer
+from utils.helper.PodTransfer import (COPY_CHUNK_SIZE, ExecStdinWriter, ExecStdoutReader, ExecStream,
+                                      HashingReader, TransferResult, parse_sha256sum, safe_member_parts)
+from utils.logger import log
 
 
 class KubernetesHelper:
     _instance = None
+    _instance_lock = threading.Lock()
+
+    _informers: Dict[str, ResourceInformer] = {}
+    _informer_max_staleness: float = 120
+
+    # kubeconfig 在第一次访问 API 时才加载
+    _config_file: Optional[str] = None
+    _in_cluster: bool = False
+    _config_loaded: bool = False
+    _config_lock = threading.Lock()
+
+    # API 传输参数，所有 REST 调用共用一个 ApiClient，见 configure_transport
+    _pool_size: int = 32
+    _request_timeout: Timeout = (10, 120)
+    _rate_limiter: Optional[TokenBucket] = None
+    _api_client: Optional[KubernetesApiClient] = None
+    _client_lock = threading.RLock()
 
     def __new__(cls, config_file: str = None, in_cluster: bool = False, default_namespace: str = "default"):
         if cls._instance is None:
-            cls._instance = super(KubernetesHelper, cls).__new__(cls)
-            cls._instance._initialized = False
-            # 只在第一次初始化时设置默认命名空间
-            cls._instance._default_namespace = default_namespace
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(KubernetesHelper, cls).__new__(cls)
+                    instance._initialized = False
+                    # 只在第一次初始化时设置默认命名空间
+                    instance._default_namespace = default_namespace
+                    cls._instance = instance
         return cls._instance
 
     def __init__(self, config_file: str = None, in_cluster: bool = False, default_namespace: str = None):
-        if self._initialized:
-            return
-
         """
         初始化 Kubernetes 客户端
+        创建实例时不访问 kubeconfig，第一次使用某个 API 时才加载配置并创建对应的 API 对象
+        单例的创建和初始化都加锁，多个线程同时创建时只初始化一次
 
         参数:
             config_file: kubeconfig 文件路径，如果为 None 则使用默认路径 (~/.kube/config)
             in_cluster: 是否在集群内部运行，如果在 Pod 中运行设置为 True
             default_namespace: 默认命名空间，只在第一次初始化时生效
         """
-        if in_cluster:
-            config.load_incluster_config()
-        else:
-            if config_file:
-                config.load_kube_config(config_file=config_file)
-            else:
-                config.load_kube_config()
+        if self._initialized:
+            return
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self._config_file = config_file
+            self._in_cluster = in_cluster
+            self._initialized = True
+
+    def configure_transport(self, pool_size: int = 32, connect_timeout: Optional[float] = 10,
+                            read_timeout: Optional[float] = 120, qps: Optional[float] = None,
+                            burst: Optional[int] = None):
+        """
+        配置访问 API Server 的传输参数，已创建的 API 对象会被丢弃并按新参数重建
 
-        self.api_client = ApiClient()
-        self.core_v1 = client.CoreV1Api()
-        self.apps_v1 = client.AppsV1Api()
-        self.batch_v1 = client.BatchV1Api()
-        self.networking_v1 = client.NetworkingV1Api()
-        self.custom_objects_api = client.CustomObjectsApi()
-        self._initialized = True
+        参数:
+            pool_size: 到 API Server 的最大空闲连接数，并发调用数超过它时多出的连接用完即关闭
+            connect_timeout: 默认连接超时(秒)，None 表示不限制
+            read_timeout: 默认读取超时(秒)，None 表示不限制；调用时传入 _request_timeout 会覆盖默认值
+            qps: 客户端限流的平均每秒请求数，None 表示不限流
+            burst: 限流允许的突发请求数，默认等于 qps
+        """
+        with self._client_lock:
+            self._pool_size = pool_size
+            if connect_timeout is None and read_timeout is None:
+                self._request_timeout = None
+            else:
+                self._request_timeout = (connect_timeout, read_timeout)
+            self._rate_limiter = TokenBucket(qps, burst) if qps else None
+            self._api_client = None
+            for name in ("core_v1", "apps_v1", "batch_v1", "networking_v1", "custom_objects_api"):
+                self.__dict__.pop(name, None)
+
+    def _load_config(self):
+        """加载 kubeconfig，只执行一次"""
+        if self._config_loaded:
+            return
+        with self._config_lock:
+            if self._config_loaded:
+                return
+            if self._in_cluster:
+                config.load_incluster_config()
+            else:
+                if self._config_file:
+                    config.load_kube_config(config_file=self._config_file)
+                else:
+                    config.load_kube_config()
+            self._config_loaded = True
+
+    def _new_api_client(self, request_timeout: bool = True) -> KubernetesApiClient:
+        """按当前传输参数创建 ApiClient，request_timeout=False 时不设置默认超时 (exec 的 websocket 调用)"""
+        self._load_config()
+        configuration = client.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = self._pool_size
+        return KubernetesApiClient(configuration, self._request_timeout if request_timeout else None,
+                                   self._rate_limiter)
+
+    # ------------------------- API 对象 (按需创建) -------------------------
+    @property
+    def api_client(self) -> KubernetesApiClient:
+        """所有 REST 调用共用的 ApiClient，多线程并发使用时共享同一个连接池"""
+        if self._api_client is None:
+            with self._client_lock:
+                if self._api_client is None:
+                    self._api_client = self._new_api_client()
+        return self._api_client
+
+    def transport_stats(self):
+        """共用 ApiClient 按接口汇总的请求统计，见 KubernetesApiClient.stats"""
+        return self.api_client.stats()
+
+    @cached_property
+    def core_v1(self) -> client.CoreV1Api:
+        return client.CoreV1Api(self.api_client)
+
+    @cached_property
+    def apps_v1(self) -> client.AppsV1Api:
+        return client.AppsV1Api(self.api_client)
+
+    @cached_property
+    def batch_v1(self) -> client.BatchV1Api:
+        return client.BatchV1Api(self.api_client)
+
+    @cached_property
+    def networking_v1(self) -> client.NetworkingV1Api:
+        return client.NetworkingV1Api(self.api_client)
+
+    @cached_property
+    def custom_objects_api(self) -> client.CustomObjectsApi:
+        return client.CustomObjectsApi(self.api_client)
 
     @property
     def default_namespace(self) -> str:
@@ -54,10 +164,86 @@ class KubernetesHelper:
         """设置新的默认命名空间"""
         self._default_namespace = namespace
 
+    # ------------------------- Informer 缓存 -------------------------
+    def enable_informers(self, resources: List[str] = ("pods", "services", "deployments"),
+                         max_staleness: float = 120, sync_timeout: float = 30,
+                         watch_factory: Optional[Callable] = None) -> Dict[str, ResourceInformer]:
+        """
+        开启 informer 模式: 每种资源 LIST 一次后通过 WATCH 保持最新，
+        之后 list_pods / list_services / list_deployments 直接读取本地缓存
+
+        参数:
+            resources: 需要缓存的资源，可选 pods、services、deployments
+            max_staleness: 缓存最长允许多少秒未与 API Server 确认，超过时回退到直接 LIST
+            sync_timeout: 首次同步的超时时间(秒)
+            watch_factory: 创建 watch 对象的工厂，测试时可替换
+
+        返回:
+            {资源名: ResourceInformer}
+        """
+        sources = {
+            "pods": (lambda: self.core_v1.list_namespaced_pod, lambda obj: self._format_pod_info(self, obj)),
+            "services": (lambda: self.core_v1.list_namespaced_service,
+                         lambda obj: self._format_service_info(self, obj)),
+            "deployments": (lambda: self.apps_v1.list_namespaced_deployment,
+                            lambda obj: self._format_deployment_info(self, obj)),
+        }
+        unknown = set(resources) - set(sources)
+        if unknown:
+            raise ValueError(f"unsupported informer resources: {sorted(unknown)}")
+
+        self.disable_informers()
+        self._informer_max_staleness = max_staleness
+        informers = {}
+        try:
+            for resource in resources:
+                list_func, formatter = sources[resource]
+                informers[resource] = ResourceInformer(
+                    list_func(), self.default_namespace, formatter,
+                    name=resource, watch_factory=watch_factory
+                ).start(sync_timeout)
+        except Exception:
+            for informer in informers.values():
+                informer.stop()
+            raise
+        self._informers = informers
+        return informers
+
+    def disable_informers(self):
+        """停止所有 informer，之后的列表操作重新直接请求 API Server"""
+        informers, self._informers = self._informers, {}
+        for informer in informers.values():
+            informer.stop()
+
+    def add_informer_handler(self, resource: str, handler: Callable[[str, Dict, Optional[Dict]], None]):
+        """为指定资源注册事件回调 handler(event_type, obj, old_obj)，obj 为格式化后的资源信息"""
+        if resource not in self._informers:
+            raise KeyError(f"informer for {resource!r} is not enabled")
+        self._informers[resource].add_event_handler(handler)
+
+    def _cached_list(self, resource: str, label_selector: str = None,
+                     node: str = None) -> Optional[List[Dict]]:
+        """informer 可用且足够新时返回缓存中的结果，否则返回 None"""
+        informer = self._informers.get(resource)
+        if informer is None or informer.namespace != self.default_namespace:
+            return None
+        if not informer.is_fresh(self._informer_max_staleness):
+            print(f"{resource} informer 缓存已过期 ({informer.staleness():.1f}s)，回退到直接查询")
+            return None
+        try:
+            return informer.list_objects(label_selector=label_selector, node=node)
+        except ValueError:
+            return None
+
     # ------------------------- Pod 操作 -------------------------
-    def list_pods(self, label_selector: str = None) -> List[Dict]:
-        """列出命名空间中的 Pod"""
-        pods = self.core_v1.list_namespaced_pod(self.default_namespace, label_selector=label_selector)
+    def list_pods(self, label_selector: str = None, node: str = None) -> List[Dict]:
+        """列出命名空间中的 Pod，node 不为 None 时只返回该节点上的 Pod"""
+        cached = self._cached_list("pods", label_selector=label_selector, node=node)
+        if cached is not None:
+            return cached
+        field_selector = f"spec.nodeName={node}" if node is not None else None
+        pods = self.core_v1.list_namespaced_pod(self.default_namespace, label_selector=label_selector,
+                                                field_selector=field_selector)
         return [self._format_pod_info(self, pod) for pod in pods.items]
 
     def get_pod(self, name: str) -> Optional[Dict]:
@@ -82,7 +268,7 @@ class KubernetesHelper:
         """在 Pod 中执行命令"""
         try:
             resp = stream(
-                self.core_v1.connect_get_namespaced_pod_exec,
+                self._exec_api().connect_get_namespaced_pod_exec,
                 pod_name,
                 self.default_namespace,
                 command=command,
@@ -97,6 +283,73 @@ class KubernetesHelper:
             print(f"执行命令失败: {e}")
             return ""
 
+    def exec_many(self, pods: List[Union[str, Dict]], command: List[str], max_workers: int = 8,
+                  timeout: Optional[float] = None, container: str = None) -> Dict[str, Dict]:
+        """
+        在多个 Pod 中并发执行同一条命令，单个 Pod 失败不影响其他 Pod
+
+        参数:
+            pods: Pod 名称或 list_pods 返回的 Pod 信息
+            command: 要执行的命令
+            max_workers: 最大并发数
+            timeout: 单个 Pod 的执行超时时间(秒)，None 表示不限制
+            container: 容器名称
+
+        返回:
+            {pod 名称: {"pod", "stdout", "stderr", "exit_code", "duration", "error", "success"}}
+        """
+        names = [pod["name"] if isinstance(pod, dict) else pod for pod in pods]
+        if not names:
+            return {}
+
+        # kubernetes.stream 会临时替换 ApiClient.request，同一个 ApiClient 不能被多个线程同时用于 exec
+        local = threading.local()
+
+        def run(pod_name: str) -> Dict:
+            if not hasattr(local, "core_v1"):
+                local.core_v1 = client.CoreV1Api(self._new_api_client(request_timeout=False))
+            return self._exec_with_status(local.core_v1, pod_name, command, container, timeout)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as executor:
+            results = list(executor.map(run, names))
+        return {result["pod"]: result for result in results}
+
+    def _exec_with_status(self, core_v1, pod_name: str, command: List[str],
+                          container: Optional[str], timeout: Optional[float]) -> Dict:
+        """在 Pod 中执行命令并分别收集 stdout、stderr 和退出码"""
+        result = {"pod": pod_name, "stdout": "", "stderr": "", "exit_code": None,
+                  "duration": 0.0, "error": None, "success": False}
+        start = time.perf_counter()
+        try:
+            resp = stream(
+                core_v1.connect_get_namespaced_pod_exec,
+                pod_name,
+                self.default_namespace,
+                command=command,
+                container=container,
+                stderr=True,
+                stdin=False,
+                stdout=True,
+                tty=False,
+                _preload_content=False
+            )
+            try:
+                resp.run_forever(timeout=timeout)
+                # 超时后命令仍在运行，不带 timeout 的读取会一直阻塞，只取已收到的输出
+                result["stdout"] = resp.read_stdout(timeout=0)
+                result["stderr"] = resp.read_stderr(timeout=0)
+                if resp.is_open():
+                    result["error"] = f"执行超时 ({timeout}s)"
+                else:
+                    result["exit_code"] = resp.returncode
+            finally:
+                resp.close()
+        except Exception as e:
+            result["error"] = f"执行命令失败: {e}"
+        result["duration"] = time.perf_counter() - start
+        result["success"] = result["error"] is None and result["exit_code"] == 0
+        return result
+
     def get_pod_logs(self, pod_name: str, container: str = None,
                      tail_lines: int = 100) -> str:
         """获取 Pod 日志"""
@@ -112,10 +365,219 @@ class KubernetesHelper:
             print(f"获取日志失败: {e}")
             return ""
 
+    def follow_pod_logs(self, pods: List[Union[str, Dict]], container: str = None, **kwargs) -> PodLogTailer:
+        """
+        开始同时跟踪多个 Pod 的日志，返回已启动的 PodLogTailer，用完后调用 stop() 或使用 with
+        其他参数见 PodLogTailer
+        """
+        return PodLogTailer(self, pods, container=container, **kwargs).start()
+
+    # ------------------------- 文件传输 -------------------------
+    def copy_to_pod(self, pod_name: str, local_path: Union[str, Path], remote_path: str,
+                    container: str = None, chunk_size: int = COPY_CHUNK_SIZE, verify: bool = True,
+                    timeout: Optional[float] = None) -> Dict:
+        """
+        把本地文件或目录复制到 Pod 中 (类似 kubectl cp)，容器中需要有 tar、sha256sum
+
+        通过 exec websocket 向 Pod 中的 `tar xf -` 发送 tar 流，每次发送 chunk_size 字节，
+        发送时计算本地文件的 sha256，传输完成后与 Pod 中 sha256sum 的结果比较
+
+        参数:
+            pod_name: Pod 名称
+            local_path: 本地文件或目录
+            remote_path: Pod 中的目标路径，父目录不存在时自动创建
+            container: 容器名称
+            chunk_size: 每次发送的字节数
+            verify: 是否校验 sha256
+            timeout: 传输超时时间(秒)，None 表示不限制
+
+        返回:
+            {"pod", "direction", "source", "destination", "bytes", "files", "chunks", "duration",
+             "mb_per_sec", "verify_duration", "checksums", "verified", "mismatched", "stderr",
+             "error", "success"}
+        """
+        local_path = Path(local_path)
+        remote_path = remote_path.rstrip("/")
+        parent, name = posixpath.split(remote_path)
+        parent = parent or "/"
+        result = TransferResult.new(pod_name, "upload", str(local_path), remote_path)
+        start = time.perf_counter()
+        core_v1 = self._exec_api()
+        try:
+            if not local_path.exists():
+                raise FileNotFoundError(f"本地路径不存在: {local_path}")
+            command = ["sh", "-c", f"mkdir -p {shlex.quote(parent)} && tar xf - -C {shlex.quote(parent)}"]
+            exec_stream = ExecStream(self._open_exec(core_v1, pod_name, command, container, stdin=True), timeout)
+            try:
+                writer = ExecStdinWriter(exec_stream)
+                with tarfile.open(fileobj=writer, mode="w|", bufsize=chunk_size) as tar:
+                    self._add_to_tar(tar, local_path, name, result)
+                exit_code = exec_stream.wait()
+                result["chunks"] = writer.chunks
+            finally:
+                result["stderr"] = exec_stream.stderr
+                exec_stream.close()
+            if exit_code != 0:
+                raise IOError(f"tar 退出码 {exit_code}: {exec_stream.stderr.strip()}")
+        except Exception as e:
+            result["error"] = f"复制到 Pod 失败: {e}"
+
+        return self._finish_transfer(core_v1, result, start, parent, name, container, verify, timeout)
+
+    def copy_from_pod(self, pod_name: str, remote_path: str, local_path: Union[str, Path],
+                      container: str = None, chunk_size: int = COPY_CHUNK_SIZE, verify: bool = True,
+                      timeout: Optional[float] = None) -> Dict:
+        """
+        把 Pod 中的文件或目录复制到本地 (类似 kubectl cp)，容器中需要有 tar、sha256sum
+
+        Pod 中的 `tar cf -` 通过 exec websocket 输出 tar 流，本地按 chunk_size 读取并写入文件，
+        写入时计算 sha256，传输完成后与 Pod 中 sha256sum 的结果比较。
+        只复制普通文件和目录，符号链接等其他类型的成员会被跳过
+
+        参数:
+            pod_name: Pod 名称
+            remote_path: Pod 中的文件或目录
+            local_path: 本地目标路径，父目录不存在时自动创建
+            container: 容器名称
+            chunk_size: 每次读取的字节数
+            verify: 是否校验 sha256
+            timeout: 传输超时时间(秒)，None 表示不限制
+
+        返回:
+            与 copy_to_pod 相同
+        """
+        local_path = Path(local_path)
+        remote_path = remote_path.rstrip("/")
+        parent, name = posixpath.split(remote_path)
+        parent = parent or "/"
+        result = TransferResult.new(pod_name, "download", remote_path, str(local_path))
+        start = time.perf_counter()
+        core_v1 = self._exec_api()
+        try:
+            exec_stream = ExecStream(
+                self._open_exec(core_v1, pod_name, ["tar", "cf", "-", "-C", parent, name], container), timeout
+            )
+            try:
+                reader = ExecStdoutReader(exec_stream)
+                with tarfile.open(fileobj=reader, mode="r|", bufsize=chunk_size) as tar:
+                    self._extract_from_tar(tar, local_path, name, chunk_size, result)
+                exit_code = exec_stream.wait()
+            finally:
+                result["stderr"] = exec_stream.stderr
+                exec_stream.close()
+            if exit_code != 0:
+                raise IOError(f"tar 退出码 {exit_code}: {exec_stream.stderr.strip()}")
+        except Exception as e:
+            result["error"] = f"从 Pod 复制失败: {e}"
+
+        return self._finish_transfer(core_v1, result, start, parent, name, container, verify, timeout)
+
+    def _exec_api(self) -> client.CoreV1Api:
+        """
+        exec 和文件传输使用独立的 ApiClient，且不设置默认超时
+        kubernetes.stream 会临时替换 ApiClient.request，不能和其他线程共用；
+        websocket 调用也不接受 (连接, 读取) 形式的 _request_timeout
+        """
+        return client.CoreV1Api(self._new_api_client(request_timeout=False))
+
+    def _open_exec(self, core_v1, pod_name: str, command: List[str], container: Optional[str],
+                   stdin: bool = False):
+        """以二进制模式打开 exec websocket，返回 WSClient"""
+        return stream(
+            core_v1.connect_get_namespaced_pod_exec,
+            pod_name,
+            self.default_namespace,
+            command=command,
+            container=container,
+            stderr=True,
+            stdin=stdin,
+            stdout=True,
+            tty=False,
+            binary=True,
+            _preload_content=False
+        )
+
+    @staticmethod
+    def _add_to_tar(tar: tarfile.TarFile, local_path: Path, arcname: str, result: Dict):
+        """把本地文件或目录逐个写入 tar 流，同时统计字节数并计算 sha256"""
+        paths = [(local_path, arcname)]
+        if local_path.is_dir():
+            for root, dirs, files in os.walk(local_path):
+                dirs.sort()
+                for entry in dirs + sorted(files):
+                    path = Path(root) / entry
+                    paths.append((path, posixpath.join(arcname, path.relative_to(local_path).as_posix())))
+
+        for path, name in paths:
+            info = tar.gettarinfo(str(path), arcname=name)
+            if not info.isreg():
+                tar.addfile(info)
+                continue
+            with path.open("rb") as f:
+                reader = HashingReader(f)
+                tar.addfile(info, reader)
+            result["checksums"][name] = reader.sha256.hexdigest()
+            result["bytes"] += info.size
+            result["files"] += 1
+
+    @staticmethod
+    def _extract_from_tar(tar: tarfile.TarFile, local_path: Path, root: str, chunk_size: int, result: Dict):
+        """按顺序读取 tar 流中的成员并写入本地，同时统计字节数并计算 sha256"""
+        for member in tar:
+            parts = safe_member_parts(member.name, root)
+            if parts is None:
+                raise IOError(f"tar 成员路径不安全: {member.name}")
+            target = local_path.joinpath(*parts)
+            if member.isdir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            if not member.isreg():
+                print(f"跳过非普通文件: {member.name}")
+                continue
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            source = tar.extractfile(member)
+            digest = hashlib.sha256()
+            with target.open("wb") as f:
+                while True:
+                    chunk = source.read(chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+            result["checksums"][member.name] = digest.hexdigest()
+            result["bytes"] += member.size
+            result["files"] += 1
+            result["chunks"] += -(-member.size // chunk_size)
+
+    def _finish_transfer(self, core_v1, result: Dict, start: float, parent: str, name: str,
+                         container: Optional[str], verify: bool, timeout: Optional[float]) -> Dict:
+        """统计吞吐量，在 Pod 中计算 sha256 校验本次传输的文件"""
+        TransferResult.finish(result, start)
+        if result["error"] is None and verify:
+            verify_start = time.perf_counter()
+            script = f"cd {shlex.quote(parent)} && find {shlex.quote(name)} -type f -exec sha256sum {{}} +"
+            checksum = self._exec_with_status(core_v1, result["pod"], ["sh", "-c", script], container, timeout)
+            result["verify_duration"] = time.perf_counter() - verify_start
+            if checksum["success"]:
+                TransferResult.verify(result, parse_sha256sum(checksum["stdout"]))
+            else:
+                result["error"] = f"计算远端校验和失败: {checksum['error'] or checksum['stderr'].strip()}"
+
+        result["success"] = result["error"] is None
+        log.info(f"{result['direction']} {result['pod']}: {result['source']} -> {result['destination']}, "
+                 f"{result['files']} 个文件 {result['bytes'] / 1024 / 1024:.2f} MB, "
+                 f"耗时 {result['duration']:.2f}s ({result['mb_per_sec']:.2f} MB/s), "
+                 f"校验={result['verified']}, 错误={result['error']}")
+        return result
+
     # ------------------------- Deployment 操作 -------------------------
-    def list_deployments(self) -> List[Dict]:
+    def list_deployments(self, label_selector: str = None) -> List[Dict]:
         """列出命名空间中的 Deployment"""
-        deployments = self.apps_v1.list_namespaced_deployment(self.default_namespace)
+        cached = self._cached_list("deployments", label_selector=label_selector)
+        if cached is not None:
+            return cached
+        deployments = self.apps_v1.list_namespaced_deployment(self.default_namespace, label_selector=label_selector)
         return [self._format_deployment_info(self, deploy) for deploy in deployments.items]
 
     def create_deployment(self, deployment_manifest: Union[Dict, str]) -> bool:
@@ -163,10 +625,66 @@ class KubernetesHelper:
             print(f"扩缩容 Deployment 失败: {e}")
             return False
 
+    # ------------------------- StatefulSet 操作 -------------------------
+    def scale_statefulset(self, name: str, replicas: int) -> bool:
+        """扩缩容 StatefulSet"""
+        try:
+            body = {"spec": {"replicas": replicas}}
+            self.apps_v1.patch_namespaced_stateful_set_scale(
+                name=name,
+                namespace=self.default_namespace,
+                body=body
+            )
+            return True
+        except client.ApiException as e:
+            print(f"扩缩容 StatefulSet 失败: {e}")
+            return False
+
+    def get_workload(self, kind: str, name: str) -> Optional[Dict]:
+        """
+        获取 Deployment 或 StatefulSet 的副本数和 Pod 选择器
+
+        参数:
+            kind: deployment 或 statefulset
+
+        返回:
+            {"name", "kind", "replicas", "ready_replicas", "selector"}，selector 可直接用作 label_selector
+        """
+        readers = {
+            "deployment": lambda: self.apps_v1.read_namespaced_deployment(name, self.default_namespace),
+            "statefulset": lambda: self.apps_v1.read_namespaced_stateful_set(name, self.default_namespace),
+        }
+        if kind not in readers:
+            raise ValueError(f"unsupported workload kind: {kind!r}")
+        try:
+            workload = readers[kind]()
+        except client.ApiException as e:
+            print(f"获取 {kind} 失败: {e}")
+            return None
+        labels = workload.spec.selector.match_labels or {}
+        return {
+            "name": workload.metadata.name,
+            "kind": kind,
+            "replicas": workload.spec.replicas,
+            "ready_replicas": workload.status.ready_replicas or 0,
+            "selector": ",".join(f"{key}={value}" for key, value in sorted(labels.items()))
+        }
+
+    def scale_workload(self, kind: str, name: str, replicas: int) -> bool:
+        """按 kind 扩缩容 Deployment 或 StatefulSet"""
+        if kind == "deployment":
+            return self.scale_deployment(name, replicas)
+        if kind == "statefulset":
+            return self.scale_statefulset(name, replicas)
+        raise ValueError(f"unsupported workload kind: {kind!r}")
+
     # ------------------------- Service 操作 -------------------------
-    def list_services(self) -> List[Dict]:
+    def list_services(self, label_selector: str = None) -> List[Dict]:
         """列出命名空间中的 Service"""
-        services = self.core_v1.list_namespaced_service(self.default_namespace)
+        cached = self._cached_list("services", label_selector=label_selector)
+        if cached is not None:
+            return cached
+        services = self.core_v1.list_namespaced_service(self.default_namespace, label_selector=label_selector)
         return [self._format_service_info(self, svc) for svc in services.items]
 
     def create_service(self, service_manifest: Union[Dict, str]) -> bool:
@@ -221,12 +739,25 @@ class KubernetesHelper:
             "namespace": pod.metadata.namespace,
             "status": pod.status.phase,
             "ip": pod.status.pod_ip,
+            "ready": KubernetesHelper.is_pod_ready(pod),
             "node": pod.spec.node_name,
             "creation_time": pod.metadata.creation_timestamp,
             "labels": pod.metadata.labels,
             "containers": [c.name for c in pod.spec.containers]
         }
 
+    @staticmethod
+    def is_pod_ready(pod) -> bool:
+        """Pod 的 Ready 条件是否为 True"""
+        conditions = (pod.status.conditions or []) if pod.status else []
+        return any(c.type == "Ready" and c.status == "True" for c in conditions)
+
+    @staticmethod
+    def pod_sort_key(name: str) -> Tuple[str, int]:
+        """按 StatefulSet 序号排序 Pod 名: tskv-2 排在 tskv-10 之前，没有序号后缀的名称排在同前缀的最前面"""
+        prefix, _, suffix = name.rpartition("-")
+        return (prefix, int(suffix)) if suffix.isdigit() else (name, -1)
+
     @staticmethod
     def _format_deployment_info(self, deploy) -> Dict:
         """格式化 Deployment 信息"""
@@ -0,0 +1,284 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from utils.logger import log
+
+EventHandler = Callable[[str, Dict, Optional[Dict]], None]
+
+
+class ResourceInformer:
+    """
+    基于 LIST + WATCH 的本地资源缓存
+    启动时 LIST 一次，之后在后台线程中从 resourceVersion 继续 WATCH，
+    410 Gone 时重新 LIST；读取直接访问内存中的索引，不请求 API Server
+
+    informer = ResourceInformer(core_v1.list_namespaced_pod, "default", formatter).start()
+    pods = informer.list_objects(label_selector="cnosdb.com/role=query_tskv")
+    """
+
+    def __init__(
+            self,
+            list_func: Callable,
+            namespace: str,
+            formatter: Callable[[Any], Dict],
+            name: str = "",
+            watch_timeout: int = 60,
+            watch_factory: Optional[Callable[[], Any]] = None
+    ):
+        """
+        :param list_func: 命名空间级别的 list 方法，例如 core_v1.list_namespaced_pod
+        :param namespace: 命名空间
+        :param formatter: 把 API 对象转换为缓存中 dict 的函数
+        :param name: 名称，用于日志和线程名
+        :param watch_timeout: 单次 WATCH 请求的服务端超时(秒)，到期后从最新 resourceVersion 续上
+        :param watch_factory: 创建 watch 对象的工厂，默认 kubernetes.watch.Watch，测试时可替换
+        """
+        self.list_func = list_func
+        self.namespace = namespace
+        self.formatter = formatter
+        self.name = name or getattr(list_func, "__name__", "informer")
+        self.watch_timeout = watch_timeout
+        self._watch_factory = watch_factory
+
+        self._lock = threading.RLock()
+        self._store: Dict[str, Dict] = {}
+        self._labels: Dict[str, Dict[str, str]] = {}
+        self._label_index: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self._node_index: Dict[str, Set[str]] = defaultdict(set)
+        self._handlers: List[EventHandler] = []
+
+        self.resource_version: Optional[str] = None
+        self.last_sync: Optional[float] = None
+        self._synced = threading.Event()
+        self._stopped = threading.Event()
+        self._watcher = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------- 生命周期 -------------------------
+    def start(self, sync_timeout: float = 30) -> "ResourceInformer":
+        """LIST 一次并启动后台 WATCH 线程，等待首次同步完成"""
+        if self._thread is not None:
+            return self
+        self._stopped.clear()
+        self._relist()
+        self._thread = threading.Thread(target=self._run, name=f"informer-{self.name}", daemon=True)
+        self._thread.start()
+        if not self._synced.wait(sync_timeout):
+            raise TimeoutError(f"informer {self.name} 首次同步超时")
+        return self
+
+    def stop(self, timeout: float = 5):
+        """停止后台 WATCH"""
+        self._stopped.set()
+        watcher = self._watcher
+        if watcher is not None:
+            watcher.stop()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def has_synced(self) -> bool:
+        return self._synced.is_set()
+
+    def staleness(self) -> float:
+        """距离最近一次与 API Server 确认状态的秒数"""
+        if self.last_sync is None:
+            return float("inf")
+        return time.monotonic() - self.last_sync
+
+    def is_fresh(self, max_staleness: float) -> bool:
+        """缓存已同步、WATCH 线程在运行且未超过 max_staleness"""
+        return (
+            self.has_synced
+            and self._thread is not None
+            and self._thread.is_alive()
+            and self.staleness() <= max_staleness
+        )
+
+    def add_event_handler(self, handler: EventHandler):
+        """注册事件回调 handler(event_type, obj, old_obj)，event_type 为 ADDED/MODIFIED/DELETED"""
+        with self._lock:
+            self._handlers.append(handler)
+
+    # ------------------------- 读取 -------------------------
+    def get(self, name: str) -> Optional[Dict]:
+        with self._lock:
+            return self._store.get(name)
+
+    def list_objects(self, label_selector: Optional[str] = None, node: Optional[str] = None) -> List[Dict]:
+        """
+        按标签选择器和节点过滤缓存中的资源
+        支持 k=v、k==v、k!=v、k、!k 形式的选择器，多个条件以逗号分隔
+        :raises ValueError: 选择器包含不支持的集合语法 (in/notin) 时
+        """
+        requirements = self.parse_selector(label_selector)
+        with self._lock:
+            candidates: Optional[Set[str]] = None
+            if node is not None:
+                candidates = set(self._node_index.get(node, ()))
+            for key, op, value in requirements:
+                if op == "=":
+                    matched = self._label_index.get((key, value), set())
+                    candidates = set(matched) if candidates is None else candidates & matched
+            if candidates is None:
+                candidates = set(self._store)
+
+            names = [
+                name for name in candidates
+                if all(self._match(self._labels.get(name, {}), req) for req in requirements)
+            ]
+            return [self._store[name] for name in sorted(names)]
+
+    @staticmethod
+    def parse_selector(label_selector: Optional[str]) -> List[Tuple[str, str, Optional[str]]]:
+        """把标签选择器解析为 (key, op, value) 列表，op 为 = / != / exists / !exists"""
+        if not label_selector:
+            return []
+        requirements = []
+        for term in (t.strip() for t in label_selector.split(",")):
+            if not term:
+                continue
+            if " in " in term or " notin " in term or "(" in term:
+                raise ValueError(f"unsupported label selector: {term}")
+            if "!=" in term:
+                key, value = term.split("!=", 1)
+                requirements.append((key.strip(), "!=", value.strip()))
+            elif "==" in term:
+                key, value = term.split("==", 1)
+                requirements.append((key.strip(), "=", value.strip()))
+            elif "=" in term:
+                key, value = term.split("=", 1)
+                requirements.append((key.strip(), "=", value.strip()))
+            elif term.startswith("!"):
+                requirements.append((term[1:].strip(), "!exists", None))
+            else:
+                requirements.append((term, "exists", None))
+        return requirements
+
+    @staticmethod
+    def _match(labels: Dict[str, str], requirement: Tuple[str, str, Optional[str]]) -> bool:
+        key, op, value = requirement
+        if op == "=":
+            return labels.get(key) == value
+        if op == "!=":
+            return labels.get(key) != value
+        if op == "exists":
+            return key in labels
+        return key not in labels
+
+    # ------------------------- 后台同步 -------------------------
+    def _run(self):
+        from kubernetes import client
+
+        backoff = 0.5
+        relist = False
+        while not self._stopped.is_set():
+            try:
+                # 重新 LIST 与 WATCH 一样失败后退避重试，成功之前不会从过期的 resourceVersion 继续 WATCH
+                if relist:
+                    self._relist()
+                    relist = False
+                self._watch_once()
+                backoff = 0.5
+            except client.ApiException as e:
+                if e.status == 410 and not relist:
+                    log.info(f"informer {self.name}: resourceVersion 已过期，重新 LIST")
+                    relist = True
+                    continue
+                log.warning(f"informer {self.name}: {'LIST' if relist else 'WATCH'} 失败 {e.status}, "
+                            f"{backoff}s 后重试")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            except Exception as e:
+                if self._stopped.is_set():
+                    break
+                log.warning(f"informer {self.name}: {'LIST' if relist else 'WATCH'} 中断 ({e}), {backoff}s 后重试")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def _watch_once(self):
+        """从当前 resourceVersion 开始一次 WATCH，正常结束表示服务端超时，状态仍是最新的"""
+        self._watcher = self._new_watch()
+        for event in self._watcher.stream(
+                self.list_func,
+                self.namespace,
+                resource_version=self.resource_version,
+                timeout_seconds=self.watch_timeout,
+                allow_watch_bookmarks=True
+        ):
+            if self._stopped.is_set():
+                break
+            if event["type"] == "ERROR":
+                raw = event.get("raw_object") or {}
+                from kubernetes import client
+                raise client.ApiException(status=raw.get("code"), reason=raw.get("message"))
+            self._handle_event(event["type"], event["object"])
+        self.last_sync = time.monotonic()
+
+    def _new_watch(self):
+        if self._watch_factory is not None:
+            return self._watch_factory()
+        from kubernetes import watch
+        return watch.Watch()
+
+    def _relist(self):
+        """全量 LIST 并替换缓存，对差异触发事件回调"""
+        listing = self.list_func(self.namespace)
+        fresh = {item.metadata.name: item for item in listing.items}
+        with self._lock:
+            for name in list(self._store):
+                if name not in fresh:
+                    self._apply("DELETED", name, None)
+            for name, item in fresh.items():
+                self._apply("MODIFIED" if name in self._store else "ADDED", name, item)
+            self.resource_version = listing.metadata.resource_version
+        self.last_sync = time.monotonic()
+        self._synced.set()
+
+    def _handle_event(self, event_type: str, obj: Any):
+        self.resource_version = obj.metadata.resource_version
+        self.last_sync = time.monotonic()
+        if event_type == "BOOKMARK":
+            return
+        with self._lock:
+            self._apply(event_type, obj.metadata.name, None if event_type == "DELETED" else obj)
+
+    def _apply(self, event_type: str, name: str, obj: Any):
+        """更新缓存和索引并触发回调，调用方持有锁"""
+        old = self._store.get(name)
+        self._unindex(name)
+        if obj is None:
+            self._store.pop(name, None)
+            self._labels.pop(name, None)
+            new = None
+        else:
+            new = self.formatter(obj)
+            labels = dict(obj.metadata.labels or {})
+            self._store[name] = new
+            self._labels[name] = labels
+            for item in labels.items():
+                self._label_index[item].add(name)
+            node = getattr(getattr(obj, "spec", None), "node_name", None)
+            if isinstance(node, str):
+                self._node_index[node].add(name)
+
+        for handler in list(self._handlers):
+            try:
+                handler(event_type, new if new is not None else old, old)
+            except Exception as e:
+                log.warning(f"informer {self.name}: 事件回调失败 {e}")
+
+    def _unindex(self, name: str):
+        for item in self._labels.get(name, {}).items():
+            names = self._label_index.get(item)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._label_index[item]
+        for node in [n for n, names in self._node_index.items() if name in names]:
+            self._node_index[node].discard(name)
+            if not self._node_index[node]:
+                del self._node_index[node]
@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import pandas as pd
+from kubernetes.client import ApiClient, Configuration
+
+from utils.helper.LatencyHistogram import LatencyRegistry, latency_registry
+
+Timeout = Union[None, float, Tuple[float, float]]
+
+
+class TokenBucket:
+    """
+    客户端限流令牌桶，语义与 client-go 的 QPS/Burst 相同: 平均每秒放行 qps 个请求，空闲后最多连续放行 burst 个
+
+    令牌不足时先预留令牌再在锁外等待，多个线程按到达顺序依次放行
+    """
+
+    def __init__(self, qps: float, burst: Optional[int] = None):
+        if qps <= 0:
+            raise ValueError(f"qps must be positive, got {qps}")
+        self.qps = qps
+        self.burst = max(1, int(burst if burst is not None else qps))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """取一个令牌，返回等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.qps)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.qps if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class KubernetesApiClient(ApiClient):
+    """
+    带默认超时、客户端限流和延迟统计的 ApiClient
+
+    每次 API 调用按 "方法 路径模板" (例如 GET /api/v1/namespaces/{namespace}/pods) 记录到 latency_registry 的
+    k8s_api 维度，阶段为 throttle (限流等待) 和 total (含限流等待的总耗时)。
+    调用方没有指定 _request_timeout 时使用 request_timeout；流式请求 (_preload_content=False，如 watch、
+    follow 日志) 的生命周期由调用方控制，不设置默认超时。
+    """
+
+    def __init__(self, configuration: Optional[Configuration] = None, request_timeout: Timeout = None,
+                 rate_limiter: Optional[TokenBucket] = None, registry: LatencyRegistry = latency_registry):
+        """
+        :param configuration: kubernetes Configuration，connection_pool_maxsize 决定连接池大小
+        :param request_timeout: 默认超时，秒数或 (连接超时, 读取超时)
+        :param rate_limiter: 共享的限流令牌桶，None 表示不限流
+        :param registry: 记录延迟的 LatencyRegistry
+        """
+        super().__init__(configuration)
+        self.request_timeout = request_timeout
+        self.rate_limiter = rate_limiter
+        self.registry = registry
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+    def call_api(self, resource_path, method, *args, **kwargs):
+        if (kwargs.get("_request_timeout") is None and self.request_timeout is not None
+                and kwargs.get("_preload_content", True)):
+            kwargs["_request_timeout"] = self.request_timeout
+
+        key = f"{method} {resource_path}"
+        start = time.perf_counter()
+        throttle = self.rate_limiter.acquire() if self.rate_limiter is not None else 0.0
+        failed = True
+        try:
+            result = super().call_api(resource_path, method, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            self.registry.record({"k8s_api": key}, {"throttle": throttle, "total": elapsed})
+            with self._stats_lock:
+                stats = self._stats.setdefault(key, {"requests": 0, "errors": 0, "throttled": 0,
+                                                     "throttle_time": 0.0, "total_time": 0.0})
+                stats["requests"] += 1
+                stats["errors"] += failed
+                stats["throttled"] += throttle > 0
+                stats["throttle_time"] += throttle
+                stats["total_time"] += elapsed
+
+    def stats(self) -> pd.DataFrame:
+        """按接口汇总的请求数、失败数、被限流次数和平均耗时(毫秒)"""
+        with self._stats_lock:
+            rows = [{"api": key, **stats} for key, stats in sorted(self._stats.items())]
+        frame = pd.DataFrame(rows, columns=["api", "requests", "errors", "throttled", "throttle_time",
+                                            "total_time"])
+        frame["mean_ms"] = (frame["total_time"] / frame["requests"] * 1000).round(3)
+        return frame
@@ -0,0 +1,229 @@
+import json
+import math
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """
+    固定内存的对数-线性延迟直方图 (HDR 风格)
+    每个 2 倍区间划分为 sub_buckets 个等宽桶，相对误差不超过 1/sub_buckets，
+    记录次数不影响内存占用
+
+    hist = LatencyHistogram()
+    hist.record(0.0123)
+    hist.percentile(99)
+    """
+
+    def __init__(self, lowest: float = 1e-6, highest: float = 600.0, sub_buckets: int = 64):
+        """
+        :param lowest: 可区分的最小值(秒)，更小的值记入第一个桶
+        :param highest: 可区分的最大值(秒)，更大的值记入最后一个桶
+        :param sub_buckets: 每个 2 倍区间的桶数，决定精度
+        """
+        self.lowest = lowest
+        self.highest = highest
+        self.sub_buckets = sub_buckets
+        self._octaves = max(1, math.ceil(math.log2(highest / lowest)))
+        self.counts = np.zeros(self._octaves * sub_buckets + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float):
+        """记录一个延迟值(秒)"""
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram"):
+        """合并另一个参数相同的直方图"""
+        if len(other.counts) != len(self.counts) or other.lowest != self.lowest:
+            raise ValueError("histograms must have the same layout")
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        """返回第 p 百分位数的近似值(秒)，没有记录时返回 0"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(max(self._value(index), self.min), self.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self, percentiles: Iterable[float] = (50, 90, 95, 99, 99.9)) -> Dict[str, float]:
+        """汇总为 {"count", "mean", "min", "max", "p50", ...}，时间单位为毫秒"""
+        summary = {
+            "count": self.count,
+            "mean_ms": round(self.mean * 1000, 3),
+            "min_ms": round(self.min * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+        for p in percentiles:
+            summary[f"p{p:g}_ms"] = round(self.percentile(p) * 1000, 3)
+        return summary
+
+    def to_state(self) -> Dict:
+        """可 JSON 序列化的完整状态，只保存非空桶"""
+        nonzero = np.flatnonzero(self.counts)
+        return {
+            "layout": [self.lowest, self.highest, self.sub_buckets],
+            "buckets": dict(zip(nonzero.tolist(), self.counts[nonzero].tolist())),
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "LatencyHistogram":
+        histogram = cls(*state["layout"])
+        for index, count in state["buckets"].items():
+            histogram.counts[int(index)] = count
+        histogram.count = state["count"]
+        histogram.total = state["total"]
+        histogram.min = math.inf if state["min"] is None else state["min"]
+        histogram.max = state["max"]
+        return histogram
+
+    def _index(self, value: float) -> int:
+        scaled = value / self.lowest
+        if scaled < 1:
+            return 0
+        # frexp 返回 scaled = mantissa * 2^exponent，mantissa 在 [0.5, 1)
+        mantissa, exponent = math.frexp(scaled)
+        octave = exponent - 1
+        if octave >= self._octaves:
+            return len(self.counts) - 1
+        return 1 + octave * self.sub_buckets + int((mantissa * 2 - 1) * self.sub_buckets)
+
+    def _value(self, index: int) -> float:
+        """桶的中点值"""
+        if index == 0:
+            return self.lowest / 2
+        if index >= len(self.counts) - 1:
+            return self.max
+        octave, sub = divmod(index - 1, self.sub_buckets)
+        return self.lowest * 2 ** octave * (1 + (sub + 0.5) / self.sub_buckets)
+
+
+class LatencyRegistry:
+    """
+    按 (维度, 键, 阶段) 汇总的延迟直方图集合，线程安全
+    维度为 endpoint (接口路径) 或 target (host:port)，阶段为 acquire/connect/ttfb/download/client/total
+    """
+
+    PHASES = ("acquire", "connect", "ttfb", "download", "client", "total")
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, dimensions: Mapping[str, str], phases: Mapping[str, Optional[float]]):
+        """
+        记录一次请求的各阶段耗时
+        :param dimensions: 例如 {"endpoint": "/api/v1/write", "target": "10.0.0.1:8902"}
+        :param phases: {阶段: 秒}，值为 None 的阶段不记录
+        """
+        with self._lock:
+            for dimension, key in dimensions.items():
+                for phase, value in phases.items():
+                    if value is None:
+                        continue
+                    histogram = self._histograms.get((dimension, key, phase))
+                    if histogram is None:
+                        histogram = self._histograms[(dimension, key, phase)] = LatencyHistogram()
+                    histogram.record(max(0.0, value))
+
+    def histogram(self, dimension: str, key: str, phase: str) -> Optional[LatencyHistogram]:
+        return self._histograms.get((dimension, key, phase))
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def __len__(self) -> int:
+        return len(self._histograms)
+
+    def save(self, path: Union[str, Path]):
+        """保存全部直方图，用于 xdist 工作进程把数据交给主进程合并"""
+        with self._lock:
+            states = [[dimension, key, phase, histogram.to_state()]
+                      for (dimension, key, phase), histogram in self._histograms.items()]
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(states), encoding="utf-8")
+
+    def merge_files(self, paths: Iterable[Union[str, Path]], remove: bool = False) -> int:
+        """合并 save 保存的直方图文件，返回合并的文件数"""
+        merged = 0
+        for path in paths:
+            states = json.loads(Path(path).read_text(encoding="utf-8"))
+            with self._lock:
+                for dimension, key, phase, state in states:
+                    histogram = LatencyHistogram.from_state(state)
+                    existing = self._histograms.get((dimension, key, phase))
+                    if existing is None:
+                        self._histograms[(dimension, key, phase)] = histogram
+                    else:
+                        existing.merge(histogram)
+            if remove:
+                Path(path).unlink()
+            merged += 1
+        return merged
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, Dict[str, float]]]]:
+        """{维度: {键: {阶段: 统计}}}"""
+        result: Dict[str, Dict[str, Dict[str, Dict[str, float]]]] = {}
+        with self._lock:
+            for (dimension, key, phase), histogram in sorted(self._histograms.items()):
+                result.setdefault(dimension, {}).setdefault(key, {})[phase] = histogram.to_dict()
+        return result
+
+    def write_summary(self, results_dir: Union[str, Path]) -> Optional[Path]:
+        """
+        把汇总保存为结果目录中的 latency-summary.json，随 Allure 结果一起归档
+        :return: 汇总 JSON 的路径，没有记录时返回 None
+        """
+        if not self._histograms:
+            return None
+
+        results_dir = Path(results_dir)
+        results_dir.mkdir(parents=True, exist_ok=True)
+        summary_path = results_dir / "latency-summary.json"
+        summary_path.write_text(json.dumps(self.summary(), indent=2, ensure_ascii=False), encoding="utf-8")
+        return summary_path
+
+    def environment_properties(self, dimension: str = "endpoint", phase: str = "total") -> Dict[str, str]:
+        """
+        每个键一行的简要统计，写入 Allure 的 environment.properties 后显示在报告首页
+        :return: {"Latency.<键>": "count=... p50=...ms p99=...ms max=...ms"}
+        """
+        properties = {}
+        for key, phases in self.summary().get(dimension, {}).items():
+            stats = phases.get(phase)
+            if stats is None:
+                continue
+            # properties 文件的键中反斜杠、冒号、等号和空格需要转义
+            escaped = "".join("\\" + c if c in "\\:= " else c for c in key)
+            properties[f"Latency.{escaped}"] = (f"count={stats['count']} p50={stats['p50_ms']}ms "
+                                                f"p99={stats['p99_ms']}ms max={stats['max_ms']}ms")
+        return properties
+
+
+# 全局单例实例
+latency_registry = LatencyRegistry()
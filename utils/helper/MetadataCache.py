@@ -0,0 +1,106 @@
+import os
+import re
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+from cachetools import TTLCache
+
+
+class MetadataCache:
+    """
+    CnosDB 只读元数据查询 (SHOW / DESCRIBE / information_schema) 的结果缓存，基于 cachetools.TTLCache
+
+    默认关闭，通过 CnosDBHelper.enable_metadata_cache() 或环境变量 CNOSDB_METADATA_CACHE=1 开启。
+    经过同一个客户端的 DDL 会清空整个缓存，写入会清空该数据库的缓存 (写入可能自动创建表和字段)
+    """
+
+    READ_ONLY = re.compile(r"^\s*(SHOW|DESCRIBE|DESC)\b|\binformation_schema\s*\.", re.IGNORECASE)
+    DDL = re.compile(r"^\s*(CREATE|DROP|ALTER|TRUNCATE|RENAME|GRANT|REVOKE|RECOVER|MOVE|COMPACT)\b",
+                     re.IGNORECASE)
+
+    def __init__(self, maxsize: int = 256, ttl: float = 30, enabled: bool = False):
+        self.enabled = enabled
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def enable(self, maxsize: int = 256, ttl: float = 30):
+        """开启缓存，已有的缓存内容会被清空"""
+        with self._lock:
+            self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+            self.enabled = True
+
+    def disable(self):
+        with self._lock:
+            self._cache.clear()
+            self.enabled = False
+
+    # ------------------------- 查询 -------------------------
+    @staticmethod
+    def _statement(sql) -> str:
+        if isinstance(sql, bytes):
+            sql = sql.decode("utf-8", errors="replace")
+        return " ".join(sql.split())
+
+    def cacheable(self, sql) -> bool:
+        """是否为可以缓存的只读元数据语句，包含多条语句时不缓存"""
+        statement = self._statement(sql).rstrip(";")
+        return self.enabled and ";" not in statement and self.READ_ONLY.search(statement) is not None
+
+    def key(self, base_url: str, db_name: str, sql, username: str) -> Tuple[Hashable, ...]:
+        # 只规整空白和结尾的分号，带引号的标识符区分大小写
+        return base_url.rstrip("/"), db_name, username, self._statement(sql).rstrip(";")
+
+    def get(self, key: Tuple[Hashable, ...]):
+        with self._lock:
+            value = self._cache.get(key)
+            self._stats["hits" if value is not None else "misses"] += 1
+            return value
+
+    def put(self, key: Tuple[Hashable, ...], value):
+        with self._lock:
+            self._cache[key] = value
+
+    # ------------------------- 失效 -------------------------
+    def on_statement(self, sql):
+        """经过客户端的 SQL 是 DDL 时清空缓存"""
+        if self._cache and self.DDL.search(self._statement(sql)):
+            self.invalidate()
+
+    def invalidate(self, db_name: Optional[str] = None):
+        """清空缓存，db_name 不为 None 时只清空该数据库的缓存"""
+        with self._lock:
+            if not self._cache:
+                return
+            if db_name is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[1] == db_name]:
+                    self._cache.pop(key, None)
+            self._stats["invalidations"] += 1
+
+    # ------------------------- 统计 -------------------------
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "size": len(self._cache)}
+
+    def merge_stats(self, stats: Dict[str, int]):
+        """合并 xdist 工作进程的统计"""
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] += stats.get(name, 0)
+
+    def summary(self) -> Optional[str]:
+        stats = self.stats()
+        lookups = stats["hits"] + stats["misses"]
+        if not lookups:
+            return None
+        return (f"CnosDB 元数据缓存: 命中 {stats['hits']}, 未命中 {stats['misses']}, "
+                f"命中率 {stats['hits'] / lookups:.1%}, 失效 {stats['invalidations']} 次")
+
+
+metadata_cache = MetadataCache(
+    maxsize=int(os.getenv("CNOSDB_METADATA_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("CNOSDB_METADATA_CACHE_TTL", "30")),
+    enabled=os.getenv("CNOSDB_METADATA_CACHE", "0").lower() in ("1", "true", "yes")
+)
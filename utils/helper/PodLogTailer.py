@@ -0,0 +1,264 @@
+import heapq
+import itertools
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Pattern, Union
+
+import allure
+
+from utils.logger import log
+
+
+class LogLine(NamedTuple):
+    """一行 Pod 日志，timestamp 为 kubelet 记录的时间 (epoch 秒)，timestamp_ns 为不丢失精度的纳秒值"""
+    timestamp: float
+    pod: str
+    text: str
+    timestamp_ns: int
+
+
+class PodLogTailer:
+    """
+    同时跟踪多个 Pod 的日志 (follow 模式)，按时间戳合并为一个生成器
+
+    每个 Pod 一个读取线程，通过 read_namespaced_pod_log(follow=True, timestamps=True) 持续读取；
+    连接断开后从最后一行的时间戳继续读取，并去掉重新连接后重复读到的行。
+    每个 Pod 只保留最近 buffer_lines 行，未消费的合并队列最多 max_pending 行，超出时丢弃最旧的行。
+
+    with PodLogTailer(k8s, pods) as tailer:
+        k8s.exec_command(...)
+        tailer.wait_for(r"create vnode \\d+", timeout=60)
+
+    with 块中抛出异常时，各 Pod 缓冲区中的日志会作为 Allure 附件保存
+    """
+
+    def __init__(self, k8s, pods: List[Union[str, Dict]], container: str = None, buffer_lines: int = 1000,
+                 max_pending: int = 100000, tail_lines: Optional[int] = 0, reorder_window: float = 0.2,
+                 read_timeout: float = 30):
+        """
+        :param k8s: KubernetesHelper
+        :param pods: Pod 名称或 list_pods 返回的 Pod 信息
+        :param container: 容器名称
+        :param buffer_lines: 每个 Pod 保留的最近日志行数
+        :param max_pending: 合并队列中未消费的最大行数
+        :param tail_lines: 开始跟踪时先读取的历史行数，0 表示只读取新日志，None 表示全部
+        :param reorder_window: 按时间戳重新排序的等待窗口(秒)，越大越能容忍各 Pod 日志到达的先后差异
+        :param read_timeout: 单次读取的超时时间(秒)，超时后重新连接
+        """
+        self.k8s = k8s
+        self.pods = [pod["name"] if isinstance(pod, dict) else pod for pod in pods]
+        self.container = container
+        self.tail_lines = tail_lines
+        self.reorder_window = reorder_window
+        self.read_timeout = read_timeout
+        self.buffers: Dict[str, Deque[LogLine]] = {pod: deque(maxlen=buffer_lines) for pod in self.pods}
+        self.dropped = 0
+        self.errors: Dict[str, str] = {}
+
+        self._pending: Deque[LogLine] = deque(maxlen=max_pending)
+        self._cond = threading.Condition()
+        self._heap: List = []
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self._responses: Dict[str, object] = {}
+        self._threads: List[threading.Thread] = []
+        self._running = 0
+
+    # ------------------------- 生命周期 -------------------------
+    def start(self) -> "PodLogTailer":
+        """为每个 Pod 启动读取线程"""
+        self._running = len(self.pods)
+        for pod in self.pods:
+            thread = threading.Thread(target=self._follow_pod, args=(pod,), name=f"log-tailer-{pod}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """停止所有读取线程"""
+        self._stop.set()
+        for response in list(self._responses.values()):
+            try:
+                response.close()
+            except Exception:
+                pass
+        for thread in self._threads:
+            thread.join(timeout=5)
+        with self._cond:
+            self._cond.notify_all()
+
+    def __enter__(self) -> "PodLogTailer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        if exc_type is not None:
+            self.attach(f"Pod Logs ({exc_type.__name__})")
+        return False
+
+    # ------------------------- 读取日志 -------------------------
+    def follow(self, timeout: Optional[float] = None) -> Iterator[LogLine]:
+        """
+        按时间戳顺序产出所有 Pod 的新日志
+        :param timeout: 最长跟踪时间(秒)，None 表示直到所有 Pod 的日志流结束
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            now = time.monotonic()
+            with self._cond:
+                while self._pending:
+                    line = self._pending.popleft()
+                    heapq.heappush(self._heap, (line.timestamp_ns, next(self._seq), now, line))
+                finished = self._running == 0 or self._stop.is_set()
+
+            # 到达后超过重新排序窗口的行才产出，给其他 Pod 更早的日志留出到达的时间
+            while self._heap and (finished or self._heap[0][2] <= now - self.reorder_window):
+                yield heapq.heappop(self._heap)[3]
+
+            if finished and not self._heap:
+                return
+            if deadline is not None and now >= deadline:
+                return
+
+            wait = self.reorder_window if self._heap else 0.5
+            if deadline is not None:
+                wait = min(wait, max(deadline - now, 0))
+            with self._cond:
+                if not self._pending and self._running and not self._stop.is_set():
+                    self._cond.wait(wait)
+
+    def wait_for(self, match: Union[str, Pattern, Callable[[LogLine], bool]], timeout: float = 60,
+                 pods: Optional[List[str]] = None, description: str = None) -> LogLine:
+        """
+        等待任意 Pod 中出现匹配的日志行，出现后立即返回
+        :param match: 正则表达式，或以 LogLine 为参数的谓词函数
+        :param timeout: 最长等待时间(秒)
+        :param pods: 只检查这些 Pod 的日志，None 表示全部
+        :param description: 等待内容描述，默认使用正则表达式
+        :return: 第一条匹配的日志行
+        :raises TimeoutError: 超过 timeout 仍未出现时，各 Pod 缓冲区的日志作为 Allure 附件保存
+        """
+        if callable(match):
+            predicate = match
+        else:
+            pattern = re.compile(match)
+            predicate = lambda line: pattern.search(line.text) is not None  # noqa: E731
+        description = description or f"日志匹配 {getattr(match, 'pattern', match)}"
+
+        with allure.step(f"等待: {description}"):
+            start = time.monotonic()
+            for line in self.follow(timeout):
+                if (pods is None or line.pod in pods) and predicate(line):
+                    log.info(f"等待完成: {description} (耗时: {time.monotonic() - start:.3f}s) [{line.pod}] {line.text}")
+                    allure.attach(f"[{line.pod}] {line.text}", name="Matched Log Line",
+                                  attachment_type=allure.attachment_type.TEXT)
+                    return line
+
+            log.warning(f"等待超时: {description} (耗时: {time.monotonic() - start:.3f}s)")
+            self.attach("Pod Logs (Timeout)")
+            raise TimeoutError(f"等待超时 ({timeout}s): {description}")
+
+    def attach(self, name: str = "Pod Logs"):
+        """把各 Pod 缓冲区中的日志作为 Allure 附件保存"""
+        for pod, lines in self.buffers.items():
+            body = "\n".join(f"{self._format_time(line.timestamp)} {line.text}" for line in list(lines))
+            if pod in self.errors:
+                body = f"{body}\n--- 读取日志失败: {self.errors[pod]}"
+            allure.attach(body, name=f"{name} - {pod}", attachment_type=allure.attachment_type.TEXT)
+
+    # ------------------------- 内部方法 -------------------------
+    def _follow_pod(self, pod: str):
+        """读取单个 Pod 的日志，连接断开后从最后一行的时间戳继续"""
+        last_ns = None
+        same_ns = 0  # 时间戳等于 last_ns 的已读取行数
+        resume_from = None
+        try:
+            while not self._stop.is_set():
+                if resume_from is None:
+                    kwargs = {"tail_lines": self.tail_lines} if self.tail_lines is not None else {}
+                    resume_from = time.time()
+                else:
+                    kwargs = {"since_seconds": max(1, int(time.time() - resume_from) + 1)}
+                try:
+                    response = self.k8s.core_v1.read_namespaced_pod_log(
+                        pod, self.k8s.default_namespace, container=self.container, follow=True,
+                        timestamps=True, _preload_content=False, _request_timeout=(10, self.read_timeout),
+                        **kwargs
+                    )
+                except Exception as e:
+                    # Pod 不存在或已被删除时结束跟踪
+                    self.errors[pod] = str(e)
+                    return
+                self._responses[pod] = response
+                # since_seconds 只精确到秒，重新连接后会重复读到已读取的行，跳过它们直到出现新行；
+                # 时间戳相同的行是连续输出的不同日志，只跳过已读取的数量
+                replay, skip = last_ns is not None, same_ns
+                try:
+                    for line in self._iter_lines(pod, response):
+                        if replay:
+                            if line.timestamp_ns < last_ns:
+                                continue
+                            if line.timestamp_ns == last_ns and skip:
+                                skip -= 1
+                                continue
+                            replay = False
+                        if line.timestamp_ns == last_ns:
+                            same_ns += 1
+                        else:
+                            last_ns, same_ns = line.timestamp_ns, 1
+                        resume_from = line.timestamp
+                        self._push(line)
+                except Exception:
+                    # 读取超时或连接断开，从最后一行的时间戳重新连接
+                    self._stop.wait(0.5)
+                    continue
+                finally:
+                    self._responses.pop(pod, None)
+                    response.release_conn()
+                # 日志流正常结束说明容器已退出
+                return
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    def _iter_lines(self, pod: str, response) -> Iterator[LogLine]:
+        """把响应按行切分，解析行首的时间戳"""
+        partial = b""
+        for chunk in response.stream(64 * 1024, decode_content=True):
+            lines = (partial + chunk).split(b"\n")
+            partial = lines.pop()
+            for raw in lines:
+                yield self._parse_line(pod, raw.decode("utf-8", errors="replace"))
+        if partial:
+            yield self._parse_line(pod, partial.decode("utf-8", errors="replace"))
+
+    def _push(self, line: LogLine):
+        self.buffers[line.pod].append(line)
+        with self._cond:
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(line)
+            self._cond.notify_all()
+
+    @staticmethod
+    def _parse_line(pod: str, raw: str) -> LogLine:
+        """解析 `2024-01-01T00:00:00.123456789Z 日志内容`，没有时间戳的行使用当前时间"""
+        stamp, _, text = raw.partition(" ")
+        try:
+            seconds, _, fraction = stamp.rstrip("Z").partition(".")
+            if fraction and not fraction.isdigit():
+                raise ValueError(stamp)
+            epoch = datetime.strptime(seconds, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+            nanos = int(epoch) * 1_000_000_000 + int(fraction[:9].ljust(9, "0") or 0)
+            return LogLine(nanos / 1e9, pod, text.rstrip("\r"), nanos)
+        except ValueError:
+            nanos = time.time_ns()
+            return LogLine(nanos / 1e9, pod, raw.rstrip("\r"), nanos)
+
+    @staticmethod
+    def _format_time(timestamp: float) -> str:
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
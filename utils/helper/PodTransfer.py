@@ -0,0 +1,151 @@
+"""
+通过 exec websocket 传输 tar 流的辅助类，供 KubernetesHelper.copy_to_pod / copy_from_pod 使用
+
+数据按固定大小的块流过 websocket，任何时候内存中最多只保留一个块，可以传输 GB 级文件
+"""
+import hashlib
+import time
+from pathlib import PurePosixPath
+from typing import Dict, Optional
+
+from kubernetes.stream.ws_client import _IgnoredIO
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _as_text(data) -> str:
+    """binary 模式下 WSClient 返回 bytes，没有数据时返回空字符串"""
+    return data.decode("utf-8", "replace") if isinstance(data, bytes) else (data or "")
+
+
+class ExecStream:
+    """对 WSClient 的简单包装：丢弃完整输出的副本，收集 stderr，检查超时"""
+
+    def __init__(self, resp, timeout: Optional[float] = None):
+        self.resp = resp
+        # WSClient 默认把所有 stdout 复制一份保存在内存里，传输大文件时必须关闭
+        self.resp._all = _IgnoredIO()
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.stderr = ""
+
+    def check_deadline(self):
+        if self.deadline and time.monotonic() > self.deadline:
+            raise TimeoutError("传输超时")
+
+    def drain_stderr(self):
+        self.stderr += _as_text(self.resp.read_stderr(timeout=0))
+
+    def wait(self) -> Optional[int]:
+        """等待远端进程退出并返回退出码，超时返回 None"""
+        while self.resp.is_open():
+            self.check_deadline()
+            self.resp.update(timeout=1)
+            self.resp.read_stdout(timeout=0)
+            self.drain_stderr()
+        self.drain_stderr()
+        return self.resp.returncode
+
+    def close(self):
+        self.resp.close()
+
+
+class ExecStdinWriter:
+    """tarfile 的输出对象：每次 write 把一个数据块发送到远端进程的 stdin"""
+
+    def __init__(self, stream: ExecStream):
+        self.stream = stream
+        self.chunks = 0
+        self.max_chunk = 0
+
+    def write(self, data) -> int:
+        resp = self.stream.resp
+        if not resp.is_open():
+            raise IOError(f"远端进程已退出: {self.stream.stderr.strip()}")
+        self.stream.check_deadline()
+        resp.write_stdin(bytes(data))
+        self.chunks += 1
+        self.max_chunk = max(self.max_chunk, len(data))
+        # 及时取走远端输出，避免缓冲区增长
+        resp.update(timeout=0)
+        resp.read_stdout(timeout=0)
+        self.stream.drain_stderr()
+        return len(data)
+
+
+class ExecStdoutReader:
+    """tarfile 的输入对象：从远端进程的 stdout 按需读取数据块"""
+
+    def __init__(self, stream: ExecStream):
+        self.stream = stream
+        self.buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        resp = self.stream.resp
+        while size < 0 or len(self.buffer) < size:
+            data = resp.read_stdout(timeout=0)
+            if data:
+                self.buffer += data
+                continue
+            self.stream.drain_stderr()
+            if not resp.is_open():
+                break
+            self.stream.check_deadline()
+            resp.update(timeout=1)
+
+        size = len(self.buffer) if size < 0 else min(size, len(self.buffer))
+        chunk = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return chunk
+
+
+class HashingReader:
+    """读取文件的同时计算 sha256"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        self.sha256.update(data)
+        return data
+
+
+class TransferResult:
+    """单次传输的统计信息"""
+
+    @staticmethod
+    def new(pod_name: str, direction: str, source: str, destination: str) -> Dict:
+        return {"pod": pod_name, "direction": direction, "source": source, "destination": destination,
+                "bytes": 0, "files": 0, "chunks": 0, "duration": 0.0, "mb_per_sec": 0.0,
+                "verify_duration": 0.0, "checksums": {}, "verified": None, "mismatched": [],
+                "stderr": "", "error": None, "success": False}
+
+    @staticmethod
+    def finish(result: Dict, start: float) -> Dict:
+        result["duration"] = time.perf_counter() - start
+        if result["duration"] > 0:
+            result["mb_per_sec"] = result["bytes"] / 1024 / 1024 / result["duration"]
+        return result
+
+    @staticmethod
+    def verify(result: Dict, remote: Dict[str, str]):
+        """用远端 sha256sum 的结果校验本次传输的文件"""
+        result["mismatched"] = sorted(name for name, digest in result["checksums"].items()
+                                      if remote.get(name) != digest)
+        result["verified"] = not result["mismatched"]
+        if not result["verified"]:
+            result["error"] = f"校验和不一致: {result['mismatched']}"
+
+
+def parse_sha256sum(output: str) -> Dict[str, str]:
+    """解析 sha256sum 的输出: <64 位摘要><空格><空格或*><文件名>"""
+    return {line[66:]: line[:64] for line in output.splitlines() if len(line) > 66}
+
+
+def safe_member_parts(name: str, root: str) -> Optional[tuple]:
+    """tar 成员相对于 root 的路径分量，成员位于 root 之外或包含 .. 时返回 None"""
+    path = PurePosixPath(name)
+    if path.is_absolute() or ".." in path.parts or not path.parts or path.parts[0] != root:
+        return None
+    return path.parts[1:]
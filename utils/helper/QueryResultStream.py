@@ -0,0 +1,156 @@
+import json
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import requests
+
+
+class QueryResultStream:
+    """
+    CnosDB 查询结果的流式读取器
+    以 stream=True 发起请求，按内存预算分块解码响应体，结果集大小不影响内存占用
+
+    with CnosDBHelper.query_stream(base_url, "db4", "SELECT * FROM air") as result:
+        for chunk in result.iter_dataframes(memory_budget=64 * 1024 * 1024):
+            ...
+        print(result.time_to_first_row)
+    """
+
+    FORMATS = {
+        "csv": "application/csv",
+        "ndjson": "application/nd-json",
+    }
+
+    def __init__(self, response: requests.Response, fmt: str = "csv", started_at: Optional[float] = None):
+        """
+        :param response: 以 stream=True 发出的请求响应
+        :param fmt: 响应格式，csv 或 ndjson
+        :param started_at: 请求发出时的 time.perf_counter()，用于计算首行耗时
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError(f"fmt must be one of {tuple(self.FORMATS)}, got {fmt!r}")
+
+        self.response = response
+        self.fmt = fmt
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.time_to_first_byte = response.elapsed.total_seconds()
+        self.time_to_first_row: Optional[float] = None
+        self.rows = 0
+        self._consumed = False
+
+    # ------------------------- 逐行读取 -------------------------
+    def iter_rows(self, memory_budget: int = 16 * 1024 * 1024) -> Iterator[Dict[str, Any]]:
+        """逐行产出 {列名: 值}，CSV 格式内部按 memory_budget 分块解码"""
+        if self.fmt == "ndjson":
+            self._check_not_consumed()
+            for record in self._iter_ndjson():
+                self._count_rows(1)
+                yield record
+            return
+
+        for chunk in self.iter_dataframes(memory_budget=memory_budget):
+            yield from chunk.to_dict("records")
+
+    # ------------------------- 列式读取 -------------------------
+    def iter_dataframes(self, memory_budget: int = 64 * 1024 * 1024,
+                        initial_rows: int = 1024) -> Iterator[pd.DataFrame]:
+        """
+        按内存预算分块产出 DataFrame
+        :param memory_budget: 单个分块的内存上限(字节)，根据已解码分块的平均行大小动态调整行数
+        :param initial_rows: 第一个分块的行数，用于估算每行大小
+        """
+        rows_per_chunk = initial_rows
+        for chunk in self._iter_frames(lambda: rows_per_chunk):
+            self._count_rows(len(chunk))
+            yield chunk
+            # 按平均行大小向上取整估算，下一个分块不超过预算
+            chunk_bytes = int(chunk.memory_usage(index=False, deep=True).sum())
+            row_bytes = max(1, -(-chunk_bytes // max(1, len(chunk))))
+            rows_per_chunk = max(1, memory_budget // row_bytes)
+
+    def iter_arrays(self, memory_budget: int = 64 * 1024 * 1024) -> Iterator[Dict[str, np.ndarray]]:
+        """按内存预算分块产出 {列名: NumPy 数组}"""
+        for chunk in self.iter_dataframes(memory_budget=memory_budget):
+            yield {column: chunk[column].to_numpy() for column in chunk.columns}
+
+    def to_dataframe(self, memory_budget: int = 64 * 1024 * 1024,
+                     max_bytes: Optional[int] = None) -> pd.DataFrame:
+        """
+        分块读取并合并为一个 DataFrame
+        :param memory_budget: 单个分块的内存上限(字节)
+        :param max_bytes: 结果总大小上限，超过时抛出 MemoryError，None 表示不限制
+        """
+        chunks: List[pd.DataFrame] = []
+        total = 0
+        for chunk in self.iter_dataframes(memory_budget=memory_budget):
+            total += int(chunk.memory_usage(index=False, deep=True).sum())
+            if max_bytes is not None and total > max_bytes:
+                self.close()
+                raise MemoryError(f"查询结果超过内存上限 {max_bytes} 字节")
+            chunks.append(chunk)
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+
+    def to_arrays(self, memory_budget: int = 64 * 1024 * 1024,
+                  max_bytes: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """分块读取并合并为 {列名: NumPy 数组}"""
+        frame = self.to_dataframe(memory_budget=memory_budget, max_bytes=max_bytes)
+        return {column: frame[column].to_numpy() for column in frame.columns}
+
+    # ------------------------- 生命周期 -------------------------
+    def close(self):
+        """关闭响应，未读完的连接不会放回连接池"""
+        self.response.close()
+
+    def __enter__(self) -> "QueryResultStream":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ------------------------- 内部方法 -------------------------
+    def _iter_frames(self, next_size) -> Iterator[pd.DataFrame]:
+        self._check_not_consumed()
+        if self.fmt == "ndjson":
+            records: List[Dict[str, Any]] = []
+            for record in self._iter_ndjson():
+                records.append(record)
+                if len(records) >= next_size():
+                    yield pd.DataFrame.from_records(records)
+                    records = []
+            if records:
+                yield pd.DataFrame.from_records(records)
+            return
+
+        self.response.raw.decode_content = True
+        try:
+            reader = pd.read_csv(self.response.raw, iterator=True)
+        except pd.errors.EmptyDataError:
+            return
+        with reader:
+            while True:
+                try:
+                    chunk = reader.get_chunk(next_size())
+                except StopIteration:
+                    return
+                if chunk.empty:
+                    return
+                yield chunk
+
+    def _iter_ndjson(self) -> Iterator[Dict[str, Any]]:
+        for line in self.response.iter_lines(chunk_size=64 * 1024):
+            if line:
+                yield json.loads(line)
+
+    def _check_not_consumed(self):
+        if self._consumed:
+            raise RuntimeError("查询结果只能读取一次")
+        self._consumed = True
+
+    def _count_rows(self, count: int):
+        if self.time_to_first_row is None and count:
+            self.time_to_first_row = time.perf_counter() - self.started_at
+        self.rows += count
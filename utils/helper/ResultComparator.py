@@ -0,0 +1,428 @@
+import json
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import allure
+import numpy as np
+import pandas as pd
+
+
+Frames = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+
+# 同一行在同组中的序号与行哈希混合时使用的乘数 (64 位黄金分割常数)
+_OCCURRENCE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+class ComparisonResult:
+    """一次结果集比较的统计和前 N 条差异"""
+
+    def __init__(self, ordered: bool):
+        self.ordered = ordered
+        self.rows_expected = 0
+        self.rows_actual = 0
+        self.matched = 0
+        self.missing = 0
+        self.extra = 0
+        self.value_mismatches = 0
+        self.column_mismatches: Dict[str, int] = {}
+        self.missing_columns: List[str] = []
+        self.extra_columns: List[str] = []
+        self.mismatches: List[Dict[str, Any]] = []
+        self.elapsed = 0.0
+
+    @property
+    def equal(self) -> bool:
+        return not (self.missing or self.extra or self.value_mismatches or self.missing_columns
+                    or self.extra_columns)
+
+    def __bool__(self) -> bool:
+        return self.equal
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "equal": self.equal,
+            "ordered": self.ordered,
+            "rows_expected": self.rows_expected,
+            "rows_actual": self.rows_actual,
+            "matched": self.matched,
+            "missing": self.missing,
+            "extra": self.extra,
+            "value_mismatches": self.value_mismatches,
+            "column_mismatches": self.column_mismatches,
+            "missing_columns": self.missing_columns,
+            "extra_columns": self.extra_columns,
+            "elapsed": round(self.elapsed, 3),
+            "mismatches": self.mismatches,
+        }
+
+    def summary(self) -> str:
+        """简短的差异报告，只列出前 N 条差异"""
+        if self.equal:
+            return f"结果一致: {self.rows_expected} 行 (耗时: {self.elapsed:.3f}s)"
+        lines = [
+            f"结果不一致: 期望 {self.rows_expected} 行, 实际 {self.rows_actual} 行, 匹配 {self.matched} 行, "
+            f"缺少 {self.missing} 行, 多出 {self.extra} 行, 值不匹配 {self.value_mismatches} 行"
+        ]
+        if self.missing_columns or self.extra_columns:
+            lines.append(f"缺少列: {self.missing_columns}, 多出列: {self.extra_columns}")
+        if self.column_mismatches:
+            lines.append(f"各列不匹配行数: {self.column_mismatches}")
+        for mismatch in self.mismatches:
+            lines.append(json.dumps(mismatch, ensure_ascii=False, default=str))
+        return "\n".join(lines)
+
+    def attach(self, name: str = "Result Comparison"):
+        allure.attach(self.summary(), name=name, attachment_type=allure.attachment_type.TEXT)
+
+
+class ResultComparator:
+    """
+    表格型查询结果比较，基于 NumPy/pandas 向量化计算
+
+    ordered=True 时按位置逐行比较；ordered=False 时按行哈希匹配，与行的顺序无关：
+    不带容差的列计算 64 位行哈希，同一哈希内按容差列排序后依次配对，再按容差比较容差列；
+    同一哈希内行数不同或有超出容差的配对时，该组的行按容差重新归并配对。
+    输入可以是 DataFrame，也可以是 DataFrame 分块的迭代器 (例如 QueryResultStream.iter_dataframes)，
+    无序比较时每个分块只保留行哈希和容差列，有序比较时只保留两边未对齐的分块
+
+    result = ResultComparator(float_tolerance=1e-6, time_column="time", time_bucket="1s").compare(actual, expected)
+    assert result, result.summary()
+    """
+
+    def __init__(self, ordered: bool = False, tolerances: Optional[Dict[str, float]] = None,
+                 float_tolerance: Optional[float] = None, time_column: Optional[str] = None,
+                 time_bucket: Optional[str] = None, ignore_columns: Iterable[str] = (),
+                 max_mismatches: int = 20):
+        """
+        :param ordered: 是否按行的顺序比较
+        :param tolerances: {列名: 绝对容差}，这些列按 |actual - expected| <= 容差 比较
+        :param float_tolerance: 其余浮点列的绝对容差，None 表示精确比较
+        :param time_column: 时间列名，与 time_bucket 一起使用
+        :param time_bucket: 时间列向下取整的粒度，例如 "1s"、"1min"，用于对齐精度不同的时间戳
+        :param ignore_columns: 不参与比较的列
+        :param max_mismatches: 差异报告中最多保留的差异条数
+        """
+        self.ordered = ordered
+        self.tolerances = dict(tolerances or {})
+        self.float_tolerance = float_tolerance
+        self.time_column = time_column
+        self.time_bucket = time_bucket
+        self.ignore_columns = set(ignore_columns)
+        self.max_mismatches = max_mismatches
+
+    # ------------------------- 对外接口 -------------------------
+    def compare(self, actual: Frames, expected: Frames) -> ComparisonResult:
+        """比较 actual 与 expected，返回 ComparisonResult"""
+        start = time.perf_counter()
+        result = ComparisonResult(self.ordered)
+        actual_chunks, expected_chunks = self._chunks(actual), self._chunks(expected)
+        first_actual, first_expected = next(actual_chunks, None), next(expected_chunks, None)
+        if first_actual is None or first_expected is None:
+            first_actual = first_actual if first_actual is not None else self._empty_like(first_expected)
+            first_expected = first_expected if first_expected is not None else self._empty_like(first_actual)
+
+        columns = self._columns(first_actual, first_expected, result)
+        tolerances = self._column_tolerances(first_expected, columns)
+        actual_chunks = self._prepend(first_actual, actual_chunks)
+        expected_chunks = self._prepend(first_expected, expected_chunks)
+
+        if self.ordered:
+            self._compare_ordered(actual_chunks, expected_chunks, columns, tolerances, result)
+        else:
+            self._compare_unordered(actual, expected, actual_chunks, expected_chunks, columns, tolerances, result)
+
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    # ------------------------- 有序比较 -------------------------
+    def _compare_ordered(self, actual_chunks: Iterator[pd.DataFrame], expected_chunks: Iterator[pd.DataFrame],
+                         columns: List[str], tolerances: Dict[str, float], result: ComparisonResult):
+        """两边分块对齐后按位置逐行比较，只在内存中保留未对齐的部分"""
+        actual_buffer, expected_buffer = self._empty_like(None), self._empty_like(None)
+        actual_done = expected_done = False
+        offset = 0
+        while True:
+            while not actual_done and len(actual_buffer) <= len(expected_buffer):
+                chunk = next(actual_chunks, None)
+                if chunk is None:
+                    actual_done = True
+                else:
+                    actual_buffer = self._concat(actual_buffer, self._normalize(chunk, columns))
+            while not expected_done and len(expected_buffer) <= len(actual_buffer):
+                chunk = next(expected_chunks, None)
+                if chunk is None:
+                    expected_done = True
+                else:
+                    expected_buffer = self._concat(expected_buffer, self._normalize(chunk, columns))
+
+            rows = min(len(actual_buffer), len(expected_buffer))
+            if rows:
+                self._compare_aligned(actual_buffer.iloc[:rows], expected_buffer.iloc[:rows], columns,
+                                      tolerances, offset, np.arange(offset, offset + rows), result)
+                actual_buffer, expected_buffer = actual_buffer.iloc[rows:], expected_buffer.iloc[rows:]
+                offset += rows
+                result.rows_actual += rows
+                result.rows_expected += rows
+                continue
+
+            # 一边已经结束，另一边剩余的行都是缺少或多出的行
+            if actual_done and len(expected_buffer):
+                self._record_rows(expected_buffer, "missing", offset, result)
+                result.rows_expected += len(expected_buffer)
+                offset += len(expected_buffer)
+                expected_buffer = expected_buffer.iloc[:0]
+            if expected_done and len(actual_buffer):
+                self._record_rows(actual_buffer, "extra", offset, result)
+                result.rows_actual += len(actual_buffer)
+                offset += len(actual_buffer)
+                actual_buffer = actual_buffer.iloc[:0]
+            if actual_done and expected_done:
+                break
+
+    # ------------------------- 无序比较 -------------------------
+    def _compare_unordered(self, actual: Frames, expected: Frames, actual_chunks: Iterator[pd.DataFrame],
+                           expected_chunks: Iterator[pd.DataFrame], columns: List[str],
+                           tolerances: Dict[str, float], result: ComparisonResult):
+        """按行哈希配对两边的行，再比较容差列"""
+        tolerance_columns = [column for column in columns if column in tolerances]
+        exact_columns = [column for column in columns if column not in tolerances]
+
+        actual_keys, actual_values = self._digest(actual_chunks, columns, exact_columns, tolerance_columns)
+        expected_keys, expected_values = self._digest(expected_chunks, columns, exact_columns, tolerance_columns)
+        result.rows_actual, result.rows_expected = len(actual_keys), len(expected_keys)
+
+        actual_order = self._sort_order(actual_keys, actual_values)
+        expected_order = self._sort_order(expected_keys, expected_values)
+        actual_sorted_keys, expected_sorted_keys = actual_keys[actual_order], expected_keys[expected_order]
+        actual_pair_keys = self._pair_keys(actual_sorted_keys)
+        expected_pair_keys = self._pair_keys(expected_sorted_keys)
+        _, actual_index, expected_index = np.intersect1d(actual_pair_keys, expected_pair_keys,
+                                                         assume_unique=True, return_indices=True)
+        if tolerance_columns:
+            atol = np.array([tolerances[column] for column in tolerance_columns])
+            actual_index, expected_index = self._repair_groups(
+                actual_sorted_keys, actual_values[actual_order], expected_sorted_keys,
+                expected_values[expected_order], actual_index, expected_index, atol)
+        # 转换为原始的行号，按期望结果的顺序排列
+        by_expected = np.argsort(expected_order[expected_index], kind="stable")
+        actual_rows = actual_order[actual_index][by_expected]
+        expected_rows = expected_order[expected_index][by_expected]
+
+        missing_rows = np.setdiff1d(np.arange(len(expected_keys)), expected_rows, assume_unique=True)
+        extra_rows = np.setdiff1d(np.arange(len(actual_keys)), actual_rows, assume_unique=True)
+        result.missing, result.extra = len(missing_rows), len(extra_rows)
+        self._record_positions(expected, missing_rows, "missing", result)
+        self._record_positions(actual, extra_rows, "extra", result)
+
+        if tolerance_columns:
+            actual_frame = pd.DataFrame(actual_values[actual_rows], columns=tolerance_columns)
+            expected_frame = pd.DataFrame(expected_values[expected_rows], columns=tolerance_columns)
+            self._compare_aligned(actual_frame, expected_frame, tolerance_columns, tolerances, None,
+                                  expected_rows, result, actual_rows=actual_rows, actual_source=actual,
+                                  expected_source=expected)
+        else:
+            result.matched = len(expected_rows)
+
+    def _digest(self, chunks: Iterator[pd.DataFrame], columns: List[str], exact_columns: List[str],
+                tolerance_columns: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """每行只保留精确比较列的 64 位哈希和容差列的值"""
+        keys, values = [], []
+        for chunk in chunks:
+            chunk = self._normalize(chunk, columns)
+            if exact_columns:
+                keys.append(pd.util.hash_pandas_object(chunk[exact_columns], index=False).to_numpy())
+            else:
+                keys.append(np.zeros(len(chunk), dtype=np.uint64))
+            values.append(chunk[tolerance_columns].to_numpy(dtype=np.float64))
+        if not keys:
+            return np.empty(0, dtype=np.uint64), np.empty((0, len(tolerance_columns)))
+        return np.concatenate(keys), np.concatenate(values)
+
+    @staticmethod
+    def _sort_order(keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """按 (行哈希, 容差列) 排序，同一哈希内的行按容差列的值依次配对"""
+        return np.lexsort([values[:, i] for i in reversed(range(values.shape[1]))] + [keys])
+
+    def _repair_groups(self, actual_keys: np.ndarray, actual_values: np.ndarray, expected_keys: np.ndarray,
+                       expected_values: np.ndarray, actual_index: np.ndarray, expected_index: np.ndarray,
+                       atol: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        按位置配对的结果中，行数不同或有超出容差的配对的哈希组重新按容差配对，
+        避免组内缺少一行时之后的配对全部错位。输入均为已排序的数组，返回配对在排序后数组中的下标
+        """
+        close = np.isclose(actual_values[actual_index], expected_values[expected_index], rtol=0, atol=atol,
+                           equal_nan=True).all(axis=1)
+        unpaired = np.concatenate([np.delete(actual_keys, actual_index), np.delete(expected_keys, expected_index)])
+        dirty = np.union1d(actual_keys[actual_index][~close], unpaired)
+        if not len(dirty):
+            return actual_index, expected_index
+
+        keep = ~np.isin(expected_keys[expected_index], dirty)
+        actual_parts, expected_parts = [actual_index[keep]], [expected_index[keep]]
+        actual_bounds = np.searchsorted(actual_keys, dirty, "left"), np.searchsorted(actual_keys, dirty, "right")
+        expected_bounds = (np.searchsorted(expected_keys, dirty, "left"),
+                           np.searchsorted(expected_keys, dirty, "right"))
+        tolerance = atol.tolist()
+        for a_start, a_end, e_start, e_end in zip(*actual_bounds, *expected_bounds):
+            a_pairs, e_pairs = self._merge_group(actual_values[a_start:a_end].tolist(),
+                                                 expected_values[e_start:e_end].tolist(), tolerance)
+            actual_parts.append(np.asarray(a_pairs, dtype=np.intp) + a_start)
+            expected_parts.append(np.asarray(e_pairs, dtype=np.intp) + e_start)
+        return np.concatenate(actual_parts), np.concatenate(expected_parts)
+
+    @staticmethod
+    def _merge_group(actual: List[List[float]], expected: List[List[float]],
+                     tolerance: List[float]) -> Tuple[List[int], List[int]]:
+        """
+        同一哈希组内两边已排序的行按容差归并配对，剩余的行按位置配对 (作为值不匹配)，
+        再剩余的行是缺少或多出的行，不出现在返回的配对中
+        """
+
+        def close(a: float, e: float, tol: float) -> bool:
+            return a == e or (a != a and e != e) or abs(a - e) <= tol
+
+        pairs_a, pairs_e, left_a, left_e = [], [], [], []
+        i = j = 0
+        while i < len(actual) and j < len(expected):
+            a, e = actual[i], expected[j]
+            column = next((c for c, tol in enumerate(tolerance) if not close(a[c], e[c], tol)), None)
+            if column is None:
+                pairs_a.append(i)
+                pairs_e.append(j)
+                i, j = i + 1, j + 1
+            elif a[column] != a[column] or e[column] < a[column]:
+                # 排序时 NaN 排在最后
+                left_e.append(j)
+                j += 1
+            else:
+                left_a.append(i)
+                i += 1
+        left_a.extend(range(i, len(actual)))
+        left_e.extend(range(j, len(expected)))
+        count = min(len(left_a), len(left_e))
+        return pairs_a + left_a[:count], pairs_e + left_e[:count]
+
+    @staticmethod
+    def _pair_keys(sorted_keys: np.ndarray) -> np.ndarray:
+        """行哈希与该行在同一哈希中的序号混合，重复的行按出现次数配对"""
+        positions = np.arange(len(sorted_keys))
+        starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]] if len(sorted_keys) else np.empty(0, bool)
+        occurrence = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+        return sorted_keys ^ (occurrence.astype(np.uint64) * _OCCURRENCE_MULTIPLIER)
+
+    # ------------------------- 内部方法 -------------------------
+    def _compare_aligned(self, actual: pd.DataFrame, expected: pd.DataFrame, columns: List[str],
+                         tolerances: Dict[str, float], offset: Optional[int], expected_rows: np.ndarray,
+                         result: ComparisonResult, actual_rows: Optional[np.ndarray] = None,
+                         actual_source: Frames = None, expected_source: Frames = None):
+        """逐列向量化比较已经对齐的两组行"""
+        row_mismatch = np.zeros(len(expected), dtype=bool)
+        cell_mismatches = []
+        for column in columns:
+            a, e = actual[column].to_numpy(), expected[column].to_numpy()
+            if column in tolerances:
+                mismatch = ~np.isclose(a.astype(np.float64), e.astype(np.float64), rtol=0,
+                                       atol=tolerances[column], equal_nan=True)
+            else:
+                mismatch = ~((a == e) | (pd.isna(a) & pd.isna(e)))
+            count = int(mismatch.sum())
+            if count:
+                result.column_mismatches[column] = result.column_mismatches.get(column, 0) + count
+                row_mismatch |= mismatch
+                cell_mismatches.append((column, np.flatnonzero(mismatch), a, e))
+
+        mismatched_rows = int(row_mismatch.sum())
+        result.value_mismatches += mismatched_rows
+        result.matched += len(expected) - mismatched_rows
+
+        for column, positions, a, e in cell_mismatches:
+            for position in positions[:self._remaining(result)]:
+                mismatch = {"type": "value", "column": column, "expected": self._value(e[position]),
+                            "actual": self._value(a[position])}
+                if actual_rows is None:
+                    mismatch["row"] = int(offset + position)
+                else:
+                    mismatch["expected_row"] = int(expected_rows[position])
+                    mismatch["actual_row"] = int(actual_rows[position])
+                result.mismatches.append(mismatch)
+
+    def _record_rows(self, frame: pd.DataFrame, kind: str, offset: int, result: ComparisonResult):
+        """有序比较中一边多出的行"""
+        setattr(result, kind, getattr(result, kind) + len(frame))
+        for position in range(min(len(frame), self._remaining(result))):
+            result.mismatches.append({"type": kind, "row": offset + position,
+                                      "values": self._row(frame.iloc[position])})
+
+    def _record_positions(self, source: Frames, positions: np.ndarray, kind: str, result: ComparisonResult):
+        """无序比较中缺少或多出的行，输入为 DataFrame 时附带行的内容"""
+        for position in positions[:self._remaining(result)]:
+            mismatch = {"type": kind, "row": int(position)}
+            if isinstance(source, pd.DataFrame):
+                mismatch["values"] = self._row(source.iloc[int(position)])
+            result.mismatches.append(mismatch)
+
+    def _remaining(self, result: ComparisonResult) -> int:
+        return max(self.max_mismatches - len(result.mismatches), 0)
+
+    def _normalize(self, frame: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """只保留比较的列，统一数值类型，时间列按 time_bucket 向下取整"""
+        frame = frame[columns].reset_index(drop=True)
+        converted = {}
+        for column in columns:
+            series = frame[column]
+            if column == self.time_column:
+                series = pd.to_datetime(series, utc=True)
+                if self.time_bucket:
+                    series = series.dt.floor(self.time_bucket)
+                converted[column] = series
+            elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                # 整数与浮点数按数值比较，CSV 解析出的 int64 与 float64 应视为相同
+                converted[column] = series.astype(np.float64)
+        return frame.assign(**converted) if converted else frame
+
+    def _columns(self, actual: pd.DataFrame, expected: pd.DataFrame, result: ComparisonResult) -> List[str]:
+        """两边共有的列按期望结果的顺序参与比较，缺少或多出的列记录在结果中"""
+        expected_columns = [c for c in expected.columns if c not in self.ignore_columns]
+        actual_columns = [c for c in actual.columns if c not in self.ignore_columns]
+        result.missing_columns = [c for c in expected_columns if c not in actual_columns]
+        result.extra_columns = [c for c in actual_columns if c not in expected_columns]
+        return [c for c in expected_columns if c in actual_columns]
+
+    def _column_tolerances(self, expected: pd.DataFrame, columns: List[str]) -> Dict[str, float]:
+        tolerances = {column: tol for column, tol in self.tolerances.items() if column in columns}
+        if self.float_tolerance is not None:
+            for column in columns:
+                if column not in tolerances and pd.api.types.is_float_dtype(expected[column]):
+                    tolerances[column] = self.float_tolerance
+        return tolerances
+
+    @staticmethod
+    def _chunks(frames: Frames) -> Iterator[pd.DataFrame]:
+        if isinstance(frames, pd.DataFrame):
+            return iter([frames])
+        return iter(frames)
+
+    @staticmethod
+    def _prepend(first: pd.DataFrame, rest: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        yield first
+        yield from rest
+
+    @staticmethod
+    def _empty_like(frame: Optional[pd.DataFrame]) -> pd.DataFrame:
+        return frame.iloc[:0] if frame is not None else pd.DataFrame()
+
+    @staticmethod
+    def _concat(buffer: pd.DataFrame, chunk: pd.DataFrame) -> pd.DataFrame:
+        return chunk if buffer.empty else pd.concat([buffer, chunk], ignore_index=True)
+
+    @staticmethod
+    def _row(row: pd.Series) -> Dict[str, Any]:
+        return {column: ResultComparator._value(value) for column, value in row.items()}
+
+    @staticmethod
+    def _value(value: Any) -> Any:
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, pd.Timestamp):
+            return value.isoformat()
+        return value
@@ -0,0 +1,211 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import allure
+import pandas as pd
+
+from utils.logger import log
+
+
+class ScenarioStep:
+    """场景中的一个步骤及其执行记录，时间为相对场景开始的秒数"""
+
+    PENDING = "pending"
+    PASSED = "passed"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+    def __init__(self, name: str, func: Callable[[], Any], depends: Sequence[str]):
+        self.name = name
+        self.func = func
+        self.depends = tuple(depends)
+        self.status = self.PENDING
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.start: Optional[float] = None
+        self.end: Optional[float] = None
+        self.thread: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.start is None or self.end is None else self.end - self.start
+
+
+class ScenarioRunner:
+    """
+    按依赖关系并发执行场景步骤，没有依赖关系的步骤在线程池中同时执行
+
+    runner = ScenarioRunner("VNode Allocation")
+    runner.add("setup", tester.setup)
+    runner.add("drop database", lambda: tester.manage_database("drop"), depends=["setup"])
+    runner.add("fill disks", tester.prepare_storage_conditions, depends=["setup"])
+    runner.add("write", tester.write_test_data, depends=["drop database", "fill disks"])
+    results = runner.run()
+
+    每个步骤是场景 Allure 步骤下的一个子步骤，步骤内部的 Allure 步骤和附件嵌套在其中
+    (依赖 allure-python 2.13 的线程上下文: 新线程以主线程当前的步骤为父步骤，因此每次 run 使用新的线程池)。
+    任一步骤失败后不再启动新的步骤，等待执行中的步骤结束后抛出第一个异常，未执行的步骤标记为 skipped。
+    结束时输出每个步骤的时间线和关键路径，即决定场景总耗时的步骤链。
+    """
+
+    def __init__(self, name: str, max_workers: int = 4):
+        """
+        :param name: 场景名称，作为 Allure 父步骤的标题
+        :param max_workers: 最大并发步骤数
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.duration: Optional[float] = None
+        self._steps: Dict[str, ScenarioStep] = {}
+
+    def add(self, name: str, func: Callable[[], Any], depends: Sequence[str] = ()) -> str:
+        """添加步骤，depends 中的步骤全部成功后才会执行，返回步骤名便于作为其他步骤的依赖"""
+        if name in self._steps:
+            raise ValueError(f"duplicate step {name!r}")
+        self._steps[name] = ScenarioStep(name, func, depends)
+        return name
+
+    def step(self, name: str, depends: Sequence[str] = ()):
+        """以装饰器形式添加步骤"""
+
+        def decorator(func: Callable[[], Any]) -> Callable[[], Any]:
+            self.add(name, func, depends)
+            return func
+
+        return decorator
+
+    @property
+    def steps(self) -> List[ScenarioStep]:
+        return list(self._steps.values())
+
+    # ------------------------- 执行 -------------------------
+    def run(self) -> Dict[str, Any]:
+        """执行所有步骤，返回 {步骤名: 返回值}"""
+        self._validate()
+        for step in self._steps.values():
+            step.status, step.result, step.error = ScenarioStep.PENDING, None, None
+            step.start = step.end = step.thread = None
+
+        failed: Optional[ScenarioStep] = None
+        with allure.step(f"Scenario: {self.name}"):
+            origin = time.perf_counter()
+            pending = list(self._steps.values())
+            running = {}
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scenario") as executor:
+                while True:
+                    if failed is None:
+                        for step in [s for s in pending if self._ready(s)]:
+                            pending.remove(step)
+                            running[executor.submit(self._execute, step, origin)] = step
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        step = running.pop(future)
+                        if step.status == ScenarioStep.FAILED and failed is None:
+                            failed = step
+            self.duration = time.perf_counter() - origin
+
+            for step in pending:
+                step.status = ScenarioStep.SKIPPED
+            try:
+                self._report()
+            except Exception as e:
+                # 报告只是辅助信息，不能掩盖步骤本身的失败
+                if failed is None:
+                    raise
+                log.error(f"场景 {self.name} 的时间线报告生成失败: {e!r}")
+
+        if failed is not None:
+            raise failed.error
+        return {step.name: step.result for step in self._steps.values()}
+
+    # ------------------------- 报告 -------------------------
+    def timeline(self) -> pd.DataFrame:
+        """每个步骤的开始时间、耗时、等待时间 (依赖完成到开始执行) 和状态，单位为秒"""
+        rows = []
+        for step in self._steps.values():
+            # 被跳过的依赖没有结束时间，依赖它的步骤也不会执行
+            ready = max((self._steps[d].end for d in step.depends if self._steps[d].end is not None), default=0.0)
+            rows.append({
+                "step": step.name,
+                "status": step.status,
+                "start": step.start,
+                "duration": step.duration,
+                "waited": None if step.start is None else step.start - ready,
+                "thread": step.thread,
+                "depends": ", ".join(step.depends),
+            })
+        return pd.DataFrame(rows, columns=["step", "status", "start", "duration", "waited", "thread", "depends"])
+
+    def critical_path(self) -> List[ScenarioStep]:
+        """从最后结束的步骤开始，沿最晚完成的依赖回溯得到的步骤链"""
+        finished = [step for step in self._steps.values() if step.end is not None]
+        if not finished:
+            return []
+        path = [max(finished, key=lambda step: step.end)]
+        while True:
+            depends = [self._steps[name] for name in path[-1].depends if self._steps[name].end is not None]
+            if not depends:
+                break
+            path.append(max(depends, key=lambda step: step.end))
+        return path[::-1]
+
+    def summary(self) -> str:
+        path = self.critical_path()
+        busy = sum(step.duration or 0.0 for step in self._steps.values())
+        chain = " -> ".join(f"{step.name} ({step.duration:.2f}s)" for step in path)
+        return (f"场景 {self.name}: {len(self._steps)} 个步骤, 耗时 {self.duration or 0.0:.2f}s "
+                f"(步骤累计 {busy:.2f}s)\n关键路径: {chain or '-'}")
+
+    # ------------------------- 内部方法 -------------------------
+    def _execute(self, step: ScenarioStep, origin: float):
+        step.thread = threading.current_thread().name
+        with allure.step(step.name):
+            step.start = time.perf_counter() - origin
+            try:
+                step.result = step.func()
+                step.status = ScenarioStep.PASSED
+            except BaseException as e:
+                step.error = e
+                step.status = ScenarioStep.FAILED
+                log.error(f"场景步骤 {step.name} 失败: {e!r}")
+                raise
+            finally:
+                step.end = time.perf_counter() - origin
+                log.info(f"场景步骤 {step.name} 结束: {step.status}, 耗时 {step.duration:.2f}s")
+
+    def _ready(self, step: ScenarioStep) -> bool:
+        return all(self._steps[name].status == ScenarioStep.PASSED for name in step.depends)
+
+    def _validate(self):
+        """检查依赖是否存在以及是否有环"""
+        for step in self._steps.values():
+            unknown = [name for name in step.depends if name not in self._steps]
+            if unknown:
+                raise ValueError(f"step {step.name!r} depends on unknown steps {unknown}")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str, chain: List[str]):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"dependency cycle: {' -> '.join(chain + [name])}")
+            visiting.add(name)
+            for depend in self._steps[name].depends:
+                visit(depend, chain + [name])
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self._steps:
+            visit(name, [])
+
+    def _report(self):
+        summary = self.summary()
+        table = self.timeline().to_string(index=False, float_format=lambda value: f"{value:.2f}")
+        log.info(summary)
+        allure.attach(f"{summary}\n\n{table}", name=f"Scenario Timeline - {self.name}",
+                      attachment_type=allure.attachment_type.TEXT)
@@ -0,0 +1,214 @@
+import shlex
+import time
+from typing import Dict, List, Optional, Set, Union
+
+import allure
+import numpy as np
+import pandas as pd
+
+from utils.logger import log
+
+
+class StorageSnapshot:
+    """
+    一次存储探测的结果
+
+    vnodes: 每行一个 vnode 目录，列为 pod、node、kind (data/wal/...)、tenant、database、vnode、bytes
+    disks: 每行一个 Pod 的数据盘，列为 pod、node、size_bytes、used_bytes、available_bytes
+    errors: 探测失败的 Pod 及原因
+    """
+
+    VNODE_COLUMNS = ["pod", "node", "kind", "tenant", "database", "vnode", "bytes"]
+    DISK_COLUMNS = ["pod", "node", "size_bytes", "used_bytes", "available_bytes"]
+
+    def __init__(self, vnodes: pd.DataFrame, disks: pd.DataFrame, errors: Dict[str, str], taken_at: float,
+                 duration: float):
+        self.vnodes = vnodes
+        self.disks = disks
+        self.errors = errors
+        self.taken_at = taken_at
+        self.duration = duration
+
+    # ------------------------- 汇总 -------------------------
+    def by_node(self, database: Optional[str] = None, kind: Optional[str] = None) -> pd.Series:
+        """每个 Pod 上 vnode 的总字节数，没有 vnode 的 Pod 为 0"""
+        vnodes = self._filter(database, kind)
+        totals = vnodes.groupby("pod")["bytes"].sum()
+        return totals.reindex(self.disks["pod"], fill_value=0).astype(np.int64).rename("bytes")
+
+    def by_database(self, kind: Optional[str] = None) -> pd.DataFrame:
+        """行为 Pod、列为数据库的字节数"""
+        vnodes = self._filter(None, kind)
+        table = vnodes.pivot_table(index="pod", columns="database", values="bytes", aggfunc="sum", fill_value=0)
+        return table.reindex(self.disks["pod"], fill_value=0)
+
+    def vnode_pods(self, database: str) -> Set[str]:
+        """保存了该数据库 vnode 的 Pod"""
+        return set(self._filter(database, None)["pod"])
+
+    def skew(self, database: Optional[str] = None, kind: Optional[str] = None) -> Dict[str, float]:
+        """
+        各 Pod 存储量的倾斜程度
+        max_mean: 最大值 / 平均值，1 表示完全均衡
+        gini: 基尼系数，0 表示完全均衡，越接近 1 越集中在少数 Pod
+        cv: 变异系数 (标准差 / 平均值)
+        """
+        values = self.by_node(database, kind).to_numpy(dtype=np.float64)
+        mean = values.mean() if len(values) else 0.0
+        return {
+            "pods": len(values),
+            "total_bytes": float(values.sum()),
+            "max_mean": float(values.max() / mean) if mean else 0.0,
+            "gini": self.gini(values),
+            "cv": float(values.std() / mean) if mean else 0.0,
+        }
+
+    @staticmethod
+    def gini(values) -> float:
+        """基尼系数，输入为非负数"""
+        values = np.sort(np.asarray(values, dtype=np.float64))
+        n = len(values)
+        if n == 0 or values.sum() == 0:
+            return 0.0
+        ranks = np.arange(1, n + 1)
+        return float((2 * (ranks * values).sum()) / (n * values.sum()) - (n + 1) / n)
+
+    def growth(self, before: "StorageSnapshot") -> pd.DataFrame:
+        """与之前的快照比较，返回每个 Pod、数据库的字节数增长"""
+        keys = ["pod", "database"]
+        after_totals = self.vnodes.groupby(keys)["bytes"].sum()
+        before_totals = before.vnodes.groupby(keys)["bytes"].sum()
+        frame = pd.concat([before_totals.rename("before"), after_totals.rename("after")], axis=1).fillna(0)
+        frame = frame.astype(np.int64)
+        frame["growth"] = frame["after"] - frame["before"]
+        frame.attrs["seconds"] = self.taken_at - before.taken_at
+        return frame.reset_index()
+
+    def attach(self, name: str = "Storage Probe"):
+        """把探测结果作为 Allure 附件保存"""
+        allure.attach(self.disks.to_csv(index=False), name=f"{name} - disks",
+                      attachment_type=allure.attachment_type.CSV)
+        allure.attach(self.vnodes.to_csv(index=False), name=f"{name} - vnodes",
+                      attachment_type=allure.attachment_type.CSV)
+        if self.errors:
+            allure.attach("\n".join(f"{pod}: {error}" for pod, error in self.errors.items()),
+                          name=f"{name} - errors", attachment_type=allure.attachment_type.TEXT)
+
+    def _filter(self, database: Optional[str], kind: Optional[str]) -> pd.DataFrame:
+        vnodes = self.vnodes
+        if database is not None:
+            vnodes = vnodes[vnodes["database"] == database]
+        if kind is not None:
+            vnodes = vnodes[vnodes["kind"] == kind]
+        return vnodes
+
+
+class StorageProbe:
+    """
+    并发采集所有 query_tskv Pod 的数据盘用量 (df) 和每个数据库、每个 vnode 的目录大小 (du)
+
+    probe = StorageProbe(k8s)
+    snapshot = probe.collect()
+    snapshot.vnode_pods("db4")      # 保存了 db4 vnode 的 Pod
+    snapshot.skew()                 # {"max_mean": ..., "gini": ..., "cv": ...}
+
+    数据目录结构: <data_dir>/<kind>/<tenant>.<database>/<vnode id>，kind 为 data、wal 等
+    """
+
+    LABEL_SELECTOR = "cnosdb.com/role=query_tskv"
+    DATA_DIR = "/var/lib/cnosdb/data"
+
+    def __init__(self, k8s, label_selector: str = LABEL_SELECTOR, data_dir: str = DATA_DIR,
+                 max_workers: int = 8, timeout: Optional[float] = 60, container: str = None):
+        """
+        :param k8s: KubernetesHelper
+        :param label_selector: 需要探测的 Pod
+        :param data_dir: CnosDB 数据目录
+        :param max_workers: 最大并发数
+        :param timeout: 单个 Pod 的探测超时时间(秒)
+        :param container: 容器名称
+        """
+        self.k8s = k8s
+        self.label_selector = label_selector
+        self.data_dir = data_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.container = container
+
+    def command(self) -> List[str]:
+        """
+        df 与 du 在同一次 exec 中执行，du 只统计到 vnode 一级目录，单位为 KiB
+        compaction 过程中文件可能在 du 遍历时被删除，du 的退出码不作为失败
+        """
+        data_dir = shlex.quote(self.data_dir)
+        return ["sh", "-c", f"cd {data_dir} || exit 1; df -Pk . | tail -n 1; echo ---; "
+                            f"du -k -d 3 . 2>/dev/null; exit 0"]
+
+    def collect(self, pods: Optional[List[Union[str, Dict]]] = None) -> StorageSnapshot:
+        """
+        探测所有 Pod，单个 Pod 失败时记录在 errors 中，不影响其他 Pod
+        :param pods: list_pods 返回的 Pod 信息，None 表示按 label_selector 查询
+        """
+        start = time.perf_counter()
+        taken_at = time.time()
+        if pods is None:
+            pods = self.k8s.list_pods(label_selector=self.label_selector)
+        nodes = {pod["name"]: pod.get("node") for pod in pods if isinstance(pod, dict)}
+
+        results = self.k8s.exec_many(pods, self.command(), max_workers=self.max_workers,
+                                     timeout=self.timeout, container=self.container)
+
+        vnode_rows, disk_rows, errors = [], [], {}
+        for pod_name in sorted(results):
+            result = results[pod_name]
+            try:
+                if not result["success"]:
+                    raise ValueError(result["error"] or result["stderr"].strip() or f"退出码 {result['exit_code']}")
+                disk, vnodes = self.parse(result["stdout"])
+            except ValueError as e:
+                errors[pod_name] = str(e)
+                continue
+            node = nodes.get(pod_name)
+            disk_rows.append({"pod": pod_name, "node": node, **disk})
+            vnode_rows.extend({"pod": pod_name, "node": node, **row} for row in vnodes)
+
+        snapshot = StorageSnapshot(
+            vnodes=pd.DataFrame(vnode_rows, columns=StorageSnapshot.VNODE_COLUMNS).astype(
+                {"vnode": np.int64, "bytes": np.int64}),
+            disks=pd.DataFrame(disk_rows, columns=StorageSnapshot.DISK_COLUMNS),
+            errors=errors,
+            taken_at=taken_at,
+            duration=time.perf_counter() - start
+        )
+        log.info(f"存储探测完成: {len(snapshot.disks)} 个 Pod, {len(snapshot.vnodes)} 个 vnode 目录, "
+                 f"失败 {len(errors)} 个, 耗时 {snapshot.duration:.2f}s")
+        if errors:
+            log.warning(f"存储探测失败的 Pod: {errors}")
+        return snapshot
+
+    @staticmethod
+    def parse(output: str):
+        """解析探测命令的输出，返回 (磁盘用量, vnode 目录列表)"""
+        df_part, separator, du_part = output.partition("\n---\n")
+        if not separator:
+            raise ValueError(f"无法解析探测输出: {output[:200]!r}")
+        fields = df_part.strip().splitlines()[-1].split()
+        if len(fields) < 4:
+            raise ValueError(f"无法解析 df 输出: {df_part!r}")
+        disk = {
+            "size_bytes": int(fields[1]) * 1024,
+            "used_bytes": int(fields[2]) * 1024,
+            "available_bytes": int(fields[3]) * 1024,
+        }
+
+        vnodes = []
+        for line in du_part.splitlines():
+            size, _, path = line.partition("\t")
+            parts = path.split("/")
+            # ./<kind>/<tenant>.<database>/<vnode id>
+            if len(parts) != 4 or not parts[3].isdigit() or "." not in parts[2]:
+                continue
+            tenant, database = parts[2].split(".", 1)
+            vnodes.append({"kind": parts[1], "tenant": tenant, "database": database,
+                           "vnode": int(parts[3]), "bytes": int(size) * 1024})
+        return disk, vnodes
@@ -4,9 +4,10 @@ import requests
 import allure
 
 from random import random
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from urllib.parse import urljoin
 
+from utils.helper.ResultComparator import ComparisonResult, Frames, ResultComparator
 from utils.logger import log
 
 
@@ -82,6 +83,23 @@ class TestHelper:
     @staticmethod
     def compare_dicts(actual: Dict, expected: Dict, path: str = "") -> bool:
         """深度比较字典并生成差异报告"""
+        diff_messages = TestHelper._dict_differences(actual, expected, path)
+
+        if diff_messages:
+            diff_report = "\n".join(diff_messages)
+            allure.attach(
+                diff_report,
+                name="Dictionary Comparison",
+                attachment_type=allure.attachment_type.TEXT
+            )
+            log.error(f"字典比较失败:\n{diff_report}")
+            return False
+
+        return True
+
+    @staticmethod
+    def _dict_differences(actual: Dict, expected: Dict, path: str = "") -> List[str]:
+        """递归收集两个字典的差异，嵌套字典的差异也包含在内"""
         diff_messages = []
 
         for key in expected:
@@ -95,21 +113,29 @@ class TestHelper:
                 if not isinstance(actual[key], dict):
                     diff_messages.append(f"类型不匹配: {current_path} (期望dict, 实际{type(actual[key])})")
                 else:
-                    TestHelper.compare_dicts(actual[key], expected[key], current_path)
+                    diff_messages.extend(TestHelper._dict_differences(actual[key], expected[key], current_path))
             elif actual[key] != expected[key]:
                 diff_messages.append(
                     f"值不匹配: {current_path} (期望: {expected[key]}, 实际: {actual[key]})"
                 )
 
-        if diff_messages:
-            diff_report = "\n".join(diff_messages)
-            allure.attach(
-                diff_report,
-                name="Dictionary Comparison",
-                attachment_type=allure.attachment_type.TEXT
-            )
-            log.error(f"字典比较失败:\n{diff_report}")
-            return False
-
-        return True
+        return diff_messages
 
+    @staticmethod
+    def compare_results(actual: Frames, expected: Frames, description: str = "查询结果",
+                        **options) -> ComparisonResult:
+        """
+        比较两个表格型查询结果，差异报告记录到 Allure 和日志
+        :param actual: 实际结果，DataFrame 或 DataFrame 分块的迭代器
+        :param expected: 期望结果，DataFrame 或 DataFrame 分块的迭代器
+        :param description: 比较内容描述
+        :param options: ResultComparator 的参数，例如 ordered、tolerances、time_bucket
+        """
+        with allure.step(f"比较{description}"):
+            result = ResultComparator(**options).compare(actual, expected)
+            result.attach(f"{description} Comparison")
+            if result.equal:
+                log.info(result.summary())
+            else:
+                log.error(f"{description}比较失败:\n{result.summary()}")
+            return result
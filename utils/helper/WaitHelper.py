@@ -0,0 +1,271 @@
+import json
+import shlex
+import time
+from typing import Any, Callable, Dict, Optional
+
+import allure
+
+from utils.helper.CnosDBHelper import CnosDBHelper
+from utils.logger import log
+
+
+class WaitHelper:
+    """
+    事件驱动的等待工具，用于替代固定的 sleep
+    轮询等待按指数退避重试直到截止时间，Kubernetes 资源等待基于 watch 事件流；
+    每次等待的实际耗时都会记录到 Allure
+
+    WaitHelper.wait_until(
+        WaitHelper.database_exists(base_url, "db4"),
+        description="数据库 db4 创建完成",
+        timeout=30
+    )
+    """
+
+    # ------------------------- 轮询等待 -------------------------
+    @staticmethod
+    def wait_until(
+            predicate: Callable[[], Any],
+            description: str,
+            timeout: float = 60,
+            initial_interval: float = 0.1,
+            max_interval: float = 5,
+            backoff: float = 2.0
+    ) -> Any:
+        """
+        轮询 predicate 直到返回真值
+        :param predicate: 无参可调用对象，返回真值表示条件满足；抛出的异常视为条件未满足
+        :param description: 等待内容描述，用于 Allure 和日志
+        :param timeout: 最长等待时间(秒)
+        :param initial_interval: 首次重试间隔(秒)
+        :param max_interval: 最大重试间隔(秒)
+        :param backoff: 重试间隔的增长倍数
+        :return: predicate 最后一次的返回值
+        :raises TimeoutError: 超过 timeout 仍未满足时
+        """
+        with allure.step(f"等待: {description}"):
+            start = time.monotonic()
+            deadline = start + timeout
+            interval = initial_interval
+            attempts = 0
+            last_error: Optional[BaseException] = None
+
+            while True:
+                attempts += 1
+                try:
+                    result = predicate()
+                    last_error = None
+                except Exception as e:
+                    result = None
+                    last_error = e
+                if result:
+                    WaitHelper._report(description, start, attempts, timeout, True)
+                    return result
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(interval, remaining))
+                interval = min(interval * backoff, max_interval)
+
+            WaitHelper._report(description, start, attempts, timeout, False, last_error)
+            message = f"等待超时 ({timeout}s): {description}"
+            if last_error is not None:
+                message = f"{message}, 最后一次错误: {last_error}"
+            raise TimeoutError(message)
+
+    # ------------------------- 轮询条件 -------------------------
+    @staticmethod
+    def database_exists(base_url: str, db_name: str, username: str = "root",
+                        password: str = "") -> Callable[[], bool]:
+        """数据库出现在 SHOW DATABASES 结果中"""
+
+        def predicate() -> bool:
+            response = CnosDBHelper._make_request(
+                base_url=base_url,
+                endpoint="/api/v1/sql?db=",
+                data="SHOW DATABASES",
+                username=username,
+                password=password,
+                expected_status=None
+            )
+            if response.status_code != 200:
+                return False
+            return any(row.get("database_name") == db_name for row in response.json())
+
+        return predicate
+
+    @staticmethod
+    def pods_ready(k8s, label_selector: str, count: Optional[int] = None) -> Callable[[], bool]:
+        """匹配 label_selector 的 Pod 全部 Ready，count 不为 None 时还要求数量一致"""
+
+        def predicate() -> bool:
+            pods = k8s.list_pods(label_selector=label_selector)
+            if count is not None and len(pods) != count:
+                return False
+            return bool(pods) and all(pod["ready"] for pod in pods)
+
+        return predicate
+
+    @staticmethod
+    def directory_exists(k8s, pod_name: str, path: str) -> Callable[[], bool]:
+        """Pod 中的目录存在"""
+
+        def predicate() -> bool:
+            cmd = f"test -d {shlex.quote(path)} && echo exists || echo missing"
+            result = k8s.exec_command(pod_name=pod_name, command=["/bin/bash", "-c", cmd])
+            return "exists" in result
+
+        return predicate
+
+    # ------------------------- watch 等待 -------------------------
+    @staticmethod
+    def wait_for_resources(
+            list_func: Callable,
+            namespace: str,
+            condition: Callable[[Dict[str, Any]], bool],
+            description: str,
+            timeout: float = 300,
+            **list_kwargs
+    ) -> Dict[str, Any]:
+        """
+        先 LIST 再从返回的 resourceVersion 开始 WATCH，每个事件后检查条件
+        :param list_func: 命名空间级别的 list 方法，例如 core_v1.list_namespaced_pod
+        :param namespace: 命名空间
+        :param condition: 以 {名称: 资源对象} 为参数，返回真值表示条件满足
+        :param description: 等待内容描述
+        :param timeout: 最长等待时间(秒)
+        :param list_kwargs: 传给 list_func 的其他参数，例如 label_selector
+        :return: 条件满足时的 {名称: 资源对象}
+        :raises TimeoutError: 超过 timeout 仍未满足时
+        """
+        from kubernetes import client, watch
+
+        with allure.step(f"等待: {description}"):
+            start = time.monotonic()
+            deadline = start + timeout
+            events = 0
+
+            def relist():
+                listing = list_func(namespace, **list_kwargs)
+                return {item.metadata.name: item for item in listing.items}, listing.metadata.resource_version
+
+            objects, resource_version = relist()
+            if condition(objects):
+                WaitHelper._report(description, start, events, timeout, True)
+                return objects
+
+            watcher = watch.Watch()
+            while time.monotonic() < deadline:
+                remaining = deadline - time.monotonic()
+                try:
+                    for event in watcher.stream(
+                            list_func,
+                            namespace,
+                            resource_version=resource_version,
+                            timeout_seconds=max(1, int(remaining)),
+                            _request_timeout=remaining + 5,
+                            **list_kwargs
+                    ):
+                        events += 1
+                        obj = event["object"]
+                        resource_version = obj.metadata.resource_version
+                        if event["type"] == "DELETED":
+                            objects.pop(obj.metadata.name, None)
+                        else:
+                            objects[obj.metadata.name] = obj
+                        if condition(objects):
+                            watcher.stop()
+                            WaitHelper._report(description, start, events, timeout, True)
+                            return objects
+                        if time.monotonic() >= deadline:
+                            watcher.stop()
+                            break
+                except client.ApiException as e:
+                    # resourceVersion 过期 (410 Gone) 时重新 LIST
+                    if e.status != 410:
+                        raise
+                    objects, resource_version = relist()
+                    if condition(objects):
+                        WaitHelper._report(description, start, events, timeout, True)
+                        return objects
+
+            WaitHelper._report(description, start, events, timeout, False)
+            raise TimeoutError(f"等待超时 ({timeout}s): {description}")
+
+    @staticmethod
+    def wait_for_pods_ready(k8s, label_selector: str, count: Optional[int] = None,
+                            timeout: float = 300) -> Dict[str, Any]:
+        """通过 watch 等待匹配 label_selector 的 Pod 全部 Ready"""
+
+        def condition(pods: Dict[str, Any]) -> bool:
+            if count is not None and len(pods) != count:
+                return False
+            return bool(pods) and all(
+                k8s.is_pod_ready(pod) and pod.metadata.deletion_timestamp is None for pod in pods.values()
+            )
+
+        return WaitHelper.wait_for_resources(
+            k8s.core_v1.list_namespaced_pod,
+            k8s.default_namespace,
+            condition,
+            description=f"Pod Ready: {label_selector} (count={count})",
+            timeout=timeout,
+            label_selector=label_selector
+        )
+
+    @staticmethod
+    def wait_for_pod_deleted(k8s, name: str, timeout: float = 300) -> Dict[str, Any]:
+        """通过 watch 等待 Pod 被删除"""
+        return WaitHelper.wait_for_resources(
+            k8s.core_v1.list_namespaced_pod,
+            k8s.default_namespace,
+            lambda pods: name not in pods,
+            description=f"Pod 删除: {name}",
+            timeout=timeout,
+            field_selector=f"metadata.name={name}"
+        )
+
+    @staticmethod
+    def wait_for_deployment_available(k8s, name: str, timeout: float = 300) -> Dict[str, Any]:
+        """通过 watch 等待 Deployment 的可用副本数达到期望副本数"""
+
+        def condition(deployments: Dict[str, Any]) -> bool:
+            deploy = deployments.get(name)
+            if deploy is None:
+                return False
+            return (deploy.status.observed_generation or 0) >= deploy.metadata.generation and \
+                (deploy.status.available_replicas or 0) == deploy.spec.replicas and \
+                (deploy.status.updated_replicas or 0) == deploy.spec.replicas
+
+        return WaitHelper.wait_for_resources(
+            k8s.apps_v1.list_namespaced_deployment,
+            k8s.default_namespace,
+            condition,
+            description=f"Deployment 可用: {name}",
+            timeout=timeout,
+            field_selector=f"metadata.name={name}"
+        )
+
+    # ------------------------- 内部方法 -------------------------
+    @staticmethod
+    def _report(description: str, start: float, attempts: int, timeout: float, success: bool,
+                error: Optional[BaseException] = None):
+        """把等待结果记录到 Allure 和日志"""
+        elapsed = time.monotonic() - start
+        allure.attach(
+            json.dumps({
+                "description": description,
+                "success": success,
+                "elapsed": round(elapsed, 3),
+                "attempts": attempts,
+                "timeout": timeout,
+                "last_error": str(error) if error else None
+            }, indent=2, ensure_ascii=False),
+            name=f"Wait {'OK' if success else 'Timeout'} ({elapsed:.2f}s)",
+            attachment_type=allure.attachment_type.JSON
+        )
+        if success:
+            log.info(f"等待完成: {description} (耗时: {elapsed:.3f}s, 次数: {attempts})")
+        else:
+            log.warning(f"等待超时: {description} (耗时: {elapsed:.3f}s, 次数: {attempts})")
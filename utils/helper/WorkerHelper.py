@@ -0,0 +1,146 @@
+import heapq
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, TypeVar, Union
+
+T = TypeVar("T")
+
+
+def _default_key(item) -> str:
+    """默认排序键: dict 资源取 "name" 字段，其他资源取字符串本身"""
+    return item["name"] if isinstance(item, dict) else str(item)
+
+
+class WorkerHelper:
+    """
+    pytest-xdist 并行执行时的工作进程信息与资源划分
+    未使用 xdist 时视为只有一个工作进程 master，所有方法退化为单进程行为
+
+    db_name = WorkerHelper.db_name("db4")            # gw1 上为 db4_gw1
+    my_pods = WorkerHelper.shard(pods, key=lambda p: p["name"])
+    """
+
+    RUN_ID_ENV = "TEST_RUN_ID"
+    # loguru 文本日志每条记录的开头
+    _LOG_RECORD_START = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3} \|")
+
+    # ------------------------- 工作进程信息 -------------------------
+    @staticmethod
+    def worker_id() -> str:
+        """当前工作进程 ID，例如 gw0；未使用 xdist 或在主进程中时为 master"""
+        return os.getenv("PYTEST_XDIST_WORKER", "master")
+
+    @staticmethod
+    def worker_count() -> int:
+        """工作进程总数，未使用 xdist 时为 1"""
+        return int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1"))
+
+    @staticmethod
+    def worker_index() -> int:
+        """当前工作进程序号，gw3 为 3，master 为 0"""
+        worker = WorkerHelper.worker_id()
+        return int(worker[2:]) if worker.startswith("gw") else 0
+
+    @staticmethod
+    def is_worker() -> bool:
+        """是否运行在 xdist 工作进程中"""
+        return "PYTEST_XDIST_WORKER" in os.environ
+
+    @staticmethod
+    def is_controller(config) -> bool:
+        """是否为负责会话级产物的进程: 未使用 xdist 时的唯一进程，或 xdist 的主进程"""
+        return not hasattr(config, "workerinput")
+
+    @staticmethod
+    def run_id() -> str:
+        """本次运行的 ID，主进程生成后通过环境变量传给工作进程"""
+        run_id = os.getenv(WorkerHelper.RUN_ID_ENV)
+        if run_id is None:
+            run_id = os.environ[WorkerHelper.RUN_ID_ENV] = uuid.uuid4().hex[:12]
+        return run_id
+
+    # ------------------------- 资源划分 -------------------------
+    @staticmethod
+    def db_name(base: str) -> str:
+        """工作进程专属的数据库名，未使用 xdist 时返回 base 本身"""
+        if not WorkerHelper.is_worker():
+            return base
+        return f"{base}_{WorkerHelper.worker_id()}"
+
+    @staticmethod
+    def shard(items: Sequence[T], key: Optional[Callable[[T], str]] = None,
+              index: Optional[int] = None, count: Optional[int] = None) -> List[T]:
+        """
+        把资源按工作进程划分为互不相交的子集
+        各工作进程独立查询到的列表顺序可能不同，先按 key 排序保证划分一致
+        :param items: 全部资源，例如 list_pods 的返回值
+        :param key: 排序键，默认按 "name" 字段或字符串本身
+        :param index: 工作进程序号，默认为当前进程
+        :param count: 工作进程总数，默认为当前进程数
+        :return: 当前工作进程负责的资源；资源数少于进程数时部分进程得到空列表
+        """
+        index = WorkerHelper.worker_index() if index is None else index
+        count = WorkerHelper.worker_count() if count is None else count
+        return sorted(items, key=key or _default_key)[index::count]
+
+    # ------------------------- 日志合并 -------------------------
+    @staticmethod
+    def worker_log_dir(logs_dir: Union[str, Path] = "logs") -> Path:
+        """本次运行各工作进程的日志目录"""
+        return Path(logs_dir) / "workers" / WorkerHelper.run_id()
+
+    @staticmethod
+    def merge_worker_logs(logs_dir: Union[str, Path] = "logs", remove: bool = True) -> List[Path]:
+        """
+        按时间顺序合并本次运行各工作进程的日志
+        文本日志 (.log) 每条记录前加上工作进程 ID，JSON Lines 日志 (.jsonl) 每条记录自带 worker 字段
+        :param logs_dir: 日志根目录
+        :param remove: 合并后是否删除工作进程日志
+        :return: 合并后的日志路径列表，没有工作进程日志时为空
+        """
+        worker_dir = WorkerHelper.worker_log_dir(logs_dir)
+        if not worker_dir.is_dir():
+            return []
+
+        merged = []
+        for suffix in (".log", ".jsonl"):
+            files = sorted(worker_dir.glob(f"*{suffix}"))
+            if not files:
+                continue
+            target = Path(logs_dir) / f"pytest_merged_{WorkerHelper.run_id()}{suffix}"
+            streams = [WorkerHelper._iter_records(path) for path in files]
+            with target.open("w", encoding="utf-8") as out:
+                for _, worker, record in heapq.merge(*streams):
+                    out.write(f"[{worker}] {record}" if suffix == ".log" else record)
+            merged.append(target)
+            if remove:
+                for path in files:
+                    path.unlink()
+
+        if remove:
+            for directory in (worker_dir, worker_dir.parent):
+                if not any(directory.iterdir()):
+                    directory.rmdir()
+        return merged
+
+    @staticmethod
+    def _iter_records(path: Path) -> Iterator[tuple]:
+        """逐条产出 (排序键, 工作进程, 记录)，文本日志中跨行的异常堆栈归入上一条记录"""
+        worker = path.name.split(".")[0]
+        with path.open(encoding="utf-8", errors="replace") as f:
+            if path.suffix == ".jsonl":
+                for line in f:
+                    yield json.loads(line)["ts"], worker, line
+                return
+
+            record: List[str] = []
+            for line in f:
+                if WorkerHelper._LOG_RECORD_START.match(line) and record:
+                    yield record[0][:23], worker, "".join(record)
+                    record = []
+                record.append(line)
+            if record:
+                yield record[0][:23], worker, "".join(record)
@@ -0,0 +1,513 @@
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.helper.LineProtocolEncoder import LineProtocolEncoder
+
+
+class FieldSpec(NamedTuple):
+    """字段名及取值范围"""
+    name: str
+    low: float
+    high: float
+
+
+class WorkloadProfile(NamedTuple):
+    """
+    场景模板
+    primary_tag 的取值个数等于序列数，tags 中其他标签的默认基数可以通过 tag_cardinality 覆盖
+    """
+    measurement: str
+    primary_tag: str
+    tags: Dict[str, int]
+    fields: Tuple[FieldSpec, ...]
+
+
+class _Layout(NamedTuple):
+    """一行数据在字节矩阵中的布局，同一块内所有行相同"""
+    template: np.ndarray
+    tag_slots: List[Tuple[Tuple[int, int], str]]
+    field_slots: List[Tuple[int, int]]
+    time_slot: Tuple[int, int]
+
+
+PROFILES: Dict[str, WorkloadProfile] = {
+    # 与示例数据 air/station 一致的气象站场景
+    "iot": WorkloadProfile(
+        measurement="air",
+        primary_tag="station",
+        tags={"region": 16},
+        fields=(
+            FieldSpec("visibility", 0, 100),
+            FieldSpec("temperature", -20, 40),
+            FieldSpec("pressure", 950, 1050),
+            FieldSpec("humidity", 0, 100),
+            FieldSpec("wind_speed", 0, 40),
+        ),
+    ),
+    # 主机监控场景
+    "devops": WorkloadProfile(
+        measurement="cpu",
+        primary_tag="hostname",
+        tags={"region": 9, "datacenter": 27, "rack": 100, "os": 3, "service": 20, "team": 8},
+        fields=tuple(FieldSpec(f"usage_{name}", 0, 100) for name in (
+            "user", "system", "idle", "nice", "iowait", "irq", "softirq", "steal", "guest", "guest_nice"
+        )),
+    ),
+}
+
+
+class WorkloadGenerator:
+    """
+    确定性的高基数写入负载生成器，按行号计算每个点，输出 Line Protocol 数据块
+
+    workload = WorkloadGenerator("iot", series=10000, points_per_series=360, interval="10s", seed=1)
+    CnosDBHelper.bulk_write(base_url, "db_load", workload.iter_chunks(10000), precision=workload.precision)
+
+    数据按时间优先排列: 第 r 行属于第 r // series 个时间点、第 r % series 个序列。
+    所有取值由 (seed, 行号) 的哈希决定，与分块大小无关，同一环境中相同参数每次生成完全相同的数据，
+    可用于比较不同 CnosDB 版本的写入吞吐。取值经过 np.sin 计算，不同平台或 NumPy 构建之间
+    个别值的最后一位小数可能不同，跨环境比较时以 describe() 的参数为准，不要比较数据的字节。
+    乱序点按 out_of_order 比例选出，延迟 lateness 个采样周期后发送，即排在同一序列的下一个点之后；
+    乱序只改变发送顺序，不改变数据集本身。
+    """
+
+    PERIOD_NS = 86400 * 10 ** 9
+    BLOCK_ROWS = 4096
+    TABLE_LIMIT = 1 << 20
+    SERIES_TABLE_BYTES = 64 << 20
+
+    def __init__(
+            self,
+            profile: Union[str, WorkloadProfile] = "iot",
+            series: int = 1000,
+            fields: Optional[int] = None,
+            start: Union[str, int, pd.Timestamp] = "2024-01-01T00:00:00Z",
+            interval: Union[str, int, pd.Timedelta] = "10s",
+            points_per_series: Optional[int] = None,
+            end: Union[str, int, pd.Timestamp, None] = None,
+            out_of_order: float = 0.0,
+            lateness: int = 1,
+            tag_cardinality: Optional[Dict[str, int]] = None,
+            seed: int = 0,
+            precision: str = "ns",
+            decimals: int = 2
+    ):
+        """
+        :param profile: 场景名称 (iot/devops) 或自定义 WorkloadProfile
+        :param series: 序列数，即主标签的基数
+        :param fields: 每个点的字段数，默认使用场景的全部字段，超出部分补充 field_<n> 字段
+        :param start: 起始时间，字符串、Timestamp 或纳秒整数
+        :param interval: 采样间隔，字符串、Timedelta 或纳秒整数
+        :param points_per_series: 每个序列的点数，与 end 二选一，都不指定时为 1
+        :param end: 结束时间 (不包含)
+        :param out_of_order: 乱序点比例，0~1
+        :param lateness: 乱序点延迟的采样周期数
+        :param tag_cardinality: 覆盖次要标签的基数，例如 {"region": 100}，可以加入场景中没有的标签
+        :param seed: 随机种子
+        :param precision: 输出时间精度 ns/us/ms
+        :param decimals: 字段值保留的小数位数
+        """
+        if isinstance(profile, str):
+            if profile not in PROFILES:
+                raise ValueError(f"profile must be one of {list(PROFILES)}, got {profile!r}")
+            profile = PROFILES[profile]
+        if precision not in LineProtocolEncoder.PRECISIONS:
+            raise ValueError(f"precision must be one of {LineProtocolEncoder.PRECISIONS}, got {precision!r}")
+        if series < 1:
+            raise ValueError(f"series must be positive, got {series}")
+        if not 0 <= out_of_order <= 1:
+            raise ValueError(f"out_of_order must be between 0 and 1, got {out_of_order}")
+        if lateness < 1:
+            raise ValueError(f"lateness must be positive, got {lateness}")
+
+        self.profile = profile
+        self.series = series
+        self.seed = seed
+        self.precision = precision
+        self.decimals = decimals
+        self.out_of_order = out_of_order
+        self.lateness = lateness
+
+        self.start_ns = self._to_ns(start)
+        self.interval_ns = int(pd.Timedelta(interval).value)
+        unit = {"ns": 1, "us": 10 ** 3, "ms": 10 ** 6}[precision]
+        if self.start_ns < 0:
+            raise ValueError("start must not be before 1970-01-01")
+        if self.interval_ns <= 0 or self.interval_ns % unit or self.start_ns % unit:
+            raise ValueError(f"start and interval must be positive multiples of 1{precision}")
+        self._unit = unit
+
+        if end is not None:
+            if points_per_series is not None:
+                raise ValueError("points_per_series and end are mutually exclusive")
+            points_per_series = max(0, -(-(self._to_ns(end) - self.start_ns) // self.interval_ns))
+        self.points_per_series = 1 if points_per_series is None else points_per_series
+
+        self.tags = {profile.primary_tag: series}
+        for name, cardinality in {**profile.tags, **(tag_cardinality or {})}.items():
+            if name == profile.primary_tag:
+                raise ValueError(f"cardinality of {name!r} is the series count")
+            if cardinality < 1:
+                raise ValueError(f"cardinality of {name!r} must be positive, got {cardinality}")
+            self.tags[name] = cardinality
+
+        count = len(profile.fields) if fields is None else fields
+        if count < 1:
+            raise ValueError(f"fields must be positive, got {count}")
+        self.fields: List[FieldSpec] = list(profile.fields[:count]) + [
+            FieldSpec(f"field_{index}", 0, 100) for index in range(len(profile.fields), count)
+        ]
+
+        self._prepare_layout()
+
+    # ------------------------- 属性 -------------------------
+    @property
+    def measurement(self) -> str:
+        return self.profile.measurement
+
+    @property
+    def total_points(self) -> int:
+        return self.series * self.points_per_series
+
+    @property
+    def tag_names(self) -> List[str]:
+        return sorted(self.tags)
+
+    @property
+    def field_names(self) -> List[str]:
+        return [field.name for field in self.fields]
+
+    def describe(self) -> Dict[str, Any]:
+        """负载参数，可作为基准测试报告的 metadata 以便复现"""
+        return {
+            "measurement": self.measurement,
+            "series": self.series,
+            "points_per_series": self.points_per_series,
+            "total_points": self.total_points,
+            "tags": dict(sorted(self.tags.items())),
+            "fields": self.field_names,
+            "start": pd.Timestamp(self.start_ns, tz="UTC").isoformat(),
+            "interval_ns": self.interval_ns,
+            "out_of_order": self.out_of_order,
+            "lateness": self.lateness,
+            "seed": self.seed,
+            "precision": self.precision,
+            "decimals": self.decimals,
+        }
+
+    # ------------------------- 生成 -------------------------
+    def iter_chunks(self, chunk_rows: int = 100000) -> Iterator[bytes]:
+        """
+        按发送顺序分块生成 Line Protocol，可直接作为 CnosDBHelper.bulk_write 的输入
+        无乱序时每块正好 chunk_rows 行 (最后一块除外)，有乱序时各块行数略有浮动
+        """
+        if chunk_rows < 1:
+            raise ValueError(f"chunk_rows must be positive, got {chunk_rows}")
+        total = self.total_points
+        delay = self._delay_rows() if self.out_of_order else 0
+        for position in range(0, total + delay, chunk_rows):
+            rows = self._emitted_rows(position, min(position + chunk_rows, total + delay))
+            if len(rows):
+                yield self.encode_rows(rows)
+
+    def encode_rows(self, rows: np.ndarray) -> bytes:
+        """把指定行号的点编码为 Line Protocol，行号顺序即输出顺序"""
+        rows = np.asarray(rows, dtype=np.int64)
+        series_ids = rows % self.series
+        steps = rows // self.series
+        values = self._scaled_values(rows, series_ids, steps)
+        if not len(rows):
+            return b""
+
+        # 所有取值都不跨越符号和位数时 (常见情况)，按实际长度的布局直接填入输出矩阵，每段大小保持在 CPU 缓存内
+        layout = self._exact_layout(values, self._timestamp(steps.min()), self._timestamp(steps.max()))
+        if layout is not None:
+            matrix = np.empty((len(rows), len(layout.template)), dtype=np.uint8)
+            for offset in range(0, len(rows), self.BLOCK_ROWS):
+                block = slice(offset, offset + self.BLOCK_ROWS)
+                self._fill_block(layout, matrix[block], series_ids[block], steps[block], values[block])
+            return matrix.tobytes()
+
+        # 否则按最大宽度填充，0 为未使用的位置 (负号、数字的前导位)，去掉后按行拼接
+        parts = []
+        for offset in range(0, len(rows), self.BLOCK_ROWS):
+            block = slice(offset, offset + self.BLOCK_ROWS)
+            block_steps, block_values = steps[block], values[block]
+            layout = self._exact_layout(block_values, self._timestamp(block_steps.min()),
+                                        self._timestamp(block_steps.max())) or self._layout
+            matrix = np.empty((len(block_steps), len(layout.template)), dtype=np.uint8)
+            self._fill_block(layout, matrix, series_ids[block], block_steps, block_values)
+            parts.append(matrix.tobytes() if layout is not self._layout else matrix[matrix != 0].tobytes())
+        return b"".join(parts)
+
+    def to_dataframe(self, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """按行号顺序返回 [start, stop) 行的数据，取值与写入的 Line Protocol 一致，用于校验查询结果"""
+        stop = self.total_points if stop is None else min(stop, self.total_points)
+        rows = np.arange(start, max(start, stop), dtype=np.int64)
+        series_ids = rows % self.series
+        steps = rows // self.series
+
+        frame = {"time": pd.to_datetime(self.start_ns + steps * self.interval_ns, utc=True)}
+        for (begin, end), name in self._tag_slots:
+            digits = self._format_tag(name, series_ids % self.tags[name])
+            frame[name] = np.char.add(f"{name}_", digits.view(f"S{end - begin}").ravel().astype(str))
+        values = self._scaled_values(rows, series_ids, steps) / 10 ** self.decimals
+        for index, field in enumerate(self.fields):
+            frame[field.name] = values[:, index]
+        return pd.DataFrame(frame)
+
+    def write(self, base_url: str, db_name: str, chunk_rows: int = 10000, **kwargs) -> List[Dict[str, Any]]:
+        """通过 CnosDBHelper.bulk_write 写入全部数据，每个数据块为一个批次"""
+        from utils.helper.CnosDBHelper import CnosDBHelper
+
+        kwargs.setdefault("batch_lines", chunk_rows)
+        return CnosDBHelper.bulk_write(base_url, db_name, self.iter_chunks(chunk_rows),
+                                       precision=self.precision, **kwargs)
+
+    # ------------------------- 内部方法 -------------------------
+    @staticmethod
+    def _to_ns(value) -> int:
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+        return int(timestamp.value)
+
+    def _prepare_layout(self):
+        """计算按最大宽度排列的布局、取值格式化表和每个序列的取值参数"""
+        self._field_widths = [self._number_width(field) for field in self.fields]
+        last = (self.start_ns + max(self.points_per_series - 1, 0) * self.interval_ns) // self._unit
+        self._time_width = len(str(last))
+        self._layout = self._build_layout(tuple(self._field_widths), self._time_width)
+        self._tag_slots = self._layout.tag_slots
+        self._layouts: Dict[Tuple[Tuple[int, ...], int], _Layout] = {}
+        self._narrow_tables: Dict[Tuple[int, int], np.ndarray] = {}
+
+        # 取值范围不大时预先格式化所有可能的值，编码时只需查表
+        self._tag_tables = {
+            name: self._digits(np.arange(self.tags[name]), end - begin, padded=True)
+            for (begin, end), name in self._tag_slots if self.tags[name] <= self.TABLE_LIMIT
+        }
+        # series key (表名和全部标签) 只由序列号决定，不太大时按序列预先拼好，编码时一次查表
+        self._key_width = self._tag_slots[-1][0][1]
+        self._series_keys = None
+        if self.series * self._key_width <= self.SERIES_TABLE_BYTES:
+            self._series_keys = np.empty((self.series, self._key_width), dtype=np.uint8)
+            self._series_keys[:] = self._layout.template[:self._key_width]
+            self._fill_tags(self._series_keys, np.arange(self.series, dtype=np.int64))
+        self._field_tables = []
+        for field, width in zip(self.fields, self._field_widths):
+            low, high = self._scaled_range(field)
+            table = None
+            if high - low < self.TABLE_LIMIT:
+                table = self._format_number(np.arange(low, high + 1, dtype=np.int64), width)
+            self._field_tables.append((low, table))
+
+        # 每个序列的基准值和日周期相位
+        series_ids = np.arange(self.series, dtype=np.int64)
+        self._phase = 2 * np.pi * self._uniform(series_ids, stream=1)
+        self._lows = np.array([field.low for field in self.fields], dtype=np.float64)
+        self._spans = np.array([field.high - field.low for field in self.fields], dtype=np.float64)
+        counters = series_ids[:, None] * len(self.fields) + np.arange(len(self.fields))
+        self._base = self._lows + self._spans * (0.25 + 0.5 * self._uniform(counters, stream=2))
+
+    def _build_layout(self, field_widths: Tuple[int, ...], time_width: int) -> _Layout:
+        """按各字段和时间戳的宽度计算每行各片段在字节矩阵中的位置"""
+        constants: List[Tuple[Tuple[int, int], np.ndarray]] = []
+        position = 0
+
+        def constant(text: str):
+            nonlocal position
+            data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+            constants.append(((position, position + len(data)), data))
+            position += len(data)
+
+        # 标签值为 <标签名>_<定长序号>，序列键长度固定
+        constant(LineProtocolEncoder.escape_measurement(self.measurement))
+        tag_slots = []
+        for name in self.tag_names:
+            escaped = LineProtocolEncoder.escape_key(name)
+            constant(f",{escaped}={escaped}_")
+            width = len(str(self.tags[name] - 1))
+            tag_slots.append(((position, position + width), name))
+            position += width
+
+        field_slots = []
+        for index, (field, width) in enumerate(zip(self.fields, field_widths)):
+            constant((" " if index == 0 else ",") + LineProtocolEncoder.escape_key(field.name) + "=")
+            field_slots.append((position, position + width))
+            position += width
+
+        constant(" ")
+        time_slot = (position, position + time_width)
+        position += time_width
+        constant("\n")
+
+        template = np.zeros(position, dtype=np.uint8)
+        for (begin, end), data in constants:
+            template[begin:end] = data
+        return _Layout(template, tag_slots, field_slots, time_slot)
+
+    def _timestamp(self, step: int) -> int:
+        return (self.start_ns + int(step) * self.interval_ns) // self._unit
+
+    def _exact_layout(self, values: np.ndarray, first_timestamp: int, last_timestamp: int) -> Optional[_Layout]:
+        """
+        一组行中每个字段和时间戳的文本长度都不变时 (取值不跨越符号和位数)，返回按实际长度排列、没有空位的布局，
+        填充后无需再去掉 0 字节；否则返回 None
+        """
+        time_width = len(str(first_timestamp))
+        if len(str(last_timestamp)) != time_width:
+            return None
+        widths = []
+        for low, high in zip(values.min(axis=0).tolist(), values.max(axis=0).tolist()):
+            width = self._text_width(low)
+            if (low < 0) != (high < 0) or self._text_width(high) != width:
+                return None
+            widths.append(width)
+        key = (tuple(widths), time_width)
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = self._layouts[key] = self._build_layout(*key)
+        return layout
+
+    def _fill_block(self, layout: _Layout, matrix: np.ndarray, series_ids: np.ndarray, steps: np.ndarray,
+                    values: np.ndarray):
+        """按布局填充一段行的字节矩阵"""
+        if self._series_keys is not None:
+            matrix[:, :self._key_width] = np.take(self._series_keys, series_ids, axis=0)
+            matrix[:, self._key_width:] = layout.template[self._key_width:]
+        else:
+            matrix[:] = layout.template
+            self._fill_tags(matrix, series_ids)
+        for index, (begin, end) in enumerate(layout.field_slots):
+            matrix[:, begin:end] = self._format_field(index, values[:, index], end - begin)
+        # 同一段内的时间点很少且相邻，只对其中的时间点做数字转换
+        first = steps.min()
+        timestamps = (self.start_ns + np.arange(first, steps.max() + 1) * self.interval_ns) // self._unit
+        begin, end = layout.time_slot
+        matrix[:, begin:end] = np.take(self._digits(timestamps, end - begin), steps - first, axis=0)
+
+    def _fill_tags(self, matrix: np.ndarray, series_ids: np.ndarray):
+        for (begin, end), name in self._tag_slots:
+            matrix[:, begin:end] = self._format_tag(name, series_ids % self.tags[name])
+
+    def _text_width(self, value: int) -> int:
+        """定点整数格式化后的实际长度"""
+        return int(value < 0) + len(str(abs(value) // 10 ** self.decimals)) + (
+            1 + self.decimals if self.decimals else 0)
+
+    def _scaled_range(self, field: FieldSpec) -> Tuple[int, int]:
+        scale = 10 ** self.decimals
+        return int(np.rint(field.low * scale)), int(np.rint(field.high * scale))
+
+    def _number_width(self, field: FieldSpec) -> int:
+        """负号 + 整数部分 + 小数点 + 小数部分的最大宽度"""
+        integer_width = len(str(max(abs(value) for value in self._scaled_range(field)) // 10 ** self.decimals))
+        return 1 + integer_width + (1 + self.decimals if self.decimals else 0)
+
+    def _format_number(self, values: np.ndarray, width: int) -> np.ndarray:
+        """定点整数格式化为小数，未使用的负号和前导位为 0"""
+        scale = 10 ** self.decimals
+        magnitude = np.abs(values)
+        matrix = np.zeros((len(values), width), dtype=np.uint8)
+        matrix[:, 0] = np.where(values < 0, ord("-"), 0)
+        integer_end = width - (1 + self.decimals if self.decimals else 0)
+        matrix[:, 1:integer_end] = self._digits(magnitude // scale, integer_end - 1)
+        if self.decimals:
+            matrix[:, integer_end] = ord(".")
+            matrix[:, integer_end + 1:] = self._digits(magnitude % scale, self.decimals, padded=True)
+        return matrix
+
+    def _format_field(self, index: int, values: np.ndarray, width: int) -> np.ndarray:
+        """
+        格式化字段值，width 小于最大宽度时只保留右侧 width 个字节 (去掉的前导位都是 0)
+        此时所有取值的符号相同，负数的负号移到第一个字节
+        """
+        low, table = self._field_tables[index]
+        full = self._field_widths[index]
+        if table is None:
+            matrix = self._format_number(values, full)[:, full - width:]
+        elif width != full:
+            narrow = self._narrow_tables.get((index, width))
+            if narrow is None:
+                narrow = self._narrow_tables[(index, width)] = np.ascontiguousarray(table[:, full - width:])
+            matrix = np.take(narrow, values - low, axis=0)
+        else:
+            return np.take(table, values - low, axis=0)
+        if width != full and values[0] < 0:
+            matrix[:, 0] = ord("-")
+        return matrix
+
+    def _format_tag(self, name: str, values: np.ndarray) -> np.ndarray:
+        table = self._tag_tables.get(name)
+        if table is not None:
+            return np.take(table, values, axis=0)
+        return self._digits(values, len(str(self.tags[name] - 1)), padded=True)
+
+    def _scaled_values(self, rows: np.ndarray, series_ids: np.ndarray, steps: np.ndarray) -> np.ndarray:
+        """字段值乘以 10^decimals 后的整数，形状为 (行数, 字段数)"""
+        seconds = (self.start_ns + steps * self.interval_ns) % self.PERIOD_NS
+        daily = np.sin(2 * np.pi * seconds / self.PERIOD_NS + self._phase[series_ids])
+        noise = self._uniform(rows[:, None] * len(self.fields) + np.arange(len(self.fields)), stream=3) - 0.5
+        values = self._base[series_ids] + self._spans * (0.1 * daily[:, None] + 0.05 * noise)
+        values = np.clip(values, self._lows, self._lows + self._spans)
+        return np.rint(values * 10 ** self.decimals).astype(np.int64)
+
+    def _uniform(self, counters: np.ndarray, stream: int) -> np.ndarray:
+        """由 (seed, stream, 计数器) 决定的 [0, 1) 均匀分布，基于 splitmix64"""
+        key = self._mix(np.array([self.seed * 4 + stream], dtype=np.uint64))[0]
+        mixed = self._mix(counters.astype(np.uint64) ^ key)
+        return (mixed >> np.uint64(11)) * (1.0 / (1 << 53))
+
+    @staticmethod
+    def _mix(x: np.ndarray) -> np.ndarray:
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+    def _delay_rows(self) -> int:
+        return self.lateness * self.series
+
+    def _emitted_rows(self, begin: int, end: int) -> np.ndarray:
+        """
+        发送位置在 [begin, end) 内的行号
+        正常行的发送位置为行号本身，乱序行为行号 + 延迟，排在目标位置的正常行之后
+        """
+        total = self.total_points
+        if not self.out_of_order:
+            return np.arange(begin, min(end, total), dtype=np.int64)
+
+        # 正常行来自 [begin, end)，乱序行来自 [begin - delay, end - delay)
+        delay = self._delay_rows()
+        normal = np.arange(begin, min(end, total), dtype=np.int64)
+        normal = normal[~self._is_late(normal)]
+        late = np.arange(max(0, begin - delay), max(0, min(end - delay, total)), dtype=np.int64)
+        late = late[self._is_late(late)]
+
+        rows = np.concatenate([normal, late])
+        is_late = np.concatenate([np.zeros(len(normal), dtype=bool), np.ones(len(late), dtype=bool)])
+        order = np.lexsort((rows, is_late, rows + np.where(is_late, delay, 0)))
+        return rows[order]
+
+    def _is_late(self, rows: np.ndarray) -> np.ndarray:
+        return self._uniform(rows, stream=4) < self.out_of_order
+
+    @staticmethod
+    def _digits(values: np.ndarray, width: int, padded: bool = False) -> np.ndarray:
+        """
+        非负整数转为右对齐的 ASCII 数字矩阵
+        padded 为 False 时前导位置为 0 (输出时去掉)，为 True 时补 '0'
+        """
+        values = np.asarray(values, dtype=np.int64)[:, None]
+        powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+        digits = (values // powers % 10 + ord("0")).astype(np.uint8)
+        if not padded:
+            leading = values < powers
+            leading[:, -1] = False
+            digits[leading] = 0
+        return digits
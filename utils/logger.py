@@ -1,9 +1,17 @@
 # utils/logger.py
+import json
+import os
+import sys
+import threading
+import time
 from pathlib import Path
+from typing import Dict, Tuple
+
 from loguru import logger
-import sys
 import allure
 
+from utils.helper.WorkerHelper import WorkerHelper
+
 
 class PytestLoguru:
     """专为pytest+allure优化的日志工具"""
@@ -22,13 +30,18 @@ class PytestLoguru:
 
         # 初始化配置
         self._logs_dir = Path("logs")
+        self._sites: Dict[Tuple[str, int], list] = {}
+        self._sites_lock = threading.Lock()
         self._initialized = True
 
         # 清理现有handler
         logger.remove()
 
-        # 基础配置
-        self.configure()
+        # 基础配置，LOG_HIGH_VOLUME=1 时使用高吞吐模式
+        if os.getenv("LOG_HIGH_VOLUME") == "1":
+            self.configure_high_volume()
+        else:
+            self.configure()
 
     def configure(
             self,
@@ -45,6 +58,9 @@ class PytestLoguru:
             retention: 日志保留时间
             enqueue: 是否线程安全
         """
+        self._disable_sampling()
+        logger.remove()
+
         # 确保日志目录存在
         self._logs_dir.mkdir(exist_ok=True)
 
@@ -62,7 +78,7 @@ class PytestLoguru:
 
         # 文件输出配置
         logger.add(
-            self._logs_dir / "pytest_{time:YYYY-MM-DD}.log",
+            self._log_file(".log"),
             level=level,
             rotation=rotation,
             retention=retention,
@@ -76,15 +92,154 @@ class PytestLoguru:
         # 绑定Allure集成
         self._bind_allure()
 
+    def configure_high_volume(
+            self,
+            sample_every: int = 100,
+            rate_limit: float = 10,
+            console_level: str = "WARNING",
+            json_level: str = "DEBUG",
+            rotation: str = "100 MB",
+            retention: str = "7 days",
+            sampled_levels: Tuple[str, ...] = ("TRACE", "DEBUG", "INFO", "SUCCESS")
+    ):
+        """高吞吐模式，用于百万级请求的压测
+
+        每个调用点 (文件:行号) 独立采样和限速，被丢弃的日志不会格式化消息；
+        日志以紧凑的 JSON Lines 写入文件，控制台只输出 console_level 及以上级别；
+        ERROR/CRITICAL 不采样，仍然附加到 Allure。
+        消息请使用 loguru 的延迟格式化写法: log.info("收到响应: {} ({}s)", status, elapsed)
+
+        Args:
+            sample_every: 每个调用点每 N 条保留 1 条，1 表示不采样
+            rate_limit: 每个调用点每秒最多输出的条数，0 表示不限速
+            console_level: 控制台输出级别
+            json_level: JSON Lines 文件的输出级别
+            rotation: 日志轮转条件
+            retention: 日志保留时间
+            sampled_levels: 参与采样和限速的级别
+        """
+        self._disable_sampling()
+        logger.remove()
+        self._logs_dir.mkdir(exist_ok=True)
+
+        logger.add(
+            sys.stderr,
+            level=console_level,
+            format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+                   "<level>{level: <8}</level> | "
+                   "<cyan>{module}</cyan>:<cyan>{line}</cyan> - "
+                   "<level>{message}</level>",
+            colorize=True,
+            enqueue=True
+        )
+        logger.add(
+            self._log_file(".jsonl"),
+            level=json_level,
+            rotation=rotation,
+            retention=retention,
+            encoding="utf-8",
+            enqueue=True,
+            format=self._json_format
+        )
+        self._bind_allure()
+
+        self.sample_every = max(1, sample_every)
+        self.rate_limit = rate_limit
+        with self._sites_lock:
+            self._sites.clear()
+        for level in sampled_levels:
+            # 实例属性优先于 __getattr__，普通模式下删除后恢复直接转发
+            setattr(self, level.lower(), self._sampled(level))
+
+    def _log_file(self, suffix: str) -> Path:
+        """日志文件路径，xdist 工作进程各自写入本次运行的工作进程目录，结束后由主进程合并"""
+        if WorkerHelper.is_worker():
+            worker_dir = WorkerHelper.worker_log_dir(self._logs_dir)
+            worker_dir.mkdir(parents=True, exist_ok=True)
+            return worker_dir / f"{WorkerHelper.worker_id()}{suffix}"
+        return self._logs_dir / f"pytest_{{time:YYYY-MM-DD}}{suffix}"
+
+    def suppressed_summary(self) -> Dict[str, int]:
+        """各调用点被丢弃的日志条数 {"模块路径:行号": 条数}"""
+        with self._sites_lock:
+            return {f"{path}:{line}": state[1] for (path, line), state in self._sites.items() if state[1]}
+
+    def report_suppressed(self):
+        """输出被丢弃日志的汇总，并清零计数"""
+        summary = self.suppressed_summary()
+        with self._sites_lock:
+            for state in self._sites.values():
+                state[1] = 0
+        if not summary:
+            return summary
+        top = sorted(summary.items(), key=lambda item: item[1], reverse=True)[:10]
+        logger.warning(
+            "{} 条日志被采样或限速丢弃 (调用点 {} 个), 最多的调用点: {}",
+            sum(summary.values()), len(summary), ", ".join(f"{site}={count}" for site, count in top)
+        )
+        return summary
+
+    def _sampled(self, level: str):
+        """创建带按调用点采样和限速的日志方法"""
+
+        def log_method(message, *args, **kwargs):
+            frame = sys._getframe(1)
+            site = (frame.f_code.co_filename, frame.f_lineno)
+            with self._sites_lock:
+                # state: [已见条数, 未输出条数, 令牌数, 上次补充令牌的时间]
+                state = self._sites.get(site)
+                now = time.monotonic()
+                if state is None:
+                    state = self._sites[site] = [0, 0, float(self.rate_limit or 1), now]
+                state[0] += 1
+                keep = (state[0] - 1) % self.sample_every == 0
+                if keep and self.rate_limit:
+                    state[2] = min(float(self.rate_limit), state[2] + (now - state[3]) * self.rate_limit)
+                    state[3] = now
+                    keep = state[2] >= 1
+                    if keep:
+                        state[2] -= 1
+                if not keep:
+                    state[1] += 1
+                    return
+                suppressed, state[1] = state[1], 0
+            logger.opt(depth=1).bind(suppressed=suppressed).log(level, message, *args, **kwargs)
+
+        return log_method
+
+    def _disable_sampling(self):
+        for name in ("trace", "debug", "info", "success", "warning"):
+            self.__dict__.pop(name, None)
+
+    @staticmethod
+    def _json_format(record) -> str:
+        """把日志记录格式化为一行紧凑的 JSON"""
+        entry = {
+            "ts": record["time"].timestamp(),
+            "level": record["level"].name,
+            "site": f"{record['module']}:{record['line']}",
+            "worker": WorkerHelper.worker_id(),
+            "msg": record["message"],
+        }
+        extra = {k: v for k, v in record["extra"].items() if k != "json" and v}
+        if extra:
+            entry.update(extra)
+        if record["exception"] is not None:
+            entry["exception"] = repr(record["exception"].value)
+        record["extra"]["json"] = json.dumps(entry, ensure_ascii=False, default=str)
+        return "{extra[json]}\n"
+
     def _bind_allure(self):
         """绑定Allure报告集成"""
 
-        def allure_log(level: str, message: str, **kwargs):
-            # 原始日志记录
-            logger.opt(depth=1).log(level, message, **kwargs)
+        def allure_log(level: str, message: str, *args, **kwargs):
+            # 原始日志记录，depth=2 跳过下面的 lambda，记录真实的调用位置
+            logger.opt(depth=2).log(level, message, *args, **kwargs)
 
             # 关键日志附加到Allure
             if level in ("ERROR", "CRITICAL"):
+                if args or kwargs:
+                    message = message.format(*args, **kwargs)
                 with allure.step(f"[{level}] {message}"):
                     allure.attach(
                         message,
@@ -102,4 +257,4 @@ class PytestLoguru:
 
 
 # 全局单例实例
-log = PytestLoguru()
\ No newline at end of file
+log = PytestLoguru()